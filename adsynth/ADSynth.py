@@ -12,6 +12,7 @@
 import getpass
 import cmd
 from collections import defaultdict
+from itertools import chain
 import uuid
 import time
 import random
@@ -47,9 +48,17 @@ from adsynth.synthesizer.security_policies import apply_gpos, apply_restriction_
 from adsynth.synthesizer.sessions import create_dc_sessions, create_sessions
 from adsynth.utils.data import get_names_pool, get_surnames_pool, get_parameters_from_json, get_domains_pool
 from adsynth.utils.domains import get_domain_dn
-from adsynth.utils.parameters import print_all_parameters, get_int_param_value, get_perc_param_value
+from adsynth.utils.parameters import compile_parameters, print_all_parameters, get_int_param_value, get_perc_param_value
 from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
 from adsynth.DATABASE import *
+import adsynth.DATABASE as DB
+from adsynth.streaming_writer import StreamingGraphWriter, write_dataset
+from adsynth.neo4j_loader import BulkNeo4jLoader
+from adsynth.neo4j_admin_export import ARRAY_DELIMITER, export_dataset
+from adsynth.phase_profiler import PhaseProfiler
+from adsynth.phase_checkpoint import CHECKPOINT_PATH, PhaseCheckpoint
+from adsynth.skeleton_cache import SKELETON_CACHE_DIR, SKELETON_PHASES, SkeletonCache, skeleton_key
+from adsynth.utils.sampling import SAMPLING_VERSION, random_guid
 from adsynth.azure_ai.smart_params import SmartParameterGenerator
 import json
 from timeit import default_timer as timer
@@ -68,44 +77,20 @@ HYBRID_OBJECTS = {}      # Tracks objects that exist in both environments
 CLOUD_ONLY_OBJECTS = {}  # Tracks cloud-only objects
 ON_PREM_ONLY_OBJECTS = {} # Tracks on-premises only objects
 
-def reset_DB():
-	NODES.clear()
-	EDGES.clear()
-
-	for item in DATABASE_ID:
-		DATABASE_ID[item].clear()
-
-	dict_edges.clear()
-
-	for item in NODE_GROUPS:
-		NODE_GROUPS[item].clear()
-
-	GPLINK_OUS.clear()
-
-	GROUP_MEMBERS.clear()
-
-	SECURITY_GROUPS.clear()
-
-	LOCAL_ADMINS.clear()
-
-	ADMIN_USERS.clear()
-
-	ENABLED_USERS.clear() # processed names # Tiered
-
-	DISABLED_USERS.clear() # processed names
-
-	PAW_TIERS.clear() # Tiered
+# generate --format: dataset file (default) or BloodHound CE zip
+OUTPUT_FORMATS = ("json", "bloodhound")
 
-	S_TIERS.clear() # Tiered
-
-	WS_TIERS.clear() # Tiered
-
-	COMPUTERS.clear() # All
+# generate_data locals that later phases read, saved with every phase checkpoint
+GENERATE_RUN_VALUES = (
+	"current_time", "filename", "edge_stream", "functional_level", "ddp", "ddcp", "dcou", "gpos_container",
+	"domain_controllers", "users", "disabled_users", "admin", "misconfig_admin", "enabled_users",
+	"misconfig_regular_users", "misconfig_users_comps", "misconfig_user_comp_perc", "computers", "PAW", "Servers",
+	"Workstations", "server_operators", "print_operators", "num_regular_groups",
+)
 
-	ridcount.clear()
+def reset_DB():
+	DB.reset_DB()
 
-	KERBEROASTABLES.clear() # processed names
-	
 	SYNC_RELATIONSHIPS.clear()
 	HYBRID_OBJECTS.clear()
 	CLOUD_ONLY_OBJECTS.clear()
@@ -210,6 +195,14 @@ class MainMenu(cmd.Cmd):
 		self.json_file_name = None
 		self.level = "Customized"
 		self.dbname = None
+		self.dataset_name = None
+		# {"path", "nodes", "edges"} of the last dataset written
+		self.output = None
+		self.profile = False
+		self.trace_memory = False
+		self.output_format = "json"
+		self.checkpoint = False
+		self.resume = False
 
 		cmd.Cmd.__init__(self)
 
@@ -251,6 +244,14 @@ class MainMenu(cmd.Cmd):
  
 	def help_generate(self):
 		print("Generate an Active Directory attack graph based on the given parameters")
+		print("Usage: generate [--profile] [--trace-memory] [--checkpoint] [--resume] [--format json|bloodhound]")
+		print(f"  - --checkpoint saves the run to {CHECKPOINT_PATH} after every phase")
+		print("  - --resume continues a failed run from its last completed phase (same parameters)")
+		print("  - --format bloodhound writes a BloodHound CE zip (generated_datasets/<dataset>_bloodhound.zip)")
+		print("    straight from the generated graph instead of the JSON dataset")
+		print("  - Per-phase timings are written to generated_datasets/<dataset>.phases.json")
+		print("  - --trace-memory adds the peak memory of every phase (tracemalloc, several times slower)")
+		print("  - --profile dumps cProfile stats of the slowest phase (memory is not traced in that run)")
 
 	def help_generate_azure(self):
 		print("Generate an Azure Active Directory attack graph based on the given parameters")
@@ -573,16 +574,43 @@ class MainMenu(cmd.Cmd):
 			print("Database Connection Failed. Check your settings.")
 
 	def do_importdb(self, args):
-		"""Import a JSON file to Neo4j using APOC (manual permissions setup required)"""
+		"""Import a JSON file to Neo4j with the batched loader (adsynth/neo4j_loader.py), or with APOC (--apoc)"""
 		if not self.connected:
 			print("Neo4j connection has not been configured yet. Please run 'neo4jconfig' first.")
 			return
 
-		print("Please input the name of a JSON file in the folder 'generated_datasets' (excluding the file extension).")
-		print("Or provide the full path to your intended JSON file.")
-		print("If you want to import the dataset you have just generated in this terminal, please press Enter.")
-		
-		dataset_name = input("Dataset to be imported: ")
+		tokens = args.split()
+		use_apoc = "--apoc" in tokens
+		resume = "--resume" in tokens
+		batch_size = 10000
+		sessions = 2
+		names = []
+		i = 0
+		while i < len(tokens):
+			if tokens[i] in ("--batch-size", "--sessions") and i + 1 < len(tokens):
+				try:
+					value = int(tokens[i + 1])
+				except ValueError:
+					print(f"{tokens[i]} expects a number")
+					return
+				if tokens[i] == "--batch-size":
+					batch_size = value
+				else:
+					sessions = value
+				i += 2
+				continue
+			if not tokens[i].startswith("--"):
+				names.append(tokens[i])
+			i += 1
+
+		if names:
+			dataset_name = names[0]
+		else:
+			print("Please input the name of a JSON file in the folder 'generated_datasets' (excluding the file extension).")
+			print("Or provide the full path to your intended JSON file.")
+			print("If you want to import the dataset you have just generated in this terminal, please press Enter.")
+			
+			dataset_name = input("Dataset to be imported: ")
 		
 		if not dataset_name:
 			if self.dbname is None:
@@ -610,6 +638,33 @@ class MainMenu(cmd.Cmd):
 			print(f"Database connection error: {e}")
 			return
 
+		if use_apoc:
+			self.import_with_apoc(filename, file_path)
+			return
+
+		if not resume:
+			print("Clearing existing database...")
+			self.do_cleardb("")
+
+		print("========== BATCHED IMPORT ==========")
+		print(f"Importing: {filename} (batches of {batch_size} rows, {sessions} sessions)")
+		loader = BulkNeo4jLoader(self.driver, batch_size=batch_size, sessions=sessions)
+		try:
+			counts = loader.load(file_path, resume=resume)
+		except Exception as e:
+			print(f"Import failed: {e}")
+			print(f"Committed batches are recorded; run 'importdb {os.path.splitext(filename)[0]} --resume' to continue")
+			return
+
+		print("========== IMPORT COMPLETED ==========")
+		if loader.skipped_batches:
+			print(f"Skipped {loader.skipped_batches} batches committed by the previous run")
+		print(f"Total nodes: {counts['node']}")
+		print(f"Total relationships: {counts['relationship']}")
+
+	def import_with_apoc(self, filename, file_path):
+		# Previous importdb engine: the file is copied into Neo4j's import
+		# directory and loaded server-side with apoc.load.json
 		session = self.driver.session()
 		
 		try:
@@ -693,18 +748,83 @@ class MainMenu(cmd.Cmd):
 			session.close()
 
 	def help_importdb(self):
-		print("Import a JSON file to Neo4j using APOC")
-		print("Usage: importdb [filename]")
-		print("  - Copies file to /var/lib/neo4j/import/")
-		print("  - Requires write permissions to Neo4j import directory")
-		print("  - Run this first to set permissions:")
+		print("Import a JSON file to Neo4j")
+		print("Usage: importdb [filename] [--batch-size N] [--sessions N] [--resume] [--apoc]")
+		print("  - Streams the file from this machine in UNWIND batches (default 10000 rows, 2 sessions)")
+		print("  - --resume continues a failed import without clearing the database")
+		print("  - --apoc uses the previous APOC import instead:")
+		print("    copies file to /var/lib/neo4j/import/ (needs write permissions there)")
 		print("    sudo chmod 755 /var/lib/neo4j/import/")
 		print("    sudo chown $USER:$USER /var/lib/neo4j/import/")
 
+	def help_exportcsv(self):
+		print("Export a generated JSON file as neo4j-admin bulk import CSV files")
+		print("Usage: exportcsv [filename] [--neo4j4] [--array-delimiter C]")
+		print("  - Writes one header and data file per label set and relationship type to generated_datasets/<filename>_admin_csv")
+		print("  - Prints the neo4j-admin command (also saved as import.sh in that folder); run it while Neo4j is stopped")
+		print("  - --neo4j4 prints the Neo4j 4.x 'neo4j-admin import' command instead of 'neo4j-admin database import full'")
+
+	def do_exportcsv(self, args):
+		"""Write neo4j-admin import CSV files for a generated dataset (adsynth/neo4j_admin_export.py)"""
+		tokens = args.split()
+		neo4j_version = 4 if "--neo4j4" in tokens else 5
+		array_delimiter = ARRAY_DELIMITER
+		names = []
+		i = 0
+		while i < len(tokens):
+			if tokens[i] == "--array-delimiter" and i + 1 < len(tokens):
+				array_delimiter = tokens[i + 1]
+				i += 2
+				continue
+			if not tokens[i].startswith("--"):
+				names.append(tokens[i])
+			i += 1
+
+		if names:
+			dataset_name = names[0]
+		elif self.dbname is not None:
+			dataset_name = self.dbname
+		else:
+			print("No dataset generated recently. Usage: exportcsv <filename>")
+			return
+		filename = dataset_name if dataset_name.endswith('.json') else f"{dataset_name}.json"
+		file_path = filename if os.path.isabs(filename) else os.path.join("generated_datasets", filename)
+		if not os.path.exists(file_path):
+			print(f"File not found: {file_path}")
+			return
+
+		try:
+			exporter = export_dataset(file_path, array_delimiter=array_delimiter, neo4j_version=neo4j_version)
+		except ValueError as e:
+			print(f"Export failed: {e}")
+			return
+		counts = exporter.counts()
+		print(f"Exported {counts['node']} nodes and {counts['relationship']} relationships to {exporter.out_dir}")
+		if exporter.skipped:
+			print(f"Skipped {exporter.skipped} records that are not nodes or relationships (compact hyperedges)")
+		print("Stop Neo4j (or pick a database that does not exist yet), then run from that folder:")
+		print(exporter.command())
+
 	def do_generate(self, args):
 		
 		print(self.level)
-		passed = args
+		# --profile: cProfile every phase instead of tracing memory (adsynth/phase_profiler.py)
+		tokens = args.split()
+		self.profile = "--profile" in tokens
+		self.trace_memory = "--trace-memory" in tokens
+		# --checkpoint: save the run after every phase; --resume: continue from that save
+		self.checkpoint = "--checkpoint" in tokens
+		self.resume = "--resume" in tokens
+		tokens = [t for t in tokens if t not in ("--profile", "--trace-memory", "--checkpoint", "--resume")]
+		self.output_format = "json"
+		if "--format" in tokens:
+			i = tokens.index("--format")
+			if i + 1 >= len(tokens) or tokens[i + 1] not in OUTPUT_FORMATS:
+				print(f"--format expects one of: {', '.join(OUTPUT_FORMATS)}")
+				return
+			self.output_format = tokens[i + 1]
+			del tokens[i:i + 2]
+		passed = " ".join(tokens)
 		if passed != "":
 			try:
 				self.json_file_name = passed
@@ -727,9 +847,37 @@ class MainMenu(cmd.Cmd):
 		self.generate_data_azure()
 
 
+	def new_dataset_name(self, prefix=""):
+		# generated_datasets/<name>.json: a timestamp, unless dataset_name
+		# fixes the name (e.g. a point of adsynth/sweep.py)
+		if self.dataset_name:
+			return self.dataset_name
+		return prefix + datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3]
+
+	def set_output(self, path, num_nodes, num_edges):
+		# What the last generation wrote, e.g. for the manifest of adsynth/sweep.py
+		self.output = {"path": path, "nodes": num_nodes, "edges": num_edges}
+
+	def checkpoint_identity(self):
+		# A checkpoint is only resumed by a run with the same inputs
+		return {
+			"parameters": self.parameters,
+			"domain": self.domain,
+			"old_domain": self.old_domain,
+			"base_sid": self.base_sid,
+			"level": self.level,
+			"sampling_version": SAMPLING_VERSION,
+		}
+
 	def generate_data(self):
 		start_ = timer()
-		seed_number = get_single_int_param_value("seed", self.parameters)
+
+		# Resolve every parameter once; the getters then answer from its cache
+		parameters = compile_parameters(self.parameters)
+		for problem in parameters.problems:
+			print(f"Parameter warning - {problem}")
+
+		seed_number = get_single_int_param_value("seed", parameters)
 		if seed_number > 0:
 			random.seed(seed_number)
 
@@ -739,7 +887,7 @@ class MainMenu(cmd.Cmd):
 		
 		domain_dn = get_domain_dn(self.domain)
 
-		nTiers = get_num_tiers(self.parameters) 
+		nTiers = get_num_tiers(parameters) 
 
 		# RIDs below 1000 are used for default principals.
 		# RIDs of other objects should start from 1000.
@@ -750,287 +898,433 @@ class MainMenu(cmd.Cmd):
 		
 		users = []
 
-		convert_to_digraph = get_single_int_param_value("convert_to_directed_graphs", self.parameters)
-		
-		# session = self.driver.session()
-
-		print(f"Initiating the Active Directory Domain - {self.domain}")
-		functional_level = create_domain(self.domain, self.base_sid, domain_dn, self.parameters) # Ref: ADSimulator, DBCreator
-		
-		print("Building the fundamental framework of a tiered Active Directory model")
-		create_ad_skeleton(self.domain, self.base_sid, self.parameters, nTiers)
-
-		# -------------------------------------------------------------
-		# Active Directory Default OUs, Groups and GPOs
-		# Ref: DBCreator and ADSimulator have produced some default AD objects and relationships in their code
-		# Utilising Microsoft documentation as a knowledge base, I migrated their codes into ADSynth built-in database.
-		
-		print("Creating the default domain groups")
-		create_default_groups(self.domain, self.base_sid, self.old_domain) # Ref: ADSimulator, DBCreator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-		
-		print("Creating the admin groups")
-		create_admin_groups(self.domain, self.base_sid, nTiers)
-		
-		ddp = cs(str(uuid.uuid4()), self.base_sid).upper()
-		ddcp = cs(str(uuid.uuid4()), self.base_sid).upper()
-		dcou = cs(str(uuid.uuid4()), self.base_sid).upper()
-		gpos_container = cs(str(uuid.uuid4()), self.base_sid).upper()
-
-		print("Creating GPOs container")
-		create_gpos_container(self.domain, domain_dn, gpos_container)
-		
-		print("Creating default GPOs")
-		create_default_gpos(self.domain, domain_dn, ddp, ddcp) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-gpod/566e983e-3b72-4b2d-9063-a00ebc9514fd
-
-		print("Creating Domain Controllers OU")
-		create_domain_controllers_ou(self.domain, domain_dn, dcou) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/plan/delegating-administration-of-default-containers-and-ous
-
-		print("Applying Default GPOs")
-		apply_default_gpos(self.domain, ddp, ddcp, dcou) # Ref: DBCreator, ADSimulator
-
-		
-		# ENTERPRISE ADMINS
-		# Adding Ent Admins -> High Value Targets
-		print("Creating Enterprise Admins ACLs")
-		create_enterprise_admins_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-
+		convert_to_digraph = get_single_int_param_value("convert_to_directed_graphs", parameters)
 
-		# ADMINISTRATORS
-		# Adding Administrators -> High Value Targets
-		print("Creating Administrators ACLs")
-		create_administrators_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+		# Set-to-set permissions of directed graphs: 0 = expanded right away,
+		# 1 = kept as hyperedges and expanded at export, 2 = exported as hyperedges
+		use_hyperedges(get_single_int_param_value("lazy_hyperedges", parameters))
 
+		# Columnar, array-backed node/edge storage (adsynth/graph_store.py)
+		use_columnar_store(get_single_int_param_value("columnar_store", parameters) == 1)
 
-		# DOMAIN ADMINS
-		# Adding Domain Admins -> High Value Targets
-		print("Creating Domain Admins ACLs")
-		create_domain_admins_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-
-
-		# DC Groups
-		# Extra ENTERPRISE READ-ONLY DOMAIN CONTROLLERS
-		print("Generating DC groups ACLs")
-		create_default_dc_groups_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-
-		# DOMAIN CONTROLLERS
-		# Ref: ADSimulator, DBCreator and Microsoft, https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-authsod/c4012a57-16a9-42eb-8f64-aa9e04698dca
-		print("Creating Domain Controllers")
-		dc_properties_list, domain_controllers = generate_dcs(self.domain, self.base_sid, domain_dn, dcou, self.current_time, self.parameters, functional_level) # O(1)
-
-		# -------------------------------------------------------------
-		# GPOs - Creating GPOs for the root OUs in a Tier Model
-		print("Applying GPOs to critical OUs and tiers")
-		apply_gpos(self.domain, self.base_sid, nTiers) # Ref: Russell Smith, https://petri.com/keep-active-directory-secure-using-privileged-access-workstations/, https://volkandemirci.org/2022/01/17/privileged-access-workstations-kurulumu-ve-yapilandirilmasi-2/
-		
-
-		# Impose restriction on non-privileged OU
-		apply_restriction_gpos(self.domain, self.base_sid, self.parameters)
-
-
-		# Place all GPOs in the GPOs container
-		place_gpos_in_container(self.domain, gpos_container)
+		# Phase checkpoints (adsynth/phase_checkpoint.py): generate --checkpoint / --resume
+		checkpoint = PhaseCheckpoint(CHECKPOINT_PATH, self.checkpoint_identity(), GENERATE_RUN_VALUES,
+									 enabled=self.checkpoint or self.resume)
+		current_time = self.current_time
+		try:
+			resumed = self.resume and checkpoint.load()
+		except ValueError as e:
+			print(e)
+			return
+		if self.resume and not resumed:
+			print("No checkpoint found, generating from the first phase")
+
+		# Streaming export: edges are spilled to disk as soon as they are deduplicated
+		edge_stream = None
+		if resumed:
+			(current_time, filename, edge_stream, functional_level, ddp, ddcp, dcou, gpos_container,
+			 domain_controllers, users, disabled_users, admin, misconfig_admin, enabled_users,
+			 misconfig_regular_users, misconfig_users_comps, misconfig_user_comp_perc, computers, PAW, Servers,
+			 Workstations, server_operators, print_operators, num_regular_groups) = checkpoint.restored_values()
+			self.current_time = current_time
+			use_edge_stream(edge_stream)
+			print(f"Resuming after phase {checkpoint.phases[-1]}")
+		elif get_single_int_param_value("streaming_export", parameters) == 1:
+			filename = self.new_dataset_name()
+			edge_stream = StreamingGraphWriter(f"generated_datasets/{filename}.json")
+			use_edge_stream(edge_stream)
+		
+		# Started after the resume handling: every exit below goes through profiler.finish()
+		profiler = PhaseProfiler(profile=self.profile, trace_memory=self.trace_memory)
+		try:
+			# session = self.driver.session()
+
+			# Skeleton cache (adsynth/skeleton_cache.py): the default-AD scaffolding of the next phases
+			skeleton = SkeletonCache(SKELETON_CACHE_DIR, skeleton_key(self.domain, self.base_sid, self.old_domain, nTiers, parameters),
+									 enabled=get_single_int_param_value("skeleton_cache", parameters) == 1 and edge_stream is None and not resumed)
+			scaffolding = skeleton.load(parameters) if checkpoint.pending("skeleton") else None
+			if scaffolding is not None:
+				profiler.start_phase("skeleton")
+				print(f"Loaded the default Active Directory scaffolding of {self.domain} from the skeleton cache")
+				functional_level, ddp, ddcp, dcou, gpos_container = scaffolding
+				profiler.end_phase()
+				checkpoint.save(SKELETON_PHASES, locals())
+
+			if checkpoint.pending("skeleton"):
+				profiler.start_phase("skeleton")
+				print(f"Initiating the Active Directory Domain - {self.domain}")
+				functional_level = create_domain(self.domain, self.base_sid, domain_dn, parameters) # Ref: ADSimulator, DBCreator
+		
+				print("Building the fundamental framework of a tiered Active Directory model")
+				create_ad_skeleton(self.domain, self.base_sid, parameters, nTiers)
+				profiler.end_phase()
+				checkpoint.save("skeleton", locals())
+
+			# -------------------------------------------------------------
+			# Active Directory Default OUs, Groups and GPOs
+			# Ref: DBCreator and ADSimulator have produced some default AD objects and relationships in their code
+			# Utilising Microsoft documentation as a knowledge base, I migrated their codes into ADSynth built-in database.
+		
+			if checkpoint.pending("default_groups"):
+				profiler.start_phase("default_groups")
+				print("Creating the default domain groups")
+				create_default_groups(self.domain, self.base_sid, self.old_domain) # Ref: ADSimulator, DBCreator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+		
+				print("Creating the admin groups")
+				create_admin_groups(self.domain, self.base_sid, nTiers)
+		
+				ddp = cs(random_guid(), self.base_sid).upper()
+				ddcp = cs(random_guid(), self.base_sid).upper()
+				dcou = cs(random_guid(), self.base_sid).upper()
+				gpos_container = cs(random_guid(), self.base_sid).upper()
+				profiler.end_phase()
+				checkpoint.save("default_groups", locals())
+
+			if checkpoint.pending("default_gpos"):
+				profiler.start_phase("default_gpos")
+				print("Creating GPOs container")
+				create_gpos_container(self.domain, domain_dn, gpos_container)
+		
+				print("Creating default GPOs")
+				create_default_gpos(self.domain, domain_dn, ddp, ddcp) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-gpod/566e983e-3b72-4b2d-9063-a00ebc9514fd
+
+				print("Creating Domain Controllers OU")
+				create_domain_controllers_ou(self.domain, domain_dn, dcou) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/plan/delegating-administration-of-default-containers-and-ous
+
+				print("Applying Default GPOs")
+				apply_default_gpos(self.domain, ddp, ddcp, dcou) # Ref: DBCreator, ADSimulator
+				profiler.end_phase()
+				checkpoint.save("default_gpos", locals())
+
+		
+			# ENTERPRISE ADMINS
+			# Adding Ent Admins -> High Value Targets
+			if checkpoint.pending("admin_group_acls"):
+				profiler.start_phase("admin_group_acls")
+				print("Creating Enterprise Admins ACLs")
+				create_enterprise_admins_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+
+
+				# ADMINISTRATORS
+				# Adding Administrators -> High Value Targets
+				print("Creating Administrators ACLs")
+				create_administrators_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+
+
+				# DOMAIN ADMINS
+				# Adding Domain Admins -> High Value Targets
+				print("Creating Domain Admins ACLs")
+				create_domain_admins_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+
+
+				# DC Groups
+				# Extra ENTERPRISE READ-ONLY DOMAIN CONTROLLERS
+				print("Generating DC groups ACLs")
+				create_default_dc_groups_acls(self.domain) # Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+				profiler.end_phase()
+				skeleton.save(ddp, ddcp, dcou, gpos_container)
+				checkpoint.save("admin_group_acls", locals())
+
+			# DOMAIN CONTROLLERS
+			# Ref: ADSimulator, DBCreator and Microsoft, https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-authsod/c4012a57-16a9-42eb-8f64-aa9e04698dca
+			if checkpoint.pending("domain_controllers"):
+				profiler.start_phase("domain_controllers")
+				print("Creating Domain Controllers")
+				dc_properties_list, domain_controllers = generate_dcs(self.domain, self.base_sid, domain_dn, dcou, self.current_time, parameters, functional_level) # O(1)
+				profiler.end_phase()
+				checkpoint.save("domain_controllers", locals())
+
+			# -------------------------------------------------------------
+			# GPOs - Creating GPOs for the root OUs in a Tier Model
+			if checkpoint.pending("gpos"):
+				profiler.start_phase("gpos")
+				print("Applying GPOs to critical OUs and tiers")
+				apply_gpos(self.domain, self.base_sid, nTiers) # Ref: Russell Smith, https://petri.com/keep-active-directory-secure-using-privileged-access-workstations/, https://volkandemirci.org/2022/01/17/privileged-access-workstations-kurulumu-ve-yapilandirilmasi-2/
+		
+
+				# Impose restriction on non-privileged OU
+				apply_restriction_gpos(self.domain, self.base_sid, parameters)
+
+
+				# Place all GPOs in the GPOs container
+				place_gpos_in_container(self.domain, gpos_container)
+				profiler.end_phase()
+				checkpoint.save("gpos", locals())
 			
-		# -------------------------------------------------------------
-		# DEFAULT USERS and group relationships
-		# Ref: ADSimulator produced these in their code
-		# Utilising Microsoft documentation as a knowledge base, I migrated their code into ADSynth built-in database.
-		# https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-default-user-accounts
-		print("Generating default users")
-		generate_guest_user(self.domain, self.base_sid, self.parameters)
-		generate_default_account(self.domain, self.base_sid, self.parameters)
-		generate_administrator(self.domain, self.base_sid, self.parameters)
-		generate_krbtgt_user(self.domain, self.base_sid, self.parameters)
-		link_default_users_to_domain(self.domain, self.base_sid)
-		
-		# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-default-user-accounts
-		print("Creating ACLs for default users")
-		create_default_users_acls(self.domain, self.base_sid)
-
-		# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-		# Adminstrator account is Member of High value groups
-		print("Creating memberships for Administrator group")
-		create_adminstrator_memberships(self.domain)
-
-		# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-		print("Assigning members to default groups")
-		generate_default_member_of(self.domain, self.base_sid, self.old_domain)
-
-		# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/plan/security-best-practices/appendix-b--privileged-accounts-and-groups-in-active-directory
-		print("Creating ACLs for default groups")
-		create_default_groups_acls(self.domain, self.base_sid)
-
-
-		# -------------------------------------------------------------
-		# Creating users
-		num_users = get_int_param_value("User", "nUsers", self.parameters)
-		print(f"Creating {num_users} users")
-
-		# Get a list of enabled and disabled users
-		users, disabled_users = generate_users(self.domain, self.base_sid, num_users, self.current_time, self.first_names, self.last_names, self.parameters) # Ref: ADSimulator, DBCreator
-
-		# Segragate admin and regular users
-		perc_admin = get_perc_param_value("Admin", "Admin_Percentage", self.parameters)
-		all_admins, all_enabled_users = segregate_list(users, [perc_admin, 100 - perc_admin])
-
-		# Segregate admins and misconfigured admins in regular Users OU
-		misconfig_admin_regular_perc = get_perc_param_value("nodeMisconfig", "admin_regular", self.parameters)
-		if misconfig_admin_regular_perc > 50:
-			misconfig_admin_regular_perc = DEFAULT_CONFIGURATIONS["nodeMisconfig"]["admin_regular"]
-		admin, misconfig_admin = segregate_list(all_admins, [100 - misconfig_admin_regular_perc, misconfig_admin_regular_perc])
-
-		# Segregate regular users, misconfigured users in Admin OU and in Computers OU
-		misconfig_user_comp_perc = get_perc_param_value("nodeMisconfig", "user_comp", self.parameters)
-		if misconfig_admin_regular_perc + misconfig_user_comp_perc > 50:
-			misconfig_admin_regular_perc = DEFAULT_CONFIGURATIONS["nodeMisconfig"]["admin_regular"]
-			misconfig_user_comp_perc = DEFAULT_CONFIGURATIONS["nodeMisconfig"]["user_comp"]
-		enabled_users, misconfig_regular_users, misconfig_users_comps = \
-			segregate_list(all_enabled_users, [100 - misconfig_admin_regular_perc - misconfig_user_comp_perc, misconfig_admin_regular_perc, misconfig_user_comp_perc])
+			# -------------------------------------------------------------
+			# DEFAULT USERS and group relationships
+			# Ref: ADSimulator produced these in their code
+			# Utilising Microsoft documentation as a knowledge base, I migrated their code into ADSynth built-in database.
+			# https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-default-user-accounts
+			if checkpoint.pending("default_users"):
+				profiler.start_phase("default_users")
+				print("Generating default users")
+				generate_guest_user(self.domain, self.base_sid, parameters)
+				generate_default_account(self.domain, self.base_sid, parameters)
+				generate_administrator(self.domain, self.base_sid, parameters)
+				generate_krbtgt_user(self.domain, self.base_sid, parameters)
+				link_default_users_to_domain(self.domain, self.base_sid)
+		
+				# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-default-user-accounts
+				print("Creating ACLs for default users")
+				create_default_users_acls(self.domain, self.base_sid)
+
+				# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+				# Adminstrator account is Member of High value groups
+				print("Creating memberships for Administrator group")
+				create_adminstrator_memberships(self.domain)
+
+				# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+				print("Assigning members to default groups")
+				generate_default_member_of(self.domain, self.base_sid, self.old_domain)
+
+				# Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/plan/security-best-practices/appendix-b--privileged-accounts-and-groups-in-active-directory
+				print("Creating ACLs for default groups")
+				create_default_groups_acls(self.domain, self.base_sid)
+				profiler.end_phase()
+				checkpoint.save("default_users", locals())
+
+
+			# -------------------------------------------------------------
+			# Creating users
+			if checkpoint.pending("users"):
+				profiler.start_phase("users")
+				num_users = get_int_param_value("User", "nUsers", parameters)
+				print(f"Creating {num_users} users")
+
+				# Get a list of enabled and disabled users
+				users, disabled_users = generate_users(self.domain, self.base_sid, num_users, self.current_time, self.first_names, self.last_names, parameters) # Ref: ADSimulator, DBCreator
+
+				# Segragate admin and regular users
+				perc_admin = get_perc_param_value("Admin", "Admin_Percentage", parameters)
+				all_admins, all_enabled_users = segregate_list(users, [perc_admin, 100 - perc_admin])
+
+				# Segregate admins and misconfigured admins in regular Users OU
+				misconfig_admin_regular_perc = get_perc_param_value("nodeMisconfig", "admin_regular", parameters)
+				if misconfig_admin_regular_perc > 50:
+					misconfig_admin_regular_perc = DEFAULT_CONFIGURATIONS["nodeMisconfig"]["admin_regular"]
+				admin, misconfig_admin = segregate_list(all_admins, [100 - misconfig_admin_regular_perc, misconfig_admin_regular_perc])
+
+				# Segregate regular users, misconfigured users in Admin OU and in Computers OU
+				misconfig_user_comp_perc = get_perc_param_value("nodeMisconfig", "user_comp", parameters)
+				if misconfig_admin_regular_perc + misconfig_user_comp_perc > 50:
+					misconfig_admin_regular_perc = DEFAULT_CONFIGURATIONS["nodeMisconfig"]["admin_regular"]
+					misconfig_user_comp_perc = DEFAULT_CONFIGURATIONS["nodeMisconfig"]["user_comp"]
+				enabled_users, misconfig_regular_users, misconfig_users_comps = \
+					segregate_list(all_enabled_users, [100 - misconfig_admin_regular_perc - misconfig_user_comp_perc, misconfig_admin_regular_perc, misconfig_user_comp_perc])
+				profiler.end_phase()
+				checkpoint.save("users", locals())
  
 
-		# -------------------------------------------------------------
-		# Creating COMPUTERS
-		num_computers = get_int_param_value("Computer", "nComputers", self.parameters)
-		print("Generating", str(num_computers), "computers")
-
-		# Ref: ADSimulator, DBCreator, BadBlood
-		#      Microsoft, https://learn.microsoft.com/en-us/security/privileged-access-workstations/privileged-access-devices
-		computers, PAW, Servers, Workstations = generate_computers(self.domain, self.base_sid, num_computers, computers, self.current_time, self.parameters)
-
-		Workstations, misconfig_workstations = segregate_list(Workstations, [100 - misconfig_user_comp_perc, misconfig_user_comp_perc])
-		place_computers_in_tiers(self.domain, self.base_sid, nTiers, self.parameters, PAW, Servers, Workstations, misconfig_users_comps)
-
-		
-		# -------------------------------------------------------------
-		# Admin Users
-		print("Allocate Admin Users to tiers")
-
-		# Retrieve members of server operators and print operators
-		# to later generate sessions on Domain Controllers
-		server_operators = [] # Server Operators 
-		print_operators = []  # Print Operators 
-		
-		place_admin_users_in_tiers(self.domain, self.base_sid, nTiers, admin, misconfig_regular_users, server_operators, print_operators, self.parameters)
-		
-		# Non-admin Users
-		print("Allocate non-admin users to tiers")
-		place_normal_users_in_tiers(self.domain, enabled_users, disabled_users, misconfig_admin, misconfig_workstations, nTiers)
-
-
-		# -------------------------------------------------------------
-		# Creating GROUPS
-		print("Creating distribution groups and security groups")
-		num_regular_groups = create_groups(self.domain, self.base_sid, self.parameters, nTiers)
-		
-		print("Nesting groups")
-		nest_groups(self.domain, self.parameters) # Ref: DBCreator and ADSimulator
-
-		# Adding Users to Groups
-		# Admin users have been place into admistrative tiers. Now comes the normal users
-		print("Adding users to groups")
-		it_users = place_users_in_groups(self.domain, nTiers, self.parameters)
-
-
-		# -------------------------------------------------------------
-		print("Generate sessions")
-		create_sessions(nTiers, PAW_TIERS, S_TIERS, WS_TIERS, self.parameters)
-		
-		print("Generate cross-tier sessions")
-		create_misconfig_sessions(nTiers, self.level, self.parameters, len(enabled_users) + len(admin))
-
-		# Print Operators and Server Operators can log into Domain Controllers
-		# Idea Ref: Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
-		print("Print Operators and Server Operators can log into Domain Controllers")
-		create_dc_sessions(domain_controllers, server_operators, print_operators) # O(num of Domain Controllers)
+			# -------------------------------------------------------------
+			# Creating COMPUTERS
+			if checkpoint.pending("computers"):
+				profiler.start_phase("computers")
+				num_computers = get_int_param_value("Computer", "nComputers", parameters)
+				print("Generating", str(num_computers), "computers")
+
+				# Ref: ADSimulator, DBCreator, BadBlood
+				#      Microsoft, https://learn.microsoft.com/en-us/security/privileged-access-workstations/privileged-access-devices
+				computers, PAW, Servers, Workstations = generate_computers(self.domain, self.base_sid, num_computers, computers, self.current_time, parameters)
+				profiler.end_phase()
+				checkpoint.save("computers", locals())
+
+			if checkpoint.pending("placement"):
+				profiler.start_phase("placement")
+				Workstations, misconfig_workstations = segregate_list(Workstations, [100 - misconfig_user_comp_perc, misconfig_user_comp_perc])
+				place_computers_in_tiers(self.domain, self.base_sid, nTiers, parameters, PAW, Servers, Workstations, misconfig_users_comps)
+
+		
+				# -------------------------------------------------------------
+				# Admin Users
+				print("Allocate Admin Users to tiers")
+
+				# Retrieve members of server operators and print operators
+				# to later generate sessions on Domain Controllers
+				server_operators = [] # Server Operators 
+				print_operators = []  # Print Operators 
+		
+				place_admin_users_in_tiers(self.domain, self.base_sid, nTiers, admin, misconfig_regular_users, server_operators, print_operators, parameters)
+		
+				# Non-admin Users
+				print("Allocate non-admin users to tiers")
+				place_normal_users_in_tiers(self.domain, enabled_users, disabled_users, misconfig_admin, misconfig_workstations, nTiers)
+				profiler.end_phase()
+				checkpoint.save("placement", locals())
+
+
+			# -------------------------------------------------------------
+			# Creating GROUPS
+			if checkpoint.pending("groups"):
+				profiler.start_phase("groups")
+				print("Creating distribution groups and security groups")
+				num_regular_groups = create_groups(self.domain, self.base_sid, parameters, nTiers)
+		
+				print("Nesting groups")
+				nest_groups(self.domain, parameters) # Ref: DBCreator and ADSimulator
+
+				# Adding Users to Groups
+				# Admin users have been place into admistrative tiers. Now comes the normal users
+				print("Adding users to groups")
+				it_users = place_users_in_groups(self.domain, nTiers, parameters)
+				profiler.end_phase()
+				checkpoint.save("groups", locals())
+
+
+			# -------------------------------------------------------------
+			if checkpoint.pending("sessions"):
+				profiler.start_phase("sessions")
+				print("Generate sessions")
+				create_sessions(nTiers, PAW_TIERS, S_TIERS, WS_TIERS, parameters)
+		
+				print("Generate cross-tier sessions")
+				create_misconfig_sessions(nTiers, self.level, parameters, len(enabled_users) + len(admin))
+
+				# Print Operators and Server Operators can log into Domain Controllers
+				# Idea Ref: Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+				print("Print Operators and Server Operators can log into Domain Controllers")
+				create_dc_sessions(domain_controllers, server_operators, print_operators) # O(num of Domain Controllers)
+				profiler.end_phase()
+				checkpoint.save("sessions", locals())
 	
 		
-		# -------------------------------------------------------------
-		# Generate non-ACL Permissions
-		print("Generating non-ACL permissions")
-		create_control_management_permissions(self.domain, nTiers, False, self.parameters, convert_to_digraph)
-		
-		print("Generating misconfigured non-ACL permissions on individuals")
-		create_misconfig_permissions_on_individuals(nTiers, ADMIN_USERS, ENABLED_USERS, self.level, self.parameters, len(enabled_users) + len(admin))
-		
-		print("Generating misconfigured permissions on sets - From groups to OUs")
-		num_local_admin_groups = sum(len(subarray) for subarray in LOCAL_ADMINS)
-		create_misconfig_permissions_on_groups(self.domain, nTiers, self.level, self.parameters, num_local_admin_groups)     
-
-		print("Generating misconfigured membership - Group Nesting")
-		create_misconfig_group_nesting(self.domain, nTiers, self.level, self.parameters, num_regular_groups)
-
-		# -------------------------------------------------------------
-		#  Generate ACL Permissions, including genericall, genericwrite, writeowner, ....
-		print("Creating ACLs permissions")
-		create_control_management_permissions(self.domain, nTiers, True, self.parameters, convert_to_digraph)
-
-		# -------------------------------------------------------------
-		print("Adding Admin rights")
-		assign_administration_to_admin_principals(self.domain, nTiers, convert_to_digraph)
-		
-		print("Adding Local Admin rights")
-		assign_local_admin_rights(self.domain, nTiers, self.parameters, convert_to_digraph) 
-
-		
-		# -------------------------------------------------------------
-		# Default ACLs
-		# Ref: ADSimulator
-		create_default_AllExtendedRights(self.domain, nTiers, convert_to_digraph) # Ref: ADSimulator 
-		create_default_GenericWrite(self.domain, nTiers, self.parameters, convert_to_digraph) # Ref: ADSimulator
-		create_default_owns(self.domain, convert_to_digraph) # Ref: ADSimulator
-		create_default_write_dacl_owner(self.domain, nTiers, self.parameters, convert_to_digraph) # Ref: ADSimulator
-		create_default_GenericAll(self.domain, nTiers, self.parameters, convert_to_digraph) # Ref: ADSimulator
+			# -------------------------------------------------------------
+			# Generate non-ACL Permissions
+			if checkpoint.pending("permissions"):
+				profiler.start_phase("permissions")
+				print("Generating non-ACL permissions")
+				create_control_management_permissions(self.domain, nTiers, False, parameters, convert_to_digraph)
+				profiler.end_phase()
+				checkpoint.save("permissions", locals())
+		
+			if checkpoint.pending("misconfig"):
+				profiler.start_phase("misconfig")
+				print("Generating misconfigured non-ACL permissions on individuals")
+				create_misconfig_permissions_on_individuals(nTiers, ADMIN_USERS, ENABLED_USERS, self.level, parameters, len(enabled_users) + len(admin))
+		
+				print("Generating misconfigured permissions on sets - From groups to OUs")
+				num_local_admin_groups = sum(len(subarray) for subarray in LOCAL_ADMINS)
+				create_misconfig_permissions_on_groups(self.domain, nTiers, self.level, parameters, num_local_admin_groups)     
+
+				print("Generating misconfigured membership - Group Nesting")
+				create_misconfig_group_nesting(self.domain, nTiers, self.level, parameters, num_regular_groups)
+				profiler.end_phase()
+				checkpoint.save("misconfig", locals())
+
+			# -------------------------------------------------------------
+			#  Generate ACL Permissions, including genericall, genericwrite, writeowner, ....
+			if checkpoint.pending("acls"):
+				profiler.start_phase("acls")
+				print("Creating ACLs permissions")
+				create_control_management_permissions(self.domain, nTiers, True, parameters, convert_to_digraph)
+				profiler.end_phase()
+				checkpoint.save("acls", locals())
+
+			# -------------------------------------------------------------
+			if checkpoint.pending("admin_rights"):
+				profiler.start_phase("admin_rights")
+				print("Adding Admin rights")
+				assign_administration_to_admin_principals(self.domain, nTiers, convert_to_digraph)
+		
+				print("Adding Local Admin rights")
+				assign_local_admin_rights(self.domain, nTiers, parameters, convert_to_digraph) 
+				profiler.end_phase()
+				checkpoint.save("admin_rights", locals())
+
+		
+			# -------------------------------------------------------------
+			# Default ACLs
+			# Ref: ADSimulator
+			if checkpoint.pending("default_acls"):
+				profiler.start_phase("default_acls")
+				create_default_AllExtendedRights(self.domain, nTiers, convert_to_digraph) # Ref: ADSimulator 
+				create_default_GenericWrite(self.domain, nTiers, parameters, convert_to_digraph) # Ref: ADSimulator
+				create_default_owns(self.domain, convert_to_digraph) # Ref: ADSimulator
+				create_default_write_dacl_owner(self.domain, nTiers, parameters, convert_to_digraph) # Ref: ADSimulator
+				create_default_GenericAll(self.domain, nTiers, parameters, convert_to_digraph) # Ref: ADSimulator
+				profiler.end_phase()
+				checkpoint.save("default_acls", locals())
+
+		
+			# -------------------------------------------------------------
+			# Kerberoastable users
+			if checkpoint.pending("kerberoastables"):
+				profiler.start_phase("kerberoastables")
+				print("Creating Kerberoastable users")
+				create_kerberoastable_users(nTiers, parameters) # O(nUsers * perc of Kerberoastable)
+				profiler.end_phase()
+				checkpoint.save("kerberoastables", locals())
+		
+			num_nodes = get_num_nodes()
+			num_edges = len(dict_edges)
+			# Lazy hyperedges are exported as their member edges
+			if get_hyperedge_mode() == HYPEREDGE_LAZY:
+				num_edges += get_num_expanded_hyperedges()
+			print("Num of nodes = ", num_nodes)
+			print("Num of edges = ", num_edges)
+			if get_num_hyperedges():
+				print(f"Num of hyperedges = {get_num_hyperedges()} over {len(MEMBER_SETS)} member sets")
 
-		
-		# -------------------------------------------------------------
-		# Kerberoastable users
-		print("Creating Kerberoastable users")
-		create_kerberoastable_users(nTiers, self.parameters) # O(nUsers * perc of Kerberoastable)
-		
-		num_nodes = len(NODES)
-		num_edges = len(dict_edges)
-		print("Num of nodes = ", len(NODES))
-		print("Num of edges = ", len(dict_edges))
-
-		try:
-			print("Graph density = ", round(num_edges / (num_nodes * (num_nodes - 1)), 5))
-		except:
-			pass
+			try:
+				print("Graph density = ", round(num_edges / (num_nodes * (num_nodes - 1)), 5))
+			except:
+				pass
 
-		for i in NODE_GROUPS:
-			print("Number of ", i, " = ", len(NODE_GROUPS[i]))
-		
-		perc_misconfig_sessions = get_perc_param_value("perc_misconfig_sessions", "Low", self.parameters) / 100
-		num_misconfig = int(perc_misconfig_sessions * (len(enabled_users) + len(admin)))
-		print(f"Number of regular users = {len(enabled_users) + len(admin)} --- Num misconfig sessions = {num_misconfig}")
-
-		perc_misconfig_permissions = get_perc_param_value("perc_misconfig_permissions", "Low", self.parameters) / 100
-		num_misconfig = int(perc_misconfig_permissions * (len(enabled_users) + len(admin)))
-		print(f"Number of regular users = {len(enabled_users) + len(admin)} --- Num misconfig permissions = {num_misconfig}")
-
-		print("Dump to JSON file")
-		current_datetime = datetime.now()
-		# Format the date and time to include seconds
-		filename = current_datetime.strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3]
-		
-		with open(f"generated_datasets/{filename}.json", "w") as f:
-			for obj in NODES:
-				obj["type"] = "node"
-				# Use json.dumps() to convert the object to a JSON string without square brackets
-				json_str = json.dumps(obj, separators=(',', ':'))
-				# Write the JSON string to the file with a newline character
-				f.write(json_str + '\n')
-
-		# Open the file in append mode
-		with open(f"generated_datasets/{filename}.json", 'a') as f:
-			for obj in EDGES:
-				# Use json.dumps() to convert the object to a JSON string without square brackets
-				obj["type"] = "relationship"  # Added this line for relationships
-				json_str = json.dumps(obj, separators=(',', ':'))
-				# Write the JSON string to the file with a newline character
-				f.write(json_str + '\n')
-		
-		self.dbname = filename
+			for i in NODE_GROUPS:
+				print("Number of ", i, " = ", len(NODE_GROUPS[i]))
+		
+			perc_misconfig_sessions = get_perc_param_value("perc_misconfig_sessions", "Low", parameters) / 100
+			num_misconfig = int(perc_misconfig_sessions * (len(enabled_users) + len(admin)))
+			print(f"Number of regular users = {len(enabled_users) + len(admin)} --- Num misconfig sessions = {num_misconfig}")
+
+			perc_misconfig_permissions = get_perc_param_value("perc_misconfig_permissions", "Low", parameters) / 100
+			num_misconfig = int(perc_misconfig_permissions * (len(enabled_users) + len(admin)))
+			print(f"Number of regular users = {len(enabled_users) + len(admin)} --- Num misconfig permissions = {num_misconfig}")
+
+			print("Dump to JSON file")
+			profiler.start_phase("export")
+			if edge_stream is not None:
+				use_edge_stream(None)
+				num_metagraph = 0
+				if get_hyperedge_mode() == HYPEREDGE_LAZY:
+					for start_index, end_index, rel_type, props in iter_expanded_hyperedges():
+						edge_stream.add_edge(edge_stream.num_edges, start_index, end_index, rel_type, props)
+				elif get_hyperedge_mode() == HYPEREDGE_COMPACT:
+					metagraph = list(iter_metagraph_records())
+					num_metagraph = len(metagraph)
+					edge_stream.drain_records(metagraph)
+				edge_stream.finish(iter_node_records(), get_node_endpoint)
+				self.set_output(f"generated_datasets/{filename}.json", edge_stream.num_nodes, edge_stream.num_edges)
+				if self.output_format == "bloodhound":
+					# Streamed edges only exist in the dataset file
+					from bloodhound_exporter import export_legacy_dataset
+					zip_path = export_legacy_dataset(f"generated_datasets/{filename}.json", "generated_datasets", filename)
+					self.set_output(zip_path, edge_stream.num_nodes, edge_stream.num_edges - num_metagraph)
+			else:
+				filename = self.new_dataset_name()
+				if self.output_format == "bloodhound":
+					# Straight from the graph store to generated_datasets/<filename>_bloodhound.zip
+					from bloodhound_exporter import export_legacy_bloodhound
+					zip_path = export_legacy_bloodhound("generated_datasets", filename)
+					self.set_output(zip_path, get_num_nodes(), get_num_relationship_records())
+				else:
+					# One compact JSON object per line, nodes first then relationships
+					# (and the member set / hyperedge records of a compact metagraph)
+					edge_records = iter_edge_records()
+					if get_hyperedge_mode() == HYPEREDGE_COMPACT:
+						edge_records = chain(edge_records, iter_metagraph_records())
+					path = f"generated_datasets/{filename}.json"
+					self.set_output(path, *write_dataset(path, iter_node_records(), edge_records))
+		
+			self.dbname = filename
+		finally:
+			profiler.finish()
 		# ===============================================
+
+		# Per-phase timings next to the dataset: generated_datasets/<filename>.phases.json
+		profiler.print_summary()
+		profiler.write(f"generated_datasets/{filename}.json")
+		checkpoint.remove()
 		
 		end_ = timer()
 		print("Execution time = ", end_ - start_)
@@ -1053,6 +1347,15 @@ class MainMenu(cmd.Cmd):
 		# Reset database
 		reset_DB()
 
+		# The Azure generators write through node_operation / edge_operation,
+		# so they share the backends and the streaming export of generate
+		use_columnar_store(get_single_int_param_value("columnar_store", self.parameters) == 1)
+		edge_stream = None
+		if get_single_int_param_value("streaming_export", self.parameters) == 1:
+			filename = self.new_dataset_name()
+			edge_stream = StreamingGraphWriter(f"generated_datasets/{filename}.json")
+			use_edge_stream(edge_stream)
+
 		# Generate tenant
 		print(f"Initiating Azure AD tenant - {self.domain}")
 		tenant_id = az_create_tenant(self.domain)  # Reuse domain as tenant name
@@ -1110,7 +1413,9 @@ class MainMenu(cmd.Cmd):
 		# ===============================================
 		# Assign roles
 		print("Assigning roles")
-		az_assign_roles(users, groups, service_principals, roles, tenant_id, subscriptions, self.parameters)
+		# Subscription-scoped roles are held at the first subscription, a plain id like the tenant scope
+		az_assign_roles(users, groups, service_principals, roles, tenant_id,
+						subscriptions[0] if subscriptions else tenant_id, self.parameters)
 
 		# ===============================================
 		# Generate misconfigured permissions (permission-related edge types)
@@ -1120,25 +1425,24 @@ class MainMenu(cmd.Cmd):
 		# ===============================================
 		# Export to JSON
 		print("Exporting to JSON file")
-		current_datetime = datetime.now()
-		filename = current_datetime.strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3]
-		with open(f"generated_datasets/{filename}.json", "w") as f:
-			for obj in NODES:
-				obj["type"] = "node"
-				json_str = json.dumps(obj, separators=(',', ':'))
-				f.write(json_str + '\n')
-		with open(f"generated_datasets/{filename}.json", 'a') as f:
-			for obj in EDGES:
-				json_str = json.dumps(obj, separators=(',', ':'))
-				f.write(json_str + '\n')
+		if edge_stream is not None:
+			use_edge_stream(None)
+			edge_stream.finish(iter_node_records(), get_node_endpoint)
+			self.set_output(f"generated_datasets/{filename}.json", edge_stream.num_nodes, edge_stream.num_edges)
+		else:
+			filename = self.new_dataset_name()
+			path = f"generated_datasets/{filename}.json"
+			self.set_output(path, *write_dataset(path, iter_node_records(), iter_edge_records()))
 		self.dbname = filename
 
 		# ===============================================
 		# Print statistics
-		print("Num of nodes =", len(NODES))
-		print("Num of edges =", len(EDGES))
+		num_nodes = get_num_nodes()
+		num_edges = len(dict_edges)
+		print("Num of nodes =", num_nodes)
+		print("Num of edges =", num_edges)
 		try:
-			print("Graph density =", round(len(EDGES) / (len(NODES) * (len(NODES) - 1)), 5))
+			print("Graph density =", round(num_edges / (num_nodes * (num_nodes - 1)), 5))
 		except:
 			pass
 		for node_type in NODE_GROUPS:
@@ -1199,9 +1503,9 @@ class MainMenu(cmd.Cmd):
 		import os
 	
 		from adsynth.DATABASE import (
-			NODES, EDGES, NODE_GROUPS, dict_edges,
+			NODE_GROUPS, dict_edges,
 			SYNC_LINKS, SYNC_IDENTITY_NODES, TENANT_METADATA,
-			RUN_ID, reset_DB, ridcount,
+			reset_DB, ridcount,
 		)
 		import adsynth.DATABASE as DB
 	
@@ -1214,12 +1518,12 @@ class MainMenu(cmd.Cmd):
 		# Build domain list from what generate_data() created
 		# --------------------------------------------------------
 		domain_nodes = [
-			n for n in NODES
-			if n["labels"] and n["labels"][-1] == "Domain"
+			idx for idx in range(get_num_nodes())
+			if get_node_labels(idx) and get_node_labels(idx)[-1] == "Domain"
 		]
 		domains = []
-		for n in domain_nodes:
-			props = n["properties"]
+		for idx in domain_nodes:
+			props = get_node_properties(idx)
 			domains.append({
 				"name":  props.get("name", self.domain),
 				"id":    props.get("objectid", self.base_sid),
@@ -1316,9 +1620,9 @@ class MainMenu(cmd.Cmd):
 		users_per_tenant = {}
 		for t in tenants:
 			count = sum(
-				1 for n in NODES
-				if n["labels"] and n["labels"][-1] == "AZUser"
-				and n["properties"].get("tenantid") == t["id"]
+				1 for idx in range(get_num_nodes())
+				if get_node_labels(idx) and get_node_labels(idx)[-1] == "AZUser"
+				and get_node_property(idx, "tenantid") == t["id"]
 			)
 			users_per_tenant[t["id"]] = count if count > 0 else (
 				self.parameters.get("AZUser", {}).get("nUsers", 50)
@@ -1370,7 +1674,7 @@ class MainMenu(cmd.Cmd):
 		# --------------------------------------------------------
 		print("\nPhase 7: Exporting to JSON")
 	
-		num_nodes = len(NODES)
+		num_nodes = get_num_nodes()
 		num_edges = len(dict_edges)
 		print(f"  Total nodes: {num_nodes}")
 		print(f"  Total edges: {num_edges}")
@@ -1384,22 +1688,12 @@ class MainMenu(cmd.Cmd):
 			if NODE_GROUPS[label]:
 				print(f"  {label}: {len(NODE_GROUPS[label])}")
 	
-		current_datetime = datetime.now()
-		filename = "hybrid_v2_" + current_datetime.strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3]
+		filename = self.new_dataset_name("hybrid_v2_")
 	
 		os.makedirs("generated_datasets", exist_ok=True)
 	
-		with open(f"generated_datasets/{filename}.json", "w") as f:
-			for obj in NODES:
-				obj["type"] = "node"
-				json_str = json.dumps(obj, separators=(",", ":"))
-				f.write(json_str + "\n")
-	
-		with open(f"generated_datasets/{filename}.json", "a") as f:
-			for obj in EDGES:
-				obj["type"] = "relationship"
-				json_str = json.dumps(obj, separators=(",", ":"))
-				f.write(json_str + "\n")
+		path = f"generated_datasets/{filename}.json"
+		self.set_output(path, *write_dataset(path, iter_node_records(), iter_edge_records()))
 	
 		self.dbname = filename
 	
@@ -1413,25 +1707,11 @@ class MainMenu(cmd.Cmd):
 		if source_idx == -1 or target_idx == -1:
 			return
 			
-		edge = {
-			"id": str(len(EDGES)),
-			"type": "relationship",
-			"label": edge_type,
-			"start": {"id": str(source_idx)},
-			"end": {"id": str(target_idx)},
-			"properties": {}
-		}
-		
-		if prop_names and prop_values and len(prop_names) == len(prop_values):
-			for name, value in zip(prop_names, prop_values):
-				edge["properties"][name] = value
+		if not (prop_names and prop_values and len(prop_names) == len(prop_values)):
+			prop_names, prop_values = [], []
 		
-		EDGES.append(edge)
-		
-		# Update dict_edges for tracking
-		edge_key = f"{source_idx}-{target_idx}-{edge_type}"
-		if edge_key not in dict_edges:
-			dict_edges[edge_key] = 1
+		# Same records and dedup index as every other edge
+		edge_operation(source_idx, target_idx, edge_type, prop_names, prop_values)
 
 	# Additionally, you need to modify the generate_data_hybrid method slightly:
 	# Replace the Azure tenant creation section with this:
@@ -1447,6 +1727,10 @@ class MainMenu(cmd.Cmd):
 
 		# Reset database
 		reset_DB()
+		# Every generator picks its backend: an earlier run may have left the
+		# columnar store on.  Permissions are always expanded in this pipeline.
+		use_columnar_store(get_single_int_param_value("columnar_store", self.parameters) == 1)
+		use_hyperedges(HYPEREDGE_EAGER)
 		
 		# Initialize Azure node groups first
 		azure_node_types = ["AZUser", "AZGroup", "AZTenant", "AZSubscription", 
@@ -1473,10 +1757,10 @@ class MainMenu(cmd.Cmd):
 		create_admin_groups(self.domain, self.base_sid, nTiers)
 		
 		# Create GPOs and OUs
-		ddp = cs(str(uuid.uuid4()), self.base_sid).upper()
-		ddcp = cs(str(uuid.uuid4()), self.base_sid).upper()
-		dcou = cs(str(uuid.uuid4()), self.base_sid).upper()
-		gpos_container = cs(str(uuid.uuid4()), self.base_sid).upper()
+		ddp = cs(random_guid(), self.base_sid).upper()
+		ddcp = cs(random_guid(), self.base_sid).upper()
+		dcou = cs(random_guid(), self.base_sid).upper()
+		gpos_container = cs(random_guid(), self.base_sid).upper()
 		
 		create_gpos_container(self.domain, domain_dn, gpos_container)
 		create_default_gpos(self.domain, domain_dn, ddp, ddcp)
@@ -1568,22 +1852,8 @@ class MainMenu(cmd.Cmd):
 		# Create Azure tenant - FIXED VERSION
 		print(f"Creating Azure tenant for domain - {self.domain}")
 		tenant_id = str(uuid.uuid4()).upper()
-		tenant_node = {
-			"id": str(len(NODES)),
-			"labels": ["AZTenant"],
-			"properties": {
-				"name": self.domain,
-				"objectid": tenant_id,
-				"displayName": self.domain,
-				"tenantid": tenant_id
-			}
-		}
-		
-		# Add tenant to database manually to ensure it's tracked
-		tenant_idx = len(NODES)
-		NODES.append(tenant_node)
-		NODE_GROUPS["AZTenant"].append(tenant_idx)
-		DATABASE_ID["objectid"][tenant_id] = tenant_idx
+		az_node_operation("AZTenant", tenant_id, ["name", "displayName", "tenantid"],
+						  [self.domain, self.domain, tenant_id])
 		
 		# Create comprehensive Azure infrastructure
 		print("Creating Azure subscriptions")
@@ -1626,10 +1896,8 @@ class MainMenu(cmd.Cmd):
 		# Convert user indices to object IDs for Azure functions
 		azure_user_ids = []
 		for user_idx in all_azure_users:
-			if user_idx < len(NODES):
-				node = NODES[user_idx]
-				if "objectid" in node["properties"]:
-					azure_user_ids.append(node["properties"]["objectid"])
+			if user_idx < get_num_nodes() and has_node_property(user_idx, "objectid"):
+				azure_user_ids.append(get_node_property(user_idx, "objectid"))
 
 		# Assign group memberships
 		print("Assigning Azure group memberships")
@@ -1645,7 +1913,7 @@ class MainMenu(cmd.Cmd):
 		if roles and azure_user_ids:
 			try:
 				az_assign_roles(azure_user_ids, azure_groups, service_principals, roles, 
-							tenant_id, subscriptions, self.parameters)
+							tenant_id, subscriptions[0] if subscriptions else tenant_id, self.parameters)
 			except Exception as e:
 				print(f"Warning: Error in role assignment: {e}")
 				print("Continuing with hybrid generation...")
@@ -1701,32 +1969,22 @@ class MainMenu(cmd.Cmd):
 		print("=== PHASE 7: Export and Statistics ===")
 		
 		# Export to JSON
-		current_datetime = datetime.now()
-		filename = f"hybrid_{current_datetime.strftime('%Y-%m-%d_%H-%M-%S-%f')[:-3]}"
-		
-		with open(f"generated_datasets/{filename}.json", "w") as f:
-			for obj in NODES:
-				obj["type"] = "node"
-				json_str = json.dumps(obj, separators=(',', ':'))
-				f.write(json_str + '\n')
+		filename = self.new_dataset_name("hybrid_")
 		
-		with open(f"generated_datasets/{filename}.json", 'a') as f:
-			for obj in EDGES:
-				obj["type"] = "relationship"
-				json_str = json.dumps(obj, separators=(',', ':'))
-				f.write(json_str + '\n')
+		path = f"generated_datasets/{filename}.json"
+		self.set_output(path, *write_dataset(path, iter_node_records(), iter_edge_records()))
 		
 		self.dbname = filename
 		
 		# Print comprehensive statistics
 		print("=== COMPREHENSIVE HYBRID ENVIRONMENT STATISTICS ===")
-		print(f"Total nodes: {len(NODES)}")
-		print(f"Total edges: {len(EDGES)}")
+		print(f"Total nodes: {get_num_nodes()}")
+		print(f"Total edges: {get_num_edges()}")
 		print(f"Sync relationships: {len(SYNC_RELATIONSHIPS)}")
 		print(f"Hybrid objects: {len(HYBRID_OBJECTS)}")
 		
 		try:
-			print(f"Graph density: {round(len(EDGES) / (len(NODES) * (len(NODES) - 1)), 5)}")
+			print(f"Graph density: {round(get_num_edges() / (get_num_nodes() * (get_num_nodes() - 1)), 5)}")
 		except:
 			pass
 		
@@ -1768,38 +2026,21 @@ class MainMenu(cmd.Cmd):
 			onprem_node_idx = self.get_node_index(onprem_user + "_User", "name")
 			if onprem_node_idx == -1:
 				continue
-				
-			onprem_node = NODES[onprem_node_idx]
 			
 			# Create corresponding Azure user
 			azure_user_id = str(uuid.uuid4()).upper()
-			display_name = onprem_node["properties"].get("displayname", "Unknown User")
+			display_name = get_node_property(onprem_node_idx, "displayname", "Unknown User")
 			
 			# Create UPN based on on-premises name
 			base_name = onprem_user.split("@")[0] if "@" in onprem_user else onprem_user
 			upn = f"{base_name.lower()}@{self.domain.lower()}"
 			
-			# Create Azure user node manually - FIXED to match expected format
-			azure_node = {
-				"id": str(len(NODES)),
-				"labels": ["AZUser"],
-				"properties": {
-					"name": display_name,  # This is what az_assign_roles looks for
-					"userPrincipalName": upn,
-					"objectid": azure_user_id,
-					"tenantid": tenant_id,
-					"enabled": onprem_node["properties"].get("enabled", True),
-					"displayName": display_name,
-					"syncedFromOnPremises": True,
-					"onPremisesUserPrincipalName": onprem_user
-				}
-			}
-			
-			# Add to NODES and update tracking
-			azure_node_idx = len(NODES)
-			NODES.append(azure_node)
-			NODE_GROUPS["AZUser"].append(azure_node_idx)
-			DATABASE_ID["objectid"][azure_user_id] = azure_node_idx
+			# Create corresponding Azure user node
+			azure_node_idx = az_node_operation("AZUser", azure_user_id,
+				["name", "userPrincipalName", "tenantid", "enabled", "displayName",
+				 "syncedFromOnPremises", "onPremisesUserPrincipalName"],
+				[display_name, upn, tenant_id, get_node_property(onprem_node_idx, "enabled", True), display_name,
+				 True, onprem_user])
 			
 			# Create tenant relationship - check if tenant exists first
 			tenant_idx = self.get_node_index(tenant_id, "objectid")
@@ -1838,27 +2079,13 @@ class MainMenu(cmd.Cmd):
 			
 			user_id = str(uuid.uuid4()).upper()
 			
-			# FIXED to match expected format
-			user_node = {
-				"id": str(len(NODES)),
-				"labels": ["AZUser"],
-				"properties": {
-					"name": display_name,  # This is what az_assign_roles looks for
-					"userPrincipalName": upn,
-					"objectid": user_id,
-					"tenantid": tenant_id,
-					"enabled": random.choice([True, True, True, False]),  # 75% enabled
-					"displayName": display_name,
-					"syncedFromOnPremises": False,
-					"userType": random.choice(["Member", "Guest"]),
-					"accountType": "Cloud-Only"
-				}
-			}
-			
-			user_idx = len(NODES)
-			NODES.append(user_node)
-			NODE_GROUPS["AZUser"].append(user_idx)
-			DATABASE_ID["objectid"][user_id] = user_idx
+			enabled = random.choice([True, True, True, False])  # 75% enabled
+			user_type = random.choice(["Member", "Guest"])
+			user_idx = az_node_operation("AZUser", user_id,
+				["name", "userPrincipalName", "tenantid", "enabled", "displayName",
+				 "syncedFromOnPremises", "userType", "accountType"],
+				[display_name, upn, tenant_id, enabled, display_name,
+				 False, user_type, "Cloud-Only"])
 			
 			# Create tenant relationship
 			tenant_idx = self.get_node_index(tenant_id, "objectid")
@@ -1913,10 +2140,8 @@ class MainMenu(cmd.Cmd):
 		# Convert indices back to object IDs for some operations
 		azure_user_ids = []
 		for idx in azure_user_indices:
-			if idx < len(NODES):
-				node = NODES[idx]
-				if "objectid" in node["properties"]:
-					azure_user_ids.append(node["properties"]["objectid"])
+			if idx < get_num_nodes() and has_node_property(idx, "objectid"):
+				azure_user_ids.append(get_node_property(idx, "objectid"))
 		
 		# 1. Azure users managing on-premises resources
 		num_hybrid_admins = min(8, len(azure_user_indices))
@@ -1924,7 +2149,7 @@ class MainMenu(cmd.Cmd):
 			hybrid_admin_indices = random.sample(azure_user_indices, num_hybrid_admins)
 			
 			for admin_idx in hybrid_admin_indices:
-				if admin_idx >= len(NODES):
+				if admin_idx >= get_num_nodes():
 					continue
 					
 				# Azure admin can reset on-premises user passwords
@@ -1955,9 +2180,10 @@ class MainMenu(cmd.Cmd):
 				if sp_idx == -1:
 					continue
 					
-				# Service principal can read from on-premises
-				if ENABLED_USERS:
-					target_user = random.choice(ENABLED_USERS)
+				# Service principal can read from on-premises (ENABLED_USERS is tiered)
+				enabled_onprem_users = [user for tier in ENABLED_USERS for user in tier]
+				if enabled_onprem_users:
+					target_user = random.choice(enabled_onprem_users)
 					user_idx = self.get_node_index(target_user + "_User", "name")
 					if user_idx != -1:
 						self.edge_operation(sp_idx, user_idx, "ReadLAPSPassword",
@@ -2080,10 +2306,8 @@ class MainMenu(cmd.Cmd):
 			# The Azure functions expect user IDs, not indices
 			azure_user_ids = []
 			for user_idx in all_azure_users:
-				if user_idx < len(NODES):
-					node = NODES[user_idx]
-					if "objectid" in node["properties"]:
-						azure_user_ids.append(node["properties"]["objectid"])
+				if user_idx < get_num_nodes() and has_node_property(user_idx, "objectid"):
+					azure_user_ids.append(get_node_property(user_idx, "objectid"))
 			
 			if azure_user_ids:
 				az_assign_group_memberships(azure_groups, azure_user_ids, self.parameters)
@@ -2094,15 +2318,13 @@ class MainMenu(cmd.Cmd):
 			# Convert user indices to the format expected by az_assign_roles
 			azure_user_ids = []
 			for user_idx in all_azure_users:
-				if user_idx < len(NODES):
-					node = NODES[user_idx]
-					if "objectid" in node["properties"]:
-						azure_user_ids.append(node["properties"]["objectid"])
+				if user_idx < get_num_nodes() and has_node_property(user_idx, "objectid"):
+					azure_user_ids.append(get_node_property(user_idx, "objectid"))
 			
 			if azure_user_ids:
 				try:
 					az_assign_roles(azure_user_ids, azure_groups, service_principals, roles, 
-								tenant_id, subscriptions, self.parameters)
+								tenant_id, subscriptions[0] if subscriptions else tenant_id, self.parameters)
 				except Exception as e:
 					print(f"Warning: Error in role assignment: {e}")
 					print("Continuing with hybrid generation...")
@@ -2112,10 +2334,8 @@ class MainMenu(cmd.Cmd):
 		if all_azure_users:
 			azure_user_ids = []
 			for user_idx in all_azure_users:
-				if user_idx < len(NODES):
-					node = NODES[user_idx]
-					if "objectid" in node["properties"]:
-						azure_user_ids.append(node["properties"]["objectid"])
+				if user_idx < get_num_nodes() and has_node_property(user_idx, "objectid"):
+					azure_user_ids.append(get_node_property(user_idx, "objectid"))
 			
 			if azure_user_ids:
 				try:
@@ -1,110 +1,693 @@
-import copy
+import gc
+import json
 import sys
 import warnings
+from array import array
+from contextlib import contextmanager
+from itertools import chain
+
+from adsynth.graph_state import current_graph, graph_field, graph_value
+from adsynth.graph_store import ColumnarGraphStore
 
 def update_DATABASE_ID(label, NODES_index):
+    g = current_graph()
     identifiers = ["name", "objectid"]
     for identifier in identifiers:
-        if identifier in NODES[NODES_index]["properties"]:
-            check_data = NODES[NODES_index]["properties"][identifier]
+        if has_node_property(NODES_index, identifier):
+            check_data = get_node_property(NODES_index, identifier)
             if identifier == "name":
                 check_data += "_" + label
 
-            if check_data not in DATABASE_ID[identifier]:
-                DATABASE_ID[identifier][check_data] = NODES_index
+            if check_data not in g.DATABASE_ID[identifier]:
+                g.DATABASE_ID[identifier][check_data] = NODES_index
 
 def node_operation(label, keys, values, id_lookup, identifier = "objectid", is_domain = False):
-    global neo4j_id
+    g = current_graph()
     NODES_index = -1
-    new_node = dict()
 
     if identifier == "name":
         id_lookup += "_" + label
 
-    if id_lookup in DATABASE_ID[identifier]:
-        NODES_index = DATABASE_ID[identifier][id_lookup]
+    if id_lookup in g.DATABASE_ID[identifier]:
+        NODES_index = g.DATABASE_ID[identifier][id_lookup]
     else:
-        if not is_domain:
-            new_node = copy.deepcopy(AD_NODE)
+        if g.GRAPH_STORE is not None:
+            NODES_index = g.GRAPH_STORE.add_node(label, [] if is_domain else ["Base"], g.neo4j_id)
         else:
-            new_node = copy.deepcopy(AD_NODE_ADMIN)
-
-        NODES_index = len(NODES)
-        NODES.append(new_node)
-        DATABASE_ID[identifier][id_lookup] = NODES_index
-        NODE_GROUPS[label].append(NODES_index)
-        NODES[NODES_index]["id"] = str(neo4j_id)
-        neo4j_id += 1
+            # Same record as a deep copy of AD_NODE / AD_NODE_ADMIN, built directly
+            NODES_index = len(g.NODES)
+            g.NODES.append({"id": str(g.neo4j_id), "labels": [] if is_domain else ["Base"], "properties": {}})
+        g.DATABASE_ID[identifier][id_lookup] = NODES_index
+        g.NODE_GROUPS[label].append(NODES_index)
+        g.neo4j_id += 1
 
     for i in range(len(keys)):
-        if keys[i] == "labels":
-            if values[i] not in NODES[NODES_index][keys[i]]:
-                NODES[NODES_index][keys[i]].append(values[i])
-        else:
-            NODES[NODES_index]["properties"][keys[i]] = values[i]
+        set_node_value(NODES_index, keys[i], values[i])
 
     if label == "User" or "Computer":
-        NODES[NODES_index]["properties"]["owned"] = False
+        set_node_value(NODES_index, "owned", False)
 
     update_DATABASE_ID(label, NODES_index)
 
     return NODES_index
 
+@contextmanager
+def gc_paused():
+    # Bulk inserts allocate millions of acyclic dicts/lists; without this the
+    # cyclic collector rescans the growing graph over and over
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def bulk_node_operation(label, keys, columns):
+    # Bulk node_operation for freshly generated objects: columns[k][i] is the
+    # value of keys[k] for the i-th new node.  keys must include "objectid"
+    # and "name" and must not include "labels" (nodes get ["Base", label]).
+    # Returns the range of new node indices.
+    with gc_paused():
+        return _bulk_node_operation(label, keys, columns)
+
+def _bulk_node_operation(label, keys, columns):
+    g = current_graph()
+    objectids = columns[keys.index("objectid")]
+    names = columns[keys.index("name")]
+    count = len(objectids)
+
+    # Existing objects keep the update-in-place semantics of node_operation
+    if any(objectid in g.DATABASE_ID["objectid"] for objectid in objectids):
+        return [node_operation(label, list(keys) + ["labels"], list(row) + [label], row[keys.index("objectid")])
+                for row in zip(*columns)]
+
+    keys = list(keys) + ["owned"]
+    columns = list(columns) + [[False] * count]
+    if g.GRAPH_STORE is not None:
+        indices = g.GRAPH_STORE.add_nodes(label, ["Base", label], g.neo4j_id, keys, columns)
+    else:
+        first = len(g.NODES)
+        g.NODES.extend({"id": str(g.neo4j_id + i), "labels": ["Base", label], "properties": dict(zip(keys, row))}
+                     for i, row in enumerate(zip(*columns)))
+        indices = range(first, first + count)
+    g.neo4j_id += count
+    g.NODE_GROUPS[label].extend(indices)
+
+    g.DATABASE_ID["objectid"].update(zip(objectids, indices))
+    name_index = g.DATABASE_ID["name"]
+    for name, index in zip(names, indices):
+        name_index.setdefault(name + "_" + label, index)
+    return indices
+
+def bulk_edge_operation(start_indices, end_index, relationship_type, props = [], values = []):
+    # One relationship_type edge from every start index to end_index
+    g = current_graph()
+    if g.EDGE_STREAM is not None or g.HYPEREDGE_STARTS:
+        # Streamed edges, and edges a hyperedge may cover, go one at a time
+        for start_index in start_indices:
+            edge_operation(start_index, end_index, relationship_type, props, values)
+        return
+
+    properties = {}
+    for key, value in zip(props, values):
+        properties[key] = json.dumps(value) if isinstance(value, (dict, list)) else value
+    with gc_paused():
+        if g.GRAPH_STORE is not None:
+            _bulk_columnar_edges(start_indices, end_index, relationship_type, props, values, properties)
+        else:
+            _bulk_dict_edges(start_indices, end_index, relationship_type, props, values, properties)
+
+def _bulk_columnar_edges(start_indices, end_index, relationship_type, props, values, properties):
+    g = current_graph()
+    first = g.GRAPH_STORE.num_edges()
+    is_gplink_target = g.GRAPH_STORE.last_label(end_index) == "OU"
+    new_starts = []
+    for start_index in start_indices:
+        hashed_id_edge = pack_edge_key(start_index, end_index, relationship_type)
+        if hashed_id_edge in g.dict_edges:
+            edge_operation(start_index, end_index, relationship_type, props, values)
+            continue
+        g.dict_edges[hashed_id_edge] = first + len(new_starts)
+        new_starts.append(start_index)
+        if is_gplink_target and g.GRAPH_STORE.last_label(start_index) == "GPO":
+            g.GPLINK_OUS.append(end_index)
+
+    g.GRAPH_STORE.add_edges(new_starts, end_index, relationship_type)
+    for EDGES_index in range(first, first + len(new_starts)):
+        for key, value in properties.items():
+            g.GRAPH_STORE.set_edge_property(EDGES_index, key, value)
+
+def _bulk_dict_edges(start_indices, end_index, relationship_type, props, values, properties):
+    # Build the edge records directly instead of deep-copying AD_EDGE once per edge
+    g = current_graph()
+    end = g.NODES[end_index]
+    is_gplink_target = end["labels"][-1] == "OU"
+    for start_index in start_indices:
+        hashed_id_edge = pack_edge_key(start_index, end_index, relationship_type)
+        if hashed_id_edge in g.dict_edges:
+            edge_operation(start_index, end_index, relationship_type, props, values)
+            continue
+        start = g.NODES[start_index]
+        EDGES_index = len(g.EDGES)
+        g.EDGES.append({
+            "type": "relationship",
+            "id": "r_" + str(EDGES_index),
+            "label": relationship_type,
+            "properties": dict(properties),
+            "start": {"id": start["id"], "labels": start["labels"]},
+            "end": {"id": end["id"], "labels": end["labels"]},
+        })
+        g.dict_edges[hashed_id_edge] = EDGES_index
+        if is_gplink_target and start["labels"][-1] == "GPO":
+            g.GPLINK_OUS.append(end_index)
+
+def get_rel_type_code(relationship_type):
+    g = current_graph()
+    code = g.REL_TYPE_CODES.get(relationship_type)
+    if code is None:
+        code = len(g.REL_TYPE_CODES)
+        if code > EDGE_KEY_TYPE_MASK:
+            raise ValueError(f"Too many relationship types for the edge key: {relationship_type}")
+        g.REL_TYPE_CODES[relationship_type] = code
+        g.REL_TYPE_NAMES.append(relationship_type)
+    return code
+
+def pack_edge_key(start_index, end_index, relationship_type):
+    # Layout: | start_index | type code (16 bits) | end_index (32 bits) |
+    # Every field has a fixed width, so two different (start, type, end)
+    # triples can never produce the same key.
+    if not 0 <= end_index <= EDGE_KEY_NODE_MASK:
+        raise ValueError(f"Node index out of range for the edge key: {end_index}")
+    return (((start_index << EDGE_KEY_TYPE_BITS) | get_rel_type_code(relationship_type))
+            << EDGE_KEY_NODE_BITS) | end_index
+
+def unpack_edge_key(key):
+    g = current_graph()
+    end_index = key & EDGE_KEY_NODE_MASK
+    key >>= EDGE_KEY_NODE_BITS
+    code = key & EDGE_KEY_TYPE_MASK
+    start_index = key >> EDGE_KEY_TYPE_BITS
+    return start_index, end_index, g.REL_TYPE_NAMES[code]
+
 def edge_operation(start_index, end_index, relationship_type, props = [], values = []):
-    hashed_id_edge = str(start_index) + relationship_type + str(end_index)
+    # Inlined pack_edge_key - this is the hottest call in the generator
+    g = current_graph()
+    code = g.REL_TYPE_CODES.get(relationship_type)
+    if code is None:
+        code = get_rel_type_code(relationship_type)
+    if not 0 <= end_index <= EDGE_KEY_NODE_MASK:
+        raise ValueError(f"Node index out of range for the edge key: {end_index}")
+    hashed_id_edge = (((start_index << EDGE_KEY_TYPE_BITS) | code) << EDGE_KEY_NODE_BITS) | end_index
     EDGES_index = -1
-    new_edge = dict()
-
-    if hashed_id_edge not in dict_edges:
-        new_edge = copy.deepcopy(AD_EDGE)
-        EDGES_index = len(EDGES)
-        EDGES.append(new_edge)
-        dict_edges[hashed_id_edge] = EDGES_index
-        EDGES[EDGES_index]["id"] = "r_" + str(EDGES_index)
-        EDGES[EDGES_index]["label"] = relationship_type
-
-        EDGES[EDGES_index]["start"]["id"] = NODES[start_index]["id"]
-        EDGES[EDGES_index]["start"]["labels"] = NODES[start_index]["labels"]
-        EDGES[EDGES_index]["end"]["id"] = NODES[end_index]["id"]
-        EDGES[EDGES_index]["end"]["labels"] = NODES[end_index]["labels"]
 
-        if NODES[start_index]["labels"][-1] == "GPO" and NODES[end_index]["labels"][-1] == "OU":
-            GPLINK_OUS.append(end_index)
+    if hashed_id_edge not in g.dict_edges:
+        if g.EDGE_STREAM is not None:
+            EDGES_index = g.EDGE_STREAM.num_edges
+        elif g.GRAPH_STORE is not None:
+            EDGES_index = g.GRAPH_STORE.add_edge(start_index, end_index, relationship_type)
+        else:
+            # Same record as a deep copy of AD_EDGE, built directly
+            start = g.NODES[start_index]
+            end = g.NODES[end_index]
+            EDGES_index = len(g.EDGES)
+            g.EDGES.append({
+                "type": "relationship",
+                "id": "r_" + str(EDGES_index),
+                "label": relationship_type,
+                "properties": {},
+                "start": {"id": start["id"], "labels": start["labels"]},
+                "end": {"id": end["id"], "labels": end["labels"]},
+            })
+        g.dict_edges[hashed_id_edge] = EDGES_index
+
+        if _last_label(start_index) == "GPO" and _last_label(end_index) == "OU":
+            g.GPLINK_OUS.append(end_index)
+
+        # A member edge of earlier hyperedges starts with their properties,
+        # as if they had been expanded right away
+        covered = _covering_hyperedge_properties(start_index, end_index, relationship_type) \
+            if g.HYPEREDGE_STARTS else None
+
+        if g.EDGE_STREAM is not None:
+            properties = dict(covered) if covered else {}
+            properties.update(_edge_properties(props, values))
+            g.EDGE_STREAM.add_edge(EDGES_index, start_index, end_index, relationship_type, properties)
+            return
+
+        if covered:
+            if g.GRAPH_STORE is not None:
+                for key, value in covered.items():
+                    g.GRAPH_STORE.set_edge_property(EDGES_index, key, value)
+            else:
+                g.EDGES[EDGES_index]["properties"].update(covered)
 
     else:
-        EDGES_index = dict_edges[hashed_id_edge]
+        EDGES_index = g.dict_edges[hashed_id_edge]
+
+        if g.EDGE_STREAM is not None:
+            if props:
+                g.EDGE_STREAM.update_edge(EDGES_index, _edge_properties(props, values))
+            return
 
     for i in range(len(props)):
-        if isinstance(values[i], (dict, list)):
-            import json
-            EDGES[EDGES_index]["properties"][props[i]] = json.dumps(values[i])
+        value = values[i]
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        if g.GRAPH_STORE is not None:
+            g.GRAPH_STORE.set_edge_property(EDGES_index, props[i], value)
         else:
-            EDGES[EDGES_index]["properties"][props[i]] = values[i]
+            g.EDGES[EDGES_index]["properties"][props[i]] = value
+
+def _edge_properties(props, values):
+    properties = dict()
+    for i in range(len(props)):
+        value = values[i]
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        properties[props[i]] = value
+    return properties
 
 def get_node_index(id_lookup, identifier):
-    if id_lookup in DATABASE_ID[identifier]:
-        return DATABASE_ID[identifier][id_lookup]
+    g = current_graph()
+    if id_lookup in g.DATABASE_ID[identifier]:
+        return g.DATABASE_ID[identifier][id_lookup]
 
     warnings.simplefilter('error', UserWarning)
     warnings.warn(f"Node not exisit: {id_lookup} - {identifier}")
     return -1
 
 
+# ============================================================
+# Azure objects
+# The azure_ad_system generators refer to their objects by objectid.
+# These wrappers put them through node_operation / edge_operation, so
+# Azure nodes and edges get the on-prem record layout, the active
+# backend (dict, columnar or streamed) and the packed-key edge dedup.
+# ============================================================
+
+def az_node_operation(label, objectid, keys, values):
+    return node_operation(label, ["labels", "objectid"] + keys, [label, objectid] + values, objectid)
+
+def az_edge_operation(source_id, target_id, relationship_type, props = [], values = []):
+    g = current_graph()
+    objectids = g.DATABASE_ID["objectid"]
+    edge_operation(objectids[source_id], objectids[target_id], relationship_type, props, values)
+
+
+# ============================================================
+# Backend-neutral accessors
+# Synthesizers and exporters should read nodes/edges through these helpers
+# so that they work with both the dict-backed NODES / EDGES lists and the
+# columnar GRAPH_STORE.
+# ============================================================
+
+def use_columnar_store(enabled = True):
+    g = current_graph()
+    if enabled:
+        if g.GRAPH_STORE is None:
+            g.GRAPH_STORE = ColumnarGraphStore()
+    else:
+        g.GRAPH_STORE = None
+
+def use_edge_stream(writer):
+    # writer: adsynth.streaming_writer.StreamingGraphWriter, or None to keep
+    # edges in memory again
+    g = current_graph()
+    g.EDGE_STREAM = writer
+
+def clear_graph_store():
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        g.GRAPH_STORE.clear()
+
+def set_node_value(index, key, value):
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        if key == "labels":
+            g.GRAPH_STORE.add_label(index, value)
+        else:
+            g.GRAPH_STORE.set_property(index, key, value)
+    elif key == "labels":
+        if value not in g.NODES[index]["labels"]:
+            g.NODES[index]["labels"].append(value)
+    else:
+        g.NODES[index]["properties"][key] = value
+
+def get_node_property(index, key, default = None):
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.get_property(index, key, default)
+    return g.NODES[index]["properties"].get(key, default)
+
+def has_node_property(index, key):
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.has_property(index, key)
+    return key in g.NODES[index]["properties"]
+
+def get_node_labels(index):
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.node_labels(index)
+    return g.NODES[index]["labels"]
+
+def get_node_properties(index):
+    # Read-only view: update properties through set_node_value
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.node_properties(index)
+    return g.NODES[index]["properties"]
+
+def offset_node_ids(offset):
+    # Shift the neo4j id of every node (and edge endpoint) by offset, e.g.
+    # when a graph built from neo4j_id 0 is loaded into a later run
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        g.GRAPH_STORE.node_ext_id = array("q", (ext_id + offset for ext_id in g.GRAPH_STORE.node_ext_id))
+    else:
+        for node in g.NODES:
+            node["id"] = str(int(node["id"]) + offset)
+        for edge in g.EDGES:
+            edge["start"]["id"] = str(int(edge["start"]["id"]) + offset)
+            edge["end"]["id"] = str(int(edge["end"]["id"]) + offset)
+    g.neo4j_id += offset
+
+def _last_label(index):
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.last_label(index)
+    return g.NODES[index]["labels"][-1]
+
+def get_num_nodes():
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.num_nodes()
+    return len(g.NODES)
+
+def get_node_endpoint(index):
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return str(g.GRAPH_STORE.node_ext_id[index]), g.GRAPH_STORE.node_labels(index)
+    return g.NODES[index]["id"], g.NODES[index]["labels"]
+
+def get_num_edges():
+    g = current_graph()
+    if g.EDGE_STREAM is not None:
+        return g.EDGE_STREAM.num_edges
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.num_edges()
+    return len(g.EDGES)
+
+def iter_node_records():
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        return g.GRAPH_STORE.iter_node_records()
+    return iter(g.NODES)
+
+def iter_edge_records():
+    g = current_graph()
+    if g.GRAPH_STORE is not None:
+        records = g.GRAPH_STORE.iter_edge_records()
+    else:
+        records = iter(g.EDGES)
+    if g.HYPEREDGE_MODE == HYPEREDGE_LAZY and g.HYPEREDGES:
+        return chain(records, iter_expanded_hyperedge_records(get_num_edges()))
+    return records
+
+
+# ============================================================
+# Lazy hyperedges
+# A set-to-set permission (one group -> every member of a set) is kept as
+# one hyperedge record instead of one edge per member.  Member sets are
+# interned, so memory grows with the number of distinct sets rather than
+# with the number of member edges.
+# ============================================================
+
+def use_hyperedges(mode):
+    g = current_graph()
+    if mode not in (HYPEREDGE_EAGER, HYPEREDGE_LAZY, HYPEREDGE_COMPACT):
+        raise ValueError(f"Unknown hyperedge mode: {mode}")
+    g.HYPEREDGE_MODE = mode
+
+def get_hyperedge_mode():
+    g = current_graph()
+    return g.HYPEREDGE_MODE
+
+def clear_hyperedges():
+    g = current_graph()
+    g.HYPEREDGES.clear()
+    g.HYPEREDGE_INDEX.clear()
+    g.HYPEREDGE_STARTS.clear()
+    g.HYPEREDGE_LOG.clear()
+    g.MEMBER_SETS.clear()
+    g.MEMBER_SET_IDS.clear()
+    g._MEMBER_SET_LOOKUPS.clear()
+
+def get_member_set_id(member_indices):
+    g = current_graph()
+    members = tuple(member_indices)
+    set_id = g.MEMBER_SET_IDS.get(members)
+    if set_id is None:
+        set_id = len(g.MEMBER_SETS)
+        g.MEMBER_SETS.append(members)
+        g.MEMBER_SET_IDS[members] = set_id
+    return set_id
+
+def hyperedge_operation(start_index, member_indices, relationship_type, props = [], values = []):
+    # Record "start_index --relationship_type--> every member" once.  The same
+    # (start, type, member set) again only updates the properties, as
+    # edge_operation does for an existing edge.
+    g = current_graph()
+    set_id = get_member_set_id(member_indices)
+    key = (start_index, relationship_type, set_id)
+    HYPEREDGES_index = g.HYPEREDGE_INDEX.get(key)
+    if HYPEREDGES_index is None:
+        HYPEREDGES_index = len(g.HYPEREDGES)
+        g.HYPEREDGES.append((start_index, relationship_type, set_id, {}))
+        g.HYPEREDGE_INDEX[key] = HYPEREDGES_index
+        g.HYPEREDGE_STARTS.setdefault((start_index, relationship_type), []).append(HYPEREDGES_index)
+    properties = _edge_properties(props, values)
+    g.HYPEREDGES[HYPEREDGES_index][3].update(properties)
+    if properties:
+        g.HYPEREDGE_LOG.append((HYPEREDGES_index, properties))
+
+    # Members that already have this edge get the properties right away,
+    # exactly as the eager expansion would have updated them
+    if props:
+        code = get_rel_type_code(relationship_type)
+        for end_index in g.MEMBER_SETS[set_id]:
+            hashed_id_edge = (((start_index << EDGE_KEY_TYPE_BITS) | code) << EDGE_KEY_NODE_BITS) | end_index
+            if hashed_id_edge in g.dict_edges:
+                edge_operation(start_index, end_index, relationship_type, props, values)
+    return HYPEREDGES_index
+
+def get_num_hyperedges():
+    g = current_graph()
+    return len(g.HYPEREDGES)
+
+def get_num_expanded_hyperedges():
+    # Number of member edges iter_expanded_hyperedges yields, without
+    # expanding them: members of the hyperedges of one (start, type) are
+    # counted once, materialised edges not at all
+    g = current_graph()
+    count = 0
+    for (start_index, relationship_type), HYPEREDGES_indices in g.HYPEREDGE_STARTS.items():
+        if len(HYPEREDGES_indices) == 1:
+            members = g.MEMBER_SETS[g.HYPEREDGES[HYPEREDGES_indices[0]][2]]
+        else:
+            members = set()
+            for HYPEREDGES_index in HYPEREDGES_indices:
+                members.update(g.MEMBER_SETS[g.HYPEREDGES[HYPEREDGES_index][2]])
+        for end_index in members:
+            if pack_edge_key(start_index, end_index, relationship_type) not in g.dict_edges:
+                count += 1
+    return count
+
+def _member_lookup(set_id):
+    # Membership test for a member set; rebuilt when the set ids were
+    # cleared or restored since
+    g = current_graph()
+    members = g.MEMBER_SETS[set_id]
+    cached = g._MEMBER_SET_LOOKUPS.get(set_id)
+    if cached is None or cached[0] is not members:
+        cached = g._MEMBER_SET_LOOKUPS[set_id] = (members, frozenset(members))
+    return cached[1]
+
+def _merged_hyperedge_properties(HYPEREDGES_indices, merged = None):
+    # The properties the eager expansion gives a member edge of all these
+    # hyperedges: their updates in the order they were made
+    g = current_graph()
+    if len(HYPEREDGES_indices) == 1:
+        return g.HYPEREDGES[HYPEREDGES_indices[0]][3]
+    key = tuple(HYPEREDGES_indices)
+    if merged is not None and key in merged:
+        return merged[key]
+    covering = set(HYPEREDGES_indices)
+    properties = {}
+    for HYPEREDGES_index, update in g.HYPEREDGE_LOG:
+        if HYPEREDGES_index in covering:
+            properties.update(update)
+    if merged is not None:
+        merged[key] = properties
+    return properties
+
+def _covering_hyperedge_properties(start_index, end_index, relationship_type):
+    # Properties of the hyperedges that cover (start, type, end), or None
+    g = current_graph()
+    covering = [HYPEREDGES_index for HYPEREDGES_index in g.HYPEREDGE_STARTS.get((start_index, relationship_type), ())
+                if end_index in _member_lookup(g.HYPEREDGES[HYPEREDGES_index][2])]
+    return _merged_hyperedge_properties(covering) if covering else None
+
+def iter_expanded_hyperedges():
+    # (start, end, relationship type, properties) for every member edge that
+    # is not already a materialised edge, in the order the hyperedges first
+    # cover them.  A member edge of overlapping hyperedges gets their
+    # property updates in the order they were made (the last one wins), as
+    # with the eager expansion.
+    g = current_graph()
+    covering = {}
+    for HYPEREDGES_index, (start_index, relationship_type, set_id, properties) in enumerate(g.HYPEREDGES):
+        for end_index in g.MEMBER_SETS[set_id]:
+            hashed_id_edge = pack_edge_key(start_index, end_index, relationship_type)
+            if hashed_id_edge in g.dict_edges:
+                continue
+            first = covering.get(hashed_id_edge)
+            if first is None:
+                covering[hashed_id_edge] = HYPEREDGES_index
+            elif isinstance(first, list):
+                first.append(HYPEREDGES_index)
+            else:
+                covering[hashed_id_edge] = [first, HYPEREDGES_index]
+
+    merged = {}
+    for start_index, relationship_type, set_id, properties in g.HYPEREDGES:
+        for end_index in g.MEMBER_SETS[set_id]:
+            indices = covering.pop(pack_edge_key(start_index, end_index, relationship_type), None)
+            if indices is None:
+                continue
+            if isinstance(indices, list):
+                properties_of_edge = _merged_hyperedge_properties(indices, merged)
+            else:
+                properties_of_edge = g.HYPEREDGES[indices][3]
+            yield start_index, end_index, relationship_type, properties_of_edge
+
+def iter_expanded_hyperedge_records(first_index = 0):
+    # Edge records for iter_expanded_hyperedges, numbered from r_<first_index>
+    endpoints = {}
+    def endpoint(index):
+        rendered = endpoints.get(index)
+        if rendered is None:
+            node_id, labels = get_node_endpoint(index)
+            rendered = endpoints[index] = {"id": node_id, "labels": labels}
+        return rendered
+
+    for EDGES_index, (start_index, end_index, relationship_type, properties) in \
+            enumerate(iter_expanded_hyperedges(), first_index):
+        yield {
+            "type": "relationship",
+            "id": "r_" + str(EDGES_index),
+            "label": relationship_type,
+            "properties": dict(properties),
+            "start": dict(endpoint(start_index)),
+            "end": dict(endpoint(end_index)),
+        }
+
+def iter_relationship_records():
+    # Every edge as a plain relationship record, for output formats that have
+    # no hyperedges: a compact metagraph is expanded as the lazy mode would
+    g = current_graph()
+    records = iter_edge_records()
+    if g.HYPEREDGE_MODE == HYPEREDGE_COMPACT and g.HYPEREDGES:
+        return chain(records, iter_expanded_hyperedge_records(get_num_edges()))
+    return records
+
+def get_num_relationship_records():
+    # Number of records iter_relationship_records yields
+    g = current_graph()
+    if g.HYPEREDGE_MODE != HYPEREDGE_EAGER and g.HYPEREDGES:
+        return get_num_edges() + get_num_expanded_hyperedges()
+    return get_num_edges()
+
+def iter_metagraph_records():
+    # Compact metagraph output: member sets, then hyperedges pointing at them
+    g = current_graph()
+    for set_id, members in enumerate(g.MEMBER_SETS):
+        yield {
+            "type": "memberset",
+            "id": "m_" + str(set_id),
+            "members": [get_node_endpoint(index)[0] for index in members],
+        }
+    for HYPEREDGES_index, (start_index, relationship_type, set_id, properties) in enumerate(g.HYPEREDGES):
+        node_id, labels = get_node_endpoint(start_index)
+        yield {
+            "type": "hyperedge",
+            "id": "h_" + str(HYPEREDGES_index),
+            "label": relationship_type,
+            "properties": dict(properties),
+            "start": {"id": node_id, "labels": labels},
+            "members": "m_" + str(set_id),
+        }
+
+
 # ============================================================
 # Core graph storage — unchanged from original
+# Every structure below belongs to one graph (see adsynth/graph_state.py):
+# the module-level names are proxies to the graph current in the calling
+# thread, and the functions above work on current_graph() directly.  The
+# graph_value ones (neo4j_id, GRAPH_STORE, ...) have no module-level name:
+# read and set them on current_graph().
 # ============================================================
 
-NODES = []
-EDGES = []
+NODES = graph_field("NODES", list)
+EDGES = graph_field("EDGES", list)
 
-neo4j_id = 0
+graph_value("neo4j_id", 0)
 
-DATABASE_ID = {
+DATABASE_ID = graph_field("DATABASE_ID", lambda: {
     "name": dict(),
     "objectid": dict()
-}
-
-dict_edges = dict()
+})
+
+# Edge dedup index: packed (start, relationship type code, end) int -> edge index
+dict_edges = graph_field("dict_edges", dict)
+
+# Relationship types interned to the codes used inside the dict_edges keys
+REL_TYPE_CODES = graph_field("REL_TYPE_CODES", dict)
+REL_TYPE_NAMES = graph_field("REL_TYPE_NAMES", list)
+
+EDGE_KEY_NODE_BITS = 32
+EDGE_KEY_TYPE_BITS = 16
+EDGE_KEY_NODE_MASK = (1 << EDGE_KEY_NODE_BITS) - 1
+EDGE_KEY_TYPE_MASK = (1 << EDGE_KEY_TYPE_BITS) - 1
+
+# Optional columnar backend (see adsynth/graph_store.py). When set,
+# node_operation / edge_operation write into it instead of NODES / EDGES.
+graph_value("GRAPH_STORE", None)
+
+# Optional streaming export (see adsynth/streaming_writer.py). When set,
+# edge_operation spills new edges to it instead of keeping them in memory.
+graph_value("EDGE_STREAM", None)
+
+# Lazy hyperedges (see use_hyperedges / hyperedge_operation)
+HYPEREDGE_EAGER = 0      # every member edge is created right away
+HYPEREDGE_LAZY = 1       # member edges are expanded when the dataset is exported
+HYPEREDGE_COMPACT = 2    # hyperedge + member set records are exported, never expanded
+graph_value("HYPEREDGE_MODE", HYPEREDGE_EAGER)
+# (start index, relationship type, member set id, properties)
+HYPEREDGES = graph_field("HYPEREDGES", list)
+# (start index, relationship type, member set id) -> HYPEREDGES index
+HYPEREDGE_INDEX = graph_field("HYPEREDGE_INDEX", dict)
+# (start index, relationship type) -> HYPEREDGES indices
+HYPEREDGE_STARTS = graph_field("HYPEREDGE_STARTS", dict)
+# (HYPEREDGES index, properties) of every property update, in order
+HYPEREDGE_LOG = graph_field("HYPEREDGE_LOG", list)
+# member set id -> tuple of node indices
+MEMBER_SETS = graph_field("MEMBER_SETS", list)
+# tuple of node indices -> member set id
+MEMBER_SET_IDS = graph_field("MEMBER_SET_IDS", dict)
+# member set id -> (members, frozenset of them), see _member_lookup
+_MEMBER_SET_LOOKUPS = graph_field("_MEMBER_SET_LOOKUPS", dict)
 
 AD_NODE = {
     "id":"",
@@ -133,7 +716,7 @@ AD_EDGE = {
 # NODE_GROUPS — extended with hybrid node types
 # ============================================================
 
-NODE_GROUPS = {
+NODE_GROUPS = graph_field("NODE_GROUPS", lambda: {
     # --- Original on-prem types ---
     "User": list(),
     "Computer": list(),
@@ -164,65 +747,70 @@ NODE_GROUPS = {
     # --- NEW: Typed NonHumanIdentity subtypes (Week 3 merge) ---
     "ManagedIdentity": list(),    # Azure managed identity
     "AutomationAccount": list(),  # On-prem automation account
-}
+})
 
 # ============================================================
 # Original tracking structures — unchanged
 # ============================================================
 
-GPLINK_OUS = []
-GROUP_MEMBERS = dict()
-SECURITY_GROUPS = list()
-ADMIN_USERS = list()
-ENABLED_USERS = list()
-DISABLED_USERS = list()
-PAW_TIERS = list()
-S_TIERS = list()
-S_TIERS_LOCATIONS = list()
-WS_TIERS = list()
-WS_TIERS_LOCATIONS = list()
-COMPUTERS = list()
-ridcount = list()
-KERBEROASTABLES = list()
-FOLDERS = list()
-DISTRIBUTION_GROUPS = list()
-SEC_DIST_GROUPS = list()
-LOCAL_ADMINS = list()
+GPLINK_OUS = graph_field("GPLINK_OUS", list)
+GROUP_MEMBERS = graph_field("GROUP_MEMBERS", dict)
+SECURITY_GROUPS = graph_field("SECURITY_GROUPS", list)
+ADMIN_USERS = graph_field("ADMIN_USERS", list)
+ENABLED_USERS = graph_field("ENABLED_USERS", list)
+DISABLED_USERS = graph_field("DISABLED_USERS", list)
+PAW_TIERS = graph_field("PAW_TIERS", list)
+S_TIERS = graph_field("S_TIERS", list)
+S_TIERS_LOCATIONS = graph_field("S_TIERS_LOCATIONS", list)
+WS_TIERS = graph_field("WS_TIERS", list)
+WS_TIERS_LOCATIONS = graph_field("WS_TIERS_LOCATIONS", list)
+COMPUTERS = graph_field("COMPUTERS", list)
+ridcount = graph_field("ridcount", list)
+KERBEROASTABLES = graph_field("KERBEROASTABLES", list)
+FOLDERS = graph_field("FOLDERS", list)
+DISTRIBUTION_GROUPS = graph_field("DISTRIBUTION_GROUPS", list)
+SEC_DIST_GROUPS = graph_field("SEC_DIST_GROUPS", list)
+LOCAL_ADMINS = graph_field("LOCAL_ADMINS", list)
+# OU name (without the domain suffix) -> OUEntry, see helpers/ou_registry.py
+OU_REGISTRY = graph_field("OU_REGISTRY", dict)
 
 # ============================================================
 # NEW: Hybrid tracking structures (not in original DATABASE.py)
 # ============================================================
 
 # List of (domain_name, tenant_id) tuples representing every sync link
-SYNC_LINKS = []
+SYNC_LINKS = graph_field("SYNC_LINKS", list)
 
 # Maps (domain_name, tenant_id) -> node_index of SyncIdentity node
 # Key invariant: exactly one entry per sync link
-SYNC_IDENTITY_NODES = {}
+SYNC_IDENTITY_NODES = graph_field("SYNC_IDENTITY_NODES", dict)
 
 # Maps tenant_id -> list of ConnectorHost node indices
-CONNECTOR_HOST_NODES = {}
+CONNECTOR_HOST_NODES = graph_field("CONNECTOR_HOST_NODES", dict)
 
 # Maps tenant_id -> list of PTAAgentHost node indices
-PTA_AGENT_NODES = {}
+PTA_AGENT_NODES = graph_field("PTA_AGENT_NODES", dict)
 
 # Maps tenant_id -> list of ADFSServer node indices
-ADFS_SERVER_NODES = {}
+ADFS_SERVER_NODES = graph_field("ADFS_SERVER_NODES", dict)
 
 # Maps tenant_id -> hybrid mode string: "PHS" | "PTA" | "ADFS" | "Mixed"
-TENANT_HYBRID_MODE = {}
+TENANT_HYBRID_MODE = graph_field("TENANT_HYBRID_MODE", dict)
 
 # Maps domain_name -> list of tenant_ids it syncs to
-DOMAIN_TENANT_MAPPING = {}
+DOMAIN_TENANT_MAPPING = graph_field("DOMAIN_TENANT_MAPPING", dict)
 
 # List of all NonHumanIdentity node indices (SyncIdentity, SP, MI, AA)
-NHI_NODE_INDICES = []
+NHI_NODE_INDICES = graph_field("NHI_NODE_INDICES", list)
 
 # Maps tenant_id -> {"posture": str, "orgType": str}
-TENANT_METADATA = {}
+TENANT_METADATA = graph_field("TENANT_METADATA", dict)
 
 # The run identifier for reproducibility — set at generation start
-RUN_ID = ""
+graph_value("RUN_ID", "")
+
+def get_run_id():
+    return current_graph().RUN_ID
 
 
 # ============================================================
@@ -230,6 +818,8 @@ RUN_ID = ""
 # ============================================================
 
 def reset_DB():
+    # Empties the current graph; its backend and hyperedge mode are kept
+    current_graph().neo4j_id = 0
     NODES.clear()
     EDGES.clear()
 
@@ -237,6 +827,10 @@ def reset_DB():
         DATABASE_ID[item].clear()
 
     dict_edges.clear()
+    REL_TYPE_CODES.clear()
+    REL_TYPE_NAMES.clear()
+    clear_graph_store()
+    clear_hyperedges()
 
     for item in NODE_GROUPS:
         NODE_GROUPS[item].clear()
@@ -249,10 +843,17 @@ def reset_DB():
     DISABLED_USERS.clear()
     PAW_TIERS.clear()
     S_TIERS.clear()
+    S_TIERS_LOCATIONS.clear()
     WS_TIERS.clear()
+    WS_TIERS_LOCATIONS.clear()
     COMPUTERS.clear()
     ridcount.clear()
     KERBEROASTABLES.clear()
+    FOLDERS.clear()
+    DISTRIBUTION_GROUPS.clear()
+    SEC_DIST_GROUPS.clear()
+    LOCAL_ADMINS.clear()
+    OU_REGISTRY.clear()
 
     # NEW: clear hybrid tracking structures
     SYNC_LINKS.clear()
@@ -265,5 +866,4 @@ def reset_DB():
     NHI_NODE_INDICES.clear()
     TENANT_METADATA.clear()
 
-    global RUN_ID
-    RUN_ID = ""
\ No newline at end of file
+    current_graph().RUN_ID = ""
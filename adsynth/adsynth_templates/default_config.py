@@ -150,6 +150,11 @@ DEFAULT_CONFIGURATIONS = {
     },
     "nLocations": 3,
     "convert_to_directed_graphs": 0,
+    "lazy_hyperedges": 0,
+    "columnar_store": 0,
+    "streaming_export": 0,
+    "skeleton_cache": 0,
+    "vectorized_objects": 0,
     "seed": 1,
 
 
@@ -1,7 +1,8 @@
 import uuid
 import random
-from adsynth.DATABASE import NODES, EDGES, NODE_GROUPS
+from adsynth.DATABASE import az_node_operation, az_edge_operation
 from adsynth.utils.parameters import get_int_param_value, get_perc_param_value
+from adsynth.graph_state import builds_graph
 
 
 def az_create_default_applications(tenant_id, service_principals, params):
@@ -13,36 +14,18 @@ def az_create_default_applications(tenant_id, service_principals, params):
     apps = []
     for app in default_apps:
         app_id = str(uuid.uuid4()).upper()
-        NODES.append({
-            "id": app_id,
-            "name": app["name"],
-            "type": "AZApp",
-            "labels": ["AZApp"],
-            "objectid": app_id,
-            "tenantid": tenant_id,
-            "appId": str(uuid.uuid4()).upper(),
-            "displayName": app["displayName"]
-        })
-        NODE_GROUPS["AZApp"] = NODE_GROUPS.get("AZApp", [])
-        NODE_GROUPS["AZApp"].append(app_id)
-        EDGES.append({
-            "source": tenant_id,
-            "target": app_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZApp", app_id,
+            ["name", "tenantid", "appId", "displayName"],
+            [app["name"], tenant_id, str(uuid.uuid4()).upper(), app["displayName"]])
+        az_edge_operation(tenant_id, app_id, "AZContains")
         if service_principals:
             sp_id = random.choice(service_principals)
-            EDGES.append({
-                "source": app_id,
-                "target": sp_id,
-                "type": "AZRunsAs",
-                "labels": ["AZRunsAs"]
-            })
+            az_edge_operation(app_id, sp_id, "AZRunsAs")
         apps.append(app_id)
     return apps
 
 
+@builds_graph
 def az_create_applications(tenant_id, service_principals, params):
     num_apps = get_int_param_value("AZApp", "nApplications", params)
     sp_assign_prob = get_perc_param_value("AZApp", "spAssignmentProbability", params)
@@ -54,32 +37,13 @@ def az_create_applications(tenant_id, service_principals, params):
     # Then generate arbitrary applications
     for i in range(num_apps):
         app_id = str(uuid.uuid4()).upper()
-        NODES.append({
-            "id": app_id,
-            "name": f"App_{i+1}",
-            "type": "AZApp",
-            "labels": ["AZApp"],
-            "objectid": app_id,
-            "tenantid": tenant_id,
-            "appId": str(uuid.uuid4()).upper(),
-            "displayName": f"Application {i+1}"
-        })
-        NODE_GROUPS["AZApp"] = NODE_GROUPS.get("AZApp", [])
-        NODE_GROUPS["AZApp"].append(app_id)
-        EDGES.append({
-            "source": tenant_id,
-            "target": app_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZApp", app_id,
+            ["name", "tenantid", "appId", "displayName"],
+            [f"App_{i+1}", tenant_id, str(uuid.uuid4()).upper(), f"Application {i+1}"])
+        az_edge_operation(tenant_id, app_id, "AZContains")
         if service_principals and random.random() * 100 < sp_assign_prob:
             sp_id = random.choice(service_principals)
-            EDGES.append({
-                "source": app_id,
-                "target": sp_id,
-                "type": "AZRunsAs",
-                "labels": ["AZRunsAs"]
-            })
+            az_edge_operation(app_id, sp_id, "AZRunsAs")
     apps.append(app_id)
 
     return (apps)
\ No newline at end of file
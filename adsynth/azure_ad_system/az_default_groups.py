@@ -1,6 +1,7 @@
 import uuid
-from adsynth.DATABASE import NODES, EDGES, NODE_GROUPS
+from adsynth.DATABASE import az_node_operation, az_edge_operation
 from adsynth.utils.parameters import get_int_param_value
+from adsynth.graph_state import builds_graph
 
 def az_create_default_groups(tenant_id, params):
     default_groups = [ # These are the default system groups BloodHound expects
@@ -10,28 +11,16 @@ def az_create_default_groups(tenant_id, params):
     groups = []
     for group in default_groups:
         group_id = str(uuid.uuid4()).upper()
-        NODES.append({
-            "id": group_id,
-            "name": group["name"],
-            "type": "AZGroup",
-            "labels": ["AZGroup"],
-            "objectid": group_id,
-            "tenantid": tenant_id,
-            "displayName": group["name"]
-        })
-        NODE_GROUPS["AZGroup"] = NODE_GROUPS.get("AZGroup", [])
-        NODE_GROUPS["AZGroup"].append(group_id)
-        EDGES.append({
-            "source": tenant_id,
-            "target": group_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZGroup", group_id,
+            ["name", "tenantid", "displayName"],
+            [group["name"], tenant_id, group["name"]])
+        az_edge_operation(tenant_id, group_id, "AZContains")
         groups.append(group_id)
 
     return groups
 
 
+@builds_graph
 def az_create_groups(tenant_id, params):
     num_groups = get_int_param_value("AZGroup", "nGroups", params)
     member_range = params["AZGroup"].get("nMembersPerGroup", [1, 10])
@@ -42,23 +31,10 @@ def az_create_groups(tenant_id, params):
     # Now generate arbitrary groups
     for i in range(num_groups):
         group_id = str(uuid.uuid4()).upper()
-        NODES.append({
-            "id": group_id,
-            "name": f"Group_{i+1}",
-            "type": "AZGroup",
-            "labels": ["AZGroup"],
-            "objectid": group_id,
-            "tenantid": tenant_id,
-            "displayName": f"Group_{i+1}",
-        })
-        NODE_GROUPS["AZGroup"] = NODE_GROUPS.get("AZGroup", [])
-        NODE_GROUPS["AZGroup"].append(group_id)
-        EDGES.append({
-            "source": tenant_id,
-            "target": group_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZGroup", group_id,
+            ["name", "tenantid", "displayName"],
+            [f"Group_{i+1}", tenant_id, f"Group_{i+1}"])
+        az_edge_operation(tenant_id, group_id, "AZContains")
         groups.append(group_id)
     
     return (groups)
\ No newline at end of file
@@ -1,7 +1,11 @@
-from adsynth.DATABASE import NODES, EDGES
+from adsynth.DATABASE import az_edge_operation, get_num_edges
+from adsynth.helpers.az_index import first_named, index_az_names
 from adsynth.utils.parameters import get_int_param_value, get_perc_param_value
+from adsynth.utils.sampling import ExcludingChoice
 import random
+from adsynth.graph_state import builds_graph
 
+@builds_graph
 def az_assign_group_memberships(groups, users, params):
 
     n_members_per_group = get_int_param_value("AZGroup", "nMembersPerGroup", params)
@@ -9,13 +13,9 @@ def az_assign_group_memberships(groups, users, params):
     for group_id in groups:
         num_members = random.randint(n_members_per_group[0], n_members_per_group[1])
         for user_id in random.sample(users, min(num_members, len(users))):
-            EDGES.append({
-                "source": user_id,
-                "target": group_id,
-                "type": "AZMemberOf",
-                "labels": ["AZMemberOf"]
-            })
+            az_edge_operation(user_id, group_id, "AZMemberOf")
 
+@builds_graph
 def az_assign_roles(users, groups, service_principals, roles, tenant_id, subscription_id, params):
 
     assign_chance_users = get_perc_param_value("AZRole", "assignChanceUsers", params)
@@ -23,57 +23,42 @@ def az_assign_roles(users, groups, service_principals, roles, tenant_id, subscri
     assign_chance_sps = get_perc_param_value("AZRole", "assignChanceServicePrincipals", params)
     overprivileged_users = get_perc_param_value("AZMisconfig", "overprivileged_users", params)
 
-    global_admin_role = next((r for r in roles if any(n.get("properties", {}).get("name") == "Global Administrator" and n.get("properties", {}).get("objectid") == r for n in NODES)), None)
-    global_admin_user = next((u for u in users if any(n.get("properties", {}).get("name") == "Global Admin" and n.get("properties", {}).get("objectid") == u for n in NODES)), None)
+    # One pass over the nodes for both lookups
+    names = index_az_names(["Global Administrator", "Global Admin"])
+    global_admin_role = first_named(roles, "Global Administrator", names)
+    global_admin_user = first_named(users, "Global Admin", names)
+    choose_role = ExcludingChoice(roles)
+    eligible_users = [u for u in users if u != global_admin_user]
     # Assign roles to users (excluding the default Global Admin user)
-    for user_id in [u for u in users if u != global_admin_user]:
+    for user_id in eligible_users:
         if random.random() * 100 < assign_chance_users:
-            role_id = random.choice([r for r in roles if r != global_admin_role])
+            role_id = choose_role(global_admin_role)
+            if role_id is None:
+                # Global Administrator is the only role
+                continue
             scope = subscription_id  # Contributor, Reader use subscription scope
-            EDGES.append({
-                "source": user_id,
-                "target": role_id,
-                "type": "AZHasRole",
-                "labels": ["AZHasRole"],
-                "scope": scope
-            })
+            az_edge_operation(user_id, role_id, "AZHasRole", ["scope"], [scope])
 
     # Assign Global Administrator to the overprivileged users (excluding the default Global Admin user)
-    eligible_users = [u for u in users if u != global_admin_user]
     num_overprivileged = min(int(len(users) * (overprivileged_users / 100)), len(eligible_users))
     for user_id in random.sample(eligible_users, num_overprivileged):
         if global_admin_role:
-            EDGES.append({
-                "source": user_id,
-                "target": global_admin_role,
-                "type": "AZHasRole",
-                "labels": ["AZHasRole"],
-                "scope": tenant_id  # Global Administrator uses tenant scope
-            })
+            # Global Administrator uses tenant scope
+            az_edge_operation(user_id, global_admin_role, "AZHasRole", ["scope"], [tenant_id])
 
     # Assign roles to groups
     for group_id in groups:
-        if random.random() * 100 < assign_chance_groups:
+        if random.random() * 100 < assign_chance_groups and roles:
             role_id = random.choice(roles)
             scope = tenant_id if role_id == global_admin_role else subscription_id
-            EDGES.append({
-                "source": group_id,
-                "target": role_id,
-                "type": "AZHasRole",
-                "labels": ["AZHasRole"],
-                "scope": scope
-            })
+            az_edge_operation(group_id, role_id, "AZHasRole", ["scope"], [scope])
 
     # Assign roles to service principals
     for sp_id in service_principals:
         if random.random() * 100 < assign_chance_sps:
-            role_id = random.choice([r for r in roles if r != global_admin_role])
-            EDGES.append({
-                "source": sp_id,
-                "target": role_id,
-                "type": "AZHasRole",
-                "labels": ["AZHasRole"],
-                "scope": subscription_id
-            })
+            role_id = choose_role(global_admin_role)
+            if role_id is None:
+                continue
+            az_edge_operation(sp_id, role_id, "AZHasRole", ["scope"], [subscription_id])
 
-    return len(EDGES)
\ No newline at end of file
+    return get_num_edges()
\ No newline at end of file
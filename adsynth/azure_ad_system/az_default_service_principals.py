@@ -1,32 +1,20 @@
 import uuid
-from adsynth.DATABASE import NODES, EDGES, NODE_GROUPS
+from adsynth.DATABASE import az_node_operation, az_edge_operation
 from adsynth.utils.parameters import get_int_param_value
+from adsynth.graph_state import builds_graph
 
 
+@builds_graph
 def az_create_service_principals(tenant_id, params):
     num_sps = get_int_param_value("AZServicePrincipal", "nServicePrincipals", params)
 
     sps = []
     for i in range(num_sps):
         sp_id = str(uuid.uuid4()).upper()
-        NODES.append({
-            "id": sp_id,
-            "name": f"SP_{i+1}",
-            "type": "AZServicePrincipal",
-            "labels": ["AZServicePrincipal"],
-            "objectid": sp_id,
-            "tenantid": tenant_id,
-            "appId": str(uuid.uuid4()).upper(),
-            "displayName": f"Service Principal {i+1}"
-        })
-        NODE_GROUPS["AZServicePrincipal"] = NODE_GROUPS.get("AZServicePrincipal", [])
-        NODE_GROUPS["AZServicePrincipal"].append(sp_id)
-        EDGES.append({
-            "source": tenant_id,
-            "target": sp_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZServicePrincipal", sp_id,
+            ["name", "tenantid", "appId", "displayName"],
+            [f"SP_{i+1}", tenant_id, str(uuid.uuid4()).upper(), f"Service Principal {i+1}"])
+        az_edge_operation(tenant_id, sp_id, "AZContains")
         sps.append(sp_id)
 
     return (sps)
\ No newline at end of file
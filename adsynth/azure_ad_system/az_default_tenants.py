@@ -1,6 +1,8 @@
 import uuid
-from adsynth.DATABASE import NODES, NODE_GROUPS
-from adsynth.DATABASE import RUN_ID, TENANT_METADATA
+from adsynth.DATABASE import az_node_operation
+from adsynth.DATABASE import TENANT_METADATA, get_run_id
+from adsynth.graph_state import builds_graph
+@builds_graph
 def az_create_tenant(tenant_name):
     
     # Create a tenant
@@ -8,21 +10,9 @@ def az_create_tenant(tenant_name):
     meta = TENANT_METADATA.get(tenant_id, {})
 
 
-    NODES.append({
-        "id": tenant_id,
-        "name": tenant_name,
-        "type": "AZTenant",
-        "labels": ["AZTenant"],
-        "objectid": tenant_id,
-        "displayName": tenant_name,
-        "plane": "Entra",
-        "runId": RUN_ID,
-        "orgType": meta.get("orgType", "parent"),
-        "posture": meta.get("posture", "average"),
-    })
-
-    NODE_GROUPS["AZTenant"] = NODE_GROUPS.get("AZTenant", [])
-    NODE_GROUPS["AZTenant"].append(tenant_id)
+    az_node_operation("AZTenant", tenant_id,
+        ["name", "displayName", "plane", "runId", "orgType", "posture"],
+        [tenant_name, tenant_name, "Entra", get_run_id(), meta.get("orgType", "parent"), meta.get("posture", "average")])
 
 
 
@@ -1,8 +1,10 @@
 import uuid
 import random
-from adsynth.DATABASE import NODES, EDGES, NODE_GROUPS
+from adsynth.DATABASE import az_node_operation, az_edge_operation
+from adsynth.helpers.az_index import first_named, index_az_names
 from adsynth.utils.parameters import get_int_param_value, get_perc_param_value
-from adsynth.DATABASE import RUN_ID
+from adsynth.DATABASE import get_run_id
+from adsynth.graph_state import builds_graph
 
 def az_create_default_users(tenant_name, tenant_id, roles, params):
     """
@@ -16,46 +18,25 @@ def az_create_default_users(tenant_name, tenant_id, roles, params):
     users = []
     
     # Find Global Administrator role ID
-    global_admin_role = next((r for r in roles if any(n["name"] == "Global Administrator" and n["id"] == r for n in NODES)), None)
+    global_admin_role = first_named(roles, "Global Administrator", index_az_names(["Global Administrator"]))
     
     for user in default_users:
         user_id = str(uuid.uuid4()).upper()
-        NODES.append({
-            "id": user_id,
-            "name": user["name"],
-            "userPrincipalName": user["upn"],
-            "type": "AZUser",
-            "labels": ["AZUser"],
-            "objectid": user_id,
-            "tenantid": tenant_id,
-            "enabled": True,
-            "displayName": user["name"],
-            "isAdmin": user["is_admin"]
-        })
-        NODE_GROUPS["AZUser"] = NODE_GROUPS.get("AZUser", [])
-        NODE_GROUPS["AZUser"].append(user_id)
-        EDGES.append({
-            "source": user_id,
-            "target": tenant_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZUser", user_id,
+            ["name", "userPrincipalName", "tenantid", "enabled", "displayName", "isAdmin"],
+            [user["name"], user["upn"], tenant_id, True, user["name"], user["is_admin"]])
+        az_edge_operation(user_id, tenant_id, "AZContains")
         
         # Assign Global Administrator role to Global Admin user
         if user["is_admin"] and global_admin_role:
-            EDGES.append({
-                "source": user_id,
-                "target": global_admin_role,
-                "type": "AZHasRole",
-                "labels": ["AZHasRole"],
-                "scope": tenant_id
-            })
+            az_edge_operation(user_id, global_admin_role, "AZHasRole", ["scope"], [tenant_id])
         
         users.append(user_id)
     
     return users
 
 
+@builds_graph
 def az_create_users(tenant_name, tenant_id, roles, first_names, last_names, params):
     num_users = get_int_param_value("AZUser", "nUsers", params)
     enabled_perc = get_perc_param_value("AZUser", "enabled", params)
@@ -71,28 +52,10 @@ def az_create_users(tenant_name, tenant_id, roles, first_names, last_names, para
         last_name = random.choice(last_names)
         upn = f"{first_name.lower()}.{last_name.lower()}@{tenant_name.lower()}"
         enabled = random.random() * 100 < enabled_perc
-        NODES.append({
-            "id": user_id,
-            "name": f"{first_name} {last_name}",
-            "userPrincipalName": upn,
-            "type": "AZUser",
-            "labels": ["AZUser"],
-            "objectid": user_id,
-            "tenantid": tenant_id, 
-            "enabled": enabled,
-            "displayName": f"{first_name} {last_name}",
-            "plane": "Entra",
-            "runId": RUN_ID,
-
-        })
-        NODE_GROUPS["AZUser"] = NODE_GROUPS.get("AZUser", [])
-        NODE_GROUPS["AZUser"].append(user_id)
-        EDGES.append({
-            "source": tenant_id,
-            "target": user_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZUser", user_id,
+            ["name", "userPrincipalName", "tenantid", "enabled", "displayName", "plane", "runId"],
+            [f"{first_name} {last_name}", upn, tenant_id, enabled, f"{first_name} {last_name}", "Entra", get_run_id()])
+        az_edge_operation(tenant_id, user_id, "AZContains")
         users.append(user_id)
 
     return (users)
\ No newline at end of file
@@ -1,8 +1,10 @@
 import uuid
 import random
-from adsynth.DATABASE import NODES, EDGES, NODE_GROUPS
+from adsynth.DATABASE import az_node_operation, az_edge_operation
 from adsynth.utils.parameters import get_int_param_value, get_perc_param_value
+from adsynth.graph_state import builds_graph
 
+@builds_graph
 def az_create_vms(tenant_id, subscriptions, params):
     num_vms = get_int_param_value("AZVM", "nVMs", params)
     
@@ -11,24 +13,10 @@ def az_create_vms(tenant_id, subscriptions, params):
         vm_id = str(uuid.uuid4()).upper()
         subscription_id = random.choice(subscriptions) if subscriptions else tenant_id
 
-        NODES.append({
-            "id": vm_id,
-            "name": f"VM_{i+1}",
-            "type": "AZVM",
-            "labels": ["AZVM"],
-            "objectid": vm_id,
-            "tenantid": tenant_id,
-            "subscriptionId": subscription_id,
-            "displayName": f"Virtual Machine {i+1}",
-        })
-        NODE_GROUPS["AZVM"] = NODE_GROUPS.get("AZVM", [])
-        NODE_GROUPS["AZVM"].append(vm_id)
-        EDGES.append({
-            "source": subscription_id,
-            "target": vm_id,
-            "type": "AZContains",
-            "labels": ["AZContains"]
-        })
+        az_node_operation("AZVM", vm_id,
+            ["name", "tenantid", "subscriptionId", "displayName"],
+            [f"VM_{i+1}", tenant_id, subscription_id, f"Virtual Machine {i+1}"])
+        az_edge_operation(subscription_id, vm_id, "AZContains")
         
         vms.append(vm_id)
     
@@ -2,17 +2,20 @@ from adsynth.entities.acls import cn, get_dc_ou_isinherited_value, get_default_g
 from adsynth.entities.groups import get_group_member_id
 from adsynth.helpers.metagraph_extractor import extract_hyperedges
 from adsynth.helpers.objects import add_sub_objects
-from adsynth.templates.groups import DEPARTMENTS, STANDARD_GROUPS, get_departments, get_departments_list
-from adsynth.utils.parameters import get_dict_param_value
-from adsynth.DATABASE import ADMIN_USERS, DISABLED_USERS, DISTRIBUTION_GROUPS, ENABLED_USERS, LOCAL_ADMINS, NODE_GROUPS, NODES, FOLDERS, SECURITY_GROUPS, edge_operation, get_node_index
+from adsynth.templates.groups import DEPARTMENTS, STANDARD_GROUPS, get_departments_list
+from adsynth.helpers.getters import get_department_names
+from adsynth.DATABASE import ADMIN_USERS, DISABLED_USERS, DISTRIBUTION_GROUPS, ENABLED_USERS, LOCAL_ADMINS, NODE_GROUPS, FOLDERS, SECURITY_GROUPS, edge_operation, get_node_index, get_node_property
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/plan/security-best-practices/appendix-b--privileged-accounts-and-groups-in-active-directory
+@builds_graph
 def create_default_groups_acls(domain_name, domain_sid):
     standard_group_aces_list = get_default_group_aces_list(domain_name, domain_sid)
     for ace in standard_group_aces_list:
         grant_permissions(ace)
  
 # Idea Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-default-user-accounts
+@builds_graph
 def create_default_users_acls(domain_name, domain_sid):
     standard_user_aces_list = get_default_user_aces_list(domain_name, domain_sid)
     for ace in standard_user_aces_list:
@@ -29,6 +32,7 @@ def grant_permissions(ad_object):
 
 
 # Idea Ref: ADSimulator
+@builds_graph
 def create_default_AllExtendedRights(domain_name, nTiers, convert_to_digraph = 0):
     rel_type = "AllExtendedRights"
 
@@ -154,9 +158,7 @@ def create_control_over_leaf_objects_not_t0_users(domain_name, rel_type, identit
             extract_hyperedges(cn(identity_name, domain_name), "Group", ENABLED_USERS[i], "User", rel_type, props_hyperedge, values_hyperedge)
             extract_hyperedges(cn(identity_name, domain_name), "Group", DISABLED_USERS[i], "User", rel_type, props_hyperedge, values_hyperedge)
 
-            departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-            departments_list = get_departments(departments_probs)
-            for d in departments_list:
+            for d in get_department_names(parameters):
                 # Security groups
                 extract_hyperedges(cn(identity_name, domain_name), "Group", FOLDERS[i][d], "Group", rel_type, props_hyperedge, values_hyperedge)
 
@@ -169,6 +171,7 @@ def create_control_over_leaf_objects_not_t0_users(domain_name, rel_type, identit
 
 
 # Idea Ref: ADSimulator
+@builds_graph
 def create_default_GenericWrite(domain_name, nTiers, parameters, convert_to_digraph = 0):
     rel_type = "GenericWrite"
     identity_name = "ADMINISTRATORS"
@@ -190,6 +193,7 @@ def create_default_GenericWrite(domain_name, nTiers, parameters, convert_to_digr
 
 
 # Idea Ref: ADSimulator
+@builds_graph
 def create_default_owns(domain_name, convert_to_digraph = 0):
     rel_type = "Owns"
     props = ["isacl", "isInherited", "inheritanceType"]
@@ -214,6 +218,7 @@ def create_default_owns(domain_name, convert_to_digraph = 0):
 
 
 # Idea Ref: ADSimulator
+@builds_graph
 def create_default_write_dacl_owner(domain_name, nTiers, parameters, convert_to_digraph = 0):
     acl_types = ["WriteDacl", "WriteOwner"]
     for rel_type in acl_types:
@@ -251,7 +256,7 @@ def create_default_write_dacl_owner(domain_name, nTiers, parameters, convert_to_
             end_index = get_node_index(cn("DOMAIN CONTROLLERS", domain_name) + "_OU", "name")
             
             # Retrieve sid of the group
-            group_sid = NODES[start_index]["properties"]["objectid"]
+            group_sid = get_node_property(start_index, "objectid")
             isInherited = get_dc_ou_isinherited_value(group_sid, domain_name)
 
             props = ["isacl", "isInherited"]
@@ -261,6 +266,7 @@ def create_default_write_dacl_owner(domain_name, nTiers, parameters, convert_to_
 
 
 # Idea Ref: ADSimulator
+@builds_graph
 def create_default_GenericAll(domain_name, nTiers, parameters, convert_to_digraph):
     rel_type = "GenericAll"
     props = ["isacl", "isInherited", "inheritanceType"]
@@ -322,6 +328,7 @@ def add_default_acls_gpos(domain_name, start_name, acl_type, props, values):
         edge_operation(start_index, t, acl_type, props, values)
 
 # Idea Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def create_enterprise_admins_acls(domain_name):
     # Ent Admins
     group_name = "ENTERPRISE ADMINS@{}".format(domain_name)
@@ -361,6 +368,7 @@ def create_enterprise_admins_acls(domain_name):
         edge_operation(start_index, end_index, rel_type, props, values)
  
 # Idea Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def create_administrators_acls(domain_name):
     # Administrators -> Domain Node
     group_name = "ADMINISTRATORS@{}".format(domain_name)
@@ -397,6 +405,7 @@ def create_administrators_acls(domain_name):
         edge_operation(start_index, end_index, rel_type, props, values)
  
 # Idea Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def create_domain_admins_acls(domain_name):
     # Domain Admins -> Domain Node
     group_name = "DOMAIN ADMINS@{}".format(domain_name)
@@ -437,6 +446,7 @@ def create_domain_admins_acls(domain_name):
 
 
 # Idea Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups 
+@builds_graph
 def create_default_dc_groups_acls(domain_name):
     end_index = get_node_index(domain_name + "_Domain", "name")
 
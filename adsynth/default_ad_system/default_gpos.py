@@ -1,9 +1,11 @@
-import uuid
 from adsynth.DATABASE import edge_operation, get_node_index, node_operation
 from adsynth.utils.gpos import get_gpc_path, get_gpo_dn
 from adsynth.entities.acls import cn
+from adsynth.utils.sampling import random_guid
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-gpod/566e983e-3b72-4b2d-9063-a00ebc9514fd
+@builds_graph
 def create_default_gpos(domain_name, domain_dn, ddp, ddcp):
     default_gpos = {
         "DEFAULT DOMAIN POLICY": ddp,
@@ -13,7 +15,7 @@ def create_default_gpos(domain_name, domain_dn, ddp, ddcp):
     for element in default_gpos:
         guid = default_gpos[element]
         gpo = cn(element, domain_name)
-        cn_ = "{" + str(uuid.uuid4()).upper() + "}"
+        cn_ = "{" + random_guid().upper() + "}"
         dn = get_gpo_dn(cn_, domain_dn)
         gpc_path = get_gpc_path(cn_, domain_name)
         exploitable = False
@@ -24,6 +26,7 @@ def create_default_gpos(domain_name, domain_dn, ddp, ddcp):
         node_operation("GPO", keys, values, id_lookup)
 
 # Ref: DBCreator, ADSimulator
+@builds_graph
 def apply_default_gpos(domain_name, ddp, ddcp, dcou):
     # DEFAULT DOMAIN POLICY --GpLink--> Domain
     start_index = get_node_index(ddp, "objectid")
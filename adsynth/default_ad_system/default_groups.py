@@ -1,8 +1,10 @@
 from adsynth.DATABASE import edge_operation, get_node_index, node_operation
 from adsynth.entities.acls import cn
 from adsynth.entities.groups import get_forest_default_group_members_list, get_forest_default_groups_list
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: ADSimulator, DBCreator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def create_default_groups(domain_name, domain_sid, old_domain_name):
     default_groups_list = get_forest_default_groups_list(
         domain_name, domain_sid, old_domain_name)
@@ -26,6 +28,7 @@ def create_default_groups(domain_name, domain_sid, old_domain_name):
         node_operation("Group", keys, values, id_lookup)
 
 # Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def generate_default_member_of(domain_name, domain_sid, old_domain_name):
     standard_group_members_list = get_forest_default_group_members_list(
         domain_name, domain_sid, old_domain_name)
@@ -46,6 +49,7 @@ def add_member_of_relationship(ad_object):
         pass
 
 # Idea Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def create_adminstrator_memberships(domain_name):
     name = cn("ADMINISTRATOR", domain_name)
     highvalue_groups = ["PRINT OPERATORS", "BACKUP OPERATORS", "SERVER OPERATORS",
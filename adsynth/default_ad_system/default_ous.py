@@ -1,8 +1,10 @@
 from adsynth.DATABASE import node_operation
 from adsynth.entities.acls import cn
 from adsynth.utils.ous import get_ou_dn
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: DBCreator, ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/plan/delegating-administration-of-default-containers-and-ous
+@builds_graph
 def create_domain_controllers_ou(domain_name, domain_dn, dcou):
     guid = dcou
     ou = cn("DOMAIN CONTROLLERS", domain_name)
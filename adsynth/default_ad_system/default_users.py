@@ -1,34 +1,39 @@
-import random
 from adsynth.DATABASE import edge_operation, get_node_index, node_operation
 from adsynth.entities.users import get_administrator_user, get_default_account, get_forest_user_sid_list, get_guest_user, get_krbtgt_user
 from adsynth.adsynth_templates.default_config import get_complementary_value
 from adsynth.utils.boolean import generate_boolean_value
 from adsynth.utils.parameters import get_perc_param_value
 from adsynth.utils.principals import get_cn
+from adsynth.utils.sampling import FAIR_COIN
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: ADSimulator and Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-default-user-accounts
 
 
+@builds_graph
 def generate_guest_user(domain_name, domain_sid, parameters):
     guest_user = get_guest_user(domain_name, domain_sid)
     create_user(guest_user, parameters)
 
+@builds_graph
 def generate_default_account(domain_name, domain_sid, parameters):
     default_account = get_default_account(domain_name, domain_sid)
     create_user(default_account, parameters)
 
+@builds_graph
 def generate_administrator(domain_name, domain_sid, parameters):
     administrator_user = get_administrator_user(domain_name, domain_sid)
     create_user(administrator_user, parameters)
 
+@builds_graph
 def generate_krbtgt_user(domain_name, domain_sid, parameters):
     krbtgt_user = get_krbtgt_user(domain_name, domain_sid)
     create_user(krbtgt_user, parameters)
 
 def create_user(user, parameters):
     if get_cn(user["Properties"]["name"]) == "GUEST":
-        enabled_property = random.choice([True, False])
-        pwdneverexpires_property = random.choice([True, False])
+        enabled_property = FAIR_COIN()
+        pwdneverexpires_property = FAIR_COIN()
     else:
         enabled_property = user["Properties"]["enabled"]
         pwdneverexpires_property = user["Properties"]["pwdneverexpires"]
@@ -76,6 +81,7 @@ def create_user(user, parameters):
     id_lookup = sid
     node_operation("User", keys, values, id_lookup)
 
+@builds_graph
 def link_default_users_to_domain(domain_name, domain_sid):
     standard_users_list = get_forest_user_sid_list(domain_name, domain_sid)
     for user in standard_users_list:
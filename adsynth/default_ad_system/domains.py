@@ -1,22 +1,31 @@
-import random
 from adsynth.DATABASE import node_operation
 from adsynth.templates.domains import get_functional_level_list
 from adsynth.utils.parameters import get_dict_param_value, print_domain_generation_parameters
-from adsynth.DATABASE import RUN_ID
+from adsynth.utils.sampling import AliasSampler
+from adsynth.DATABASE import get_run_id
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: ADSimulator, DBCreator
+@builds_graph
 def create_domain(domain_name, domain_sid, domain_dn, parameters):
-    prob = get_dict_param_value("Domain", "functionalLevelProbability", parameters)
-    functional_level = random.choice(get_functional_level_list(prob))
-    print_domain_generation_parameters(prob)
+    functional_level = draw_functional_level(parameters)
     
     # keys = ["domain", "name", "labels", "highvalue", "objectid", "distinguishedname", "functionallevel"]
     # values = [domain_name, domain_name, "Domain", True, domain_sid, domain_dn, functional_level]
 
     keys = ["domain", "name", "labels", "highvalue", "objectid", "distinguishedname", "functionallevel", "plane", "runId"]
-    values = [domain_name, domain_name, "Domain", True, domain_sid, domain_dn, functional_level, "AD", RUN_ID]
+    values = [domain_name, domain_name, "Domain", True, domain_sid, domain_dn, functional_level, "AD", get_run_id()]
     
     id_lookup = domain_sid
     node_operation("Domain", keys, values, id_lookup)
 
     return functional_level
+
+
+# The only random draw of the default-AD scaffolding besides its GUIDs, a
+# single random() (see skeleton_cache.py)
+def draw_functional_level(parameters):
+    prob = get_dict_param_value("Domain", "functionalLevelProbability", parameters)
+    functional_level = AliasSampler.from_list(get_functional_level_list(prob))()
+    print_domain_generation_parameters(prob)
+    return functional_level
@@ -559,6 +559,8 @@ def get_dc_ou_isinherited_value(group_sid, domain_name):
 def get_filtered_aces_list(aces_list):
     filtered_aces_list = []
     for ace in aces_list:
+        # A copy: the aces come from the templates, which every run reads
+        ace = dict(ace)
         if ace["RightName"] == "GenericAll":
             ace["RightName"] = "GenericAll"
             filtered_aces_list.append(ace)
@@ -41,14 +41,17 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import copy
+
 from adsynth.templates.groups import STANDARD_GROUPS
 
 
 def get_forest_default_groups_list(domain_name, domain_sid, old_domain_name):
-    groups_list = STANDARD_GROUPS
-    for group in groups_list:
-        group = set_group_attributes(group, domain_name, domain_sid, old_domain_name)
-    return groups_list
+    # Filled-in copies of the templates, so every run starts from the
+    # placeholders whatever the domain of an earlier run in the process
+    # (old_domain_name is only needed by set_group_attributes on a group
+    # that was filled in before)
+    return [set_group_attributes(copy.deepcopy(group), domain_name, domain_sid, None) for group in STANDARD_GROUPS]
 
 
 def get_forest_default_group_members_list(domain_name, domain_sid, old_domain_name):
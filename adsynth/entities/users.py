@@ -41,24 +41,27 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import copy
+
 from adsynth.templates.users import GUEST_USER, DEFAULT_ACCOUNT, ADMINISTRATOR, KRBTGT
 
 def get_guest_user(domain_name, domain_sid): 
-    return set_user_attributes(GUEST_USER, domain_name, domain_sid)
+    return set_user_attributes(copy.deepcopy(GUEST_USER), domain_name, domain_sid)
 
 
 def get_default_account(domain_name, domain_sid): 
-    return set_user_attributes(DEFAULT_ACCOUNT, domain_name, domain_sid)
+    return set_user_attributes(copy.deepcopy(DEFAULT_ACCOUNT), domain_name, domain_sid)
 
 
 def get_administrator_user(domain_name, domain_sid): 
-    return set_user_attributes(ADMINISTRATOR, domain_name, domain_sid)
+    return set_user_attributes(copy.deepcopy(ADMINISTRATOR), domain_name, domain_sid)
 
 
 def get_krbtgt_user(domain_name, domain_sid): 
-    return set_user_attributes(KRBTGT, domain_name, domain_sid)
+    return set_user_attributes(copy.deepcopy(KRBTGT), domain_name, domain_sid)
 
 
+# The templates keep their placeholders: set_user_attributes fills in a copy
 def set_user_attributes(user, domain_name, domain_sid):
     domain_name_splitted = str(domain_name).split(".")
     user["Properties"]["name"] = str(user["Properties"]["name"]).replace("DOMAIN_NAME.DOMAIN_SUFFIX", str(domain_name).upper())
@@ -77,7 +80,7 @@ def get_forest_user_sid_list(domain_name, domain_sid):
     user_sid_list = []
     domain_users_list = []
     for user in get_standard_users_list():
-        domain_users_list.append(set_user_attributes(user, domain_name, domain_sid))
+        domain_users_list.append(set_user_attributes(copy.deepcopy(user), domain_name, domain_sid))
     for user in domain_users_list:
         item = {
             "DomainId": domain_sid,
@@ -1,51 +1,44 @@
 """
 generators/common.py — Shared primitives for all generators
 ============================================================
-Name/surname pools loaded from ADSynth data files (first.pkl, last.pkl,
-domain.pkl).  SID format, UPN format, and timestamp logic match ADSynth
-conventions exactly.
+Name/surname pools: the packed corpora of the ADSynth data files
+(first.pkl, last.pkl, domain.pkl, see utils/corpus.py).  SID format, UPN
+format, and timestamp logic match ADSynth conventions exactly.
 """
 
 import os
-import pickle
 import random
 import uuid
-from typing import List
+import zlib
+from typing import Sequence
+
+from adsynth.utils.corpus import load_corpus
 
 
 def _data_path() -> str:
     return os.path.join(os.getcwd(), "data")
 
-def _load_pkl(filename: str) -> list:
-    path = os.path.join(_data_path(), filename)
-    with open(path, "rb") as f:
-        return pickle.load(f)
-
-_FIRST_NAMES: List[str] = []
-_LAST_NAMES:  List[str] = []
-_DOMAIN_NAMES: List[str] = []
-
-def get_first_names() -> List[str]:
-    global _FIRST_NAMES
-    if not _FIRST_NAMES:
-        _FIRST_NAMES = _load_pkl("first.pkl")
-    return _FIRST_NAMES
-
-def get_last_names() -> List[str]:
-    global _LAST_NAMES
-    if not _LAST_NAMES:
-        _LAST_NAMES = _load_pkl("last.pkl")
-    return _LAST_NAMES
-
-def get_domain_names() -> List[str]:
-    global _DOMAIN_NAMES
-    if not _DOMAIN_NAMES:
-        _DOMAIN_NAMES = _load_pkl("domain.pkl")
-    return _DOMAIN_NAMES
+def _load_corpus(filename: str) -> Sequence[str]:
+    # The NameCorpus utils/data.py hands MainMenu: one mapping per process
+    return load_corpus(os.path.join(_data_path(), filename))
+
+def get_first_names() -> Sequence[str]:
+    return _load_corpus("first.pkl")
+
+def get_last_names() -> Sequence[str]:
+    return _load_corpus("last.pkl")
+
+def get_domain_names() -> Sequence[str]:
+    return _load_corpus("domain.pkl")
 
 def det_uuid(namespace: str, *parts: str) -> str:
     return str(uuid.uuid5(uuid.UUID(int=0), f"{namespace}:{'|'.join(parts)}"))
 
+def stable_hash(value: str) -> int:
+    """32-bit hash of a string that, unlike hash(), is the same in every
+    process (PYTHONHASHSEED) — used to derive per-domain / per-tenant RNGs."""
+    return zlib.crc32(value.encode("utf-8"))
+
 def rand_uuid(rng: random.Random) -> str:
     return str(uuid.UUID(int=rng.getrandbits(128), version=4))
 
@@ -19,7 +19,7 @@ from typing import Any, Dict, List
 
 from adsynth.hybrid_system.schema_registry import NodeLabel, RelType, Plane
 from adsynth.hybrid_system.export_writer import add_node, add_edge
-from adsynth.generators.common import det_uuid, rand_uuid, weighted_choice
+from adsynth.generators.common import det_uuid, rand_uuid, stable_hash, weighted_choice
 
 # Group name building blocks (kept domain-agnostic per paper design)
 _DEPARTMENTS = ["IT", "HR", "Finance", "Security", "Dev", "Ops",
@@ -48,7 +48,7 @@ def create_ad_groups(
     Also creates the mandatory 'DOMAIN USERS' group that all AD users join.
     Returns list of {id, name, domainId, is_default}.
     """
-    rng      = random.Random(seed["groupSeed"] ^ hash(domain["id"]) & 0xFFFFFFFF)
+    rng      = random.Random(seed["groupSeed"] ^ stable_hash(domain["id"]))
     n_groups = config["Group"]["nADGroups"]
     fqdn     = domain["fqdn"]
 
@@ -162,7 +162,7 @@ def create_entra_groups(
     (matching ADSynth az_default_groups.py convention).
     Returns list of {id, name, tenantId, is_privileged, is_default}.
     """
-    rng      = random.Random(seed["groupSeed"] ^ hash(tenant["id"]) & 0xFFFFFFFF)
+    rng      = random.Random(seed["groupSeed"] ^ stable_hash(tenant["id"]))
     n_groups = config["Group"]["nEntraGroups"]
     groups: List[Dict[str, Any]] = []
 
@@ -0,0 +1,127 @@
+"""
+generators/parallel.py — Multi-process principal generation
+============================================================
+The AD users/groups of one domain and the Entra users/groups of one tenant
+depend only on that domain's (tenant's) RNG, derived from the seed vector
+and its id.  Each domain and each tenant is therefore generated as a shard
+in its own worker process, into an empty graph, and the shards are merged
+back into HYBRID_NODES / HYBRID_EDGES in the order the serial pipeline
+creates them:
+
+  AD users (per domain) → Entra users (per tenant) → SYNCED_TO
+  → AD groups (per domain) → Entra groups (per tenant) → memberships
+
+SYNCED_TO and membership edges sample across all shards with a single RNG,
+so they stay in the parent process.  The result is byte-identical to
+create_humans() + create_groups() for the same seed vector.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from adsynth.hybrid_system.export_writer import (
+    HYBRID_NODES, HYBRID_EDGES, merge_graph, reset_graph,
+)
+from adsynth.generators.user_generator import (
+    create_ad_users, create_entra_users, create_synced_to_edges,
+)
+from adsynth.generators.group_generator import (
+    create_ad_groups, create_entra_groups,
+    assign_ad_group_memberships, assign_entra_group_memberships,
+)
+
+
+#
+# Worker side
+#
+
+def _build_shard(create_users, create_groups, owner, config, seed, run_id) -> Dict[str, Any]:
+    reset_graph()
+    users = create_users(owner, config, seed, run_id)
+    n_nodes, n_edges = len(HYBRID_NODES), len(HYBRID_EDGES)
+    groups = create_groups(owner, config, seed, run_id)
+    return {
+        "users":       users,
+        "groups":      groups,
+        "user_nodes":  HYBRID_NODES[:n_nodes],
+        "user_edges":  HYBRID_EDGES[:n_edges],
+        "group_nodes": HYBRID_NODES[n_nodes:],
+        "group_edges": HYBRID_EDGES[n_edges:],
+    }
+
+
+def domain_shard(domain, config, seed, run_id) -> Dict[str, Any]:
+    """AD users + AD groups of one domain, generated into a fresh graph."""
+    return _build_shard(create_ad_users, create_ad_groups, domain, config, seed, run_id)
+
+
+def tenant_shard(tenant, config, seed, run_id) -> Dict[str, Any]:
+    """Entra users + Entra groups of one tenant, generated into a fresh graph."""
+    return _build_shard(create_entra_users, create_entra_groups, tenant, config, seed, run_id)
+
+
+#
+# Top-level entry point
+#
+
+def create_principals_parallel(
+    domains: List[Dict[str, Any]],
+    tenants: List[Dict[str, Any]],
+    links: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    seed: Dict[str, Any],
+    run_id: str,
+    workers: int,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Parallel equivalent of create_humans() followed by create_groups().
+
+    Returns (humans, groups) with the same shape as those two functions.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        domain_futures = [pool.submit(domain_shard, d, config, seed, run_id) for d in domains]
+        tenant_futures = [pool.submit(tenant_shard, t, config, seed, run_id) for t in tenants]
+        domain_shards = [f.result() for f in domain_futures]
+        tenant_shards = [f.result() for f in tenant_futures]
+
+    # Humans — same order as create_humans()
+    all_ad_users: List[Dict[str, Any]] = []
+    all_entra_users: Dict[str, List[Dict[str, Any]]] = {}
+    for shard in domain_shards:
+        merge_graph(shard["user_nodes"], shard["user_edges"])
+        all_ad_users.extend(shard["users"])
+    for tenant, shard in zip(tenants, tenant_shards):
+        merge_graph(shard["user_nodes"], shard["user_edges"])
+        all_entra_users[tenant["id"]] = shard["users"]
+
+    synced_pairs = create_synced_to_edges(all_ad_users, links, config, seed, run_id)
+    users_per_tenant = {
+        t_id: len(users) for t_id, users in all_entra_users.items()
+    }
+
+    # Groups — same order as create_groups()
+    all_ad_groups: Dict[str, List[Dict]] = {}
+    all_entra_groups: Dict[str, List[Dict]] = {}
+    flat_ad_groups: List[Dict] = []
+    for domain, shard in zip(domains, domain_shards):
+        merge_graph(shard["group_nodes"], shard["group_edges"])
+        all_ad_groups[domain["id"]] = shard["groups"]
+        flat_ad_groups.extend(shard["groups"])
+    for tenant, shard in zip(tenants, tenant_shards):
+        merge_graph(shard["group_nodes"], shard["group_edges"])
+        all_entra_groups[tenant["id"]] = shard["groups"]
+
+    assign_ad_group_memberships(all_ad_users, flat_ad_groups, config, seed)
+    assign_entra_group_memberships(all_entra_users, all_entra_groups, config, seed)
+
+    humans = {
+        "ad_users":         all_ad_users,
+        "entra_users":      all_entra_users,
+        "synced_pairs":     synced_pairs,
+        "users_per_tenant": users_per_tenant,
+    }
+    groups = {
+        "ad_groups":    all_ad_groups,
+        "entra_groups": all_entra_groups,
+    }
+    return humans, groups
@@ -28,7 +28,7 @@ from typing import Any, Dict, List, Tuple
 from adsynth.hybrid_system.schema_registry import NodeLabel, RelType, Plane
 from adsynth.hybrid_system.export_writer import add_node, add_edge
 from adsynth.generators.common import (
-    det_uuid, rand_uuid,
+    det_uuid, rand_uuid, stable_hash,
     make_domain_sid, make_object_sid,
     random_full_name, make_upn_ad, make_upn_entra, make_display_name,
     get_user_timestamp, weighted_choice,
@@ -115,8 +115,8 @@ def create_ad_users(
     Generate AD User nodes for one domain.
     Returns list of {id, upn, enabled, domainId}.
     """
-    rng          = random.Random(seed["userSeed"] ^ hash(domain["id"]) & 0xFFFFFFFF)
-    current_time = int(time.time())
+    rng          = random.Random(seed["userSeed"] ^ stable_hash(domain["id"]))
+    current_time = seed.get("_current_time") or int(time.time())
     n_users      = config["User"]["nUsers"]
 
     users: List[Dict[str, Any]] = []
@@ -205,7 +205,7 @@ def create_entra_users(
     Generate Entra User nodes for one tenant.
     Returns list of {id, upn, enabled, tenantId}.
     """
-    rng     = random.Random(seed["userSeed"] ^ hash(tenant["id"]) & 0xFFFFFFFF)
+    rng     = random.Random(seed["userSeed"] ^ stable_hash(tenant["id"]))
     n_users = config["User"]["nUsers"]
 
     users: List[Dict[str, Any]] = []
@@ -0,0 +1,66 @@
+"""
+Instance-scoped graph state.
+
+The synthesizers write one graph through adsynth/DATABASE.py (and the
+hybrid pipeline through hybrid_system/export_writer.py).  A GraphBuilder
+owns one such graph, and the synthesizer entry points build into it when
+it is passed to them (see builds_graph in adsynth/graph_state.py):
+
+    builder = GraphBuilder()
+    create_domain(..., graph=builder)
+    generate_users(..., graph=builder)
+    with builder.active():
+        records = list(DB.iter_node_records())
+
+The store functions of DATABASE (node_operation, iter_node_records, ...)
+work on the current graph: active() makes the builder's graph the current
+one for a block.  Without either a thread uses the default graph (MainMenu
+keeps using it).  Nothing is copied, so a builder can be passed again
+later to continue its graph, and active() blocks nest:
+
+    with a.active():
+        ...
+        with b.active():      # b's graph
+            ...
+        ...                   # a's graph again
+
+Builders used in different threads build at the same time, without a
+lock.  One builder must not be used in two threads at once, just as one
+list must not be appended to from two threads without a lock.  The
+synthesizers draw from the shared random module, so concurrent builders
+interleave their draws: a seeded graph is only reproduced by a builder
+that runs alone (or in a process of its own, as adsynth.sweep does).
+"""
+
+from contextlib import contextmanager
+
+import adsynth.DATABASE as DB
+import adsynth.hybrid_system.export_writer  # noqa: F401 - declares the hybrid structures
+from adsynth.graph_state import GraphState, using_graph
+from adsynth.graph_store import ColumnarGraphStore
+
+
+class GraphBuilder:
+    """
+    One graph and its tracking structures, empty when created.  With
+    columnar=True the builder keeps its nodes in a ColumnarGraphStore, and
+    hyperedge_mode is its DATABASE.use_hyperedges mode.
+    """
+
+    def __init__(self, columnar=False, hyperedge_mode=DB.HYPEREDGE_EAGER):
+        self.graph = GraphState()
+        self.graph.HYPEREDGE_MODE = hyperedge_mode
+        if columnar:
+            self.graph.GRAPH_STORE = ColumnarGraphStore()
+
+    @contextmanager
+    def active(self):
+        """Make this builder's graph the current one in this thread."""
+        with using_graph(self.graph):
+            yield self
+
+    def reset(self):
+        """Empty the graph, keeping the builder's store and hyperedge mode."""
+        with self.active():
+            DB.reset_DB()
+            adsynth.hybrid_system.export_writer.reset_graph()
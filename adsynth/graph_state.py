@@ -0,0 +1,296 @@
+"""
+Per-graph state of the legacy store.
+
+adsynth/DATABASE.py (and hybrid_system/export_writer.py) keep a graph in
+module-level structures that the synthesizers import by name:
+
+    from adsynth.DATABASE import NODES, NODE_GROUPS, ENABLED_USERS
+
+Those names are proxies.  Every structure of a graph lives in a GraphState
+object, and a proxy forwards each operation to the structure of the graph
+that is current in the calling thread (a context variable), so the same
+imported NODE_GROUPS reads and writes different graphs in different
+threads:
+
+    graph = GraphState()
+    with using_graph(graph):
+        create_domain(...)          # builds into graph
+    ...                             # the default graph again
+
+Nothing is copied when a graph is made current, and graphs current in
+different threads never wait for each other.  Every thread starts in the
+process-wide default graph, the one MainMenu and the scripts use.
+
+The synthesizer entry points (create_domain, generate_users, ...) are
+declared with builds_graph and take the graph to build into explicitly:
+
+    create_domain(..., graph=graph)     # a GraphState or a GraphBuilder
+
+Without graph= they build into the current graph.
+
+A module declares a structure with graph_field(name, factory): the factory
+makes its empty value, and every graph, existing or new, gets one.
+Values that the store rebinds (neo4j_id, GRAPH_STORE, ...) are declared
+with graph_value and are only attributes of the graphs: read and set them
+as current_graph().neo4j_id, not through the module.
+
+The proxies behave as the list or dict they stand for (len, indexing,
+iteration, the list / dict methods, isinstance Sequence / Mapping) except
+that they are not list / dict instances: json.dumps them through list() or
+dict(), and read a graph's real structures with getattr(current_graph(),
+name).  Hot code resolves current_graph() once and works on the real
+structures.
+"""
+
+import contextvars
+import functools
+import weakref
+from collections.abc import MutableMapping, MutableSequence
+from contextlib import contextmanager
+
+# name -> factory of the empty value, for every declared structure and value
+_FIELDS = {}
+
+
+class GraphState:
+    """One graph: every declared structure, empty when created."""
+
+    def __init__(self):
+        for name, factory in _FIELDS.items():
+            setattr(self, name, factory())
+        _GRAPHS.add(self)
+
+
+# Every GraphState alive, so that a structure declared later (by a module
+# imported after the graph was made) is added to it
+_GRAPHS = weakref.WeakSet()
+
+_DEFAULT_GRAPH = GraphState()
+_CURRENT_GRAPH = contextvars.ContextVar("adsynth_graph", default=_DEFAULT_GRAPH)
+
+
+# current_graph() -> the GraphState the calling thread (or task) builds
+# into.  Bound straight to the context variable: the store calls it on
+# every node and edge operation.
+current_graph = _CURRENT_GRAPH.get
+
+
+@contextmanager
+def using_graph(graph):
+    """Make graph the current one in this thread for the block."""
+    token = _CURRENT_GRAPH.set(graph)
+    try:
+        yield graph
+    finally:
+        _CURRENT_GRAPH.reset(token)
+
+
+def builds_graph(function):
+    """
+    Declare a synthesizer entry point: it takes graph=, the GraphState (or
+    GraphBuilder) to build into, and builds into the current graph without it.
+    """
+    @functools.wraps(function)
+    def entry_point(*args, graph=None, **kwargs):
+        if graph is None:
+            return function(*args, **kwargs)
+        with using_graph(getattr(graph, "graph", graph)):
+            return function(*args, **kwargs)
+    return entry_point
+
+
+class GraphList:
+    """A list of the current graph (see the module docstring)."""
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name):
+        self._name = name
+
+    def _target(self):
+        # Inlined in the methods the synthesizers call in loops
+        return getattr(current_graph(), self._name)
+
+    def __len__(self):
+        return len(getattr(current_graph(), self._name))
+
+    def __bool__(self):
+        return bool(self._target())
+
+    def __getitem__(self, index):
+        return getattr(current_graph(), self._name)[index]
+
+    def __setitem__(self, index, value):
+        getattr(current_graph(), self._name)[index] = value
+
+    def __delitem__(self, index):
+        del self._target()[index]
+
+    def __iter__(self):
+        return iter(getattr(current_graph(), self._name))
+
+    def __reversed__(self):
+        return reversed(self._target())
+
+    def __contains__(self, value):
+        return value in getattr(current_graph(), self._name)
+
+    def __add__(self, other):
+        return self._target() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self._target()
+
+    def __iadd__(self, other):
+        self._target().extend(other)
+        return self
+
+    def __mul__(self, count):
+        return self._target() * count
+
+    def __eq__(self, other):
+        return self._target() == (other._target() if isinstance(other, GraphList) else other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._target())
+
+    def __reduce__(self):
+        # A copy of the current graph's list, e.g. when sent to another process
+        return list, (list(self._target()),)
+
+    def append(self, value):
+        getattr(current_graph(), self._name).append(value)
+
+    def extend(self, values):
+        self._target().extend(values)
+
+    def insert(self, index, value):
+        self._target().insert(index, value)
+
+    def pop(self, *index):
+        return self._target().pop(*index)
+
+    def remove(self, value):
+        self._target().remove(value)
+
+    def clear(self):
+        self._target().clear()
+
+    def index(self, *args):
+        return self._target().index(*args)
+
+    def count(self, value):
+        return self._target().count(value)
+
+    def sort(self, **kwargs):
+        self._target().sort(**kwargs)
+
+    def reverse(self):
+        self._target().reverse()
+
+    def copy(self):
+        return self._target().copy()
+
+
+class GraphDict:
+    """A dict of the current graph (see the module docstring)."""
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name):
+        self._name = name
+
+    def _target(self):
+        # Inlined in the methods the synthesizers call in loops
+        return getattr(current_graph(), self._name)
+
+    def __len__(self):
+        return len(getattr(current_graph(), self._name))
+
+    def __bool__(self):
+        return bool(self._target())
+
+    def __getitem__(self, key):
+        return getattr(current_graph(), self._name)[key]
+
+    def __setitem__(self, key, value):
+        getattr(current_graph(), self._name)[key] = value
+
+    def __delitem__(self, key):
+        del self._target()[key]
+
+    def __iter__(self):
+        return iter(getattr(current_graph(), self._name))
+
+    def __contains__(self, key):
+        return key in getattr(current_graph(), self._name)
+
+    def __eq__(self, other):
+        return self._target() == (other._target() if isinstance(other, GraphDict) else other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._target())
+
+    def __reduce__(self):
+        return dict, (dict(self._target()),)
+
+    def get(self, key, default=None):
+        return getattr(current_graph(), self._name).get(key, default)
+
+    def setdefault(self, key, default=None):
+        return self._target().setdefault(key, default)
+
+    def keys(self):
+        return self._target().keys()
+
+    def values(self):
+        return self._target().values()
+
+    def items(self):
+        return self._target().items()
+
+    def pop(self, *args):
+        return self._target().pop(*args)
+
+    def popitem(self):
+        return self._target().popitem()
+
+    def update(self, *args, **kwargs):
+        self._target().update(*args, **kwargs)
+
+    def clear(self):
+        self._target().clear()
+
+    def copy(self):
+        return self._target().copy()
+
+
+MutableSequence.register(GraphList)
+MutableMapping.register(GraphDict)
+
+
+def _declare(name, factory):
+    _FIELDS[name] = factory
+    for graph in list(_GRAPHS):
+        if not hasattr(graph, name):
+            setattr(graph, name, factory())
+
+
+def graph_field(name, factory):
+    """Declare a per-graph list or dict; returns its module-level proxy."""
+    _declare(name, factory)
+    empty = factory()
+    if isinstance(empty, list):
+        return GraphList(name)
+    if isinstance(empty, dict):
+        return GraphDict(name)
+    raise TypeError(f"Graph structure {name} must be a list or a dict, use graph_value")
+
+
+def graph_value(name, default):
+    """Declare a per-graph value that the store rebinds, e.g. current_graph().neo4j_id."""
+    _declare(name, lambda: default)
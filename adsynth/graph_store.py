@@ -0,0 +1,320 @@
+"""
+Columnar, array-backed storage for the legacy on-prem graph.
+
+The default DATABASE backend keeps every node and edge as its own nested
+dict (shaped like ``AD_NODE`` / ``AD_EDGE``) and every edge
+carries references to both endpoint label lists.  ColumnarGraphStore keeps
+the same graph in flat columns instead:
+
+  * nodes are addressed by their integer index (the same index DATABASE_ID
+    and NODE_GROUPS already hand out), with the neo4j id in an int column;
+  * labels and relationship types are interned to small integer codes, and
+    each node only stores the code of its interned label set;
+  * edges are three typed arrays (src, dst, type) plus a sparse property map
+    for the minority of edges that carry properties;
+  * node properties live in one PropertyTable per primary label, one Python
+    list per property key plus an interned key order per row.
+
+The legacy JSON records are only materialised at write time through
+``node_record`` / ``edge_record`` (or the ``iter_*`` helpers).
+"""
+
+from array import array
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Pickled by name, so an unpickled store (phase checkpoints) still
+        # compares its empty cells against the same marker
+        return "_MISSING"
+
+
+# Placeholder for "property not set on this row" inside a PropertyTable column.
+# None is a legitimate property value (e.g. "description": null), so it cannot
+# be used as the marker.
+_MISSING = _Missing()
+
+
+class PropertyTable:
+    """
+    Property columns for all nodes that share one primary label.
+
+    Besides one list per property key, every row records an interned key
+    order ("schema") so that materialised records keep the key order the
+    properties were first set in, exactly as the dict backend does.
+    """
+
+    __slots__ = ("columns", "num_rows", "row_schema", "schemas", "_schema_codes")
+
+    def __init__(self):
+        self.columns = {}
+        self.num_rows = 0
+        self.row_schema = array("l")
+        self.schemas = [()]
+        self._schema_codes = {(): 0}
+
+    def add_row(self):
+        row = self.num_rows
+        for column in self.columns.values():
+            column.append(_MISSING)
+        self.row_schema.append(0)
+        self.num_rows += 1
+        return row
+
+    def add_rows(self, keys, columns):
+        """
+        Append len(columns[0]) rows at once, row i holding columns[k][i] for
+        keys[k].  All new rows share the key order ``keys``.
+        """
+        first = self.num_rows
+        count = len(columns[0]) if columns else 0
+        for key, values in zip(keys, columns):
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = [_MISSING] * first
+            column.extend(values)
+        for column in self.columns.values():
+            if len(column) == first:
+                column.extend([_MISSING] * count)
+
+        schema = tuple(keys)
+        code = self._schema_codes.get(schema)
+        if code is None:
+            code = len(self.schemas)
+            self.schemas.append(schema)
+            self._schema_codes[schema] = code
+        self.row_schema.extend(array("l", [code]) * count)
+        self.num_rows += count
+        return range(first, first + count)
+
+    def set(self, row, key, value):
+        column = self.columns.get(key)
+        if column is None:
+            column = [_MISSING] * self.num_rows
+            self.columns[key] = column
+        elif column[row] is not _MISSING:
+            column[row] = value
+            return
+        column[row] = value
+
+        schema = self.schemas[self.row_schema[row]] + (key,)
+        code = self._schema_codes.get(schema)
+        if code is None:
+            code = len(self.schemas)
+            self.schemas.append(schema)
+            self._schema_codes[schema] = code
+        self.row_schema[row] = code
+
+    def get(self, row, key, default=None):
+        column = self.columns.get(key)
+        if column is None:
+            return default
+        value = column[row]
+        return default if value is _MISSING else value
+
+    def has(self, row, key):
+        column = self.columns.get(key)
+        return column is not None and column[row] is not _MISSING
+
+    def row_dict(self, row):
+        columns = self.columns
+        return {key: columns[key][row] for key in self.schemas[self.row_schema[row]]}
+
+
+class ColumnarGraphStore:
+    """
+    Array-backed node/edge storage with interned labels and relationship types.
+
+    Node and edge indices are dense integers starting at 0, so they can be
+    used interchangeably with the indices of the dict-backed NODES / EDGES.
+    """
+
+    def __init__(self):
+        # Interned strings
+        self.label_names = []
+        self._label_codes = {}
+        self.rel_names = []
+        self._rel_codes = {}
+        self.labelsets = []          # labelset code -> tuple of label codes
+        self._labelset_codes = {}
+
+        # Node columns
+        self.node_ext_id = array("q")      # neo4j id written to the "id" field
+        self.node_labelset = array("l")
+        self.node_table = array("l")       # label code of the owning PropertyTable
+        self.node_row = array("l")         # row inside that PropertyTable
+        self.tables = {}                   # label code -> PropertyTable
+
+        # Edge columns
+        self.edge_src = array("l")
+        self.edge_dst = array("l")
+        self.edge_type = array("l")
+        self.edge_props = {}               # edge index -> properties dict
+
+    # ------------------------------------------------------------------
+    # Interning
+    # ------------------------------------------------------------------
+
+    def label_code(self, label):
+        code = self._label_codes.get(label)
+        if code is None:
+            code = len(self.label_names)
+            self.label_names.append(label)
+            self._label_codes[label] = code
+        return code
+
+    def rel_code(self, rel_type):
+        code = self._rel_codes.get(rel_type)
+        if code is None:
+            code = len(self.rel_names)
+            self.rel_names.append(rel_type)
+            self._rel_codes[rel_type] = code
+        return code
+
+    def _labelset_code(self, label_codes):
+        code = self._labelset_codes.get(label_codes)
+        if code is None:
+            code = len(self.labelsets)
+            self.labelsets.append(label_codes)
+            self._labelset_codes[label_codes] = code
+        return code
+
+    # ------------------------------------------------------------------
+    # Nodes
+    # ------------------------------------------------------------------
+
+    def num_nodes(self):
+        return len(self.node_ext_id)
+
+    def add_node(self, table_label, labels, ext_id):
+        index = len(self.node_ext_id)
+        table_code = self.label_code(table_label)
+        table = self.tables.get(table_code)
+        if table is None:
+            table = PropertyTable()
+            self.tables[table_code] = table
+
+        self.node_ext_id.append(ext_id)
+        self.node_labelset.append(
+            self._labelset_code(tuple(self.label_code(l) for l in labels)))
+        self.node_table.append(table_code)
+        self.node_row.append(table.add_row())
+        return index
+
+    def add_nodes(self, table_label, labels, first_ext_id, keys, columns):
+        """
+        Bulk add_node + set_property: one node per entry of the columns, with
+        consecutive neo4j ids starting at first_ext_id.  Returns the range of
+        new node indices.
+        """
+        index = len(self.node_ext_id)
+        table_code = self.label_code(table_label)
+        table = self.tables.get(table_code)
+        if table is None:
+            table = PropertyTable()
+            self.tables[table_code] = table
+
+        rows = table.add_rows(keys, columns)
+        count = len(rows)
+        labelset = self._labelset_code(tuple(self.label_code(l) for l in labels))
+        self.node_ext_id.extend(range(first_ext_id, first_ext_id + count))
+        self.node_labelset.extend(array("l", [labelset]) * count)
+        self.node_table.extend(array("l", [table_code]) * count)
+        self.node_row.extend(rows)
+        return range(index, index + count)
+
+    def node_labels(self, index):
+        return [self.label_names[c] for c in self.labelsets[self.node_labelset[index]]]
+
+    def last_label(self, index):
+        codes = self.labelsets[self.node_labelset[index]]
+        return self.label_names[codes[-1]] if codes else None
+
+    def add_label(self, index, label):
+        codes = self.labelsets[self.node_labelset[index]]
+        code = self.label_code(label)
+        if code not in codes:
+            self.node_labelset[index] = self._labelset_code(codes + (code,))
+
+    def set_property(self, index, key, value):
+        self.tables[self.node_table[index]].set(self.node_row[index], key, value)
+
+    def get_property(self, index, key, default=None):
+        return self.tables[self.node_table[index]].get(self.node_row[index], key, default)
+
+    def has_property(self, index, key):
+        return self.tables[self.node_table[index]].has(self.node_row[index], key)
+
+    def node_properties(self, index):
+        return self.tables[self.node_table[index]].row_dict(self.node_row[index])
+
+    def node_record(self, index):
+        return {
+            "id": str(self.node_ext_id[index]),
+            "labels": self.node_labels(index),
+            "properties": self.node_properties(index),
+        }
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+
+    def num_edges(self):
+        return len(self.edge_src)
+
+    def add_edge(self, start_index, end_index, rel_type):
+        index = len(self.edge_src)
+        self.edge_src.append(start_index)
+        self.edge_dst.append(end_index)
+        self.edge_type.append(self.rel_code(rel_type))
+        return index
+
+    def add_edges(self, start_indices, end_index, rel_type):
+        """One rel_type edge from every start index to end_index; returns the first edge index."""
+        index = len(self.edge_src)
+        count = len(start_indices)
+        self.edge_src.extend(start_indices)
+        self.edge_dst.extend(array("l", [end_index]) * count)
+        self.edge_type.extend(array("l", [self.rel_code(rel_type)]) * count)
+        return index
+
+    def set_edge_property(self, index, key, value):
+        props = self.edge_props.get(index)
+        if props is None:
+            props = self.edge_props[index] = {}
+        props[key] = value
+
+    def edge_record(self, index):
+        start = self.edge_src[index]
+        end = self.edge_dst[index]
+        return {
+            "type": "relationship",
+            "id": "r_" + str(index),
+            "label": self.rel_names[self.edge_type[index]],
+            "properties": dict(self.edge_props.get(index, {})),
+            "start": {"id": str(self.node_ext_id[start]), "labels": self.node_labels(start)},
+            "end": {"id": str(self.node_ext_id[end]), "labels": self.node_labels(end)},
+        }
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def iter_node_records(self):
+        for index in range(self.num_nodes()):
+            yield self.node_record(index)
+
+    def iter_edge_records(self):
+        for index in range(self.num_edges()):
+            yield self.edge_record(index)
+
+    def memory_usage(self):
+        """Approximate bytes held by the array columns (excluding property values)."""
+        columns = (self.node_ext_id, self.node_labelset, self.node_table, self.node_row,
+                   self.edge_src, self.edge_dst, self.edge_type)
+        return sum(c.itemsize * len(c) for c in columns)
+
+    def clear(self):
+        self.__init__()
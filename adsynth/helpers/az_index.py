@@ -0,0 +1,25 @@
+"""
+Name -> object id lookups over the Azure nodes.
+
+index_az_names reads every node once through the backend-neutral
+accessors, so finding e.g. the Global Administrator role costs
+O(nodes) instead of one scan of the graph per candidate role.
+"""
+
+import adsynth.DATABASE as DB
+
+
+def index_az_names(names):
+    """name -> object ids of the nodes with that name, in node order."""
+    index = {name: [] for name in names}
+    for node in range(DB.get_num_nodes()):
+        ids = index.get(DB.get_node_property(node, "name"))
+        if ids is not None:
+            ids.append(DB.get_node_property(node, "objectid"))
+    return index
+
+
+def first_named(candidates, name, index):
+    """The first of candidates whose node is called name, or None."""
+    named = set(index.get(name, ()))
+    return next((c for c in candidates if c in named), None)
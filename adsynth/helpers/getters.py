@@ -1,28 +1,27 @@
-import re
-from adsynth.DATABASE import DISABLED_USERS, DISTRIBUTION_GROUPS, ENABLED_USERS, FOLDERS, S_TIERS_LOCATIONS, WS_TIERS_LOCATIONS
 from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
 from adsynth.adsynth_templates.servers import T1_SERVERS
+from adsynth.helpers.ou_registry import get_ou_entry
 from adsynth.templates.groups import get_departments
 from adsynth.templates.ous import STATES
-from adsynth.utils.parameters import get_dict_param_value
+from adsynth.utils.parameters import compiled_lookup, get_dict_param_value
 
+@compiled_lookup
 def get_list_perc_param_value(node, key, parameters):
     try:
-        list = parameters[node][key]
-        if len(list) != 3:
+        values = parameters[node][key]
+        if len(values) != 3:
             return DEFAULT_CONFIGURATIONS[node][key]
-        
-        for i in range(len(list)):
-            if list[i] < 0 or list[i] > 100:
-                list[i] = 100       
-        return list
+
+        # Out-of-range percentages become 100 (in a new list, the parameters are left as they are)
+        return [value if 0 <= value <= 100 else 100 for value in values]
     except:
         return DEFAULT_CONFIGURATIONS[node][key]
 
+@compiled_lookup
 def get_misconfig_dict_param_value(node, parameters):
     try:
         value = parameters[node]
-        if type(value) == dict:
+        if isinstance(value, dict):
             if (value["allow"] == 0 or value["allow"] == 1) and type(value["limit"]) == int:
                 return value["allow"], int(value["limit"])
             else:
@@ -30,6 +29,7 @@ def get_misconfig_dict_param_value(node, parameters):
     except:
         return DEFAULT_CONFIGURATIONS[node]
 
+@compiled_lookup
 def get_single_int_param_value(key, parameters):
     try:
         value = parameters[key]
@@ -40,6 +40,7 @@ def get_single_int_param_value(key, parameters):
     except:
         return DEFAULT_CONFIGURATIONS[key]
 
+@compiled_lookup
 def get_num_tiers(parameters):
     try:
         value = parameters["nTiers"]
@@ -50,20 +51,22 @@ def get_num_tiers(parameters):
     except:
         return DEFAULT_CONFIGURATIONS["nTiers"]
         
+@compiled_lookup
 def get_list_param_value(node, key, parameters):
     try:
         value = parameters[node][key]
-        if type(value) == list:
+        if isinstance(value, list):
             return value
         else:
             return DEFAULT_CONFIGURATIONS[node][key]
     except:
         return DEFAULT_CONFIGURATIONS[node][key]
 
+@compiled_lookup
 def get_threshold_values(node, key, parameters):
     try:
         value = parameters[node][key]
-        if type(value) == list and len(value) == 2 and value[0] > 0 and value[1] >= value[0]:
+        if isinstance(value, list) and len(value) == 2 and value[0] > 0 and value[1] >= value[0]:
             return value
         else:
             return DEFAULT_CONFIGURATIONS[node][key] 
@@ -78,8 +81,7 @@ def get_total_resources(tier, nTiers, locations, parameters, object_types = ["C"
         
         lowest_tier_not_admin = min(2, nTiers - 1)
         starting_tier = max(lowest_tier_not_admin, tier)
-        departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-        departments_list = get_departments(departments_probs)
+        departments_list = get_department_names(parameters)
 
         for i in range(starting_tier, nTiers):
             for type in object_types:
@@ -99,39 +101,11 @@ def get_total_resources(tier, nTiers, locations, parameters, object_types = ["C"
         return resources
 
 def get_ou_elements(ou_name):
-        patterns = {
-            "Workstations": r'T(\d+) Workstations (\w+)', 
-            "Servers": r'T(\d+) Servers (\w+)',
-            "Distribution": r'T(\d+) Distribution (\S+)',
-            "Security": r'T(\d+) Security (\S+)',
-            "Enabled": r'T(\d+) Enabled User Accounts',
-            "Disabled": r'T(\d+) Disabled User Accounts'       
-        }
-
-        # Check the type of OU
-        for type in patterns:
-            if type in ou_name:
-                match = re.match(patterns[type], ou_name)
-                if len(match.groups()) > 1:
-                    tier = int(match.group(1))
-                    department_or_location = match.group(2)
-        
-                    if type == "Workstations":
-                        return WS_TIERS_LOCATIONS[tier][department_or_location], "Computer"
-                    if type == "Servers":
-                        return S_TIERS_LOCATIONS[tier][department_or_location], "Computer"
-                    if type == "Distribution":
-                        return DISTRIBUTION_GROUPS[tier][department_or_location], "Group"
-                    if type == "Security":
-                        return FOLDERS[tier][department_or_location], "Group"
-
-                else:
-                    tier = int(match.group(1))
-                    if type == "Enabled":
-                        return ENABLED_USERS[tier], "User"
-                    else:
-                        return DISABLED_USERS[tier], "User"
+    # Members of a tiered OU and their node type, from the OU registry
+    entry = get_ou_entry(ou_name)
+    if entry is None:
         return [], ""
+    return entry.members(), entry.member_type
 
 def get_num_total_resources(tier, nTiers, locations, parameters):
     num_resources = 0
@@ -147,8 +121,7 @@ def get_num_total_resources(tier, nTiers, locations, parameters):
     # + OUs across all locations for Workstations and Servers
     # + 2 OUs for users (enabled & disabled)
     # + OUs across all departments for security and distribution groups
-    departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-    departments_list = get_departments(departments_probs)
+    departments_list = get_department_names(parameters)
     num_resources += (nTiers - starting_tier) * (len(locations) * 2 + 2 + 2 * len(departments_list))
 
     return num_resources  
@@ -156,6 +129,11 @@ def get_num_total_resources(tier, nTiers, locations, parameters):
 def get_t1_servers():
     return T1_SERVERS
 
+@compiled_lookup
+def get_department_names(parameters):
+    return get_departments(get_dict_param_value("Group", "departmentProbability", parameters))
+
+@compiled_lookup
 def get_locations(parameters):
     num_locations = get_single_int_param_value("nLocations", parameters)
     if num_locations > len(STATES) or num_locations == 0:
@@ -1,9 +1,15 @@
-from adsynth.DATABASE import edge_operation, get_node_index
+from adsynth.DATABASE import HYPEREDGE_EAGER, edge_operation, get_hyperedge_mode, get_node_index, hyperedge_operation
 
 
 def extract_hyperedges(start_name, start_type, end_set, end_type, rel_type, props = [], values = []):
     # All nodes are assumed to have a full name, including domain name
     start_index = get_node_index(f"{start_name}_{start_type}", "name")
-    for node in end_set:
-        end_index = node if isinstance(node, int) else get_node_index(f"{node}_{end_type}", "name")
+    end_indices = [node if isinstance(node, int) else get_node_index(f"{node}_{end_type}", "name")
+                   for node in end_set]
+    if get_hyperedge_mode() != HYPEREDGE_EAGER:
+        # Keep one set-to-set record; member edges are expanded at export time
+        if end_indices:
+            hyperedge_operation(start_index, end_indices, rel_type, props, values)
+        return
+    for end_index in end_indices:
         edge_operation(start_index, end_index, rel_type, props, values)
@@ -1,6 +1,5 @@
 import math
 import random
-import uuid
 from adsynth.DATABASE import edge_operation, get_node_index, node_operation, ridcount
 from adsynth.adsynth_templates.admin_groups import get_t0_admin_groups, get_tn_admin_groups
 from adsynth.entities.acls import cn, cs
@@ -9,6 +8,7 @@ from adsynth.utils.domains import get_domain_dn
 from adsynth.utils.groups import generate_group_description
 from adsynth.utils.ous import get_ou_dn
 from adsynth.utils.principals import get_cn, get_sid_from_rid
+from adsynth.utils.sampling import random_guid
 
 def segregate_list(array, percentages):
 
@@ -34,7 +34,7 @@ def create_sub_objects(domain_name, domain_sid, parent_name, parent_type, sub_li
     for sub in sub_list:
         # Create a sub object
         if sub_type == "OU":
-            sid = cs(str(uuid.uuid4()), domain_sid)
+            sid = cs(random_guid(), domain_sid)
         else:
             sid = get_sid_from_rid(ridcount[0], domain_sid)
             ridcount[0] += 1
@@ -0,0 +1,60 @@
+"""
+Registry of the tiered OUs whose members permission synthesis expands.
+
+create_ad_skeleton registers every "T<i> Workstations <location>",
+"T<i> Servers <location>", "T<i> Enabled/Disabled User Accounts" and
+"T<i> Distribution/Security <department>" OU once.  Each entry records the
+tier, the kind of OU, its location or department and where its members are
+tracked (WS_TIERS_LOCATIONS, S_TIERS_LOCATIONS, ENABLED_USERS,
+DISABLED_USERS, DISTRIBUTION_GROUPS or FOLDERS), so a permission target is
+resolved with one dict lookup instead of matching its name against regexes.
+
+Members are read from the tracking structure when they are asked for, so
+the entries stay valid while users, computers and groups are placed.
+"""
+
+from collections import namedtuple
+
+from adsynth.DATABASE import DISABLED_USERS, DISTRIBUTION_GROUPS, ENABLED_USERS, FOLDERS, OU_REGISTRY, S_TIERS_LOCATIONS, WS_TIERS_LOCATIONS
+
+# kind -> (tracking structure, type of the member nodes)
+OU_KINDS = {
+    "Workstations": (WS_TIERS_LOCATIONS, "Computer"),
+    "Servers": (S_TIERS_LOCATIONS, "Computer"),
+    "Enabled": (ENABLED_USERS, "User"),
+    "Disabled": (DISABLED_USERS, "User"),
+    "Distribution": (DISTRIBUTION_GROUPS, "Group"),
+    "Security": (FOLDERS, "Group"),
+}
+
+
+class OUEntry(namedtuple("OUEntry", ["name", "tier", "kind", "subdivision", "member_type"])):
+    """subdivision is the location or department, None for the user account OUs."""
+
+    __slots__ = ()
+
+    def members(self):
+        tier_members = OU_KINDS[self.kind][0][self.tier]
+        return tier_members if self.subdivision is None else tier_members[self.subdivision]
+
+
+def register_ou(name, tier, kind, subdivision = None):
+    entry = OUEntry(name, tier, kind, subdivision, OU_KINDS[kind][1])
+    OU_REGISTRY[name] = entry
+    return entry
+
+
+def register_tiered_ous(tiers, locations, departments):
+    for i in tiers:
+        for l in locations:
+            register_ou(f"T{i} Workstations {l}", i, "Workstations", l)
+            register_ou(f"T{i} Servers {l}", i, "Servers", l)
+        register_ou(f"T{i} Enabled User Accounts", i, "Enabled")
+        register_ou(f"T{i} Disabled User Accounts", i, "Disabled")
+        for d in departments:
+            register_ou(f"T{i} Distribution {d}", i, "Distribution", d)
+            register_ou(f"T{i} Security {d}", i, "Security", d)
+
+
+def get_ou_entry(ou_name):
+    return OU_REGISTRY.get(ou_name)
@@ -16,22 +16,25 @@ import json
 import os
 from typing import Any, Dict, List, Optional
 
+from adsynth.graph_state import graph_field
 from adsynth.hybrid_system.schema_registry import (
     NodeLabel, RelType, SCHEMA_VERSION,
     validate_node, is_allowed_edge,
 )
+from adsynth.utils.serialization import get_serializer
 
 
-# In-memory graph store (mirrors adsynth DATABASE.py pattern)
+# In-memory graph store (mirrors adsynth DATABASE.py pattern: one per graph,
+# the names below are proxies to the current graph's, see graph_state.py)
 
 # List of node dicts:  {id, labels, properties}
-HYBRID_NODES: List[Dict[str, Any]] = []
+HYBRID_NODES: List[Dict[str, Any]] = graph_field("HYBRID_NODES", list)
 
 # List of edge dicts:  {start, end, relType, properties}
-HYBRID_EDGES: List[Dict[str, Any]] = []
+HYBRID_EDGES: List[Dict[str, Any]] = graph_field("HYBRID_EDGES", list)
 
 # Quick-lookup: node id -> index in HYBRID_NODES
-_NODE_INDEX: Dict[str, int] = {}
+_NODE_INDEX: Dict[str, int] = graph_field("_NODE_INDEX", dict)
 
 
 # Graph mutation helpers
@@ -133,6 +136,20 @@ def get_node_by_id(node_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def merge_graph(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> None:
+    """
+    Append nodes/edges built in another graph (e.g. a worker process shard).
+
+    Records were validated when they were first added, so they are taken as
+    is; node ids already present are skipped exactly as add_node would.
+    """
+    for node in nodes:
+        if node["id"] not in _NODE_INDEX:
+            _NODE_INDEX[node["id"]] = len(HYBRID_NODES)
+            HYBRID_NODES.append(node)
+    HYBRID_EDGES.extend(edges)
+
+
 def reset_graph() -> None:
     """Clear all nodes and edges (useful for tests / multiple runs)."""
     HYBRID_NODES.clear()
@@ -167,18 +184,18 @@ def write_graph_jsonl(output_dir: str,
                       filename: str = "graph.jsonl") -> str:
     """
     Write all nodes then all edges as newline-delimited JSON to
-    <output_dir>/<filename>.
+    <output_dir>/<filename>, encoded with the active serializer
+    (adsynth.utils.serialization).
 
     Returns the full path to the written file.
     """
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, filename)
 
-    with open(output_path, "w", encoding="utf-8") as fh:
-        for node in HYBRID_NODES:
-            fh.write(json.dumps(_node_record(node), separators=(",", ":")) + "\n")
-        for edge in HYBRID_EDGES:
-            fh.write(json.dumps(_edge_record(edge), separators=(",", ":")) + "\n")
+    dumps = get_serializer().dumps
+    with open(output_path, "wb") as fh:
+        fh.writelines(dumps(_node_record(node)) + b"\n" for node in HYBRID_NODES)
+        fh.writelines(dumps(_edge_record(edge)) + b"\n" for edge in HYBRID_EDGES)
 
     return output_path
 
@@ -8,6 +8,10 @@ export_writer.py (HYBRID_NODES, HYBRID_EDGES).
 Logic is identical to the original invariant_validators.py.
 Only the data source references changed.
 
+All checks read the graph through a ValidationContext, which indexes
+nodes and edges in one pass; validate_graph_invariants() builds it once
+and shares it, so validation is linear in |NODES| + |EDGES| + |links|.
+
 Invariants:
   I1 — Per-link SyncIdentity: every SYNC_LINK has exactly one SyncIdentity
        with SERVICES_LINK, SYNCS_TO, and RUNS_ON(EntraConnect)
@@ -16,60 +20,108 @@ Invariants:
   I4 — PHS: SyncIdentity with syncMode PHS/Mixed exists + SYNCED_TO edges present
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from adsynth.DATABASE import (
-    NODES, EDGES,
     SYNC_LINKS, SYNC_IDENTITY_NODES,
     TENANT_HYBRID_MODE,
     PTA_AGENT_NODES, ADFS_SERVER_NODES,
+    iter_node_records, iter_edge_records,
 )
+from adsynth.graph_state import builds_graph
 
 
 # ============================================================
-# Internal helpers — read from NODES / EDGES
+# Validation context — indexes over NODES / EDGES, built once
 # ============================================================
 
-def _nodes_by_label(label: str) -> List[Dict[str, Any]]:
-    return [n for n in NODES if n["labels"] and n["labels"][-1] == label]
-
-
-def _edges_by_type(rel_type: str) -> List[Dict[str, Any]]:
-    return [e for e in EDGES if e.get("label") == rel_type]
-
-
-def _edge_exists(rel_type: str, start_id: str, end_id: str) -> bool:
-    for e in EDGES:
-        if (e.get("label") == rel_type
-                and e.get("start", {}).get("id") == start_id
-                and e.get("end", {}).get("id") == end_id):
-            return True
-    return False
-
-
-def _get_node_by_objectid(objectid: str) -> Optional[Dict[str, Any]]:
-    for n in NODES:
-        if n["properties"].get("objectid") == objectid:
-            return n
-    return None
-
-
-def _get_node_by_index(idx: int) -> Optional[Dict[str, Any]]:
-    if 0 <= idx < len(NODES):
-        return NODES[idx]
-    return None
-
-
 def _neo4j_id_of(node: Dict[str, Any]) -> str:
     """Return the Neo4j internal id string used in edge start/end."""
     return node.get("id", "")
 
 
+class ValidationContext:
+    """
+    One pass over the graph builds every lookup the invariant checks need,
+    so each per-link check is a dict / set lookup instead of a scan of
+    NODES / EDGES:
+
+      label    -> [nodes]          (by last label)
+      objectid -> node             (first node with that objectid)
+      relType  -> [edges]
+      (relType, start id, end id)  membership set
+      (relType, start id) -> {end ids}
+      (relType, end id)   -> {start ids}
+
+    Nodes come from the active storage backend (dict or columnar store).
+    Azure-side records without a "properties" dict are indexed by their
+    top-level fields.
+    """
+
+    def __init__(self, nodes=None, edges=None):
+        self.nodes: List[Dict[str, Any]] = list(iter_node_records() if nodes is None else nodes)
+        edges = list(iter_edge_records() if edges is None else edges)
+
+        self._nodes_by_label: Dict[str, List[Dict[str, Any]]] = {}
+        self._node_by_objectid: Dict[Any, Dict[str, Any]] = {}
+        self._domain_by_name: Dict[str, Dict[str, Any]] = {}
+        for n in self.nodes:
+            props = n.get("properties", n)
+            self._node_by_objectid.setdefault(props.get("objectid"), n)
+            if not n["labels"]:
+                continue
+            label = n["labels"][-1]
+            self._nodes_by_label.setdefault(label, []).append(n)
+            if label == "Domain":
+                self._domain_by_name.setdefault(props.get("name", "").upper(), n)
+
+        self._edges_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self._edge_keys: Set[tuple] = set()
+        self._ends: Dict[tuple, Set[str]] = {}
+        self._starts: Dict[tuple, Set[str]] = {}
+        for e in edges:
+            rel_type = e.get("label")
+            start_id = e.get("start", {}).get("id")
+            end_id = e.get("end", {}).get("id")
+            self._edges_by_type.setdefault(rel_type, []).append(e)
+            self._edge_keys.add((rel_type, start_id, end_id))
+            self._ends.setdefault((rel_type, start_id), set()).add(end_id)
+            self._starts.setdefault((rel_type, end_id), set()).add(start_id)
+
+    def nodes_by_label(self, label: str) -> List[Dict[str, Any]]:
+        return self._nodes_by_label.get(label, [])
+
+    def edges_by_type(self, rel_type: str) -> List[Dict[str, Any]]:
+        return self._edges_by_type.get(rel_type, [])
+
+    def edge_exists(self, rel_type: str, start_id: str, end_id: str) -> bool:
+        return (rel_type, start_id, end_id) in self._edge_keys
+
+    def edge_ends(self, rel_type: str, start_id: str) -> Set[str]:
+        """Ids of the end nodes of all rel_type edges leaving start_id."""
+        return self._ends.get((rel_type, start_id), set())
+
+    def edge_starts(self, rel_type: str, end_id: str) -> Set[str]:
+        """Ids of the start nodes of all rel_type edges entering end_id."""
+        return self._starts.get((rel_type, end_id), set())
+
+    def get_node_by_objectid(self, objectid: str) -> Optional[Dict[str, Any]]:
+        return self._node_by_objectid.get(objectid)
+
+    def get_node_by_index(self, idx: int) -> Optional[Dict[str, Any]]:
+        if 0 <= idx < len(self.nodes):
+            return self.nodes[idx]
+        return None
+
+    def get_domain_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._domain_by_name.get(name.upper())
+
+
 # ============================================================
 # Invariant I1 — Per-link SyncIdentity
 # ============================================================
 
-def check_sync_identity_invariant() -> List[str]:
+def check_sync_identity_invariant(ctx: Optional[ValidationContext] = None) -> List[str]:
     """
     For every SYNC_LINK (domain_name, tenant_id) in SYNC_LINKS:
       a) Exactly one SyncIdentity with linkKey = "domain_id->tenant_id" exists
@@ -82,12 +134,13 @@ def check_sync_identity_invariant() -> List[str]:
     if not SYNC_LINKS:
         return []
 
+    ctx = ctx or ValidationContext()
+
     # Build set of EntraConnect server neo4j ids
-    ec_neo4j_ids = set()
-    for n in NODES:
-        if (n["labels"] and n["labels"][-1] == "ConnectorHost"
-                and n["properties"].get("serverRole") == "EntraConnect"):
-            ec_neo4j_ids.add(_neo4j_id_of(n))
+    ec_neo4j_ids = {
+        _neo4j_id_of(n) for n in ctx.nodes_by_label("ConnectorHost")
+        if n["properties"].get("serverRole") == "EntraConnect"
+    }
 
     for domain_name, tenant_id in SYNC_LINKS:
         # Get node indices from tracking dict
@@ -101,7 +154,7 @@ def check_sync_identity_invariant() -> List[str]:
             )
             continue
 
-        sync_node = _get_node_by_index(sync_idx)
+        sync_node = ctx.get_node_by_index(sync_idx)
         if sync_node is None:
             violations.append(
                 f"SYNC_LINK({domain_name}, {tenant_id}): "
@@ -112,19 +165,14 @@ def check_sync_identity_invariant() -> List[str]:
         sync_neo4j_id = _neo4j_id_of(sync_node)
 
         # Find domain node neo4j id
-        domain_node = None
-        for n in NODES:
-            if (n["labels"] and n["labels"][-1] == "Domain"
-                    and n["properties"].get("name", "").upper() == domain_name.upper()):
-                domain_node = n
-                break
+        domain_node = ctx.get_domain_by_name(domain_name)
 
         # Find tenant node neo4j id
-        tenant_node = _get_node_by_objectid(tenant_id)
+        tenant_node = ctx.get_node_by_objectid(tenant_id)
 
         # (b) SERVICES_LINK(sync -> domain)
         if domain_node:
-            if not _edge_exists("SERVICES_LINK", sync_neo4j_id,
+            if not ctx.edge_exists("SERVICES_LINK", sync_neo4j_id,
                                 _neo4j_id_of(domain_node)):
                 violations.append(
                     f"SyncIdentity for ({domain_name},{tenant_id}) "
@@ -138,7 +186,7 @@ def check_sync_identity_invariant() -> List[str]:
 
         # (c) SYNCS_TO(sync -> tenant)
         if tenant_node:
-            if not _edge_exists("SYNCS_TO", sync_neo4j_id,
+            if not ctx.edge_exists("SYNCS_TO", sync_neo4j_id,
                                 _neo4j_id_of(tenant_node)):
                 violations.append(
                     f"SyncIdentity for ({domain_name},{tenant_id}) "
@@ -151,12 +199,7 @@ def check_sync_identity_invariant() -> List[str]:
             )
 
         # (d) RUNS_ON(sync -> EntraConnect host)
-        runs_on_targets = {
-            e.get("end", {}).get("id")
-            for e in EDGES
-            if e.get("label") == "RUNS_ON"
-            and e.get("start", {}).get("id") == sync_neo4j_id
-        }
+        runs_on_targets = ctx.edge_ends("RUNS_ON", sync_neo4j_id)
         valid_hosts = runs_on_targets & ec_neo4j_ids
         if not valid_hosts:
             violations.append(
@@ -171,7 +214,7 @@ def check_sync_identity_invariant() -> List[str]:
 # Invariant I2 — PTA mode
 # ============================================================
 
-def check_pta_invariant() -> List[str]:
+def check_pta_invariant(ctx: Optional[ValidationContext] = None) -> List[str]:
     """
     For every tenant with TENANT_HYBRID_MODE in (PTA, Mixed):
       a) At least one PTAAgentHost node exists
@@ -183,6 +226,8 @@ def check_pta_invariant() -> List[str]:
         t_id for t_id, mode in TENANT_HYBRID_MODE.items()
         if mode in ("PTA", "Mixed")
     ]
+    if pta_tenants:
+        ctx = ctx or ValidationContext()
 
     for tenant_id in pta_tenants:
         pta_indices = PTA_AGENT_NODES.get(tenant_id, [])
@@ -195,7 +240,7 @@ def check_pta_invariant() -> List[str]:
             continue
 
         # Check HAS_PTA_AGENT edge exists
-        tenant_node = _get_node_by_objectid(tenant_id)
+        tenant_node = ctx.get_node_by_objectid(tenant_id)
         if not tenant_node:
             violations.append(
                 f"PTA tenant '{tenant_id}': tenant node not found in NODES"
@@ -204,16 +249,11 @@ def check_pta_invariant() -> List[str]:
 
         tenant_neo4j_id = _neo4j_id_of(tenant_node)
         pta_neo4j_ids = {
-            _neo4j_id_of(NODES[i]) for i in pta_indices
-            if 0 <= i < len(NODES)
+            _neo4j_id_of(ctx.nodes[i]) for i in pta_indices
+            if 0 <= i < len(ctx.nodes)
         }
 
-        has_edge = any(
-            e.get("label") == "HAS_PTA_AGENT"
-            and e.get("start", {}).get("id") == tenant_neo4j_id
-            and e.get("end", {}).get("id") in pta_neo4j_ids
-            for e in EDGES
-        )
+        has_edge = not ctx.edge_ends("HAS_PTA_AGENT", tenant_neo4j_id).isdisjoint(pta_neo4j_ids)
 
         if not has_edge:
             violations.append(
@@ -228,7 +268,7 @@ def check_pta_invariant() -> List[str]:
 # Invariant I3 — ADFS mode
 # ============================================================
 
-def check_adfs_invariant() -> List[str]:
+def check_adfs_invariant(ctx: Optional[ValidationContext] = None) -> List[str]:
     """
     For every link with TENANT_HYBRID_MODE in (ADFS, Mixed):
       a) IS_FEDERATED_WITH(domain -> tenant) edge exists
@@ -241,7 +281,11 @@ def check_adfs_invariant() -> List[str]:
         if mode in ("ADFS", "Mixed")
     ]
 
-    adfs_server_nodes = _nodes_by_label("ADFSServer")
+    if not adfs_tenants:
+        return violations
+
+    ctx = ctx or ValidationContext()
+    adfs_server_nodes = ctx.nodes_by_label("ADFSServer")
 
     for tenant_id in adfs_tenants:
         if not ADFS_SERVER_NODES.get(tenant_id):
@@ -256,13 +300,10 @@ def check_adfs_invariant() -> List[str]:
             )
 
         # IS_FEDERATED_WITH edge
-        fed_edges = _edges_by_type("IS_FEDERATED_WITH")
-        tenant_fed = [
-            e for e in fed_edges
-            if e.get("end", {}).get("id") == _neo4j_id_of(
-                _get_node_by_objectid(tenant_id) or {}
-            )
-        ]
+        tenant_fed = ctx.edge_starts(
+            "IS_FEDERATED_WITH",
+            _neo4j_id_of(ctx.get_node_by_objectid(tenant_id) or {}),
+        )
         if not tenant_fed:
             violations.append(
                 f"ADFS tenant '{tenant_id}': "
@@ -276,7 +317,7 @@ def check_adfs_invariant() -> List[str]:
 # Invariant I4 — PHS mode
 # ============================================================
 
-def check_phs_invariant() -> List[str]:
+def check_phs_invariant(ctx: Optional[ValidationContext] = None) -> List[str]:
     """
     For every link with TENANT_HYBRID_MODE in (PHS, Mixed):
       a) SyncIdentity with syncMode PHS or Mixed exists for that link
@@ -292,6 +333,8 @@ def check_phs_invariant() -> List[str]:
     if not phs_links:
         return []
 
+    ctx = ctx or ValidationContext()
+
     for domain_name, tenant_id in phs_links:
         sync_idx = SYNC_IDENTITY_NODES.get((domain_name, tenant_id))
         if sync_idx is None:
@@ -301,7 +344,7 @@ def check_phs_invariant() -> List[str]:
             )
             continue
 
-        sync_node = _get_node_by_index(sync_idx)
+        sync_node = ctx.get_node_by_index(sync_idx)
         if not sync_node:
             continue
 
@@ -313,8 +356,8 @@ def check_phs_invariant() -> List[str]:
             )
 
     # At least one SYNCED_TO edge must exist if users were generated
-    user_nodes = _nodes_by_label("User")
-    synced_to = _edges_by_type("SYNCED_TO")
+    user_nodes = ctx.nodes_by_label("User")
+    synced_to = ctx.edges_by_type("SYNCED_TO")
     if user_nodes and not synced_to:
         violations.append(
             "PHS mode active but no SYNCED_TO edges found — "
@@ -328,6 +371,7 @@ def check_phs_invariant() -> List[str]:
 # Full validation — run all invariants
 # ============================================================
 
+@builds_graph
 def validate_graph_invariants() -> Dict[str, List[str]]:
     """
     Run all invariant checks on current NODES / EDGES.
@@ -335,11 +379,12 @@ def validate_graph_invariants() -> Dict[str, List[str]]:
     Empty list means the invariant holds.
     """
     results = {}
+    ctx = ValidationContext()
 
-    results["I1_sync_identity"] = check_sync_identity_invariant()
-    results["I2_pta_mode"] = check_pta_invariant()
-    results["I3_adfs_mode"] = check_adfs_invariant()
-    results["I4_phs_mode"] = check_phs_invariant()
+    results["I1_sync_identity"] = check_sync_identity_invariant(ctx)
+    results["I2_pta_mode"] = check_pta_invariant(ctx)
+    results["I3_adfs_mode"] = check_adfs_invariant(ctx)
+    results["I4_phs_mode"] = check_phs_invariant(ctx)
 
     return results
 
@@ -8,7 +8,8 @@ Bundle contents (written to <run_dir>/):
   graph_stats.json    — summary statistics
   config.json         — the configuration Θ used for this run
   seed.json           — the seed vector s used for this run
-  manifest.json       — run metadata (schemaVersion, timestamp, hashes)
+  manifest.json       — run metadata (schemaVersion, samplingVersion,
+                        timestamp, hashes)
 
 The bundle is designed so that any run can be fully reproduced given only
 config.json + seed.json, plus the same codebase version.
@@ -21,6 +22,7 @@ import time
 from typing import Any, Dict, Optional
 
 from adsynth.hybrid_system.schema_registry import SCHEMA_VERSION
+from adsynth.utils.sampling import SAMPLING_VERSION
 from adsynth.hybrid_system.export_writer import (
     HYBRID_NODES,
     HYBRID_EDGES,
@@ -99,6 +101,7 @@ def write_reproducibility_bundle(
     manifest = {
         "runId": run_id,
         "schemaVersion": SCHEMA_VERSION,
+        "samplingVersion": SAMPLING_VERSION,
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "totalNodes": len(HYBRID_NODES),
         "totalEdges": len(HYBRID_EDGES),
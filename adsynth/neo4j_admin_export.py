@@ -0,0 +1,392 @@
+"""
+CSV export for offline loading with neo4j-admin.
+
+Even batched Cypher (adsynth/neo4j_loader.py) goes through the transaction
+layer; neo4j-admin's bulk importer writes the store files directly and is
+orders of magnitude faster for graphs with millions of relationships.
+AdminImportExporter turns a graph into its input:
+
+  * one header file and one data file per label set (nodes) and per
+    relationship type, named nodes_<n>_<labels>.csv / rels_<n>_<type>.csv;
+  * typed header columns (boolean, long, double, string and their array
+    forms), inferred from every value of the property;
+  * the exact neo4j-admin command line, printed and saved as import.sh.
+
+Headers have to list every column before the first data row, so the
+records are read twice: once to infer the columns, once to write the rows.
+Only the column types are kept between the passes and rows go straight to
+their file, so memory stays flat however large the graph is.  Records are
+taken from a callable that returns a fresh iterator on each call.
+
+Node records are {"id", "labels", "properties"}; relationship records use
+either the legacy layout ({"start": {"id": ...}, "label": ...}) or the
+hybrid graph.jsonl one ({"start": "...", "relType": ...}).  Other records
+(compact metagraph memberset / hyperedge lines) are counted and skipped.
+"""
+
+import csv
+import json
+import math
+import os
+import re
+import shlex
+from itertools import chain
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ARRAY_DELIMITER = ";"
+NODE_ID_COLUMN = "id"
+
+BOOLEAN = "boolean"
+LONG = "long"
+DOUBLE = "double"
+STRING = "string"
+EMPTY_ARRAY = "[]"
+
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _scalar_type(value):
+    if isinstance(value, bool):
+        return BOOLEAN
+    if isinstance(value, int):
+        return LONG
+    if isinstance(value, float):
+        return DOUBLE
+    return STRING
+
+
+def value_type(value):
+    """
+    neo4j-admin type of a property value, None for a missing value.  An
+    empty list has no element type yet and is typed EMPTY_ARRAY.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        element = None
+        for item in value:
+            if item is not None:
+                element = _merge_scalar(element, _scalar_type(item))
+        return (element or "") + "[]"
+    return _scalar_type(value)
+
+
+def _merge_scalar(a, b):
+    if not a or a == b:
+        return b
+    if not b:
+        return a
+    if {a, b} == {LONG, DOUBLE}:
+        return DOUBLE
+    return STRING
+
+
+def merge_types(a, b):
+    """
+    Column type that holds values of both types: long + double is double,
+    any other mix is string, and a scalar mixed with an array is an array.
+    """
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    is_array = a.endswith("[]") or b.endswith("[]")
+    merged = _merge_scalar(a.replace("[]", ""), b.replace("[]", ""))
+    return merged + "[]" if is_array else merged
+
+
+def _format_scalar(value, column_type):
+    if column_type == BOOLEAN:
+        return "true" if value else "false"
+    if column_type == LONG:
+        return str(int(value))
+    if column_type == DOUBLE:
+        value = float(value)
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        return repr(value)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def format_value(value, column_type, array_delimiter=ARRAY_DELIMITER):
+    if value is None:
+        return ""
+    if column_type.endswith("[]"):
+        element_type = column_type[:-2]
+        items = value if isinstance(value, (list, tuple)) else [value]
+        return array_delimiter.join(_format_scalar(item, element_type) for item in items if item is not None)
+    return _format_scalar(value, column_type)
+
+
+def _endpoint_id(endpoint):
+    return str(endpoint["id"] if isinstance(endpoint, dict) else endpoint)
+
+
+def classify(record):
+    """("node", label tuple), ("relationship", type) or (None, None) for records that are not exported."""
+    kind = record.get("type")
+    if kind == "relationship" or (kind is None and "start" in record):
+        return "relationship", record.get("label") or record.get("relType")
+    if kind == "node" or (kind is None and "labels" in record):
+        return "node", tuple(record.get("labels") or ())
+    return None, None
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", text).strip("-")[:60] or "none"
+
+
+class CSVGroup:
+    """The header and data file of one label set or relationship type."""
+
+    def __init__(self, kind, key, number):
+        self.kind = kind
+        self.key = key
+        name = "-".join(key) if kind == "node" else key
+        self.base = f"{'nodes' if kind == 'node' else 'rels'}_{number}_{_slug(name)}"
+        self.columns = {}       # property name -> column type, in first-seen order
+        self.delimited = set()  # properties with a string containing the array delimiter
+        self.count = 0
+        self.written = 0
+        self._file = None
+        self._writer = None
+
+    @property
+    def header_file(self):
+        return self.base + ".header.csv"
+
+    @property
+    def data_file(self):
+        return self.base + ".csv"
+
+    def header(self):
+        fixed = [f"{NODE_ID_COLUMN}:ID"] if self.kind == "node" else [":START_ID", ":END_ID"]
+        return fixed + [f"{name}:{STRING + EMPTY_ARRAY if column_type == EMPTY_ARRAY else column_type}"
+                        for name, column_type in self.columns.items()]
+
+    def open(self, out_dir, buffer_size):
+        self._file = open(os.path.join(out_dir, self.data_file), "w", newline="", encoding="utf-8",
+                          buffering=buffer_size)
+        self._writer = csv.writer(self._file)
+
+    def write_row(self, row):
+        self._writer.writerow(row)
+        self.written += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class AdminImportExporter:
+
+    def __init__(self, out_dir, array_delimiter=ARRAY_DELIMITER, database="neo4j", neo4j_version=5,
+                 buffer_size=1 << 16):
+        if len(array_delimiter) != 1 or array_delimiter in ',"\n':
+            raise ValueError("array_delimiter must be a single character other than ',', '\"' or a newline")
+        self.out_dir = out_dir
+        self.array_delimiter = array_delimiter
+        self.database = database
+        self.neo4j_version = neo4j_version
+        self.buffer_size = buffer_size
+        self.groups = {}        # (kind, key) -> CSVGroup
+        self.skipped = 0
+        self.multiline = False
+
+    # ------------------------------------------------------------------
+    # Pass 1: columns
+    # ------------------------------------------------------------------
+
+    def _group(self, kind, key):
+        group = self.groups.get((kind, key))
+        if group is None:
+            group = CSVGroup(kind, key, len(self.groups))
+            self.groups[(kind, key)] = group
+        return group
+
+    def _check_string(self, group, name, value):
+        if "\n" in value or "\r" in value:
+            self.multiline = True
+        if self.array_delimiter in value:
+            group.delimited.add(name)
+
+    def scan(self, records):
+        for record in records:
+            kind, key = classify(record)
+            if kind is None:
+                self.skipped += 1
+                continue
+            group = self._group(kind, key)
+            group.count += 1
+            columns = group.columns
+            for name, value in (record.get("properties") or {}).items():
+                if value is None or (kind == "node" and name == NODE_ID_COLUMN):
+                    continue
+                if ":" in name:
+                    raise ValueError(f"Property name '{name}' cannot be used in a neo4j-admin header")
+                columns[name] = merge_types(columns.get(name), value_type(value))
+                if isinstance(value, str):
+                    self._check_string(group, name, value)
+                elif isinstance(value, (list, tuple)):
+                    for item in value:
+                        if isinstance(item, str):
+                            self._check_string(group, name, item)
+        for group in self.groups.values():
+            for name in group.delimited:
+                if group.columns[name].endswith("[]"):
+                    raise ValueError(f"Array property '{name}' has a value containing the array delimiter "
+                                     f"'{self.array_delimiter}'; choose another array_delimiter")
+
+    # ------------------------------------------------------------------
+    # Pass 2: rows
+    # ------------------------------------------------------------------
+
+    def write(self, records):
+        os.makedirs(self.out_dir, exist_ok=True)
+        for group in self.groups.values():
+            with open(os.path.join(self.out_dir, group.header_file), "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(group.header())
+        delimiter = self.array_delimiter
+        try:
+            for record in records:
+                kind, key = classify(record)
+                if kind is None:
+                    continue
+                group = self.groups.get((kind, key))
+                if group is None:
+                    raise RuntimeError(f"{kind} {key!r} was not seen while inferring the columns; "
+                                       f"the records changed between the two passes")
+                if group._writer is None:
+                    group.open(self.out_dir, self.buffer_size)
+                properties = record.get("properties") or {}
+                if kind == "node":
+                    row = [str(record["id"])]
+                else:
+                    row = [_endpoint_id(record["start"]), _endpoint_id(record["end"])]
+                row.extend(format_value(properties.get(name), column_type, delimiter)
+                           for name, column_type in group.columns.items())
+                group.write_row(row)
+        finally:
+            for group in self.groups.values():
+                group.close()
+        for group in self.groups.values():
+            if group.written != group.count:
+                raise RuntimeError(f"{group.data_file}: {group.written} rows written, {group.count} expected; "
+                                   f"the records changed between the two passes")
+
+    # ------------------------------------------------------------------
+    # Command line
+    # ------------------------------------------------------------------
+
+    def command_args(self):
+        if self.neo4j_version >= 5:
+            args = ["neo4j-admin", "database", "import", "full", "--id-type=string"]
+        else:
+            args = ["neo4j-admin", "import", f"--database={self.database}", "--id-type=STRING"]
+        args.append(f"--array-delimiter={self.array_delimiter}")
+        if self.multiline:
+            args.append("--multiline-fields=true")
+        for group in self.groups.values():
+            files = f"{group.header_file},{group.data_file}"
+            if group.kind == "node":
+                args.append(f"--nodes={':'.join(group.key)}={files}" if group.key else f"--nodes={files}")
+        for group in self.groups.values():
+            if group.kind == "relationship":
+                args.append(f"--relationships={group.key}={group.header_file},{group.data_file}")
+        if self.neo4j_version >= 5:
+            args.append(self.database)
+        return args
+
+    def command(self):
+        """The neo4j-admin command, to be run from the export directory."""
+        return " ".join(shlex.quote(arg) for arg in self.command_args())
+
+    def write_script(self):
+        path = os.path.join(self.out_dir, "import.sh")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("#!/bin/sh\n")
+            f.write("# Stop Neo4j (or use a database that does not exist yet) before importing\n")
+            f.write('cd "$(dirname "$0")" || exit 1\n')
+            f.write(self.command() + "\n")
+        os.chmod(path, 0o755)
+        return path
+
+    def counts(self):
+        counts = {"node": 0, "relationship": 0}
+        for group in self.groups.values():
+            counts[group.kind] += group.count
+        return counts
+
+    def export(self, records):
+        """
+        Write the CSV files and import.sh for the records returned by the
+        callable records().  Returns the neo4j-admin command.
+        """
+        self.scan(records())
+        self.write(records())
+        self.write_script()
+        return self.command()
+
+
+def export_admin_csv(out_dir, records, **kwargs):
+    """Export records (a callable returning a fresh iterator) to out_dir; returns the exporter."""
+    exporter = AdminImportExporter(out_dir, **kwargs)
+    exporter.export(records)
+    return exporter
+
+
+def _graph_store_records():
+    # neo4j has no hyperedges: a compact metagraph is expanded
+    from adsynth.DATABASE import iter_node_records, iter_relationship_records
+    return chain(iter_node_records(), iter_relationship_records())
+
+
+def export_graph_store(out_dir, **kwargs):
+    """
+    Export the legacy store (NODES / EDGES, the columnar store and any
+    hyperedges).  A streamed run keeps its edges on disk only; export its
+    dataset file with export_dataset instead.
+    """
+    from adsynth.graph_state import current_graph
+    if current_graph().EDGE_STREAM is not None:
+        raise RuntimeError("Edges were streamed to disk; export the dataset file with export_dataset")
+    return export_admin_csv(out_dir, _graph_store_records, **kwargs)
+
+
+def export_hybrid_graph(out_dir, **kwargs):
+    """Export HYBRID_NODES / HYBRID_EDGES."""
+    from adsynth.hybrid_system.export_writer import HYBRID_EDGES, HYBRID_NODES
+    return export_admin_csv(out_dir, lambda: chain(HYBRID_NODES, HYBRID_EDGES), **kwargs)
+
+
+def iter_dataset_records(path):
+    """Stream the records of a generated JSONL dataset."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield _loads(line)
+
+
+def export_dataset(path, out_dir=None, **kwargs):
+    """
+    Export a generated JSONL dataset (legacy or hybrid layout) to out_dir,
+    by default <dataset>_admin_csv next to it.
+    """
+    if out_dir is None:
+        out_dir = os.path.splitext(path)[0] + "_admin_csv"
+    return export_admin_csv(out_dir, lambda: iter_dataset_records(path), **kwargs)
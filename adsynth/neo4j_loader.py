@@ -0,0 +1,299 @@
+"""
+Batched Neo4j import for generated datasets.
+
+importdb used to hand the whole file to apoc.load.json and match every
+relationship endpoint with an unlabelled, unindexed
+MATCH (start {id: ...}), (end {id: ...}) - one full node scan per
+relationship, all inside a single transaction.  BulkNeo4jLoader instead:
+
+  * creates a uniqueness constraint (and so an index) on the node id of an
+    import label that every imported node carries while loading;
+  * streams the JSONL file from the client, one line at a time;
+  * groups nodes by label set and relationships by type, and sends each
+    group as UNWIND batches of batch_size rows, one transaction per batch;
+  * runs batches on a small pool of sessions (one per worker thread);
+  * reports rows/s as it goes and records every committed batch in a
+    checkpoint file, so a failed import can be resumed where it stopped.
+
+Both dataset layouts are understood: the legacy one
+({"start": {"id": ...}, "label": ...}) and the hybrid graph.jsonl one
+({"start": "...", "relType": ...}).  Other records (compact metagraph
+memberset / hyperedge lines) are skipped.
+
+The loader only needs driver.session() and, on the session, run() plus
+execute_write() (driver 5.x) or write_transaction() (driver 4.x), so it
+can be tested against a stub driver.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+IMPORT_LABEL = "ADSynthImport"
+
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def quote_name(name):
+    """Backtick-quote a label or relationship type for use in Cypher."""
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def node_query(labels, import_label=IMPORT_LABEL):
+    label_clause = "".join(":" + quote_name(l) for l in (import_label, *labels))
+    return (f"UNWIND $rows AS row CREATE (n{label_clause}) "
+            f"SET n = row.properties, n.id = row.id")
+
+
+def relationship_query(rel_type, import_label=IMPORT_LABEL):
+    label = quote_name(import_label)
+    return (f"UNWIND $rows AS row "
+            f"MATCH (s:{label} {{id: row.start}}) MATCH (e:{label} {{id: row.end}}) "
+            f"CREATE (s)-[r:{quote_name(rel_type)}]->(e) SET r = row.properties")
+
+
+def iter_import_batches(path, batch_size=10000):
+    """
+    Yield (kind, key, rows) batches for the dataset at path, kind being
+    "node" (key = label tuple) or "relationship" (key = type).
+
+    Batches depend only on the file and batch_size, which is what lets a
+    resumed import skip the batches that were already committed.  All
+    pending node batches are flushed before the first relationship batch.
+    """
+    nodes = {}
+    relationships = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = _loads(line)
+            kind = record.get("type")
+            if kind == "node":
+                key = tuple(record.get("labels") or ())
+                rows = nodes.setdefault(key, [])
+                rows.append({"id": str(record["id"]), "properties": record.get("properties") or {}})
+                if len(rows) >= batch_size:
+                    yield "node", key, nodes.pop(key)
+            elif kind == "relationship":
+                if nodes:
+                    for key, rows in nodes.items():
+                        yield "node", key, rows
+                    nodes = {}
+                start, end = record["start"], record["end"]
+                key = record.get("label") or record.get("relType")
+                rows = relationships.setdefault(key, [])
+                rows.append({
+                    "start": str(start["id"] if isinstance(start, dict) else start),
+                    "end": str(end["id"] if isinstance(end, dict) else end),
+                    "properties": record.get("properties") or {},
+                })
+                if len(rows) >= batch_size:
+                    yield "relationship", key, relationships.pop(key)
+    for key, rows in nodes.items():
+        yield "node", key, rows
+    for key, rows in relationships.items():
+        yield "relationship", key, rows
+
+
+def _run_batch(tx, query, rows):
+    tx.run(query, rows=rows).consume()
+
+
+def _write(session, query, rows):
+    execute_write = getattr(session, "execute_write", None) or session.write_transaction
+    execute_write(_run_batch, query, rows)
+
+
+class ImportCheckpoint:
+    """
+    Numbers of the committed batches of one import, kept in
+    <dataset>.import.json.  The file is rewritten after every batch and
+    removed once the import is complete.
+    """
+
+    def __init__(self, path, dataset, batch_size):
+        self.path = path
+        stat = os.stat(dataset)
+        self.identity = {"dataset": os.path.abspath(dataset), "size": stat.st_size,
+                         "mtime": int(stat.st_mtime), "batch_size": batch_size}
+        self.done = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read a previous checkpoint; raises ValueError if it is for another file or batch size."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            saved = json.load(f)
+        if saved.get("identity") != self.identity:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different dataset or batch size")
+        self.done = set(saved["done"])
+        return True
+
+    def mark(self, batch_number):
+        with self._lock:
+            self.done.add(batch_number)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"identity": self.identity, "done": sorted(self.done)}, f)
+            os.replace(tmp, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SessionPool:
+    """A fixed number of sessions handed out to one worker thread at a time."""
+
+    def __init__(self, driver, size, database=None):
+        self._sessions = [driver.session(database=database) if database else driver.session()
+                          for _ in range(size)]
+        self._free = queue.Queue()
+        for session in self._sessions:
+            self._free.put(session)
+
+    def write(self, query, rows):
+        session = self._free.get()
+        try:
+            _write(session, query, rows)
+        finally:
+            self._free.put(session)
+
+    def close(self):
+        for session in self._sessions:
+            session.close()
+
+
+class BulkNeo4jLoader:
+
+    def __init__(self, driver, database=None, batch_size=10000, sessions=2,
+                 import_label=IMPORT_LABEL, keep_import_label=False, progress=print,
+                 progress_interval=5.0):
+        self.driver = driver
+        self.database = database
+        self.batch_size = batch_size
+        self.sessions = max(1, sessions)
+        self.import_label = import_label
+        self.keep_import_label = keep_import_label
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.counts = {"node": 0, "relationship": 0}
+        self.skipped_batches = 0
+
+    def _session(self):
+        return self.driver.session(database=self.database) if self.database else self.driver.session()
+
+    def ensure_schema(self, session):
+        label = quote_name(self.import_label)
+        name = f"{self.import_label.lower()}_id"
+        try:
+            session.run(f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE").consume()
+        except Exception:
+            # Neo4j 4.0 - 4.3 syntax
+            session.run(f"CREATE CONSTRAINT {name} IF NOT EXISTS ON (n:{label}) ASSERT n.id IS UNIQUE").consume()
+
+    def remove_import_label(self, session):
+        label = quote_name(self.import_label)
+        total = 1
+        while total > 0:
+            result = session.run(f"MATCH (n:{label}) WITH n LIMIT $limit REMOVE n:{label} RETURN count(n) AS total",
+                                 limit=self.batch_size)
+            total = int(result.single()["total"])
+
+    def load(self, path, resume=False, checkpoint_path=None):
+        """
+        Import the dataset at path.  With resume=True the batches recorded in
+        the checkpoint of an earlier, failed run are skipped.  Returns the
+        counts of imported nodes and relationships.
+        """
+        checkpoint = ImportCheckpoint(checkpoint_path or os.path.splitext(path)[0] + ".import.json",
+                                      path, self.batch_size)
+        if resume:
+            checkpoint.load()
+        else:
+            checkpoint.remove()
+
+        with self._session() as session:
+            self.ensure_schema(session)
+
+        self.counts = {"node": 0, "relationship": 0}
+        self.skipped_batches = 0
+        start = last_report = time.perf_counter()
+        pool = SessionPool(self.driver, self.sessions, self.database)
+        pending = set()
+
+        def submit(executor, number, kind, key, rows):
+            query = node_query(key, self.import_label) if kind == "node" else \
+                relationship_query(key, self.import_label)
+            future = executor.submit(pool.write, query, rows)
+            future.batch = (number, kind, len(rows))
+            pending.add(future)
+
+        def collect(futures):
+            # Record every committed batch, even when another one failed,
+            # so that a resumed import does not send it twice
+            error = None
+            for future in futures:
+                pending.discard(future)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                number, kind, count = future.batch
+                checkpoint.mark(number)
+                self.counts[kind] += count
+            if error is not None:
+                raise error
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.sessions) as executor:
+                phase = "node"
+                for number, (kind, key, rows) in enumerate(iter_import_batches(path, self.batch_size)):
+                    if kind != phase:
+                        # Relationships need every node committed first
+                        collect(list(pending))
+                        phase = kind
+                    if number in checkpoint.done:
+                        self.skipped_batches += 1
+                        continue
+                    submit(executor, number, kind, key, rows)
+                    # Keep at most two batches per session in flight
+                    if len(pending) >= 2 * self.sessions:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                    now = time.perf_counter()
+                    if self.progress and now - last_report >= self.progress_interval:
+                        last_report = now
+                        self._report(now - start)
+                collect(list(pending))
+        finally:
+            if pending:
+                try:
+                    collect(list(pending))
+                except Exception:
+                    pass
+            pool.close()
+
+        if not self.keep_import_label:
+            with self._session() as session:
+                self.remove_import_label(session)
+        checkpoint.remove()
+        if self.progress:
+            self._report(time.perf_counter() - start)
+        return dict(self.counts)
+
+    def _report(self, elapsed):
+        rows = self.counts["node"] + self.counts["relationship"]
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        self.progress(f"Imported {self.counts['node']} nodes, {self.counts['relationship']} relationships "
+                      f"({rate:,.0f} rows/s)")
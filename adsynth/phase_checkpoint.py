@@ -0,0 +1,131 @@
+"""
+Phase checkpoints for MainMenu.generate_data.
+
+A legacy run keeps its whole state in the module-level globals of
+adsynth/DATABASE.py, so a run that fails in a late phase loses everything.
+With ``generate --checkpoint`` generate_data saves a checkpoint after every
+pipeline phase.  The checkpoint file holds two pickles, a header:
+
+    identity   parameters, domain, SID and level of the run
+    phases     the completed phases, in order
+
+and the state of the run:
+
+    database   the graph store and tracking structures (DATABASE_STATE)
+    random     the state of the random module
+    values     the generate_data locals that later phases read
+
+``generate --resume`` loads it, checks that it belongs to the same run,
+puts everything back and skips the completed phases.  Every draw of a
+run comes from the random module (ColumnSampler seeds itself from it, and
+GUIDs come from random_guid), so a resumed run writes the dataset of an
+uninterrupted one byte for byte.
+
+The file is replaced atomically after every phase and removed when the run
+is complete.  A StreamingGraphWriter is checkpointed by the length of its
+spill file, which is truncated back to that length on resume.
+"""
+
+import os
+import pickle
+import random
+
+from adsynth.graph_state import current_graph
+
+CHECKPOINT_VERSION = 2
+CHECKPOINT_PATH = "generated_datasets/generate.checkpoint"
+
+# DATABASE structures that make up a legacy graph and its tracking
+# structures, snapshotted from and restored into the current graph.  Lists
+# and dicts are restored in place, in case a caller holds one of them; the
+# others are rebound on the graph.
+DATABASE_STATE = (
+    "NODES", "EDGES", "neo4j_id", "DATABASE_ID", "dict_edges", "REL_TYPE_CODES", "REL_TYPE_NAMES",
+    "GRAPH_STORE", "HYPEREDGE_MODE", "HYPEREDGES", "HYPEREDGE_INDEX", "HYPEREDGE_STARTS", "HYPEREDGE_LOG",
+    "MEMBER_SETS", "MEMBER_SET_IDS", "NODE_GROUPS", "GPLINK_OUS", "GROUP_MEMBERS", "SECURITY_GROUPS", "ADMIN_USERS", "ENABLED_USERS",
+    "DISABLED_USERS", "PAW_TIERS", "S_TIERS", "S_TIERS_LOCATIONS", "WS_TIERS", "WS_TIERS_LOCATIONS",
+    "COMPUTERS", "ridcount", "KERBEROASTABLES", "FOLDERS", "DISTRIBUTION_GROUPS", "SEC_DIST_GROUPS",
+    "LOCAL_ADMINS", "OU_REGISTRY",
+)
+
+
+def snapshot_database(names=DATABASE_STATE):
+    graph = current_graph()
+    return {name: getattr(graph, name) for name in names}
+
+
+def restore_database(state):
+    graph = current_graph()
+    for name, value in state.items():
+        current = getattr(graph, name)
+        if isinstance(current, list):
+            current[:] = value
+        elif isinstance(current, dict):
+            current.clear()
+            current.update(value)
+        else:
+            setattr(graph, name, value)
+
+
+class PhaseCheckpoint:
+    """
+    Checkpoints of one generate_data run.  names are the generate_data
+    locals saved with every phase; with enabled=False nothing is written
+    and every phase is pending.
+    """
+
+    def __init__(self, path, identity, names, enabled=True):
+        self.path = path
+        self.identity = identity
+        self.names = names
+        self.enabled = enabled
+        self.phases = []
+        self.values = {}
+
+    def load(self):
+        """
+        Restore the state of a previous run.  Returns False if there is no
+        checkpoint; raises ValueError if it belongs to another run.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("version") != CHECKPOINT_VERSION or header.get("identity") != self.identity:
+                raise ValueError(f"Checkpoint {self.path} belongs to a different run or parameters")
+            # Only unpickled once the header matches: a StreamingGraphWriter
+            # truncates its spill file when it is unpickled
+            saved = pickle.load(f)
+        restore_database(saved["database"])
+        random.setstate(saved["random"])
+        self.phases = header["phases"]
+        self.values = saved["values"]
+        return True
+
+    def restored_values(self):
+        """The saved locals in the order of names (None if not set yet)."""
+        return tuple(self.values.get(name) for name in self.names)
+
+    def pending(self, phase):
+        return phase not in self.phases
+
+    def save(self, phase, local_values):
+        """
+        Record phase (a phase name, or a tuple of the phases completed
+        together) as completed and write the checkpoint once.
+        """
+        self.phases.extend(phase if isinstance(phase, tuple) else (phase,))
+        if not self.enabled:
+            return
+        self.values = {name: local_values[name] for name in self.names if name in local_values}
+        header = {"version": CHECKPOINT_VERSION, "identity": self.identity, "phases": self.phases}
+        state = {"database": snapshot_database(), "random": random.getstate(), "values": self.values}
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,146 @@
+"""
+Phase-level timing and memory profiler for MainMenu.generate_data.
+
+generate_data marks the start of each pipeline phase (skeleton, default
+groups, users, computers, placement, groups, sessions, misconfig, ACLs,
+kerberoastables, export, ...) with start_phase(name); a phase ends when
+the next one starts or at finish().  For every phase the report records:
+
+    wall_s                   wall-clock seconds (time.perf_counter)
+    cpu_s                    process CPU seconds (time.process_time)
+    nodes_added/edges_added  growth of the legacy DATABASE graph
+    peak_tracemalloc_bytes   peak traced memory during the phase
+    net_tracemalloc_bytes    traced memory still held at its end
+
+The memory fields are only recorded with trace_memory=True
+(``generate --trace-memory``).  tracemalloc then runs for the whole run and
+wall_s / cpu_s include its overhead: tracing every allocation makes
+generation several times slower.  By default the report only has the
+timings, which are those of an uninstrumented run.  finish() stops the
+tracemalloc it started, so generate_data calls it in a finally block.
+
+With profile=True (``generate --profile``) every phase runs under its own
+cProfile profile instead, and write() dumps the stats of the slowest one.
+tracemalloc is not started for a profiled run, because it would skew the
+cProfile stats towards allocation-heavy code.  A report without memory
+fields says "memory_traced": false.
+If tracemalloc was already tracing, the memory fields are always recorded
+(and a profile includes its overhead).
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+from adsynth.DATABASE import get_num_edges, get_num_nodes
+
+
+class PhaseProfiler:
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.profile = profile
+        self.phases = []
+        self._profiles = {}
+        self._current = None
+        self._started_tracemalloc = False
+        if trace_memory and not profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.memory_traced = tracemalloc.is_tracing()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    def start_phase(self, name):
+        self.end_phase()
+        self._current = {
+            "name": name,
+            "nodes": get_num_nodes(),
+            "edges": get_num_edges(),
+            "wall": time.perf_counter(),
+            "cpu": time.process_time(),
+        }
+        if self.memory_traced:
+            tracemalloc.reset_peak()
+            self._current["traced"] = tracemalloc.get_traced_memory()[0]
+        if self.profile:
+            profile = self._profiles[name] = cProfile.Profile()
+            profile.enable()
+
+    def end_phase(self):
+        current = self._current
+        if current is None:
+            return
+        self._current = None
+        if self.profile:
+            self._profiles[current["name"]].disable()
+        record = {
+            "phase": current["name"],
+            "wall_s": round(time.perf_counter() - current["wall"], 6),
+            "cpu_s": round(time.process_time() - current["cpu"], 6),
+            "nodes_added": get_num_nodes() - current["nodes"],
+            "edges_added": get_num_edges() - current["edges"],
+        }
+        if self.memory_traced:
+            traced, peak = tracemalloc.get_traced_memory()
+            record["peak_tracemalloc_bytes"] = peak
+            record["net_tracemalloc_bytes"] = traced - current["traced"]
+        self.phases.append(record)
+
+    def finish(self):
+        self.end_phase()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def slowest_phase(self):
+        if not self.phases:
+            return None
+        return max(self.phases, key=lambda p: p["wall_s"])["phase"]
+
+    def report(self):
+        return {
+            "profiled": self.profile,
+            "memory_traced": self.memory_traced,
+            "total_wall_s": round(time.perf_counter() - self._start_wall, 6),
+            "total_cpu_s": round(time.process_time() - self._start_cpu, 6),
+            "nodes": get_num_nodes(),
+            "edges": get_num_edges(),
+            "slowest_phase": self.slowest_phase(),
+            "phases": self.phases,
+        }
+
+    def write(self, dataset_path):
+        """
+        Write <dataset>.phases.json next to the dataset and, for a profiled
+        run, <dataset>.<slowest phase>.prof.  Returns the report path.
+        """
+        self.finish()
+        base = os.path.splitext(dataset_path)[0]
+        report = self.report()
+        report["dataset"] = os.path.basename(dataset_path)
+
+        slowest = report["slowest_phase"]
+        if self.profile and slowest is not None:
+            stats_path = f"{base}.{slowest}.prof"
+            self._profiles[slowest].dump_stats(stats_path)
+            report["cprofile_stats"] = os.path.basename(stats_path)
+
+        report_path = f"{base}.phases.json"
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        return report_path
+
+    def print_summary(self, top=15):
+        memory = f"{'peak MB':>9}" if self.memory_traced else ""
+        print(f"{'phase':<22}{'wall s':>9}{'cpu s':>9}{'nodes':>9}{'edges':>10}{memory}")
+        for p in self.phases:
+            memory = f"{p['peak_tracemalloc_bytes'] / 2**20:>9.1f}" if self.memory_traced else ""
+            print(f"{p['phase']:<22}{p['wall_s']:>9.3f}{p['cpu_s']:>9.3f}"
+                  f"{p['nodes_added']:>9}{p['edges_added']:>10}{memory}")
+        slowest = self.slowest_phase()
+        if self.profile and slowest is not None:
+            print(f"\ncProfile of the slowest phase ({slowest}):")
+            pstats.Stats(self._profiles[slowest]).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,171 @@
+"""
+Cache of the default-AD scaffolding built by the first phases of
+MainMenu.generate_data.
+
+create_domain, create_ad_skeleton, the default and admin groups, the
+default GPOs, the Domain Controllers OU and the Enterprise Admins,
+Administrators, Domain Admins and DC groups ACLs build the same graph on
+every run with the same domain, SID, tiers, locations, departments and
+extra Tier 1 servers.  With ``"skeleton_cache": 1`` generate_data saves
+that graph (and the tracking structures it sets up) as
+generated_datasets/skeleton_cache/<key>.skeleton, key being a hash of
+those inputs, and later runs load it instead of building it.
+
+Two parts of the scaffolding differ between runs:
+
+    functional level   drawn again on load with the draw create_domain
+                       makes
+    GUIDs              every GUID (OU objectids, default GPOs, containers)
+                       is replaced by a fresh one from random_guid
+
+Both come from the random module, in the order an uncached run draws
+them: the functional level first, then the GUIDs in the order the
+scaffolding drew them.  save() finds that order by replaying the random
+stream from where the scaffolding started, and load() hands the new
+GUIDs out in it, so a run that hits the cache writes the dataset of a run
+that misses it, byte for byte.
+
+Node ids are shifted to continue from the neo4j_id of the run.  Runs that
+stream their edges (streaming_export) build the scaffolding themselves,
+since its edges have to be in their spill file.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import random
+import re
+
+import adsynth.DATABASE as DB
+from adsynth.default_ad_system.domains import draw_functional_level
+from adsynth.graph_state import current_graph
+from adsynth.helpers.getters import get_department_names, get_list_param_value, get_locations, get_single_int_param_value
+from adsynth.phase_checkpoint import DATABASE_STATE, restore_database, snapshot_database
+from adsynth.utils.sampling import random_guid
+
+SKELETON_CACHE_VERSION = 3
+SKELETON_CACHE_DIR = "generated_datasets/skeleton_cache"
+
+# generate_data phases the cached scaffolding stands for
+SKELETON_PHASES = ("skeleton", "default_groups", "default_gpos", "admin_group_acls")
+
+# The hyperedge mode is a setting of the run, not part of the scaffolding
+SKELETON_STATE = tuple(name for name in DATABASE_STATE if name != "HYPEREDGE_MODE")
+
+# path -> pickled scaffolding read (or written) by this process: a process
+# that runs many generations, e.g. a worker of adsynth/sweep.py, reads
+# every cache file once
+_LOADED = {}
+
+GUID_PATTERN = re.compile(r"(?<![0-9A-Fa-f])[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}(?![0-9A-Fa-f])")
+
+
+def skeleton_key(domain, base_sid, old_domain, nTiers, parameters):
+    """Content address of the scaffolding: a hash of everything it is built from."""
+    inputs = {
+        "version": SKELETON_CACHE_VERSION,
+        "domain": domain,
+        "base_sid": base_sid,
+        "old_domain": old_domain,
+        "nTiers": nTiers,
+        "locations": list(get_locations(parameters)),
+        "departments": list(get_department_names(parameters)),
+        "extraServers": list(get_list_param_value("Tier_1_Servers", "extraServers", parameters)),
+        "columnar_store": get_single_int_param_value("columnar_store", parameters) == 1,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+class SkeletonCache:
+    """
+    The cached scaffolding of one key.  Create it before the scaffolding
+    phases run: the neo4j_id at that point is where the scaffolding's node
+    ids start.  With enabled=False nothing is loaded or saved.
+    """
+
+    def __init__(self, directory, key, enabled=True):
+        self.path = os.path.join(directory, key + ".skeleton")
+        self.enabled = enabled
+        self.first_id = current_graph().neo4j_id
+        # Where the scaffolding's random draws start, to replay them in save()
+        self.random_state = random.getstate() if enabled else None
+
+    def load(self, parameters):
+        """
+        Put the cached scaffolding into DATABASE.  Returns the generate_data
+        values (functional_level, ddp, ddcp, dcou, gpos_container), or None
+        if nothing is cached.
+        """
+        if not self.enabled:
+            return None
+        if self.path not in _LOADED:
+            if not os.path.exists(self.path):
+                return None
+            with open(self.path, "rb") as f:
+                _LOADED[self.path] = f.read()
+        cached = pickle.loads(_LOADED[self.path])
+        restore_database(cached["database"])
+        DB.offset_node_ids(self.first_id - cached["first_id"])
+
+        functional_level = draw_functional_level(parameters)
+        DB.set_node_value(DB.NODE_GROUPS["Domain"][0], "functionallevel", functional_level)
+
+        # The cached GUIDs are in draw order, so the i-th one gets the i-th draw
+        guids = {guid: random_guid() for guid in cached["guids"]}
+
+        def replace(match):
+            guid = match.group(0)
+            new = guids[guid.lower()]
+            return new.upper() if guid == guid.upper() else new
+
+        for index in range(DB.get_num_nodes()):
+            for key, value in list(DB.get_node_properties(index).items()):
+                if isinstance(value, str):
+                    renamed = GUID_PATTERN.sub(replace, value)
+                    if renamed != value:
+                        DB.set_node_value(index, key, renamed)
+        for lookup in DB.DATABASE_ID.values():
+            renamed = {GUID_PATTERN.sub(replace, id_lookup): index for id_lookup, index in lookup.items()}
+            lookup.clear()
+            lookup.update(renamed)
+        return (functional_level,) + tuple(GUID_PATTERN.sub(replace, value) for value in cached["values"])
+
+    def drawn_guids(self):
+        """
+        The GUIDs of the scaffolding now in DATABASE (lower case), in the
+        order it drew them, or None if its draws cannot be replayed.
+        """
+        found = set()
+        for index in range(DB.get_num_nodes()):
+            for value in DB.get_node_properties(index).values():
+                if isinstance(value, str):
+                    found.update(guid.lower() for guid in GUID_PATTERN.findall(value))
+        rng = random.Random()
+        rng.setstate(self.random_state)
+        rng.random()  # the functional level: one AliasSampler draw
+        drawn = [random_guid(rng) for _ in range(len(found))]
+        return drawn if set(drawn) == found else None
+
+    def save(self, ddp, ddcp, dcou, gpos_container):
+        """Cache the scaffolding now in DATABASE, unless it is cached already."""
+        if not self.enabled or os.path.exists(self.path):
+            return
+        guids = self.drawn_guids()
+        if guids is None:
+            print("The scaffolding drew more than its functional level and GUIDs, it is not cached")
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        cached = {
+            "first_id": self.first_id,
+            "database": snapshot_database(SKELETON_STATE),
+            "values": (ddp, ddcp, dcou, gpos_container),
+            "guids": guids,
+        }
+        data = pickle.dumps(cached, protocol=pickle.HIGHEST_PROTOCOL)
+        # Per process: parallel runs may save the same key at the same time
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        _LOADED[self.path] = data
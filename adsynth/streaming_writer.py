@@ -0,0 +1,192 @@
+"""
+Streaming JSONL export for the legacy generators.
+
+StreamingGraphWriter lets MainMenu.generate_data / generate_data_azure write
+edges out while the graph is being generated instead of holding every edge
+record until the final dump.  Edges go to a spill file next to the dataset
+as soon as they are deduplicated; only the dedup index (dict_edges) and the
+property updates of already-spilled edges stay in memory.  Nodes are written
+once generation is finished (their properties keep changing until the last
+phase), then the spilled edges are appended behind them so the dataset keeps
+the usual nodes-then-relationships layout that importdb expects.
+
+write_dataset is the equivalent one-shot dump used when streaming is off.
+Both write bytes produced by adsynth.utils.serialization.
+
+Spill line formats:
+    <start>\t<end>\t<edge JSON without start/end and closing brace>
+        legacy edge; endpoint ids/labels are resolved when finishing, so
+        labels added to a node after the edge was created are still exported
+    {...}
+        a complete record (Azure edges) copied verbatim
+"""
+
+import json
+import os
+
+from adsynth.utils.serialization import get_serializer
+
+
+def write_dataset(path, node_records, edge_records, serializer=None,
+                  batch_size=10000, buffer_size=1 << 20):
+    """
+    Non-streaming dump of an in-memory graph: nodes (tagged "type": "node")
+    then edge records as they are, one compact JSON object per line.
+    Returns (num_nodes, num_edges).
+    """
+    dumps = (serializer or get_serializer()).dumps
+    num_nodes = num_edges = 0
+    batch = []
+    with open(path, "wb", buffering=buffer_size) as f:
+        for obj in node_records:
+            obj["type"] = "node"
+            batch.append(dumps(obj) + b"\n")
+            num_nodes += 1
+            if len(batch) >= batch_size:
+                f.writelines(batch)
+                batch.clear()
+        for obj in edge_records:
+            batch.append(dumps(obj) + b"\n")
+            num_edges += 1
+            if len(batch) >= batch_size:
+                f.writelines(batch)
+                batch.clear()
+        f.writelines(batch)
+    return num_nodes, num_edges
+
+
+class StreamingGraphWriter:
+
+    def __init__(self, path, batch_size=10000, buffer_size=1 << 20, serializer=None):
+        self.path = path
+        self.dumps = (serializer or get_serializer()).dumps
+        self.spill_path = path + ".edges.tmp"
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.num_edges = 0
+        self.num_nodes = 0
+        self._edge_updates = {}     # edge index -> props set after the edge was spilled
+        self._batch = []
+        self._spill = open(self.spill_path, "wb", buffering=buffer_size)
+
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+
+    def add_edge(self, index, start_index, end_index, relationship_type, props):
+        fragment = self.dumps({
+            "type": "relationship",
+            "id": "r_" + str(index),
+            "label": relationship_type,
+            "properties": props,
+        })
+        self._batch.append(b"%d\t%d\t%s\n" % (start_index, end_index, fragment[:-1]))
+        self.num_edges += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush_batch()
+
+    def update_edge(self, index, props):
+        updates = self._edge_updates.get(index)
+        if updates is None:
+            self._edge_updates[index] = dict(props)
+        else:
+            updates.update(props)
+
+    def drain_records(self, records):
+        """Spill complete records (e.g. the Azure EDGES list) and empty the list."""
+        dumps = self.dumps
+        for obj in records:
+            self._batch.append(dumps(obj) + b"\n")
+            self.num_edges += 1
+            if len(self._batch) >= self.batch_size:
+                self._flush_batch()
+        records.clear()
+
+    def _flush_batch(self):
+        if self._batch:
+            self._spill.writelines(self._batch)
+            self._batch.clear()
+
+    # ------------------------------------------------------------------
+    # Phase checkpoints (adsynth/phase_checkpoint.py)
+    # ------------------------------------------------------------------
+
+    def __getstate__(self):
+        # The spill file stays where it is; only its current length is kept
+        self._flush_batch()
+        self._spill.flush()
+        state = dict(self.__dict__)
+        state["_spill_size"] = self._spill.tell()
+        del state["_spill"], state["dumps"]
+        return state
+
+    def __setstate__(self, state):
+        # Edges spilled after the checkpoint are dropped again
+        spill_size = state.pop("_spill_size")
+        self.__dict__.update(state)
+        self.dumps = get_serializer().dumps
+        self._spill = open(self.spill_path, "r+b", buffering=self.buffer_size)
+        self._spill.truncate(spill_size)
+        self._spill.seek(spill_size)
+
+    # ------------------------------------------------------------------
+    # Finish
+    # ------------------------------------------------------------------
+
+    def finish(self, node_records, node_endpoint=None):
+        """
+        Write the dataset: all node records, then every spilled edge.
+
+        node_endpoint(index) -> (id, labels) resolves legacy edge endpoints.
+        """
+        self._flush_batch()
+        self._spill.close()
+        dumps = self.dumps
+
+        endpoints = {}
+        def endpoint_json(index):
+            rendered = endpoints.get(index)
+            if rendered is None:
+                node_id, labels = node_endpoint(index)
+                rendered = dumps({"id": node_id, "labels": labels})
+                endpoints[index] = rendered
+            return rendered
+
+        batch = []
+        with open(self.path, "wb", buffering=self.buffer_size) as f:
+            for obj in node_records:
+                obj["type"] = "node"
+                batch.append(dumps(obj) + b"\n")
+                self.num_nodes += 1
+                if len(batch) >= self.batch_size:
+                    f.writelines(batch)
+                    batch.clear()
+
+            with open(self.spill_path, "rb", buffering=self.buffer_size) as spill:
+                edge_index = 0
+                for line in spill:
+                    if line[:1] != b"{":
+                        start, end, fragment = line.split(b"\t", 2)
+                        fragment = fragment[:-1]
+                        updates = self._edge_updates.get(edge_index)
+                        if updates:
+                            record = json.loads(fragment + b"}")
+                            record["properties"].update(updates)
+                            fragment = dumps(record)[:-1]
+                        line = b"".join((fragment, b',"start":', endpoint_json(int(start)),
+                                         b',"end":', endpoint_json(int(end)), b"}\n"))
+                    batch.append(line)
+                    edge_index += 1
+                    if len(batch) >= self.batch_size:
+                        f.writelines(batch)
+                        batch.clear()
+            f.writelines(batch)
+
+        os.remove(self.spill_path)
+        self._edge_updates.clear()
+
+    def abort(self):
+        if not self._spill.closed:
+            self._spill.close()
+        if os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
@@ -0,0 +1,255 @@
+"""
+Parameter sweeps: many datasets from one base configuration, in parallel.
+
+    python -m adsynth.sweep BASE.json --grid GRID.json [--generators legacy hybrid]
+                            [--seeds 1 2 3] [--workers 8] [--output-dir DIR]
+
+BASE is a parameters JSON as read by setparams (or DEFAULT).  GRID is
+either an object of lists, whose cartesian product gives the points, or a
+list of override objects, one per point:
+
+    {"User.nUsers": [1000, 10000], "nTiers": [2, 3],
+     "perc_misconfig_sessions.Customized": [1, 10, 30]}
+
+A dotted key overrides one value inside a parameter, "level" the security
+level of adconfig and "domain" the domain of setdomain.  Every point runs
+every generator once per seed:
+
+    legacy      generate        hybrid      generate_hybrid
+    azure       generate_azure  hybrid_v2   generate_hybrid_v2
+
+Each worker process creates one MainMenu, so the name pools are loaded
+once per worker, and keeps the skeleton cache files it has read in memory
+(the sweep turns "skeleton_cache" on, points with the same domain and
+tiers share one scaffolding).  A point writes DIR/<point>.json, its phase
+timings and its console output (DIR/<point>.log); DIR/manifest.json lists
+every point with its overrides, seed, timing and the size of the dataset
+it wrote.  All points share one current_time, so a point is reproduced by
+its parameters, seed and the manifest's current_time: a legacy point byte
+for byte, whether it built its scaffolding or loaded it from the skeleton
+cache, the other generators up to their uuid4 GUIDs.
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.utils.data import get_parameters_from_json
+
+SWEEP_VERSION = 1
+
+GENERATORS = ("legacy", "azure", "hybrid", "hybrid_v2")
+
+# Overrides of MainMenu settings rather than of parameters
+MENU_SETTINGS = ("level", "domain")
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+def expand_grid(grid):
+    """The override dicts of a grid: a list as is, an object of lists as its product."""
+    if grid is None:
+        return [{}]
+    if isinstance(grid, list):
+        return [dict(point) for point in grid]
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def apply_overrides(parameters, overrides):
+    """A copy of parameters with the (dotted) parameter overrides set."""
+    parameters = copy.deepcopy(parameters)
+    for key, value in overrides.items():
+        if key in MENU_SETTINGS:
+            continue
+        *path, name = key.split(".")
+        target = parameters
+        for part in path:
+            if not isinstance(target.get(part), dict):
+                raise ValueError(f"Override {key}: {part} is not a parameter group")
+            target = target[part]
+        target[name] = value
+    return parameters
+
+
+def plan_points(base, overrides_list, generators, seeds, skeleton_cache=True):
+    """One point per (overrides, generator, seed)."""
+    for generator in generators:
+        if generator not in GENERATORS:
+            raise ValueError(f"Unknown generator {generator}, expected one of: {', '.join(GENERATORS)}")
+    points = []
+    for overrides in overrides_list:
+        parameters = apply_overrides(base, overrides)
+        if skeleton_cache:
+            parameters["skeleton_cache"] = 1
+        for generator in generators:
+            for seed in seeds or [parameters.get("seed", 0)]:
+                point_parameters = copy.deepcopy(parameters)
+                point_parameters["seed"] = seed
+                points.append({
+                    "name": f"{len(points):04d}_{generator}",
+                    "generator": generator,
+                    "overrides": overrides,
+                    "seed": seed,
+                    "level": overrides.get("level", "Customized"),
+                    "domain": overrides.get("domain", "TESTLAB.LOCALE"),
+                    "parameters": point_parameters,
+                })
+    return points
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+_MENU = None
+
+
+def init_worker():
+    """Create the worker's MainMenu (and load the name pools) once."""
+    global _MENU
+    from adsynth.ADSynth import MainMenu
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        _MENU = MainMenu()
+
+
+def _generate(menu, generator):
+    from adsynth.ADSynth import reset_DB
+    if generator == "legacy":
+        reset_DB()
+        menu.generate_data()
+    elif generator == "azure":
+        menu.generate_data_azure()
+    elif generator == "hybrid":
+        menu.generate_data_hybrid()
+    else:
+        menu.do_generate_hybrid_v2("")
+
+
+def run_point(point, output_dir, current_time, trace_memory=False):
+    """Generate one point into output_dir; returns its manifest entry."""
+    if _MENU is None:
+        init_worker()
+    menu = _MENU
+    menu.parameters = point["parameters"]
+    menu.level = point["level"]
+    menu.domain = point["domain"]
+    menu.old_domain = None
+    menu.current_time = current_time
+    menu.trace_memory = trace_memory
+    menu.dataset_name = os.path.relpath(os.path.join(output_dir, point["name"]), "generated_datasets")
+    menu.dbname = None
+    menu.output = None
+
+    entry = {key: point[key] for key in ("name", "generator", "overrides", "seed")}
+    start = time.perf_counter()
+    with open(os.path.join(output_dir, point["name"] + ".log"), "w") as log, redirect_stdout(log):
+        try:
+            _generate(menu, point["generator"])
+            # What the generator wrote: a JSON dataset or a BloodHound zip
+            output = menu.output
+            entry["dataset"] = os.path.basename(output["path"])
+            entry["nodes"] = output["nodes"]
+            entry["edges"] = output["edges"]
+            entry["bytes"] = os.path.getsize(output["path"])
+            entry["status"] = "ok"
+        except Exception as e:
+            traceback.print_exc(file=log)
+            entry["status"] = "failed"
+            entry["error"] = f"{type(e).__name__}: {e}"
+            # Later points of this worker must not run traced
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    entry["pid"] = os.getpid()
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------------------------
+
+def run_sweep(points, output_dir, workers=1, current_time=None, base_path="DEFAULT", trace_memory=False):
+    """
+    Generate every point in a pool of workers processes and write
+    output_dir/manifest.json.  Returns the manifest.  trace_memory=True
+    adds the per-phase memory to the legacy points' phase reports.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    current_time = int(time.time()) if current_time is None else current_time
+    start = time.perf_counter()
+    # Spawned workers start from fresh modules, whatever this process generated
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker) as pool:
+        futures = [pool.submit(run_point, point, output_dir, current_time, trace_memory) for point in points]
+        entries = [future.result() for future in futures]
+    manifest = {
+        "version": SWEEP_VERSION,
+        "base": base_path,
+        "workers": workers,
+        "current_time": current_time,
+        "seconds": round(time.perf_counter() - start, 3),
+        "points": entries,
+        "parameters": {point["name"]: point["parameters"] for point in points},
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a dataset for every point of a parameter grid")
+    parser.add_argument("base", nargs="?", default="DEFAULT",
+                        help="base parameters JSON (default: the built-in defaults)")
+    parser.add_argument("--grid", help="JSON file: an object of value lists or a list of override objects")
+    parser.add_argument("--generators", nargs="+", default=["legacy"], choices=GENERATORS)
+    parser.add_argument("--seeds", type=int, nargs="+", help="run every point with each seed (default: the base seed)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output-dir", help="default: generated_datasets/sweep_<timestamp>")
+    parser.add_argument("--no-skeleton-cache", action="store_true",
+                        help="build the default-AD scaffolding in every point")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also trace the memory of every phase (much slower)")
+    args = parser.parse_args(argv)
+
+    base = DEFAULT_CONFIGURATIONS if args.base == "DEFAULT" else get_parameters_from_json(args.base)
+    grid = None
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    try:
+        points = plan_points(base, expand_grid(grid), args.generators, args.seeds,
+                             skeleton_cache=not args.no_skeleton_cache)
+    except ValueError as e:
+        print(e)
+        return 2
+    output_dir = args.output_dir or os.path.join(
+        "generated_datasets", "sweep_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3])
+
+    print(f"Sweep of {len(points)} points with {args.workers} workers -> {output_dir}")
+    manifest = run_sweep(points, output_dir, workers=args.workers, base_path=args.base,
+                         trace_memory=args.trace_memory)
+    failed = [entry for entry in manifest["points"] if entry["status"] != "ok"]
+    for entry in manifest["points"]:
+        size = f"{entry['nodes']:>9} nodes {entry['edges']:>10} edges" if entry["status"] == "ok" else entry["error"]
+        print(f"  {entry['name']:<20}{entry['seconds']:>9.2f}s  {size}")
+    print(f"{len(points) - len(failed)}/{len(points)} points generated in {manifest['seconds']:.2f}s, "
+          f"manifest: {os.path.join(output_dir, 'manifest.json')}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,16 +23,18 @@ import uuid
 from typing import Any, Dict, List, Tuple
 
 from adsynth.DATABASE import (
-    NODES, EDGES, NODE_GROUPS,
+    NODE_GROUPS,
     DATABASE_ID, dict_edges,
     SYNC_LINKS, SYNC_IDENTITY_NODES,
     CONNECTOR_HOST_NODES, PTA_AGENT_NODES,
     ADFS_SERVER_NODES, TENANT_HYBRID_MODE,
     DOMAIN_TENANT_MAPPING, NHI_NODE_INDICES,
-    TENANT_METADATA, RUN_ID,
-    node_operation, edge_operation, get_node_index,
+    TENANT_METADATA,
+    node_operation, edge_operation, get_node_index, get_run_id,
+    get_node_property,
     ridcount,
 )
+from adsynth.graph_state import builds_graph
 
 
 # ============================================================
@@ -146,7 +148,7 @@ def _create_connector_host(
         "operatingsystem", "highvalue",
     ]
     values = [
-        "ConnectorHost", hostname, server_sid, "AD", RUN_ID,
+        "ConnectorHost", hostname, server_sid, "AD", get_run_id(),
         domain["id"], tenant_id,
         hostname.split("@")[0],
         "EntraConnect",
@@ -211,7 +213,7 @@ def _create_sync_identity(
         "highvalue",
     ]
     values = [
-        "SyncIdentity", display_name, sync_objectid, "Hybrid", RUN_ID,
+        "SyncIdentity", display_name, sync_objectid, "Hybrid", get_run_id(),
         domain["id"], tenant_id,
         "System", lifecycle,
         sync_mode, link_key,
@@ -269,7 +271,7 @@ def _create_pta_server(
         "operatingsystem", "highvalue",
     ]
     values = [
-        "PTAAgentHost", hostname, server_sid, "AD", RUN_ID,
+        "PTAAgentHost", hostname, server_sid, "AD", get_run_id(),
         domain["id"], tenant_id,
         hostname.split("@")[0],
         "PTAAgent",
@@ -322,7 +324,7 @@ def _create_adfs_server(
         "operatingsystem", "highvalue",
     ]
     values = [
-        "ADFSServer", hostname, server_sid, "AD", RUN_ID,
+        "ADFSServer", hostname, server_sid, "AD", get_run_id(),
         domain["id"], tenant_id,
         hostname.split("@")[0],
         "ADFS",
@@ -375,6 +377,7 @@ def _create_sync_link_edge(
 # SYNCED_TO user mapping per link
 # ============================================================
 
+@builds_graph
 def create_user_synced_to_edges(
     domain_name: str,
     tenant_id: str,
@@ -393,9 +396,9 @@ def create_user_synced_to_edges(
     # Find enabled AD users in this domain
     ad_user_indices = [
         idx for idx in NODE_GROUPS["User"]
-        if NODES[idx]["properties"].get("domain", "").upper() == domain_name.upper()
-        and NODES[idx]["properties"].get("enabled", True)
-        and NODES[idx]["properties"].get("plane", "AD") == "AD"
+        if get_node_property(idx, "domain", "").upper() == domain_name.upper()
+        and get_node_property(idx, "enabled", True)
+        and get_node_property(idx, "plane", "AD") == "AD"
     ]
 
     if not ad_user_indices:
@@ -404,7 +407,7 @@ def create_user_synced_to_edges(
     # Find Entra users in this tenant
     entra_user_indices = [
         idx for idx in NODE_GROUPS["AZUser"]
-        if NODES[idx]["properties"].get("tenantid", "") == tenant_id
+        if get_node_property(idx, "tenantid", "") == tenant_id
     ]
 
     if not entra_user_indices:
@@ -427,6 +430,7 @@ def create_user_synced_to_edges(
 # Main entry point: create_sync_links
 # ============================================================
 
+@builds_graph
 def create_sync_links(
     domains: List[Dict[str, Any]],
     tenants: List[Dict[str, Any]],
@@ -6,7 +6,9 @@ from adsynth.helpers.getters import get_locations, get_misconfig_dict_param_valu
 from adsynth.templates.acls import get_acls_list
 from adsynth.templates.groups import get_departments_list
 from adsynth.utils.parameters import get_dict_param_value, get_int_param_value, get_perc_param_value
+from adsynth.utils.sampling import FAIR_COIN, AliasSampler, bernoulli
 import random
+from adsynth.graph_state import builds_graph
 
 def create_misconfig_sessions_multi_tiers(nTiers, num_users, security_level, parameters):
     if nTiers < 2:
@@ -16,7 +18,7 @@ def create_misconfig_sessions_multi_tiers(nTiers, num_users, security_level, par
     num_misconfig = int(perc_misconfig_sessions * num_users)
     
     for i in range(num_misconfig):
-        is_admin = random.choice([True, False])
+        is_admin = FAIR_COIN()
 
         # Specify the user' tier
         ut = random.randrange(0, nTiers - 1)
@@ -70,12 +72,14 @@ def create_misconfig_sessions_no_tier(nTiers, num_users, security_level, paramet
         end_index = get_node_index(user + "_User", "name")
         edge_operation(start_index, end_index, "HasSession")
 
+@builds_graph
 def create_misconfig_sessions(nTiers, security_level, parameters, num_users):
     if nTiers == 1:
         create_misconfig_sessions_no_tier(nTiers, num_users, security_level, parameters)
     else:
         create_misconfig_sessions_multi_tiers(nTiers, num_users, security_level, parameters)
 
+@builds_graph
 def create_misconfig_permissions_on_individuals(nTiers, A, EU, security_level, parameters, num_users):
     if nTiers == 1:
         return
@@ -130,15 +134,16 @@ def create_misconfig_permissions_on_individuals(nTiers, A, EU, security_level, p
         rel_type = random.choice(CP)
         edge_operation(start_index, end_index, rel_type)
 
+@builds_graph
 def create_misconfig_permissions_on_groups(domain, nTiers, security_level, parameters, num_groups):
     # 2 lists for ACL and non-ACL permissions
     # ACLs
     acl_permission_probs = get_dict_param_value("ACLs", "ACLsProbability", parameters)
-    ACL_PERMISSIONS = get_acls_list(acl_permission_probs)
+    choose_acl = AliasSampler.from_list(get_acls_list(acl_permission_probs))
 
     # Non-ACLs
     non_acl_permission_probs = get_dict_param_value("nonACLs", "nonACLsProbability", parameters)
-    NON_ACL_PERMISSIONS = get_non_acls_list(non_acl_permission_probs)
+    choose_non_acl = AliasSampler.from_list(get_non_acls_list(non_acl_permission_probs))
 
     # Retrieve the number of misconfig
     misconfig_perc = get_perc_param_value("perc_misconfig_permissions_on_groups", security_level, parameters) / 100
@@ -150,8 +155,10 @@ def create_misconfig_permissions_on_groups(domain, nTiers, security_level, param
     # ACL setup
     acl_ratio = get_perc_param_value("misconfig_group", "acl_ratio", parameters)
     admin_ratio = get_perc_param_value("misconfig_group", "admin_ratio", parameters)
+    is_acl_permission = bernoulli(acl_ratio, 100 - acl_ratio)
+    is_admin_target = bernoulli(admin_ratio, 100 - admin_ratio)
     departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-    departments_list = get_departments_list(departments_probs)
+    choose_department = AliasSampler.from_list(get_departments_list(departments_probs))
     locations = get_locations(parameters)
 
     # For loop to generate misconfig
@@ -165,9 +172,9 @@ def create_misconfig_permissions_on_groups(domain, nTiers, security_level, param
             continue
 
         # Sample a permissions ACL/non-ACL
-        is_acl = random.choice([True] * acl_ratio + [False] * (100 - acl_ratio))
+        is_acl = is_acl_permission()
         if not is_acl:
-            rel_type = random.choice(NON_ACL_PERMISSIONS)
+            rel_type = choose_non_acl()
 
             # Determine OU tier
             if nTiers < 2:
@@ -183,12 +190,12 @@ def create_misconfig_permissions_on_groups(domain, nTiers, security_level, param
                     ou_tier = random.randrange(1, group_tier)
             target_ou_name = f"T{ou_tier} Admin Devices"
         else:
-            rel_type = random.choice(ACL_PERMISSIONS)
+            rel_type = choose_acl()
 
             # Determine admin/non-admin target
             is_admin = True
             if group_tier > 2:
-                is_admin = random.choice([True] * admin_ratio + [False] * (100 - admin_ratio))
+                is_admin = is_admin_target()
 
             if is_admin:
                 if nTiers < 2:
@@ -216,7 +223,7 @@ def create_misconfig_permissions_on_groups(domain, nTiers, security_level, param
                 else:
                     if ou_types > 2:
                         group_type = random.choice(["Distribution", "Security"])
-                        dept = random.choice(departments_list)
+                        dept = choose_department()
                         target_ou_name = f"T{ou_tier} {group_type} {dept}"
                     else:
                         l = random.choice(locations)
@@ -227,13 +234,14 @@ def create_misconfig_permissions_on_groups(domain, nTiers, security_level, param
         end_index = get_node_index(cn(target_ou_name, domain) + "_OU", "name")
         edge_operation(start_index, end_index, rel_type)
 
+@builds_graph
 def create_misconfig_group_nesting(domain, nTiers, security_level, parameters, num_groups):
     misconfig_perc = get_perc_param_value("perc_misconfig_nesting_groups", security_level, parameters) / 100
     num_misconfig = int(misconfig_perc * num_groups)
 
     # Departments and locations
     departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-    departments_list = get_departments_list(departments_probs)
+    choose_department = AliasSampler.from_list(get_departments_list(departments_probs))
     locations = get_locations(parameters)
 
     for i in range(num_misconfig):
@@ -243,7 +251,7 @@ def create_misconfig_group_nesting(domain, nTiers, security_level, parameters, n
         regular_group_tier = random.randrange(lowest_tier_no_admin, nTiers)
         group_type = random.choice(["Distribution", "Security"])
         if group_type == "Distribution":
-            d = random.choice(departments_list)
+            d = choose_department()
             l = random.choice(locations)
             regular_group_name = cn(f"T{regular_group_tier} Distribution {d}_{l}", domain)
         else:
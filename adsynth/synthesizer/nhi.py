@@ -32,13 +32,15 @@ import uuid
 from typing import Any, Dict, List
 
 from adsynth.DATABASE import (
-    NODES, NODE_GROUPS,
-    DATABASE_ID, RUN_ID,
+    NODE_GROUPS,
+    DATABASE_ID,
     NHI_NODE_INDICES,
     TENANT_METADATA,
-    node_operation, edge_operation, get_node_index,
+    node_operation, edge_operation, get_node_index, get_run_id,
+    get_node_property, set_node_value,
     ridcount,
 )
+from adsynth.graph_state import builds_graph
 
 
 # ============================================================
@@ -123,7 +125,7 @@ def _create_service_principal(
         "isCrossTenant",
     ]
     values = [
-        "AZServicePrincipal", display_name, sp_objectid, "Entra", RUN_ID,
+        "AZServicePrincipal", display_name, sp_objectid, "Entra", get_run_id(),
         tenant_id, None,
         _sample_owner_type(rng, posture),
         _sample_lifecycle(rng),
@@ -138,8 +140,8 @@ def _create_service_principal(
     idx = node_operation("AZServicePrincipal", keys, values, sp_objectid)
 
     # Set highvalue based on privilege tier
-    priv = NODES[idx]["properties"]["privilegeTier"]
-    NODES[idx]["properties"]["highvalue"] = (priv == "tier0")
+    priv = get_node_property(idx, "privilegeTier")
+    set_node_value(idx, "highvalue", priv == "tier0")
 
     NHI_NODE_INDICES.append(idx)
 
@@ -180,7 +182,7 @@ def _create_managed_identity(
         "rotationCadenceDays", "privilegeTier", "highvalue",
     ]
     values = [
-        "ManagedIdentity", display_name, mi_objectid, "Entra", RUN_ID,
+        "ManagedIdentity", display_name, mi_objectid, "Entra", get_run_id(),
         tenant_id, None,
         _sample_owner_type(rng, posture),
         _sample_lifecycle(rng),
@@ -191,9 +193,7 @@ def _create_managed_identity(
     ]
 
     idx = node_operation("ManagedIdentity", keys, values, mi_objectid)
-    NODES[idx]["properties"]["highvalue"] = (
-        NODES[idx]["properties"]["privilegeTier"] == "tier0"
-    )
+    set_node_value(idx, "highvalue", get_node_property(idx, "privilegeTier") == "tier0")
     NHI_NODE_INDICES.append(idx)
 
     tenant_idx = get_node_index(tenant_id, "objectid")
@@ -235,7 +235,7 @@ def _create_automation_account(
         "rotationCadenceDays", "privilegeTier", "highvalue",
     ]
     values = [
-        "AutomationAccount", display_name, aa_sid, "AD", RUN_ID,
+        "AutomationAccount", display_name, aa_sid, "AD", get_run_id(),
         None, domain_name,
         domain_name,
         _sample_owner_type(rng, "average"),
@@ -247,9 +247,7 @@ def _create_automation_account(
     ]
 
     idx = node_operation("AutomationAccount", keys, values, aa_sid)
-    NODES[idx]["properties"]["highvalue"] = (
-        NODES[idx]["properties"]["privilegeTier"] == "tier0"
-    )
+    set_node_value(idx, "highvalue", get_node_property(idx, "privilegeTier") == "tier0")
     NHI_NODE_INDICES.append(idx)
 
     # Place in domain
@@ -301,6 +299,7 @@ def _create_cross_tenant_pool(
 # Main entry point: create_non_humans
 # ============================================================
 
+@builds_graph
 def create_non_humans(
     domains: List[Dict[str, Any]],
     tenants: List[Dict[str, Any]],
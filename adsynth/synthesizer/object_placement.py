@@ -1,6 +1,6 @@
 
 import math
-from adsynth.DATABASE import ADMIN_USERS, DISABLED_USERS, ENABLED_USERS, FOLDERS, NODE_GROUPS, NODES, PAW_TIERS, S_TIERS, S_TIERS_LOCATIONS, SECURITY_GROUPS, WS_TIERS, WS_TIERS_LOCATIONS, edge_operation, get_node_index, node_operation, ridcount
+from adsynth.DATABASE import ADMIN_USERS, DISABLED_USERS, ENABLED_USERS, FOLDERS, NODE_GROUPS, PAW_TIERS, S_TIERS, S_TIERS_LOCATIONS, SECURITY_GROUPS, WS_TIERS, WS_TIERS_LOCATIONS, edge_operation, get_node_index, get_node_property, node_operation, ridcount
 from adsynth.adsynth_templates.servers import T1_SERVERS
 from adsynth.entities.acls import cn
 from adsynth.helpers.distinguished_names import add_dn
@@ -8,12 +8,14 @@ from adsynth.helpers.getters import get_list_param_value, get_locations, get_thr
 from adsynth.helpers.objects import add_sub_objects, create_sub_objects, add_admin_tiers
 from adsynth.adsynth_templates.default_config import get_complementary_value
 from adsynth.templates.groups import get_departments_list
-from adsynth.utils.boolean import generate_boolean_value
+from adsynth.utils.sampling import AliasSampler, bernoulli
 from adsynth.utils.parameters import get_dict_param_value, get_perc_param_value
 from adsynth.utils.principals import get_sid_from_rid
 import random
 import copy
+from adsynth.graph_state import builds_graph
 
+@builds_graph
 def place_computers_in_tiers(domain_name, domain_sid, nTiers, parameters, PAW, Servers, Workstations, misconfig_users_comps):
     place_paws_in_tiers(domain_name, domain_sid, PAW, nTiers)
     place_servers_in_tiers(domain_name, domain_sid, parameters, Servers, nTiers)
@@ -110,6 +112,7 @@ def place_workstations_in_tiers(domain_name, domain_sid, Workstations, misconfig
     place_object_in_ous(Workstations, "Computer")
     place_object_in_ous(misconfig_users_comps, "User")
 
+@builds_graph
 def place_admin_users_in_tiers(domain_name, domain_sid, nTiers, admin, misconfig_regular_users, server_operators, print_operators, parameters):
     # DEFAULT ADMIN USERS for each tier
     for i in range(0, nTiers):
@@ -131,12 +134,13 @@ def place_admin_users_in_tiers(domain_name, domain_sid, nTiers, admin, misconfig
 
     # ADMIN USERS
     service_account_perc = get_perc_param_value("Admin", "service_account", parameters)
+    is_service_account = bernoulli(service_account_perc, get_complementary_value(service_account_perc))
     keys = ["admincount", "highvalue"]
     values = [True, True]
 
     for user in admin:
         tier = random.randrange(nTiers)
-        account_type = generate_boolean_value(service_account_perc, get_complementary_value(service_account_perc)) #Admin Accounts or Admin Service Accounts
+        account_type = is_service_account() #Admin Accounts or Admin Service Accounts
         ADMIN_USERS[tier].append(user)
         
         node_operation("User", keys, values, user, "name")
@@ -155,6 +159,7 @@ def place_admin_users_in_tiers(domain_name, domain_sid, nTiers, admin, misconfig
         ous_dn = ["Admin", f"T{tier} Admin"]
         add_admin_tiers(domain_name, user, tier, account_type, server_operators, print_operators, ous_dn)
 
+@builds_graph
 def place_normal_users_in_tiers(domain_name, enabled_users, disabled_users, misconfig_admin, misconfig_workstations, nTiers):
     def add_normal_users(domain_name, nTiers, user_list, object_type, is_enabled, is_admin = False):
         lowest_tier_not_admin = min(2, nTiers - 1)
@@ -191,15 +196,17 @@ def place_normal_users_in_tiers(domain_name, enabled_users, disabled_users, misc
     add_normal_users(domain_name, nTiers, misconfig_admin, "User", True, True)
     add_normal_users(domain_name, nTiers, misconfig_workstations, "Computer", True)
 
+@builds_graph
 def place_users_in_groups(domain_name, nTiers, parameters):
     locations = get_locations(parameters)
     it_users = []
     departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-    departments_list = get_departments_list(departments_probs)
+    choose_department = AliasSampler.from_list(get_departments_list(departments_probs))
+    thresholds_group_member = get_threshold_values("Group", "nGroupsPerUsers", parameters)
     for i in range(nTiers):
         for user in ENABLED_USERS[i]:
             # Add to a distribution group
-            d = random.choice(departments_list)
+            d = choose_department()
             if d == 'IT':
                 it_users.append(user)
             s = random.choice(locations)
@@ -209,7 +216,6 @@ def place_users_in_groups(domain_name, nTiers, parameters):
             edge_operation(start_index, end_index, "MemberOf")
 
             # Add to several security groups
-            thresholds_group_member = get_threshold_values("Group", "nGroupsPerUsers", parameters)
             num_groups = random.randint(thresholds_group_member[0], thresholds_group_member[1])
             group_list = random.sample(SECURITY_GROUPS[i], min(num_groups, len(SECURITY_GROUPS[i])))
             
@@ -221,21 +227,23 @@ def place_users_in_groups(domain_name, nTiers, parameters):
     return it_users
 
 # Idea Ref: DBCreator and ADSimulator
+@builds_graph
 def nest_groups(domain_name, parameters):
     num_groups = len(NODE_GROUPS["Group"])
     max_nest = int(round(math.log10(num_groups)))
     nesting_perc = get_perc_param_value("Group", "nestingGroupProbability", parameters)
+    is_nested = bernoulli(nesting_perc, get_complementary_value(nesting_perc))
 
     # Aim at security groups
     for g in NODE_GROUPS["Group"]:
-        if generate_boolean_value(nesting_perc, get_complementary_value(nesting_perc)):
+        if is_nested():
             try:
                 num_nest = random.randrange(1, max_nest)
             except ValueError:
                 num_nest = 1
             
             # Info of chosen group
-            name = NODES[g]["properties"]["name"].split("@")[0]
+            name = get_node_property(g, "name").split("@")[0]
             try:
                 tier, dept, resource, resource_permission = name.split("_")
                 tier = int(tier[1:])
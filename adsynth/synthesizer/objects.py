@@ -3,10 +3,9 @@ from adsynth.adsynth_templates.admin_groups import get_t0_admin_groups, get_tn_a
 from adsynth.adsynth_templates.tier_0_assets import get_t0_default_groups
 from adsynth.entities.acls import cn
 from adsynth.helpers.distinguished_names import set_computer_dn
-from adsynth.helpers.getters import get_locations, get_threshold_values
+from adsynth.helpers.getters import get_department_names, get_locations, get_single_int_param_value, get_threshold_values
 from adsynth.helpers.objects import add_sub_objects, create_sub_objects
 from adsynth.templates.computers import get_client_os_list, get_computer_type_list, get_main_dc_os, get_server_os_list
-from adsynth.templates.groups import get_departments
 from adsynth.utils.computers import generate_client_service_pricipal_names, generate_server_service_pricipal_names, get_computer_name, is_os_vulnerable
 from adsynth.helpers.debug import log
 from adsynth.utils.domains import get_domain_dn
@@ -16,13 +15,17 @@ from adsynth.utils.principals import get_cn, get_sid_from_rid
 from adsynth.utils.time import generate_timestamp
 from adsynth.utils.users import get_user_timestamp, generate_sid_history
 from adsynth.utils.boolean import generate_boolean_value
+from adsynth.utils.sampling import AliasSampler, bernoulli
 from adsynth.utils.parameters import get_dict_param_value, get_perc_param_value, print_computer_generation_parameters, print_dc_generation_parameters, print_user_generation_parameters
 from adsynth.entities.users import get_guest_user, get_default_account, get_administrator_user, get_krbtgt_user,\
     get_forest_user_sid_list
 from adsynth.adsynth_templates.default_config import get_complementary_value
+from adsynth.synthesizer.vectorized_objects import generate_computers_vectorized, generate_users_vectorized
 from adsynth.DATABASE import ADMIN_USERS, COMPUTERS, DISABLED_USERS, DISTRIBUTION_GROUPS, ENABLED_USERS, FOLDERS, KERBEROASTABLES, LOCAL_ADMINS, SECURITY_GROUPS, node_operation, edge_operation, get_node_index, ridcount
-from adsynth.DATABASE import RUN_ID
+from adsynth.DATABASE import get_run_id
+from adsynth.graph_state import builds_graph
 
+@builds_graph
 def create_admin_groups(domain_name, domain_sid, nTiers):
     # Tier 0 Admin groups
     # There are multiple groups, but we only simulate the working of "PRINT OPERATORS", "ACCOUNT OPERATORS", "SERVER OPERATORS", "DOMAIN ADMINS"
@@ -40,7 +43,11 @@ def create_admin_groups(domain_name, domain_sid, nTiers):
         create_sub_objects(domain_name, domain_sid, parent_name, "OU", sub_list, "Group", "Contains", highvalue = True)     
 
 # Idea Ref: ADSimulator, DBCreator
+@builds_graph
 def generate_users(domain_name, domain_sid, num_nodes, current_time, first_names, last_names, parameters):
+    if get_single_int_param_value("vectorized_objects", parameters) == 1:
+        return generate_users_vectorized(domain_name, domain_sid, num_nodes, current_time, first_names, last_names, parameters)
+
     users = list()
     disabled_users = list()
 
@@ -64,6 +71,14 @@ def generate_users(domain_name, domain_sid, num_nodes, current_time, first_names
     print_user_generation_parameters(enabled_perc, dontreqpreauth_perc, hasspn_perc,
                                      passwordnotreqd_perc, pwdneverexpires_perc, unconstraineddelegation_perc, sidhistory_perc)
 
+    is_enabled = bernoulli(enabled_perc, get_complementary_value(enabled_perc))
+    is_dontreqpreauth = bernoulli(dontreqpreauth_perc, get_complementary_value(dontreqpreauth_perc))
+    is_hasspn = bernoulli(hasspn_perc, get_complementary_value(hasspn_perc))
+    is_passwordnotreqd = bernoulli(passwordnotreqd_perc, get_complementary_value(passwordnotreqd_perc))
+    is_pwdneverexpires = bernoulli(pwdneverexpires_perc, get_complementary_value(pwdneverexpires_perc))
+    is_unconstraineddelegation = bernoulli(unconstraineddelegation_perc, get_complementary_value(unconstraineddelegation_perc))
+    is_savedcredentials = bernoulli(savedcredentials_perc, get_complementary_value(savedcredentials_perc))
+
     for i in range(1, num_nodes + 1):
         first = random.choice(first_names)
         last = random.choice(last_names)
@@ -72,24 +87,18 @@ def generate_users(domain_name, domain_sid, num_nodes, current_time, first_names
         user_name = user_name.format(first[0], last, i).upper()
 
         dispname = "{} {}".format(first, last)
-        enabled = generate_boolean_value(
-            enabled_perc, get_complementary_value(enabled_perc))
+        enabled = is_enabled()
 
         if enabled:
             users.append(user_name)
         else:
             disabled_users.append(user_name)
 
-        dontreqpreauth = generate_boolean_value(
-            dontreqpreauth_perc, get_complementary_value(dontreqpreauth_perc))
-        hasspn = generate_boolean_value(
-            hasspn_perc, get_complementary_value(hasspn_perc))
-        passwordnotreqd = generate_boolean_value(
-            passwordnotreqd_perc, get_complementary_value(passwordnotreqd_perc))
-        pwdneverexpires = generate_boolean_value(
-            pwdneverexpires_perc, get_complementary_value(pwdneverexpires_perc))
-        unconstraineddelegation = generate_boolean_value(
-            unconstraineddelegation_perc, get_complementary_value(unconstraineddelegation_perc))
+        dontreqpreauth = is_dontreqpreauth()
+        hasspn = is_hasspn()
+        passwordnotreqd = is_passwordnotreqd()
+        pwdneverexpires = is_pwdneverexpires()
+        unconstraineddelegation = is_unconstraineddelegation()
         sidhistory = generate_sid_history(
             sidhistory_perc, get_complementary_value(sidhistory_perc))
         pwdlastset = get_user_timestamp(current_time, enabled)
@@ -97,15 +106,14 @@ def generate_users(domain_name, domain_sid, num_nodes, current_time, first_names
         objectsid = get_sid_from_rid(ridcount[0], domain_sid)
 
         # New properties
-        savedcredentials = generate_boolean_value(
-            savedcredentials_perc, get_complementary_value(savedcredentials_perc))
+        savedcredentials = is_savedcredentials()
 
         ridcount[0] += 1
         keys = ["domain", "objectid", "labels", "displayname", "name", "enabled", "pwdlastset", "lastlogon", "lastlogontimestamp",
                   "highvalue", "dontreqpreauth", "hasspn", "passwordnotreqd", "pwdneverexpires", "sensitive", "serviceprincipalnames",
                   "sidhistory", "unconstraineddelegation", "description", "admincount", "savedcredentials","plane", "runId"]
         values = [domain_name, objectsid, "User", dispname, user_name, enabled, pwdlastset, lastlogon, lastlogon, False, dontreqpreauth, 
-                  hasspn, passwordnotreqd, pwdneverexpires, False, "", sidhistory, unconstraineddelegation, "null", False, savedcredentials,"AD", RUN_ID]
+                  hasspn, passwordnotreqd, pwdneverexpires, False, "", sidhistory, unconstraineddelegation, "null", False, savedcredentials,"AD", get_run_id()]
         id_lookup = objectsid
         node_operation("User", keys, values, id_lookup)
 
@@ -119,14 +127,18 @@ def generate_users(domain_name, domain_sid, num_nodes, current_time, first_names
 
 # Ref: ADSimulator, DBCreator, BadBlood
 #      Microsoft, https://learn.microsoft.com/en-us/security/privileged-access-workstations/privileged-access-devices
+@builds_graph
 def generate_computers(domain_name, domain_sid, num_nodes, computers, current_time, parameters):
+    if get_single_int_param_value("vectorized_objects", parameters) == 1:
+        return generate_computers_vectorized(domain_name, domain_sid, num_nodes, computers, current_time, parameters)
+
     group_name = "DOMAIN COMPUTERS@{}".format(domain_name)
     props = []
     enabled_perc = get_perc_param_value("Computer", "enabled", parameters)
     has_laps_perc = get_perc_param_value("Computer", "haslaps", parameters)
     unconstrained_delegation_perc = get_perc_param_value("Computer", "unconstraineddelegation", parameters)
     os_perc = get_dict_param_value("Computer", "osProbability", parameters)
-    os_list = get_client_os_list(os_perc)
+    choose_os = AliasSampler.from_list(get_client_os_list(os_perc))
  
     # New params
     privesc_perc = get_perc_param_value("Computer", "privesc", parameters)
@@ -137,8 +149,14 @@ def generate_computers(domain_name, domain_sid, num_nodes, computers, current_ti
  
     # PC List
     computer_type_perc = get_dict_param_value("Computer", "computerProbability", parameters)
-    PC_list = get_computer_type_list(computer_type_perc) 
-    # print(PC_list)   
+    choose_PC_type = AliasSampler.from_list(get_computer_type_list(computer_type_perc))
+
+    is_enabled = bernoulli(enabled_perc, get_complementary_value(enabled_perc))
+    has_laps_value = bernoulli(has_laps_perc, get_complementary_value(has_laps_perc))
+    is_unconstrained_delegation = bernoulli(unconstrained_delegation_perc, get_complementary_value(unconstrained_delegation_perc))
+    is_privesc = bernoulli(privesc_perc, get_complementary_value(privesc_perc))
+    is_creddump = bernoulli(creddump_perc, get_complementary_value(creddump_perc))
+    is_exploitable = bernoulli(exploitable_perc, get_complementary_value(exploitable_perc))
 
     PAW = []
     Server = []
@@ -150,7 +168,7 @@ def generate_computers(domain_name, domain_sid, num_nodes, computers, current_ti
  
     print_computer_generation_parameters(enabled_perc, has_laps_perc, unconstrained_delegation_perc, os_perc)
     for i in range(1, num_nodes + 1):
-        PC_type = random.choice(PC_list)
+        PC_type = choose_PC_type()
         highvalue = False
         if PC_type == 'PAW':
             comp_name = str('PAW')+"-{:05d}@{}".format(len(PAW), domain_name)
@@ -166,16 +184,16 @@ def generate_computers(domain_name, domain_sid, num_nodes, computers, current_ti
         
         COMPUTERS.append(comp_name)
         computers.append(comp_name)
-        os = random.choice(os_list)
-        enabled = generate_boolean_value(enabled_perc, get_complementary_value(enabled_perc))
-        has_laps = generate_boolean_value(has_laps_perc, get_complementary_value(has_laps_perc))
-        unconstrained_delegation = generate_boolean_value(unconstrained_delegation_perc, get_complementary_value(unconstrained_delegation_perc))
+        os = choose_os()
+        enabled = is_enabled()
+        has_laps = has_laps_value()
+        unconstrained_delegation = is_unconstrained_delegation()
  
         # New params
-        privesc = generate_boolean_value(privesc_perc, get_complementary_value(privesc_perc))
-        creddump = generate_boolean_value(creddump_perc, get_complementary_value(creddump_perc))
+        privesc = is_privesc()
+        creddump = is_creddump()
         if is_os_vulnerable(os):
-            exploitable = generate_boolean_value(exploitable_perc, get_complementary_value(exploitable_perc))
+            exploitable = is_exploitable()
         else:
             exploitable = False
 
@@ -204,7 +222,7 @@ def generate_computers(domain_name, domain_sid, num_nodes, computers, current_ti
         keys.extend(['domain', 'labels', 'objectid',"plane", "runId"])
 
         values = [computer_property['props'][i] for i in computer_property['props']]
-        values.extend([domain_name, "Computer", computer_property['id'],"AD", RUN_ID])
+        values.extend([domain_name, "Computer", computer_property['id'],"AD", get_run_id()])
 
         id_lookup = computer_property['id']
         node_operation("Computer", keys, values, id_lookup)
@@ -221,13 +239,14 @@ def generate_computers(domain_name, domain_sid, num_nodes, computers, current_ti
     return computers, PAW, Server, Workstation
 
 # Ref: ADSimulator, DBCreator and Microsoft, https://learn.microsoft.com/en-us/openspecs/windows_protocols/ms-authsod/c4012a57-16a9-42eb-8f64-aa9e04698dca
+@builds_graph
 def generate_dcs(domain_name, domain_sid, domain_dn, dcou, current_time, parameters, functional_level):
     dc_properties_list = []
     ou_dn = get_ou_dn("Domain Controllers", domain_dn)
     enabled_perc = get_perc_param_value("DC", "enabled", parameters)
     has_laps_perc = get_perc_param_value("DC", "haslaps", parameters)
     os_perc = get_dict_param_value("DC", "osProbability", parameters)
-    os_list = get_server_os_list(os_perc)
+    choose_os = AliasSampler.from_list(get_server_os_list(os_perc))
 
     # New params
     privesc_perc = get_perc_param_value("Computer", "privesc", parameters)
@@ -243,7 +262,7 @@ def generate_dcs(domain_name, domain_sid, domain_dn, dcou, current_time, paramet
         sid = get_sid_from_rid(ridcount[0], domain_sid)
         enabled = generate_boolean_value(enabled_perc, get_complementary_value(enabled_perc))
         has_laps = generate_boolean_value(has_laps_perc, get_complementary_value(has_laps_perc))
-        os = random.choice(os_list)
+        os = choose_os()
 
         # New params
         privesc = generate_boolean_value(privesc_perc, get_complementary_value(privesc_perc))
@@ -289,7 +308,7 @@ def generate_dcs(domain_name, domain_sid, domain_dn, dcou, current_time, paramet
         keys = ["domain", "labels", "objectid", "name", "operatingsystem", "enabled", "haslaps", "highvalue", "lastlogontimestamp", "pwdlastset",
                 "serviceprincipalnames", "unconstraineddelegation", "privesc", "creddump", "exploitable","plane", "runId"]
         values = [domain_name, "Computer", sid, name, os, enabled, haslaps, highvalue, lastlogontimestamp, pwdlastset,
-                serviceprincipalnames, unconstraineddelegation, privesc, creddump, exploitable,"AD", RUN_ID]
+                serviceprincipalnames, unconstraineddelegation, privesc, creddump, exploitable,"AD", get_run_id()]
         id_lookup = sid
         node_operation("Computer", keys, values, id_lookup)
         domain_controllers.append(comp_name)
@@ -426,6 +445,7 @@ def generate_main_dc(domain_name, domain_sid, domain_dn, dcou, current_time, par
 
     return dc_properties_list
 
+@builds_graph
 def create_groups(domain_name, domain_sid, parameters, nTiers):
     locations = get_locations(parameters)
     access_rights = ['Read', 'Modify', 'Write', 'Full']
@@ -436,8 +456,7 @@ def create_groups(domain_name, domain_sid, parameters, nTiers):
 
 
     # Group bounded by Departments
-    departments_probs = get_dict_param_value("Group", "departmentProbability", parameters)
-    departments_list = get_departments(departments_probs)
+    departments_list = get_department_names(parameters)
     TG = ["Distribution", "Security"]
     lowest_tier_no_admin = min(2, nTiers - 1)
     num_groups = 0
@@ -486,6 +505,7 @@ def create_groups(domain_name, domain_sid, parameters, nTiers):
     
     return num_groups
 
+@builds_graph
 def create_kerberoastable_users(nTiers, parameters):
     # log("Enabled", enabled_users)
     thresholds = get_threshold_values("User", "Kerberoastable", parameters)
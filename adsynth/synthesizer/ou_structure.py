@@ -1,10 +1,13 @@
 import copy
 from adsynth.DATABASE import ADMIN_USERS, DISABLED_USERS, DISTRIBUTION_GROUPS, ENABLED_USERS, FOLDERS, KERBEROASTABLES, LOCAL_ADMINS, PAW_TIERS, S_TIERS, S_TIERS_LOCATIONS, SECURITY_GROUPS, WS_TIERS, WS_TIERS_LOCATIONS
 from adsynth.adsynth_templates.servers import T1_SERVERS
-from adsynth.helpers.getters import get_list_param_value, get_locations
+from adsynth.helpers.getters import get_department_names, get_list_param_value, get_locations
 from adsynth.helpers.objects import create_sub_objects
+from adsynth.helpers.ou_registry import register_tiered_ous
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: Microsoft, https://www.microsoft.com/en-au/download/details.aspx?id=36036
+@builds_graph
 def create_ad_skeleton(domain_name, domain_sid, parameters, nTiers):
     # Domain
     high_privileged_ous = ['Admin', 'Tier 1 Servers']
@@ -95,5 +98,7 @@ def create_ad_skeleton(domain_name, domain_sid, parameters, nTiers):
     for i in range(nTiers):
         for l in locations:
             S_TIERS_LOCATIONS[i][l] = list()
-            WS_TIERS_LOCATIONS[i][l] = list()  
- 
\ No newline at end of file
+            WS_TIERS_LOCATIONS[i][l] = list()
+
+    # Tiered OUs whose members permission synthesis expands (helpers/ou_registry.py)
+    register_tiered_ous(range(lowest_tier_not_admin, nTiers), locations, get_department_names(parameters))
@@ -1,16 +1,19 @@
 import random
-import re
-from adsynth.DATABASE import LOCAL_ADMINS, NODE_GROUPS, PAW_TIERS, S_TIERS_LOCATIONS, WS_TIERS_LOCATIONS, edge_operation, get_node_index
+from adsynth.DATABASE import LOCAL_ADMINS, NODE_GROUPS, PAW_TIERS, edge_operation, get_node_index
 from adsynth.adsynth_templates.admin_groups import get_admin_groups
 from adsynth.adsynth_templates.permissions import get_non_acls_list
 from adsynth.entities.acls import cn
 from adsynth.helpers.getters import get_locations, get_threshold_values, get_total_resources, get_ou_elements
 from adsynth.helpers.metagraph_extractor import extract_hyperedges
+from adsynth.helpers.ou_registry import get_ou_entry
 from adsynth.helpers.objects import add_sub_objects
 from adsynth.templates.acls import get_acls_list
 from adsynth.utils.parameters import get_dict_param_value, get_perc_param_value
+from adsynth.utils.sampling import AliasSampler
+from adsynth.graph_state import builds_graph
 
 
+@builds_graph
 def create_control_management_permissions(domain_name, nTiers, is_acl, parameters, convert_to_digraph):
     # Set up parameters depending on ACL/Non-ACL
     permission_type = "nonACLs"
@@ -29,9 +32,9 @@ def create_control_management_permissions(domain_name, nTiers, is_acl, parameter
     
     # An admin group can have control over objects at the same tier or below
     if is_acl:
-        PERMISSIONS = get_acls_list(permission_probs)
+        choose_permission = AliasSampler.from_list(get_acls_list(permission_probs))
     else:
-        PERMISSIONS = get_non_acls_list(permission_probs)
+        choose_permission = AliasSampler.from_list(get_non_acls_list(permission_probs))
 
     locations = get_locations(parameters)
     perc_target = get_perc_param_value(permission_type, permission_percentage_call, parameters)
@@ -53,7 +56,7 @@ def create_control_management_permissions(domain_name, nTiers, is_acl, parameter
         for g in AG:
             start_index = get_node_index(cn(g, domain_name) + "_Group", "name")
             for j in range(num_permissions):
-                rel_type = random.choice(PERMISSIONS)
+                rel_type = choose_permission()
                 try:
                     if rel_type == "AddMember" or rel_type == "AddSelf":
                         target = random.choice(group_targets)
@@ -70,6 +73,7 @@ def create_control_management_permissions(domain_name, nTiers, is_acl, parameter
                         
                     extract_hyperedges(cn(g, domain_name), "Group", ou_elements, type, rel_type)
 
+@builds_graph
 def assign_administration_to_admin_principals(domain_name, nTiers, convert_to_digraph = 0):
     rel_type = "AdminTo"
     props = ["isacl", "isInherited", "inheritanceType"]
@@ -115,34 +119,17 @@ def assign_administration_to_admin_principals(domain_name, nTiers, convert_to_di
         if convert_to_digraph:
             extract_hyperedges(AG, "Group", PAW_TIERS[i], "Computer", rel_type, props, values)
 
+@builds_graph
 def assign_local_admin_rights(domain_name, nTiers, parameters, convert_to_digraph):
     rel_type = "AdminTo"
     props = ["isacl", "isInherited", "inheritanceType"]
     values = [False, False, "All"]
     locations = get_locations(parameters)
 
-    # Extract tier and location of a computer
-    pattern_ws = r'T(\d+) Workstations (\w+)'
-    pattern_s = r'T(\d+) Server (\w+)'
-
-    def extract_tier_location(ou_name, pattern_ws, pattern_s):
-        # Match against Workstations
-        match = re.match(pattern_ws, ou_name)
-        is_ou_ws = True # Check whether Workstations or Servers
-        if not match:
-            match = re.match(pattern_s, ou_name)
-            is_ou_ws = False
-            
-        tier = int(match.group(1))
-        location = match.group(2)
-
-        return is_ou_ws, tier, location
-        
-
+    thresholds_to_admin = get_threshold_values("Group", "nOUsPerLocalAdmins", parameters)
     lowest_tier_not_admin = min(2, nTiers - 1)
     for i in range(lowest_tier_not_admin, nTiers):
         for g in LOCAL_ADMINS[i]:
-            thresholds_to_admin = get_threshold_values("Group", "nOUsPerLocalAdmins", parameters)
             num_local_admins = random.randint(thresholds_to_admin[0], thresholds_to_admin[1])
             num_local_admins = min(num_local_admins, len(locations))
             targets = [f"T{i} Workstations {l}" for l in locations]
@@ -155,12 +142,9 @@ def assign_local_admin_rights(domain_name, nTiers, parameters, convert_to_digrap
                 props_digraph = ["isacl", "isInherited"]
                 values_digraph = [False, False]
                 for ou in targets:
-                    try:
-                        is_ou_ws, tier, location = extract_tier_location(ou, pattern_ws, pattern_s)
-                        if is_ou_ws:
-                            extract_hyperedges(cn(g, domain_name), "Group", WS_TIERS_LOCATIONS[tier][location], "Computer", rel_type, props_digraph, values_digraph)
-                        else:
-                            extract_hyperedges(cn(g, domain_name), "Group", S_TIERS_LOCATIONS[tier][location], "Computer", rel_type, props_digraph, values_digraph)
-                    except:
+                    # Server OUs never matched the "T<i> Server <location>" pattern this
+                    # used to parse, so only workstation OUs are expanded
+                    entry = get_ou_entry(ou)
+                    if entry is None or entry.kind != "Workstations":
                         continue
- 
\ No newline at end of file
+                    extract_hyperedges(cn(g, domain_name), "Group", entry.members(), entry.member_type, rel_type, props_digraph, values_digraph)
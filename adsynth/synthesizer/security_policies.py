@@ -1,13 +1,15 @@
 import random
-import uuid
 from adsynth.DATABASE import GPLINK_OUS, NODE_GROUPS, edge_operation, get_node_index, node_operation
 from adsynth.adsynth_templates.default_config import get_complementary_value
 from adsynth.entities.acls import cn, cs
 from adsynth.utils.boolean import generate_boolean_value
 from adsynth.utils.gpos import get_gpos_container_dn
 from adsynth.utils.parameters import get_int_param_value, get_perc_param_value
+from adsynth.utils.sampling import random_guid
+from adsynth.graph_state import builds_graph
 
 # Idea Ref: https://learn.microsoft.com/en-us/previous-versions/windows/desktop/policy/group-policy-storage
+@builds_graph
 def create_gpos_container(domain_name, domain_dn, gpos_container):
     guid = gpos_container
     name = cn("Group Policy Objects Container", domain_name)
@@ -19,6 +21,7 @@ def create_gpos_container(domain_name, domain_dn, gpos_container):
     id_lookup = guid
     node_operation("Container", keys, values, id_lookup)
 
+@builds_graph
 def apply_gpos(domain_name, domain_sid, nTiers):
     # A ---GpLink---> B
     # C ---GpLink---> D
@@ -47,7 +50,7 @@ def apply_gpos(domain_name, domain_sid, nTiers):
 
     for gpo in gpos_map:
         # Create GPO
-        guid = cs(str(uuid.uuid4()), domain_sid)
+        guid = cs(random_guid(), domain_sid)
         gpo_name = cn(gpo, domain_name)
         keys = ["domain", "name", "objectid", "labels"]
         values = [domain_name, gpo_name, guid, "GPO"]
@@ -62,6 +65,7 @@ def apply_gpos(domain_name, domain_sid, nTiers):
             edge_operation(start_index, end_index, rel_type)
     
 
+@builds_graph
 def apply_restriction_gpos(domain_name, domain_sid, parameters):
     unlinked_OUs = list(set(NODE_GROUPS["OU"]) - set(GPLINK_OUS))
 
@@ -77,7 +81,7 @@ def apply_restriction_gpos(domain_name, domain_sid, parameters):
         gpo_name = cn(random.choice(GPO_names)+str(i), domain_name)
 
         # Create the GPO
-        guid = cs(str(uuid.uuid4()), domain_sid)
+        guid = cs(random_guid(), domain_sid)
         exploitable_perc = get_perc_param_value("GPO", "exploitable", parameters)
         exploitable = generate_boolean_value(exploitable_perc, get_complementary_value(exploitable_perc))
         keys = ["domain", "name", "objectid", "exploitable", "labels"]
@@ -91,6 +95,7 @@ def apply_restriction_gpos(domain_name, domain_sid, parameters):
         rel_type = "GpLink"
         edge_operation(start_index, end_index, rel_type)
 
+@builds_graph
 def place_gpos_in_container(domain_name, gpos_container):
     start_index = get_node_index(gpos_container, "objectid")
     rel_type = "Contains"
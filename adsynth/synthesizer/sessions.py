@@ -2,11 +2,16 @@ import random
 from adsynth.DATABASE import ADMIN_USERS, ENABLED_USERS, edge_operation, get_node_index, node_operation
 from adsynth.helpers.getters import get_list_perc_param_value
 from adsynth.utils.parameters import get_int_param_value, get_perc_param_value
+from adsynth.utils.sampling import FAIR_COIN, bernoulli
+from adsynth.graph_state import builds_graph
 
 
 def create_sessions_per_set(parameters, U, C, tier_list, perc_sessions, priority_session_weight, restricted = False):
     lowest_tier = tier_list[0]
     total_comps_from_current_to_above = 0
+    if restricted:
+        perc_special_roles = get_perc_param_value("User", "perc_special_roles", parameters)
+        has_special_role = bernoulli(perc_special_roles, 100 - perc_special_roles)
 
     for tier in tier_list:
         weights = [1 for i in range(lowest_tier, tier + 1)]
@@ -15,9 +20,7 @@ def create_sessions_per_set(parameters, U, C, tier_list, perc_sessions, priority
         for user in U[tier]:
             # Only a small set of users with special roles can log on to servers
             if restricted:
-                perc_special_roles = get_perc_param_value("User", "perc_special_roles", parameters)
-                is_special_role = random.choice([True] * perc_special_roles + [False] * (100 - perc_special_roles))
-                if is_special_role:
+                if has_special_role():
                     # Update the user with flag special_role
                     keys = ["special_role"]
                     values = [True]
@@ -37,6 +40,7 @@ def create_sessions_per_set(parameters, U, C, tier_list, perc_sessions, priority
                 start_index = get_node_index(comp + "_Computer", "name")
                 edge_operation(start_index, end_index, "HasSession")
           
+@builds_graph
 def create_sessions(nTiers, PAW, Servers, Workstations, parameters):
     lowest_tier_no_admin = min(2, nTiers - 1)
     perc_sessions = get_list_perc_param_value("User", "sessionsPercentages", parameters)
@@ -56,10 +60,11 @@ def create_sessions(nTiers, PAW, Servers, Workstations, parameters):
         create_sessions_per_set(parameters, ADMIN_USERS, Servers, [1], perc_sessions[1], priority_session_weight)
 
 # Idea Ref: Microsoft, https://learn.microsoft.com/en-us/windows-server/identity/ad-ds/manage/understand-security-groups
+@builds_graph
 def create_dc_sessions(domain_controllers, server_operators, print_operators):
     for OP in server_operators + print_operators:
         for DC in domain_controllers:
-            if random.choice([True, False]):
+            if FAIR_COIN():
                 start_index = get_node_index(OP + "_User", "name")
                 end_index = get_node_index(DC + "_Computer", "name")
                 rel_type = "HasSession"
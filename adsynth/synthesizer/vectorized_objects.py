@@ -0,0 +1,183 @@
+"""
+Bulk user / computer factory.
+
+generate_users / generate_computers (synthesizer/objects.py) draw every
+property of one object at a time and insert it with node_operation.  The
+functions here produce the same properties, MemberOf edges and return
+values, but draw each property as a whole column for all N objects
+(ColumnSampler, NumPy when installed), take the SIDs from the RID range
+[ridcount[0], ridcount[0] + N) and insert all nodes with one
+bulk_node_operation call.
+
+Enabled with the "vectorized_objects" parameter.  The column draws consume
+randomness differently from the per-object loop, so the same seed gives a
+different (but identically distributed) graph.
+"""
+
+from adsynth.adsynth_templates.default_config import get_complementary_value
+from adsynth.templates.computers import get_client_os_list, get_computer_type_list
+from adsynth.utils.computers import generate_client_service_pricipal_names, is_os_vulnerable
+from adsynth.utils.parameters import get_dict_param_value, get_perc_param_value, print_computer_generation_parameters, print_user_generation_parameters
+from adsynth.utils.principals import get_sid_from_rid
+from adsynth.utils.sampling import ColumnSampler
+from adsynth.DATABASE import COMPUTERS, bulk_edge_operation, bulk_node_operation, gc_paused, get_node_index, get_run_id, ridcount
+
+USER_KEYS = ["domain", "objectid", "displayname", "name", "enabled", "pwdlastset", "lastlogon", "lastlogontimestamp",
+             "highvalue", "dontreqpreauth", "hasspn", "passwordnotreqd", "pwdneverexpires", "sensitive", "serviceprincipalnames",
+             "sidhistory", "unconstraineddelegation", "description", "admincount", "savedcredentials", "plane", "runId"]
+
+COMPUTER_KEYS = ["name", "operatingsystem", "enabled", "haslaps", "highvalue", "lastlogontimestamp", "pwdlastset",
+                 "serviceprincipalnames", "unconstraineddelegation", "privesc", "creddump", "exploitable",
+                 "domain", "objectid", "plane", "runId"]
+
+SID_HISTORY_PREFIX = "S-1-5-21-883822822-279636685-4182209497-"
+
+
+def _perc_column(sampler, node, key, parameters, n):
+    perc = get_perc_param_value(node, key, parameters)
+    return sampler.bools(perc, get_complementary_value(perc), n)
+
+
+def _timestamp_column(sampler, current_time, n):
+    # Column version of utils.time.generate_timestamp
+    choices = sampler.integers(-1, 1, n)
+    variations = sampler.integers(0, 31536000, n)
+    return [current_time - v if c == 1 else c for c, v in zip(choices, variations)]
+
+
+def _take_sids(domain_sid, n):
+    first = ridcount[0]
+    ridcount[0] += n
+    return [get_sid_from_rid(rid, domain_sid) for rid in range(first, first + n)]
+
+
+@gc_paused()
+def generate_users_vectorized(domain_name, domain_sid, num_nodes, current_time, first_names, last_names, parameters, sampler=None):
+    if sampler is None:
+        sampler = ColumnSampler()
+    n = num_nodes
+    group_name = "DOMAIN USERS@{}".format(domain_name)
+
+    print_user_generation_parameters(*(get_perc_param_value("User", key, parameters) for key in
+                                       ["enabled", "dontreqpreauth", "hasspn", "passwordnotreqd",
+                                        "pwdneverexpires", "unconstraineddelegation", "sidhistory"]))
+    if n < 1:
+        return [], []
+
+    firsts = sampler.choices(first_names, n)
+    lasts = sampler.choices(last_names, n)
+    names = ["{}{}{:05d}@{}".format(first[0], last, i, domain_name).upper()
+             for i, first, last in zip(range(1, n + 1), firsts, lasts)]
+    displaynames = ["{} {}".format(first, last) for first, last in zip(firsts, lasts)]
+
+    enabled = _perc_column(sampler, "User", "enabled", parameters, n)
+    pwdlastset = [t if e else -1 for t, e in zip(_timestamp_column(sampler, current_time, n), enabled)]
+    lastlogon = [t if e else -1 for t, e in zip(_timestamp_column(sampler, current_time, n), enabled)]
+    has_sidhistory = _perc_column(sampler, "User", "sidhistory", parameters, n)
+    sidhistory = [SID_HISTORY_PREFIX + str(rid) if h else ""
+                  for h, rid in zip(has_sidhistory, sampler.integers(1100, 2000, n))]
+    false = [False] * n
+
+    columns = [
+        [domain_name] * n,
+        _take_sids(domain_sid, n),
+        displaynames,
+        names,
+        enabled,
+        pwdlastset,
+        lastlogon,
+        lastlogon,
+        false,
+        _perc_column(sampler, "User", "dontreqpreauth", parameters, n),
+        _perc_column(sampler, "User", "hasspn", parameters, n),
+        _perc_column(sampler, "User", "passwordnotreqd", parameters, n),
+        _perc_column(sampler, "User", "pwdneverexpires", parameters, n),
+        false,
+        [""] * n,
+        sidhistory,
+        _perc_column(sampler, "User", "unconstraineddelegation", parameters, n),
+        ["null"] * n,
+        false,
+        _perc_column(sampler, "User", "savedcredentials", parameters, n),
+        ["AD"] * n,
+        [get_run_id()] * n,
+    ]
+    indices = bulk_node_operation("User", USER_KEYS, columns)
+
+    # All users are MemberOf Domain Users
+    bulk_edge_operation(indices, get_node_index(group_name + "_Group", "name"), "MemberOf")
+
+    users = [name for name, e in zip(names, enabled) if e]
+    disabled_users = [name for name, e in zip(names, enabled) if not e]
+    return users, disabled_users
+
+
+@gc_paused()
+def generate_computers_vectorized(domain_name, domain_sid, num_nodes, computers, current_time, parameters, sampler=None):
+    if sampler is None:
+        sampler = ColumnSampler()
+    n = num_nodes
+    group_name = "DOMAIN COMPUTERS@{}".format(domain_name)
+    PAW = []
+    Server = []
+    Workstation = []
+
+    if n < 1:
+        print("No computers are generated!")
+        return computers, PAW, Server, Workstation
+
+    os_perc = get_dict_param_value("Computer", "osProbability", parameters)
+    print_computer_generation_parameters(get_perc_param_value("Computer", "enabled", parameters),
+                                         get_perc_param_value("Computer", "haslaps", parameters),
+                                         get_perc_param_value("Computer", "unconstraineddelegation", parameters),
+                                         os_perc)
+
+    computer_type_perc = get_dict_param_value("Computer", "computerProbability", parameters)
+    types = sampler.weighted(get_computer_type_list(computer_type_perc), n)
+    names = []
+    for PC_type in types:
+        if PC_type == 'PAW':
+            comp_name = "PAW-{:05d}@{}".format(len(PAW), domain_name)
+            PAW.append(comp_name)
+        elif PC_type == 'Server':
+            comp_name = "S-{:05d}@{}".format(len(Server), domain_name)
+            Server.append(comp_name)
+        else:
+            comp_name = "WS-{:05d}@{}".format(len(Workstation), domain_name)
+            Workstation.append(comp_name)
+        names.append(comp_name)
+    COMPUTERS.extend(names)
+    computers.extend(names)
+
+    operating_systems = sampler.weighted(get_client_os_list(os_perc), n)
+    vulnerable = {os: is_os_vulnerable(os) for os in set(operating_systems)}
+    exploitable = [e and vulnerable[os] for e, os in
+                   zip(_perc_column(sampler, "Computer", "exploitable", parameters, n), operating_systems)]
+
+    columns = [
+        names,
+        operating_systems,
+        _perc_column(sampler, "Computer", "enabled", parameters, n),
+        _perc_column(sampler, "Computer", "haslaps", parameters, n),
+        [t in ("PAW", "Server") for t in types],
+        _timestamp_column(sampler, current_time, n),
+        _timestamp_column(sampler, current_time, n),
+        [generate_client_service_pricipal_names(name) for name in names],
+        _perc_column(sampler, "Computer", "unconstraineddelegation", parameters, n),
+        _perc_column(sampler, "Computer", "privesc", parameters, n),
+        _perc_column(sampler, "Computer", "creddump", parameters, n),
+        exploitable,
+        [domain_name] * n,
+        _take_sids(domain_sid, n),
+        ["AD"] * n,
+        [get_run_id()] * n,
+    ]
+    indices = bulk_node_operation("Computer", COMPUTER_KEYS, columns)
+
+    # Regualar computer / Workstations --MemberOf--> Domain Computers Group
+    if Workstation:
+        workstations = [index for index, t in zip(indices, types) if t == "Workstation"]
+        bulk_edge_operation(workstations, get_node_index(group_name + "_Group", "name"),
+                            "MemberOf", ["isacl"], [False])
+
+    return computers, PAW, Server, Workstation
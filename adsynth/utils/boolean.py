@@ -41,10 +41,7 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import random
+from adsynth.utils.sampling import bernoulli
 
 def generate_boolean_value(p_true, p_false):
-    if p_true + p_false == 100:
-        return random.choice([True] * p_true + [False] * p_false)
-    else:
-        return random.choice([True] * 50 + [False] * 50)
\ No newline at end of file
+    return bernoulli(p_true, p_false)()
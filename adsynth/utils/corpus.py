@@ -0,0 +1,143 @@
+"""
+Packed, memory-mapped name corpora.
+
+The name pools (data/first.pkl, last.pkl, domain.pkl) are lists of
+strings.  Unpickling one builds a Python str per name in every process
+that loads it, so each worker of a sweep holds its own copy of the ~94k
+names.  load_corpus converts a pool once into data/<name>.names:
+
+    header   8s magic, <I count
+    offsets  (count + 1) <I, the start of every name in the blob, then its end
+    blob     the UTF-8 names, back to back
+
+and maps that file read-only.  Every process mapping the file shares the
+same page-cache pages, and a name only becomes a str when it is read.
+
+A NameCorpus is a read-only Sequence of the names: corpus[i], len(corpus)
+and random.choice(corpus) (which draws the same index as on the list, so
+the random stream and the generated graph do not change).  sample_indices
+and take draw and decode by index, for code that keeps the indices and
+only needs the strings at the end.
+
+The .names file is rebuilt whenever its .pkl is newer.  If the data
+directory is not writable, the corpus is packed in memory instead (no
+sharing, same contents).
+"""
+
+import mmap
+import os
+import pickle
+import random
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+CORPUS_MAGIC = b"ADSNAME1"
+CORPUS_SUFFIX = ".names"
+
+_HEADER = struct.Struct("<8sI")
+
+# path -> NameCorpus mapped by this process
+_CORPORA = {}
+
+
+def pack_corpus(names):
+    """The packed bytes of a list of names."""
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = [0]
+    for name in encoded:
+        offsets.append(offsets[-1] + len(name))
+    return (_HEADER.pack(CORPUS_MAGIC, len(encoded))
+            + struct.pack(f"<{len(offsets)}I", *offsets)
+            + b"".join(encoded))
+
+
+def write_corpus(names, path):
+    """Pack names into path (atomically: concurrent writers leave one whole file)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pack_corpus(names))
+    os.replace(tmp, path)
+
+
+class NameCorpus(Sequence):
+    """A read-only sequence of names over packed corpus bytes (a mmap or bytes)."""
+
+    def __init__(self, buffer, path=None):
+        magic, count = _HEADER.unpack_from(buffer, 0)
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f"Not a name corpus: {path or 'buffer'}")
+        self._buffer = buffer
+        self._count = count
+        self._blob = _HEADER.size + 4 * (count + 1)
+        offsets = memoryview(buffer)[_HEADER.size:self._blob]
+        if sys.byteorder == "little":
+            self._offsets = offsets.cast("I")
+        else:
+            self._offsets = array("I", offsets)
+            self._offsets.byteswap()
+        self.path = path
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    def __reduce__(self):
+        # Sent to another process: it maps the file itself
+        if self.path is None:
+            return NameCorpus, (bytes(self._buffer),)
+        return NameCorpus.open, (self.path,)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(range(*i.indices(self._count)))
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("corpus index out of range")
+        blob = self._blob
+        return str(self._buffer[blob + self._offsets[i]:blob + self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        return iter(self.take(range(self._count)))
+
+    def sample_indices(self, n, rng=random):
+        """n uniform draws of an index (each as random.choice would draw it)."""
+        count = self._count
+        if not count:
+            raise IndexError("Cannot sample from an empty corpus")
+        randrange = rng.randrange
+        return [randrange(count) for _ in range(n)]
+
+    def take(self, indices):
+        """The names at indices."""
+        buffer, blob, offsets = self._buffer, self._blob, self._offsets
+        return [str(buffer[blob + offsets[i]:blob + offsets[i + 1]], "utf-8") for i in indices]
+
+    def tolist(self):
+        return self.take(range(self._count))
+
+
+def load_corpus(pkl_path):
+    """The NameCorpus of a pickled name list, converted on first use."""
+    corpus = _CORPORA.get(pkl_path)
+    if corpus is not None:
+        return corpus
+    path = os.path.splitext(pkl_path)[0] + CORPUS_SUFFIX
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(pkl_path):
+        with open(pkl_path, "rb") as f:
+            names = pickle.load(f)
+        try:
+            write_corpus(names, path)
+        except OSError:
+            # Read-only data directory: a private copy of the packed corpus
+            corpus = NameCorpus(pack_corpus(names))
+    if corpus is None:
+        corpus = NameCorpus.open(path)
+    _CORPORA[pkl_path] = corpus
+    return corpus
@@ -42,31 +42,28 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
-import pickle
 import json
 from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.utils.corpus import load_corpus
 
 
 def get_data_path():
     # return os.path.expanduser("~") + "/.adsynth/data/"
-    print(os.getcwd())
     return os.getcwd() + "/data/"
 
 
+# The pools are NameCorpus sequences (adsynth/utils/corpus.py), mapped once
+# per process and shared with generators/common.py
 def get_names_pool():
-    with open(get_data_path() + 'first.pkl', 'rb') as f:
-        return pickle.load(f)
-        
+    return load_corpus(get_data_path() + 'first.pkl')
 
 
 def get_surnames_pool():
-    with open(get_data_path() + 'last.pkl', 'rb') as f:
-        return pickle.load(f)
+    return load_corpus(get_data_path() + 'last.pkl')
 
 
 def get_domains_pool():
-    with open(get_data_path() + 'domain.pkl', 'rb') as f:
-        return pickle.load(f)
+    return load_corpus(get_data_path() + 'domain.pkl')
 
 
 def get_parameters_from_json(json_path):
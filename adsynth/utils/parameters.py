@@ -41,14 +41,122 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import functools
 import json
 from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError("compiled parameters are read-only, edit the source dict and compile again")
+
+
+class _ReadOnlyDict(dict):
+    # A nested object of CompiledParameters; copies are plain dicts
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _ReadOnlyList(list):
+    # A list of CompiledParameters; copies are plain lists
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return _ReadOnlyDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return _ReadOnlyList(_freeze(item) for item in value)
+    return value
+
+
+class CompiledParameters(dict):
+    """
+    Read-only snapshot of a parameters dict, made once per run by
+    compile_parameters.
+
+    It can be passed anywhere a parameters dict is expected.  Because it
+    cannot change (nested objects and lists included), the getters
+    decorated with compiled_lookup compute each answer (defaults, clamps,
+    derived lists) once and then return it from lookup_cache, so
+    synthesizers can call them inside per-object loops.  The objects and
+    lists they return are the read-only ones of the snapshot (or
+    DEFAULT_CONFIGURATIONS'): copy one to change it.  problems lists the
+    entries that do not match DEFAULT_CONFIGURATIONS; the getters fall
+    back to the defaults for those.
+    """
+
+    def __init__(self, parameters):
+        super().__init__((key, _freeze(value)) for key, value in parameters.items())
+        self.lookup_cache = {}
+        self.problems = validate_parameters(self)
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return CompiledParameters, (dict(self),)
+
+
+def compile_parameters(parameters):
+    if isinstance(parameters, CompiledParameters):
+        return parameters
+    return CompiledParameters(parameters)
+
+
+def validate_parameters(parameters, defaults = DEFAULT_CONFIGURATIONS, path = ""):
+    # Unknown keys of a section and values whose type does not match the
+    # default.  Top-level keys of other generators and the keys of nested
+    # tables (probabilities, ...) are open-ended and not reported.
+    problems = []
+    for key, value in parameters.items():
+        name = f"{path}{key}"
+        if key not in defaults:
+            if path and "." not in path[:-1]:
+                problems.append(f"{name}: unknown parameter")
+            continue
+        default = defaults[key]
+        if isinstance(default, dict):
+            if not isinstance(value, dict):
+                problems.append(f"{name}: expected an object, the default is used")
+            elif default:
+                problems.extend(validate_parameters(value, default, name + "."))
+        elif isinstance(default, bool) != isinstance(value, bool) or \
+                isinstance(default, (int, float)) and not isinstance(value, (int, float)) or \
+                isinstance(default, list) and not isinstance(value, list):
+            problems.append(f"{name}: expected {type(default).__name__}, the default is used")
+    return problems
+
+
+def compiled_lookup(getter):
+    # Memoise getter(..., parameters) when parameters is a CompiledParameters.
+    # Every caller gets the same answer, so it is made read-only.
+    @functools.wraps(getter)
+    def lookup(*args):
+        cache = getattr(args[-1], "lookup_cache", None)
+        if cache is None:
+            return getter(*args)
+        key = (getter, args[:-1])
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = _freeze(getter(*args))
+            return value
+    return lookup
+
     
 def print_all_parameters(parameters):
     print("")
     print("New Settings:")
     print(json.dumps(parameters, indent=4, sort_keys=True))
 
+@compiled_lookup
 def get_perc_param_value(node, key, parameters):
     try:
         if 0 <= parameters[node][key] <= 100:
@@ -58,16 +166,18 @@ def get_perc_param_value(node, key, parameters):
     except:
         return DEFAULT_CONFIGURATIONS[node][key]
 
+@compiled_lookup
 def get_dict_param_value(node, key, parameters):
     try:
         value = parameters[node][key]
-        if type(value) == dict:
+        if isinstance(value, dict):
             return value
         else:
             return DEFAULT_CONFIGURATIONS[node][key]
     except:
         return DEFAULT_CONFIGURATIONS[node][key]
 
+@compiled_lookup
 def get_int_param_value(node, key, parameters):
     try:
         value = parameters[node][key]
@@ -0,0 +1,199 @@
+"""
+Shared samplers for the synthesizers.
+
+Percentages in the parameter file are turned into samplers once, outside
+the per-object loops, and every draw then costs a single random():
+
+    Bernoulli      - a precomputed threshold:  random() < p_true / 100
+    AliasSampler   - Vose's alias method for weighted categorical draws
+
+bernoulli() caches one Bernoulli per (p_true, p_false) pair, so
+generate_boolean_value and other call sites that cannot hoist a sampler
+still avoid building the former 100-element [True] * p + [False] * q list.
+
+Reproducibility: a draw consumes one random() instead of random.choice()
+over an expanded list, so the same seed gives a different (but equally
+distributed) graph than before.  SAMPLING_VERSION identifies the stream:
+
+    1 - random.choice over expanded weight lists
+    2 - Bernoulli thresholds and alias tables (this module)
+    3 - GUIDs drawn from the random module too (random_guid)
+
+ExcludingChoice is random.choice over a list of distinct ids minus one of
+them, without building the filtered list for every draw.  It consumes the
+same random numbers as the list version, so it does not change the stream.
+
+ColumnSampler draws a whole column of N values per call for the bulk
+object factory (adsynth/synthesizer/vectorized_objects.py).  It uses a
+NumPy Generator when NumPy is installed (it is in requirements.txt) and a
+random.Random otherwise, about 1.4x slower; both are seeded from the global
+random module, so a run stays reproducible for a given seed and backend,
+but the two backends give different graphs.
+"""
+
+import random
+import uuid
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SAMPLING_VERSION = 3
+
+
+def random_guid(rng=random):
+    """A version 4 GUID from rng, so a seeded run draws the same GUIDs."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+class Bernoulli:
+    """True with probability p_true %; 50/50 if p_true + p_false != 100."""
+
+    __slots__ = ("threshold",)
+
+    def __init__(self, p_true, p_false):
+        if p_true + p_false == 100:
+            self.threshold = p_true / 100
+        else:
+            self.threshold = 0.5
+
+    def __call__(self, rng=random):
+        return rng.random() < self.threshold
+
+
+class AliasSampler:
+    """O(1) weighted choice over items (Vose's alias method)."""
+
+    __slots__ = ("items", "prob", "alias", "n")
+
+    def __init__(self, items, weights):
+        items = list(items)
+        weights = list(weights)
+        total = sum(weights)
+        if not items or total <= 0:
+            raise ValueError("AliasSampler needs at least one item with a positive weight")
+        n = len(items)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        self.items = items
+        self.prob = prob
+        self.alias = alias
+        self.n = n
+
+    @classmethod
+    def from_list(cls, weighted_list):
+        """Sampler equivalent to random.choice(weighted_list) for lists like
+        ["PAW"] * 15 + ["Server"] * 20 + ...; items keep first-seen order."""
+        counts = {}
+        for item in weighted_list:
+            counts[item] = counts.get(item, 0) + 1
+        return cls(counts.keys(), counts.values())
+
+    def __call__(self, rng=random):
+        u = rng.random() * self.n
+        i = int(u)
+        if u - i < self.prob[i]:
+            return self.items[i]
+        return self.items[self.alias[i]]
+
+
+_BERNOULLI_CACHE = {}
+
+def bernoulli(p_true, p_false):
+    sampler = _BERNOULLI_CACHE.get((p_true, p_false))
+    if sampler is None:
+        sampler = _BERNOULLI_CACHE[(p_true, p_false)] = Bernoulli(p_true, p_false)
+    return sampler
+
+
+FAIR_COIN = Bernoulli(50, 50)
+
+
+class ExcludingChoice:
+    """
+    O(1) random.choice([i for i in items if i != excluded]) for distinct
+    items.  Returns None when no other item is left.
+    """
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.positions = {item: i for i, item in enumerate(self.items)}
+
+    def __call__(self, excluded=None, rng=random):
+        position = self.positions.get(excluded)
+        if position is None:
+            return rng.choice(self.items) if self.items else None
+        if len(self.items) == 1:
+            return None
+        # The i-th item of the filtered list, drawn with the same
+        # _randbelow(len - 1) random.choice would use on it
+        i = rng.choice(range(len(self.items) - 1))
+        return self.items[i if i < position else i + 1]
+
+
+class ColumnSampler:
+    """Whole-column draws: bools / integers / uniform and weighted choices."""
+
+    def __init__(self, seed=None, backend=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        if backend is None:
+            backend = "numpy" if numpy is not None else "random"
+        if backend == "numpy":
+            if numpy is None:
+                raise ValueError("ColumnSampler backend 'numpy' needs NumPy installed")
+            self._gen = numpy.random.default_rng(seed)
+        elif backend == "random":
+            self._rng = random.Random(seed)
+        else:
+            raise ValueError(f"Unknown ColumnSampler backend: {backend!r}")
+        self.backend = backend
+
+    def bools(self, p_true, p_false, n):
+        """n draws of Bernoulli(p_true, p_false)."""
+        threshold = Bernoulli(p_true, p_false).threshold
+        if self.backend == "numpy":
+            return (self._gen.random(n) < threshold).tolist()
+        r = self._rng.random
+        return [r() < threshold for _ in range(n)]
+
+    def integers(self, low, high, n):
+        """n draws of randint(low, high) (both ends inclusive)."""
+        if self.backend == "numpy":
+            return self._gen.integers(low, high, size=n, endpoint=True).tolist()
+        randrange = self._rng.randrange
+        return [randrange(low, high + 1) for _ in range(n)]
+
+    def choices(self, items, n):
+        """n uniform draws from items."""
+        return [items[i] for i in self.integers(0, len(items) - 1, n)]
+
+    def weighted(self, weighted_list, n):
+        """n draws equivalent to random.choice(weighted_list), cf. AliasSampler.from_list."""
+        if self.backend == "numpy":
+            counts = {}
+            for item in weighted_list:
+                counts[item] = counts.get(item, 0) + 1
+            items = list(counts)
+            weights = numpy.fromiter(counts.values(), dtype=float, count=len(items))
+            indices = self._gen.choice(len(items), size=n, p=weights / weights.sum())
+            return [items[i] for i in indices.tolist()]
+        sampler = AliasSampler.from_list(weighted_list)
+        rng = self._rng
+        return [sampler(rng) for _ in range(n)]
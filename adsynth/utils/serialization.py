@@ -0,0 +1,103 @@
+"""
+Pluggable JSON serializer shared by all exporters.
+
+Every backend turns one object into compact UTF-8 JSON bytes, so exporters
+can open their output in binary mode and write the result directly:
+
+    orjson   - used when installed (fastest)
+    msgspec  - used when installed and orjson is not
+    json     - stdlib fallback
+
+All three produce the same bytes for the data ADSynth generates (str / int /
+bool / None / list / dict): compact separators, dict insertion order and
+non-ASCII characters written as UTF-8 rather than \\uXXXX escapes.
+
+The backend can be forced with set_serializer(name) or the
+ADSYNTH_SERIALIZER environment variable.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class Serializer:
+    """A named pair of compact / indented ``obj -> bytes`` encoders."""
+
+    __slots__ = ("name", "dumps", "dumps_pretty")
+
+    def __init__(self, name, dumps, dumps_pretty):
+        self.name = name
+        self.dumps = dumps
+        self.dumps_pretty = dumps_pretty
+
+    def dumps_line(self, obj):
+        return self.dumps(obj) + b"\n"
+
+    def __repr__(self):
+        return f"Serializer({self.name!r})"
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _json_dumps_pretty(obj):
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _build_serializers():
+    serializers = {}
+    if orjson is not None:
+        serializers["orjson"] = Serializer(
+            "orjson", orjson.dumps,
+            lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    if msgspec is not None:
+        encoder = msgspec.json.Encoder()
+        serializers["msgspec"] = Serializer(
+            "msgspec", encoder.encode,
+            lambda obj: msgspec.json.format(encoder.encode(obj), indent=2))
+    serializers["json"] = Serializer("json", _json_dumps, _json_dumps_pretty)
+    return serializers
+
+
+SERIALIZERS = _build_serializers()
+
+_active = None
+
+
+def available_serializers():
+    """Names of the installed backends, fastest first."""
+    return list(SERIALIZERS)
+
+
+def set_serializer(name=None):
+    """
+    Select the backend used by get_serializer().
+
+    name=None picks ADSYNTH_SERIALIZER if set, else the fastest installed
+    backend. Raises ValueError for a backend that is not installed.
+    """
+    global _active
+    if name is None:
+        name = os.environ.get("ADSYNTH_SERIALIZER") or next(iter(SERIALIZERS))
+    if name not in SERIALIZERS:
+        raise ValueError(
+            f"Serializer '{name}' is not available; installed: {available_serializers()}"
+        )
+    _active = SERIALIZERS[name]
+    return _active
+
+
+def get_serializer():
+    if _active is None:
+        return set_serializer()
+    return _active
@@ -0,0 +1,196 @@
+"""
+bench_azure.py — Azure relationship / permission generator scaling benchmark
+============================================================================
+Builds the Azure objects of generate_data_azure (tenant, roles, users,
+groups, service principals, key vaults, VMs) for an increasing number of
+AZUsers and times the relationship and permission generators:
+
+  * scan     — the previous az_assign_roles / az_create_permissions, which
+               scan the nodes once per role and rebuild the candidate list
+               (users minus the source user, ...) for every draw
+               (O(users^2))
+  * indexed  — the current generators: one name index over the nodes and
+               ExcludingChoice draws (O(users))
+
+Both draw the same random numbers, so they must add exactly the same
+edges.  Then the whole MainMenu.generate_data_azure run (including the
+JSON export) is timed; its "us/user" column stays flat as the user count
+grows.
+
+Run from the repository root:
+    python benchmarks/bench_azure.py --users 5000 10000 20000 40000
+    python benchmarks/bench_azure.py --users 100000 500000 --skip-scan
+"""
+
+import argparse
+import copy
+import io
+import os
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adsynth.DATABASE as DB
+from adsynth.DATABASE import EDGES, az_edge_operation
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.azure_ad_system.az_default_groups import az_create_groups
+from adsynth.azure_ad_system.az_default_key_vaults import az_create_key_vaults
+from adsynth.azure_ad_system.az_default_permissions import az_create_permissions
+from adsynth.azure_ad_system.az_default_relationships import az_assign_roles
+from adsynth.azure_ad_system.az_default_roles import az_create_roles
+from adsynth.azure_ad_system.az_default_service_principals import az_create_service_principals
+from adsynth.azure_ad_system.az_default_subscriptions import az_create_subscriptions
+from adsynth.azure_ad_system.az_default_tenants import az_create_tenant
+from adsynth.azure_ad_system.az_default_users import az_create_users
+from adsynth.azure_ad_system.az_default_vms import az_create_vms
+from adsynth.utils.parameters import get_perc_param_value
+
+SEED = 7
+TENANT = "CORP.ONMICROSOFT.COM"
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+def build_objects(num_users):
+    DB.reset_DB()
+    random.seed(SEED)
+    params = copy.deepcopy(DEFAULT_CONFIGURATIONS)
+    params["AZUser"]["nUsers"] = num_users
+    tenant_id = az_create_tenant(TENANT)
+    subscriptions = az_create_subscriptions(TENANT, tenant_id, params)
+    roles = az_create_roles(tenant_id, params)
+    users = az_create_users(TENANT, tenant_id, roles, ["Ann", "Bob", "Cy"], ["Lee", "Ng", "Roe"], params)
+    groups = az_create_groups(tenant_id, params)
+    service_principals = az_create_service_principals(tenant_id, params)
+    key_vaults = az_create_key_vaults(tenant_id, subscriptions, params)
+    vms = az_create_vms(tenant_id, subscriptions, params)
+    return params, (users, groups, service_principals, roles, tenant_id, subscriptions[0]), (key_vaults, vms)
+
+
+# ---------------------------------------------------------------------------
+# Baseline: the scan-based generators the indexes replaced
+# ---------------------------------------------------------------------------
+
+def _has_role(source, target, scope):
+    az_edge_operation(source, target, "AZHasRole", ["scope"], [scope])
+
+def _edge(source, target, rel_type):
+    az_edge_operation(source, target, rel_type)
+
+def _named(candidate, name):
+    return any(DB.get_node_property(node, "name") == name and DB.get_node_property(node, "objectid") == candidate
+               for node in range(DB.get_num_nodes()))
+
+def scan_assign_roles(users, groups, service_principals, roles, tenant_id, subscription_id, params):
+    global_admin_role = next((r for r in roles if _named(r, "Global Administrator")), None)
+    global_admin_user = next((u for u in users if _named(u, "Global Admin")), None)
+    for user_id in [u for u in users if u != global_admin_user]:
+        if random.random() * 100 < get_perc_param_value("AZRole", "assignChanceUsers", params):
+            _has_role(user_id, random.choice([r for r in roles if r != global_admin_role]), subscription_id)
+    eligible_users = [u for u in users if u != global_admin_user]
+    num_overprivileged = min(int(len(users) * (get_perc_param_value("AZMisconfig", "overprivileged_users", params) / 100)), len(eligible_users))
+    for user_id in random.sample(eligible_users, num_overprivileged):
+        if global_admin_role:
+            _has_role(user_id, global_admin_role, tenant_id)
+    for group_id in groups:
+        if random.random() * 100 < get_perc_param_value("AZRole", "assignChanceGroups", params):
+            role_id = random.choice(roles)
+            _has_role(group_id, role_id, tenant_id if role_id == global_admin_role else subscription_id)
+    for sp_id in service_principals:
+        if random.random() * 100 < get_perc_param_value("AZRole", "assignChanceServicePrincipals", params):
+            _has_role(sp_id, random.choice([r for r in roles if r != global_admin_role]), subscription_id)
+
+def scan_create_permissions(users, groups, service_principals, key_vaults, vms, params):
+    num_reset_users = int(len(users) * (get_perc_param_value("AZMisconfig", "reset_password", params) / 100))
+    for user_id in random.sample(users, min(num_reset_users, len(users))):
+        _edge(user_id, random.choice([u for u in users if u != user_id]), "AZResetPassword")
+    num_add_members = int(len(users) * (get_perc_param_value("AZMisconfig", "add_member", params) / 100))
+    for user_id in random.sample(users, min(num_add_members, len(users))):
+        if groups:
+            _edge(user_id, random.choice(groups), "AZAddMembers")
+    principals = users + service_principals
+    num_add_secrets = int(len(principals) * (get_perc_param_value("AZMisconfig", "add_secret", params) / 100))
+    for principal_id in random.sample(principals, min(num_add_secrets, len(principals))):
+        target_sp = random.choice([sp for sp in service_principals if sp != principal_id]) if service_principals else None
+        if target_sp:
+            _edge(principal_id, target_sp, "AZAddSecret")
+    num_owns = int(len(principals) * (get_perc_param_value("AZMisconfig", "owns_resource", params) / 100))
+    resources = key_vaults + vms
+    for principal_id in random.sample(principals, min(num_owns, len(principals))):
+        if resources:
+            _edge(principal_id, random.choice(resources), "AZOwns")
+    num_misconfig_members = int(len(users) * (get_perc_param_value("AZMisconfig", "misconfig_group_members", params) / 100))
+    for user_id in random.sample(users, min(num_misconfig_members, len(users))):
+        if groups:
+            _edge(user_id, random.choice(groups), "AZMemberOf")
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def timed_relationships(num_users, assign_roles, create_permissions):
+    params, role_args, resources = build_objects(num_users)
+    users, groups, service_principals = role_args[:3]
+    first_edge = len(EDGES)
+    random.seed(SEED)
+    start = time.perf_counter()
+    assign_roles(*role_args, params)
+    create_permissions(users, groups, service_principals, *resources, params)
+    elapsed = time.perf_counter() - start
+    # Node ids continue from earlier builds and object ids are fresh uuid4s:
+    # compare ids relative to the first node and the scope by what it is
+    first_id = int(DB.get_node_endpoint(0)[0])
+    scope = lambda edge: "tenant" if edge["properties"].get("scope") == role_args[4] else "scope" in edge["properties"]
+    return elapsed, [(int(e["start"]["id"]) - first_id, int(e["end"]["id"]) - first_id, e["label"], scope(e))
+                     for e in EDGES[first_edge:]]
+
+def timed_generate_azure(num_users):
+    from adsynth.ADSynth import MainMenu
+    with redirect_stdout(io.StringIO()):
+        menu = MainMenu()
+        menu.parameters = copy.deepcopy(menu.parameters)
+        menu.parameters["seed"] = SEED
+        menu.parameters["AZUser"]["nUsers"] = num_users
+        start = time.perf_counter()
+        menu.generate_data_azure()
+        elapsed = time.perf_counter() - start
+    num_nodes, num_edges = DB.get_num_nodes(), DB.get_num_edges()
+    os.remove(f"generated_datasets/{menu.dbname}.json")
+    return elapsed, num_nodes, num_edges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Azure relationship and permission generators")
+    parser.add_argument("--users", type=int, nargs="+", default=[5000, 10000, 20000, 40000])
+    parser.add_argument("--skip-scan", action="store_true",
+                        help="only time the indexed generators")
+    args = parser.parse_args(argv)
+
+    print(f"\n  {'users':>8}{'scan s':>10}{'indexed s':>11}{'speed-up':>10}"
+          f"{'nodes':>10}{'edges':>10}{'azure s':>10}{'us/user':>9}")
+    ok = True
+    for num_users in args.users:
+        indexed_s, indexed = timed_relationships(num_users, az_assign_roles, az_create_permissions)
+        if args.skip_scan:
+            scan_col, speedup = f"{'-':>10}", f"{'-':>10}"
+        else:
+            scan_s, scan = timed_relationships(num_users, scan_assign_roles, scan_create_permissions)
+            ok &= scan == indexed
+            scan_col, speedup = f"{scan_s:>10.3f}", f"{scan_s / indexed_s:>9.1f}x"
+        azure_s, num_nodes, num_edges = timed_generate_azure(num_users)
+        print(f"  {num_users:>8}{scan_col}{indexed_s:>11.4f}{speedup}"
+              f"{num_nodes:>10}{num_edges:>10}{azure_s:>10.3f}{azure_s / num_users * 1e6:>9.2f}")
+    DB.reset_DB()
+    if not args.skip_scan:
+        print(f"\n  scan and indexed add the same edges: {ok}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
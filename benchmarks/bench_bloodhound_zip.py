@@ -0,0 +1,79 @@
+"""
+bench_bloodhound_zip.py — BloodHound CE export: compression workers and level
+=============================================================================
+Times bloodhound_exporter.export_bloodhound on a synthetic hybrid graph
+(AD/Entra users, groups, computers; MEMBER_OF, CLOUD_MEMBER_OF, ADMIN_TO and
+generic edges) for every combination of --workers and --levels, and reports
+wall seconds, zip size and peak RSS.  The graph is generated on the fly, so
+the benchmark itself holds no node or edge lists.
+
+The zip members are identical for every worker count; only the time changes,
+and only on machines with more than one core.
+
+Run from the repository root:
+    python benchmarks/bench_bloodhound_zip.py --nodes 1000000 --workers 1 2 4 --levels 1 6
+"""
+
+import argparse
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bloodhound_exporter import export_bloodhound
+
+# (label, plane) of the node kinds, in rotation
+NODE_KINDS = [("User", "AD"), ("User", "Entra"), ("Group", "AD"), ("AzureADGroup", "Entra"), ("Computer", "AD")]
+REL_TYPES = ["MEMBER_OF", "CLOUD_MEMBER_OF", "ADMIN_TO", "HAS_SESSION", "SYNCED_TO"]
+
+
+def iter_nodes(n):
+    for i in range(n):
+        label, plane = NODE_KINDS[i % len(NODE_KINDS)]
+        yield {"id": f"n{i}", "labels": [label],
+               "properties": {"name": f"{label.lower()}{i}@corp.local", "objectid": f"S-1-5-21-1000-{i}",
+                              "plane": plane, "runId": "bench", "enabled": i % 7 != 0,
+                              "description": f"synthetic {label} {i}"}}
+
+
+def iter_edges(n, m):
+    for j in range(m):
+        yield {"start": f"n{(j * 7919) % n}", "end": f"n{(j * 104729 + 2) % n}",
+               "relType": REL_TYPES[j % len(REL_TYPES)], "properties": {}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BloodHound zip compression")
+    parser.add_argument("--nodes", type=int, default=1000000, help="nodes in the graph (default: 1000000)")
+    parser.add_argument("--edges-per-node", type=float, default=2.0, help="edges per node (default: 2)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="compression thread counts (default: 1 2 4)")
+    parser.add_argument("--levels", type=int, nargs="+", default=[6], help="zlib levels (default: 6)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="records per zip member (default: 10000)")
+    args = parser.parse_args(argv)
+
+    n = args.nodes
+    m = int(n * args.edges_per_node)
+    print(f"\n  {n} nodes, {m} edges, {os.cpu_count()} CPUs")
+    print(f"  {'workers':>7}{'level':>7}{'seconds':>10}{'zip MB':>9}{'peak RSS MB':>13}")
+    for level in args.levels:
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                start = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    path = export_bloodhound(iter_nodes(n), iter_edges(n, m), tmp, "bench",
+                                             chunk_size=args.chunk_size, workers=workers, compresslevel=level)
+                elapsed = time.perf_counter() - start
+                size = os.path.getsize(path) / 1e6
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"  {workers:>7}{level:>7}{elapsed:>10.2f}{size:>9.1f}{rss:>13.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
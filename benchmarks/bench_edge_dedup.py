@@ -0,0 +1,146 @@
+"""
+bench_edge_dedup.py — edge dedup key benchmark
+==============================================
+Records every edge_operation call made by a real legacy generate_data run,
+then replays the call stream through two dedup indexes:
+
+  * string  — the original str(start) + relType + str(end) keys
+  * packed  — the packed (start, type code, end) int keys used by DATABASE
+
+and reports build time, tracemalloc peak / retained bytes and the number of
+distinct keys for each.  Both indexes must see exactly the same number of
+distinct edges as the generator produced (collision-free).
+
+Run from the repository root:
+    python benchmarks/bench_edge_dedup.py --users 50000
+"""
+
+import argparse
+import copy
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adsynth.DATABASE as DB
+
+
+# ---------------------------------------------------------------------------
+# Call recording
+# ---------------------------------------------------------------------------
+
+_calls_start = array("q")
+_calls_end = array("q")
+_calls_type = array("l")
+_type_names = []
+_type_codes = {}
+
+_edge_operation = DB.edge_operation
+
+def _recording_edge_operation(start_index, end_index, relationship_type, props=[], values=[]):
+    code = _type_codes.get(relationship_type)
+    if code is None:
+        code = _type_codes[relationship_type] = len(_type_names)
+        _type_names.append(relationship_type)
+    _calls_start.append(start_index)
+    _calls_end.append(end_index)
+    _calls_type.append(code)
+    return _edge_operation(start_index, end_index, relationship_type, props, values)
+
+# Must be installed before the synthesizers do `from adsynth.DATABASE import edge_operation`
+DB.edge_operation = _recording_edge_operation
+
+from adsynth.ADSynth import MainMenu  # noqa: E402
+
+
+def run_generate_data(num_users, num_computers, columnar):
+    menu = MainMenu()
+    menu.parameters = copy.deepcopy(menu.parameters)
+    menu.parameters["User"]["nUsers"] = num_users
+    if num_computers is not None:
+        menu.parameters["Computer"]["nComputers"] = num_computers
+    menu.parameters["columnar_store"] = 1 if columnar else 0
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        menu.do_generate("")
+    elapsed = time.perf_counter() - start
+    os.remove(f"generated_datasets/{menu.dbname}.json")
+    os.remove(f"generated_datasets/{menu.dbname}.phases.json")
+    return elapsed, len(DB.dict_edges)
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def string_keys(index):
+    for start, end, code in zip(_calls_start, _calls_end, _calls_type):
+        key = str(start) + _type_names[code] + str(end)
+        if key not in index:
+            index[key] = len(index)
+
+def packed_keys(index):
+    type_bits, node_bits = DB.EDGE_KEY_TYPE_BITS, DB.EDGE_KEY_NODE_BITS
+    for start, end, code in zip(_calls_start, _calls_end, _calls_type):
+        key = (((start << type_bits) | code) << node_bits) | end
+        if key not in index:
+            index[key] = len(index)
+
+def replay(builder):
+    # Timed without tracemalloc (it slows allocation down by an order of
+    # magnitude), then replayed once more to measure allocations.
+    gc.collect()
+    index = {}
+    start = time.perf_counter()
+    builder(index)
+    elapsed = time.perf_counter() - start
+    del index
+
+    gc.collect()
+    index = {}
+    tracemalloc.start()
+    builder(index)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "retained": retained, "peak": peak, "distinct": len(index)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the edge dedup key")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--computers", type=int, default=None,
+                        help="nComputers (defaults to the parameter default)")
+    parser.add_argument("--dict-store", action="store_true",
+                        help="use the dict-backed NODES/EDGES instead of the columnar store")
+    args = parser.parse_args(argv)
+
+    print(f"generate_data with {args.users} users ...")
+    gen_seconds, num_edges = run_generate_data(args.users, args.computers, not args.dict_store)
+    print(f"  generation time     : {gen_seconds:.2f} s")
+    print(f"  edge_operation calls: {len(_calls_start)}")
+    print(f"  distinct edges      : {num_edges}")
+
+    results = {"string": replay(string_keys), "packed": replay(packed_keys)}
+
+    print(f"\n  {'key':<8}{'time (s)':>10}{'peak MB':>10}{'retained MB':>13}{'distinct':>11}")
+    for name, r in results.items():
+        print(f"  {name:<8}{r['seconds']:>10.3f}{r['peak'] / 2**20:>10.1f}"
+              f"{r['retained'] / 2**20:>13.1f}{r['distinct']:>11}")
+
+    s, p = results["string"], results["packed"]
+    print(f"\n  speed-up            : {s['seconds'] / p['seconds']:.2f}x")
+    print(f"  memory saved        : {(s['retained'] - p['retained']) / 2**20:.1f} MB")
+    collision_free = s["distinct"] == p["distinct"] == num_edges
+    print(f"  collision-free      : {collision_free}")
+    return 0 if collision_free else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+bench_object_factory.py — per-object vs bulk user/computer factory
+==================================================================
+Times the creation of N users and N computers (nodes + MemberOf edges) in
+the legacy DATABASE with:
+
+  * loop       — generate_users / generate_computers (one node_operation
+                 per object)
+  * bulk       — generate_users_vectorized / generate_computers_vectorized
+                 (column draws + one bulk_node_operation), with each
+                 installed ColumnSampler backend
+
+on the dict backend and the columnar store (adsynth/graph_store.py).  The
+"numpy" backend is only timed when NumPy is installed (requirements.txt).
+
+Run from the repository root:
+    python benchmarks/bench_object_factory.py --users 100000 1000000
+
+100000 users + 100000 computers, 1 CPU, NumPy 2.4:
+
+    store     factory        seconds
+    dict      loop              7.50
+    dict      bulk/numpy        2.16
+    dict      bulk/random       2.83
+    columnar  loop             10.69
+    columnar  bulk/numpy        1.28
+    columnar  bulk/random       1.77
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adsynth.DATABASE as DB
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.synthesizer.objects import generate_computers, generate_users
+from adsynth.synthesizer.vectorized_objects import generate_computers_vectorized, generate_users_vectorized
+from adsynth.utils.sampling import ColumnSampler, numpy
+
+DOMAIN = "TESTLAB.LOCAL"
+DOMAIN_SID = "S-1-5-21-883232822-274137685-4173207997"
+FIRST_NAMES = [f"First{i}" for i in range(5000)]
+LAST_NAMES = [f"Last{i}" for i in range(20000)]
+CURRENT_TIME = 1700000000
+
+
+def reset(columnar):
+    DB.use_columnar_store(columnar)
+    DB.reset_DB()
+    DB.ridcount.extend([1000])
+    for name, rid in (("DOMAIN USERS", 513), ("DOMAIN COMPUTERS", 515)):
+        DB.node_operation("Group", ["name", "objectid", "labels"],
+                          [f"{name}@{DOMAIN}", f"{DOMAIN_SID}-{rid}", "Group"], f"{DOMAIN_SID}-{rid}")
+
+
+def run_loop(n):
+    generate_users(DOMAIN, DOMAIN_SID, n, CURRENT_TIME, FIRST_NAMES, LAST_NAMES, DEFAULT_CONFIGURATIONS)
+    generate_computers(DOMAIN, DOMAIN_SID, n, [], CURRENT_TIME, DEFAULT_CONFIGURATIONS)
+
+
+def run_bulk(n, backend):
+    sampler = ColumnSampler(seed=1, backend=backend)
+    generate_users_vectorized(DOMAIN, DOMAIN_SID, n, CURRENT_TIME, FIRST_NAMES, LAST_NAMES,
+                              DEFAULT_CONFIGURATIONS, sampler)
+    generate_computers_vectorized(DOMAIN, DOMAIN_SID, n, [], CURRENT_TIME, DEFAULT_CONFIGURATIONS, sampler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the user/computer factories")
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000],
+                        help="users (and computers) per run (default: 10000 100000)")
+    parser.add_argument("--skip-loop", action="store_true",
+                        help="only time the bulk factory")
+    args = parser.parse_args(argv)
+
+    variants = [] if args.skip_loop else [("loop", run_loop)]
+    if numpy is None:
+        print("NumPy is not installed: only the random.Random ColumnSampler backend is timed")
+    for backend in (["numpy"] if numpy is not None else []) + ["random"]:
+        variants.append((f"bulk/{backend}", lambda n, b=backend: run_bulk(n, b)))
+
+    print(f"\n  {'objects':>9}  {'store':<9}{'factory':<14}{'seconds':>9}{'us/object':>11}{'nodes':>10}{'edges':>10}")
+    for n in args.users:
+        for columnar in (False, True):
+            for name, runner in variants:
+                reset(columnar)
+                start = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    runner(n)
+                elapsed = time.perf_counter() - start
+                print(f"  {n:>9}  {'columnar' if columnar else 'dict':<9}{name:<14}{elapsed:>9.2f}"
+                      f"{elapsed / (2 * n) * 1e6:>11.2f}{DB.get_num_nodes():>10}{DB.get_num_edges():>10}")
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
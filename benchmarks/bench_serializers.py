@@ -0,0 +1,160 @@
+"""
+bench_serializers.py — exporter throughput per JSON serializer
+==============================================================
+Builds one legacy graph (MainMenu.generate_data) and one hybrid graph
+(run.generate_graph), then times every exporter with each installed
+serializer backend (adsynth.utils.serialization) and with the previous
+per-object json.dumps text path ("baseline"):
+
+  legacy     write_dataset            generated_datasets/<ts>.json
+  hybrid     write_graph_jsonl        <run_dir>/graph.jsonl
+  bloodhound export_bloodhound        <run_dir>/<run_id>_bloodhound.zip
+
+Throughput is uncompressed JSON megabytes per second.
+
+Run from the repository root:
+    python benchmarks/bench_serializers.py --users 5000 --hybrid-users 20000
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import run
+import bloodhound_exporter
+from adsynth.DATABASE import iter_edge_records, iter_node_records
+from adsynth.hybrid_system.export_writer import (
+    HYBRID_EDGES, HYBRID_NODES, _edge_record, _node_record, write_graph_jsonl,
+)
+from adsynth.hybrid_system.hybrid_config import DEFAULT_HYBRID_CONFIG
+from adsynth.streaming_writer import write_dataset
+from adsynth.utils.serialization import available_serializers, set_serializer
+
+
+# ---------------------------------------------------------------------------
+# Baselines: the exporters as they were before the serializer layer
+# ---------------------------------------------------------------------------
+
+def legacy_baseline(path):
+    with open(path, "w") as f:
+        for obj in iter_node_records():
+            obj["type"] = "node"
+            f.write(json.dumps(obj, separators=(',', ':')) + '\n')
+    with open(path, 'a') as f:
+        for obj in iter_edge_records():
+            f.write(json.dumps(obj, separators=(',', ':')) + '\n')
+
+def hybrid_baseline(path):
+    with open(path, "w", encoding="utf-8") as fh:
+        for node in HYBRID_NODES:
+            fh.write(json.dumps(_node_record(node), separators=(",", ":")) + "\n")
+        for edge in HYBRID_EDGES:
+            fh.write(json.dumps(_edge_record(edge), separators=(",", ":")) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Runners — each returns (seconds, uncompressed bytes, file bytes)
+# ---------------------------------------------------------------------------
+
+def run_legacy(tmp, backend):
+    path = os.path.join(tmp, "legacy.json")
+    start = time.perf_counter()
+    if backend == "baseline":
+        legacy_baseline(path)
+    else:
+        write_dataset(path, iter_node_records(), iter_edge_records())
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    return elapsed, size, size
+
+def run_hybrid(tmp, backend):
+    start = time.perf_counter()
+    if backend == "baseline":
+        path = os.path.join(tmp, "graph.jsonl")
+        hybrid_baseline(path)
+    else:
+        path = write_graph_jsonl(tmp)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    return elapsed, size, size
+
+def run_bloodhound(tmp, backend):
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        # Baseline = the former indent=2 output
+        path = bloodhound_exporter.export_bloodhound(
+            HYBRID_NODES, HYBRID_EDGES, tmp, "bench", pretty=(backend == "baseline"))
+    elapsed = time.perf_counter() - start
+    with zipfile.ZipFile(path) as zf:
+        raw = sum(info.file_size for info in zf.infolist())
+    return elapsed, raw, os.path.getsize(path)
+
+
+def build_legacy_graph(num_users):
+    from adsynth.ADSynth import MainMenu
+    menu = MainMenu()
+    menu.parameters = copy.deepcopy(menu.parameters)
+    menu.parameters["User"]["nUsers"] = num_users
+    menu.parameters["Computer"]["nComputers"] = num_users
+    menu.parameters["columnar_store"] = 1
+    with redirect_stdout(io.StringIO()):
+        menu.do_generate("")
+    os.remove(f"generated_datasets/{menu.dbname}.json")
+    os.remove(f"generated_datasets/{menu.dbname}.phases.json")
+
+def build_hybrid_graph(num_users):
+    config = copy.deepcopy(DEFAULT_HYBRID_CONFIG)
+    config["User"]["nUsers"] = num_users
+    seed = run.build_seed_vector(42)
+    seed["_run_id"] = "bench"
+    run.generate_graph(config, seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark exporter serializers")
+    parser.add_argument("--users", type=int, default=2000,
+                        help="legacy nUsers / nComputers (default: 2000)")
+    parser.add_argument("--hybrid-users", type=int, default=20000,
+                        help="hybrid config User.nUsers (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="best of N runs per cell (default: 3)")
+    args = parser.parse_args(argv)
+
+    print(f"Building legacy graph ({args.users} users) ...")
+    build_legacy_graph(args.users)
+    print(f"Building hybrid graph ({args.hybrid_users} users) ...")
+    build_hybrid_graph(args.hybrid_users)
+    print(f"  {len(HYBRID_NODES)} hybrid nodes, {len(HYBRID_EDGES)} hybrid edges")
+
+    backends = ["baseline"] + available_serializers()
+    exporters = [("legacy", run_legacy), ("hybrid", run_hybrid), ("bloodhound", run_bloodhound)]
+
+    print(f"\n  {'exporter':<12}{'serializer':<11}{'seconds':>9}{'MB':>9}{'MB/s':>9}{'file MB':>9}")
+    tmp = tempfile.mkdtemp(prefix="adsynth-bench-")
+    try:
+        for exporter_name, runner in exporters:
+            for backend in backends:
+                set_serializer("json" if backend == "baseline" else backend)
+                best = min((runner(tmp, backend) for _ in range(args.repeat)),
+                           key=lambda r: r[0])
+                seconds, raw, on_disk = best
+                print(f"  {exporter_name:<12}{backend:<11}{seconds:>9.3f}{raw / 2**20:>9.1f}"
+                      f"{raw / 2**20 / seconds:>9.1f}{on_disk / 2**20:>9.2f}")
+    finally:
+        shutil.rmtree(tmp)
+        set_serializer()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
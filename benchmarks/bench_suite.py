@@ -0,0 +1,305 @@
+"""
+bench_suite.py — generator benchmark suite with history and regression check
+============================================================================
+Runs the three generators over a matrix of size tiers and records one JSON
+line per case in a history file (default: benchmarks/history.jsonl):
+
+  legacy   MainMenu.generate_data        nUsers = nComputers = N,
+                                         x nTiers x convert_to_directed_graphs
+  azure    MainMenu.generate_data_azure  AZUser.nUsers = N
+  hybrid   run.generate_graph            User.nUsers = N, + graph.jsonl export
+
+Every case runs in a fresh interpreter (so peak RSS and the module-level
+graph state belong to that case alone) with a fixed seed and clock, and
+records wall seconds including the export, nodes/s, edges/s, peak RSS and
+output bytes, tagged with the git commit it ran on.
+
+Record a run, then compare two commits (best of the recorded repeats per
+case; exit status 1 if any case regressed beyond --threshold):
+
+    python benchmarks/bench_suite.py run --sizes 1k 10k
+    python benchmarks/bench_suite.py run --sizes 100k 1M --generators legacy --tiers 3 --digraph 0
+    python benchmarks/bench_suite.py compare <base-commit> <new-commit>
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "history.jsonl")
+CURRENT_TIME = 1700000000
+CASE_KEYS = ("generator", "users", "nTiers", "digraph")
+
+
+# ---------------------------------------------------------------------------
+# One case (runs in the child interpreter)
+# ---------------------------------------------------------------------------
+
+def _menu(case):
+    from adsynth.ADSynth import MainMenu
+    menu = MainMenu()
+    menu.current_time = CURRENT_TIME
+    menu.parameters = copy.deepcopy(menu.parameters)
+    menu.parameters["seed"] = case["seed"]
+    return menu
+
+def _remove_dataset(menu):
+    path = f"generated_datasets/{menu.dbname}.json"
+    size = os.path.getsize(path)
+    for suffix in (".json", ".phases.json"):
+        if os.path.exists(f"generated_datasets/{menu.dbname}{suffix}"):
+            os.remove(f"generated_datasets/{menu.dbname}{suffix}")
+    return size
+
+def run_legacy(case):
+    import adsynth.DATABASE as DB
+    menu = _menu(case)
+    menu.parameters["User"]["nUsers"] = case["users"]
+    menu.parameters["Computer"]["nComputers"] = case["users"]
+    menu.parameters["nTiers"] = case["nTiers"]
+    menu.parameters["convert_to_directed_graphs"] = case["digraph"]
+    start = time.perf_counter()
+    menu.do_generate("")
+    elapsed = time.perf_counter() - start
+    return elapsed, DB.get_num_nodes(), DB.get_num_edges(), _remove_dataset(menu)
+
+def run_azure(case):
+    import adsynth.DATABASE as DB
+    menu = _menu(case)
+    menu.parameters["AZUser"]["nUsers"] = case["users"]
+    start = time.perf_counter()
+    menu.do_generate_azure("")
+    elapsed = time.perf_counter() - start
+    return elapsed, len(DB.NODES), len(DB.EDGES), _remove_dataset(menu)
+
+def run_hybrid(case):
+    import run
+    from adsynth.hybrid_system.export_writer import HYBRID_EDGES, HYBRID_NODES, write_graph_jsonl
+    from adsynth.hybrid_system.hybrid_config import DEFAULT_HYBRID_CONFIG
+    config = copy.deepcopy(DEFAULT_HYBRID_CONFIG)
+    config["User"]["nUsers"] = case["users"]
+    seed = run.build_seed_vector(case["seed"])
+    seed["_run_id"] = "bench"
+    seed["_current_time"] = CURRENT_TIME
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        run.generate_graph(config, seed)
+        path = write_graph_jsonl(tmp)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    return elapsed, len(HYBRID_NODES), len(HYBRID_EDGES), size
+
+RUNNERS = {"legacy": run_legacy, "azure": run_azure, "hybrid": run_hybrid}
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def run_case(case):
+    os.chdir(ROOT)
+    with redirect_stdout(io.StringIO()):
+        elapsed, nodes, edges, output_bytes = RUNNERS[case["generator"]](case)
+    result = dict(case)
+    result.update({
+        "wall_s": round(elapsed, 4),
+        "nodes": nodes,
+        "edges": edges,
+        "nodes_per_s": round(nodes / elapsed, 1),
+        "edges_per_s": round(edges / elapsed, 1),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "output_bytes": output_bytes,
+    })
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Run mode
+# ---------------------------------------------------------------------------
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip() != ""
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+def environment():
+    from adsynth.utils.sampling import numpy
+    from adsynth.utils.serialization import get_serializer
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy is not None,
+        "serializer": get_serializer().name,
+    }
+
+def build_cases(args):
+    cases = []
+    for generator in args.generators:
+        for users in args.sizes:
+            if generator == "legacy":
+                for n_tiers in args.tiers:
+                    for digraph in args.digraph:
+                        cases.append({"generator": generator, "users": users,
+                                      "nTiers": n_tiers, "digraph": digraph})
+            else:
+                cases.append({"generator": generator, "users": users, "nTiers": None, "digraph": None})
+    for case in cases:
+        case["seed"] = args.seed
+    return cases
+
+def spawn_case(case, timeout):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "_case", json.dumps(case)],
+                          cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else
+                           f"exit status {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def do_run(args):
+    commit, dirty = git_commit()
+    env = environment()
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    cases = build_cases(args)
+
+    print(f"  commit {commit[:12]}{' (dirty)' if dirty else ''}  ->  {args.history}")
+    print(f"\n  {'generator':<8}{'users':>9}{'tiers':>6}{'dig':>4}{'seconds':>10}{'nodes/s':>11}"
+          f"{'edges/s':>11}{'RSS MB':>9}{'out MB':>9}")
+    failed = 0
+    with open(args.history, "a") as history:
+        for case in cases:
+            for _ in range(args.repeat):
+                try:
+                    result = spawn_case(case, args.timeout)
+                except (RuntimeError, subprocess.TimeoutExpired) as e:
+                    print(f"  {case['generator']:<8}{case['users']:>9}  FAILED: {e}")
+                    failed += 1
+                    break
+                result.update({"commit": commit, "dirty": dirty, "timestamp": stamp, "env": env})
+                history.write(json.dumps(result) + "\n")
+                history.flush()
+                print(f"  {case['generator']:<8}{case['users']:>9}{_opt(case['nTiers']):>6}"
+                      f"{_opt(case['digraph']):>4}{result['wall_s']:>10.2f}{result['nodes_per_s']:>11.0f}"
+                      f"{result['edges_per_s']:>11.0f}{result['peak_rss_bytes'] / 2**20:>9.1f}"
+                      f"{result['output_bytes'] / 2**20:>9.1f}")
+    return 1 if failed else 0
+
+def _opt(value):
+    return "-" if value is None else str(value)
+
+
+# ---------------------------------------------------------------------------
+# Compare mode
+# ---------------------------------------------------------------------------
+
+def load_history(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def best_per_case(records, commit):
+    """Best (fastest) record per case for the commit (prefix match)."""
+    best = {}
+    for record in records:
+        if not record.get("commit", "").startswith(commit):
+            continue
+        key = tuple(record.get(k) for k in CASE_KEYS) + (record.get("seed"),)
+        if key not in best or record["wall_s"] < best[key]["wall_s"]:
+            best[key] = record
+    return best
+
+def _change(base, new):
+    return (new - base) / base if base else 0.0
+
+def do_compare(args):
+    records = load_history(args.history)
+    base = best_per_case(records, args.base)
+    new = best_per_case(records, args.new)
+    if not base or not new:
+        print(f"  no history for {'base ' + args.base if not base else 'new ' + args.new} in {args.history}")
+        return 2
+
+    print(f"\n  {args.base[:12]} -> {args.new[:12]}  (regression threshold {args.threshold:.0%})")
+    print(f"\n  {'generator':<8}{'users':>9}{'tiers':>6}{'dig':>4}{'base s':>9}{'new s':>9}{'time':>8}"
+          f"{'RSS':>8}{'output':>8}  status")
+    regressions = 0
+    for key in sorted(set(base) & set(new), key=lambda k: tuple(str(x) for x in k)):
+        b, n = base[key], new[key]
+        d_time = _change(b["wall_s"], n["wall_s"])
+        d_rss = _change(b["peak_rss_bytes"], n["peak_rss_bytes"])
+        d_out = _change(b["output_bytes"], n["output_bytes"])
+        flags = []
+        if d_time > args.threshold:
+            flags.append("SLOWER")
+        if d_rss > args.threshold:
+            flags.append("MORE MEMORY")
+        if (b["nodes"], b["edges"], b["output_bytes"]) != (n["nodes"], n["edges"], n["output_bytes"]):
+            flags.append("OUTPUT CHANGED")
+        regressions += any(f in ("SLOWER", "MORE MEMORY") for f in flags)
+        print(f"  {b['generator']:<8}{b['users']:>9}{_opt(b['nTiers']):>6}{_opt(b['digraph']):>4}"
+              f"{b['wall_s']:>9.2f}{n['wall_s']:>9.2f}{d_time:>+8.0%}{d_rss:>+8.0%}{d_out:>+8.0%}"
+              f"  {', '.join(flags) or 'ok'}")
+    missing = set(base) ^ set(new)
+    if missing:
+        print(f"\n  {len(missing)} case(s) recorded for only one of the two commits were skipped")
+    print(f"\n  {regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+# ---------------------------------------------------------------------------
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["_case"]:
+        print(json.dumps(run_case(json.loads(argv[1]))))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark suite for the ADSynth generators")
+    parser.add_argument("--history", default=DEFAULT_HISTORY,
+                        help="JSON-lines history file (default: benchmarks/history.jsonl)")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    run_p = sub.add_parser("run", help="run the benchmark matrix and append to the history")
+    run_p.add_argument("--generators", nargs="+", choices=sorted(RUNNERS), default=["legacy", "azure", "hybrid"])
+    run_p.add_argument("--sizes", nargs="+", type=parse_size, default=[1000, 10000],
+                       help="user counts, e.g. 1k 10k 100k 1M (default: 1k 10k)")
+    run_p.add_argument("--tiers", nargs="+", type=int, default=[1, 3, 5], help="legacy nTiers (default: 1 3 5)")
+    run_p.add_argument("--digraph", nargs="+", type=int, choices=[0, 1], default=[0, 1],
+                       help="legacy convert_to_directed_graphs (default: 0 1)")
+    run_p.add_argument("--repeat", type=int, default=1, help="runs per case (default: 1)")
+    run_p.add_argument("--seed", type=int, default=1)
+    run_p.add_argument("--timeout", type=float, default=None, help="seconds per case")
+
+    cmp_p = sub.add_parser("compare", help="compare two commits recorded in the history")
+    cmp_p.add_argument("base", help="baseline commit (prefix)")
+    cmp_p.add_argument("new", help="commit to check (prefix)")
+    cmp_p.add_argument("--threshold", type=float, default=0.10,
+                       help="relative slow-down / RSS growth flagged as a regression (default: 0.10)")
+
+    args = parser.parse_args(argv)
+    return do_run(args) if args.mode == "run" else do_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+bench_validation.py — invariant validation scaling benchmark
+============================================================
+Builds legacy DATABASE graphs with an increasing number of sync links
+(hybrid_seam.create_sync_links: one domain per link, one tenant per link,
+plus filler users / groups / MemberOf edges per domain) and times:
+
+  * scan     — the previous per-link scans of NODES / EDGES
+               (O(links x (|NODES| + |EDGES|)))
+  * indexed  — validate_graph_invariants() over one ValidationContext
+               (O(links + |NODES| + |EDGES|))
+
+Both must report exactly the same violations.  The "us/elem" column is
+time divided by |NODES| + |EDGES|; it stays flat for the indexed run.
+
+Run from the repository root:
+    python benchmarks/bench_validation.py --links 50 100 250 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adsynth.DATABASE as DB
+from adsynth.DATABASE import (
+    NODES, EDGES, SYNC_LINKS, SYNC_IDENTITY_NODES, TENANT_HYBRID_MODE,
+    PTA_AGENT_NODES, ADFS_SERVER_NODES,
+    node_operation, edge_operation,
+)
+from adsynth.hybrid_system.invariant_validators import validate_graph_invariants
+from adsynth.synthesizer.hybrid_seam import create_sync_links
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+def build_graph(num_links, users_per_domain):
+    DB.reset_DB()
+    DB.ridcount.extend([1000])
+    domains, tenants = [], []
+    for i in range(num_links):
+        fqdn = f"CORP{i}.LOCAL"
+        sid = f"S-1-5-21-{100000000 + i}-200000000-3000000000"
+        node_operation("Domain", ["name", "objectid", "labels"], [fqdn, sid, "Domain"], sid)
+        domains.append({"name": fqdn, "sid": sid, "id": sid})
+
+        tenant_id = f"00000000-0000-4000-8000-{i:012d}"
+        node_operation("AZTenant", ["name", "objectid", "labels"],
+                       [f"corp{i}.onmicrosoft.com", tenant_id, "AZTenant"], tenant_id)
+        tenants.append({"id": tenant_id, "name": f"corp{i}.onmicrosoft.com"})
+
+        group = node_operation("Group", ["name", "objectid", "labels"],
+                               [f"DOMAIN USERS@{fqdn}", f"{sid}-513", "Group"], f"{sid}-513")
+        for u in range(users_per_domain):
+            user = node_operation("User", ["name", "objectid", "labels"],
+                                  [f"U{u}@{fqdn}", f"{sid}-{1100 + u}", "User"], f"{sid}-{1100 + u}")
+            edge_operation(user, group, "MemberOf", ["isacl"], [False])
+
+    config = {"hybrid": {"p_domain_multisync": 0}}
+    create_sync_links(domains, tenants, config, 1)
+    # one SYNCED_TO edge so I4 has something to find
+    edge_operation(len(NODES) - 1, len(NODES) - 1, "SYNCED_TO", ["isacl"], [False])
+
+
+# ---------------------------------------------------------------------------
+# Baseline: the scan-based checks the ValidationContext replaced
+# ---------------------------------------------------------------------------
+
+def _scan_nodes_by_label(label):
+    return [n for n in NODES if n["labels"] and n["labels"][-1] == label]
+
+def _scan_edges_by_type(rel_type):
+    return [e for e in EDGES if e.get("label") == rel_type]
+
+def _scan_edge_exists(rel_type, start_id, end_id):
+    return any(e.get("label") == rel_type and e["start"]["id"] == start_id
+               and e["end"]["id"] == end_id for e in EDGES)
+
+def _scan_node_by_objectid(objectid):
+    for n in NODES:
+        if n["properties"].get("objectid") == objectid:
+            return n
+    return None
+
+def scan_validate():
+    results = {"I1_sync_identity": [], "I2_pta_mode": [], "I3_adfs_mode": [], "I4_phs_mode": []}
+
+    v = results["I1_sync_identity"]
+    ec_ids = {n["id"] for n in _scan_nodes_by_label("ConnectorHost")
+              if n["properties"].get("serverRole") == "EntraConnect"}
+    for domain_name, tenant_id in SYNC_LINKS:
+        sync_node = NODES[SYNC_IDENTITY_NODES[(domain_name, tenant_id)]]
+        domain_node = next((n for n in _scan_nodes_by_label("Domain")
+                            if n["properties"].get("name", "").upper() == domain_name.upper()), None)
+        tenant_node = _scan_node_by_objectid(tenant_id)
+        if not domain_node or not _scan_edge_exists("SERVICES_LINK", sync_node["id"], domain_node["id"]):
+            v.append(f"SyncIdentity for ({domain_name},{tenant_id}) missing SERVICES_LINK -> domain")
+        if not tenant_node or not _scan_edge_exists("SYNCS_TO", sync_node["id"], tenant_node["id"]):
+            v.append(f"SyncIdentity for ({domain_name},{tenant_id}) missing SYNCS_TO -> tenant")
+        targets = {e["end"]["id"] for e in EDGES
+                   if e.get("label") == "RUNS_ON" and e["start"]["id"] == sync_node["id"]}
+        if not targets & ec_ids:
+            v.append(f"SyncIdentity for ({domain_name},{tenant_id}) not RUNS_ON any EntraConnect server")
+
+    for tenant_id, mode in TENANT_HYBRID_MODE.items():
+        tenant_node = _scan_node_by_objectid(tenant_id)
+        if mode in ("PTA", "Mixed"):
+            pta_ids = {NODES[i]["id"] for i in PTA_AGENT_NODES.get(tenant_id, [])}
+            if not any(e.get("label") == "HAS_PTA_AGENT" and e["start"]["id"] == tenant_node["id"]
+                       and e["end"]["id"] in pta_ids for e in EDGES):
+                results["I2_pta_mode"].append(f"PTA tenant '{tenant_id}': HAS_PTA_AGENT edge to PTAAgentHost missing")
+        if mode in ("ADFS", "Mixed"):
+            _scan_nodes_by_label("ADFSServer")
+            if not ADFS_SERVER_NODES.get(tenant_id) or not [
+                    e for e in _scan_edges_by_type("IS_FEDERATED_WITH")
+                    if e["end"]["id"] == tenant_node["id"]]:
+                results["I3_adfs_mode"].append(f"ADFS tenant '{tenant_id}': IS_FEDERATED_WITH edge missing")
+
+    for domain_name, tenant_id in SYNC_LINKS:
+        if TENANT_HYBRID_MODE.get(tenant_id) in ("PHS", "Mixed"):
+            NODES[SYNC_IDENTITY_NODES[(domain_name, tenant_id)]]["properties"].get("syncMode")
+    if _scan_nodes_by_label("User") and not _scan_edges_by_type("SYNCED_TO"):
+        results["I4_phs_mode"].append("PHS mode active but no SYNCED_TO edges found")
+    return results
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark invariant validation scaling")
+    parser.add_argument("--links", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--users-per-domain", type=int, default=100)
+    parser.add_argument("--skip-scan", action="store_true",
+                        help="only time the indexed validator")
+    args = parser.parse_args(argv)
+
+    print(f"\n  {'links':>6}{'nodes':>9}{'edges':>9}{'scan s':>10}{'indexed s':>11}"
+          f"{'us/elem':>9}{'speed-up':>10}")
+    ok = True
+    for num_links in args.links:
+        build_graph(num_links, args.users_per_domain)
+        elems = len(NODES) + len(EDGES)
+        indexed_s, indexed = timed(validate_graph_invariants)
+        violations = sum(len(v) for v in indexed.values())
+        if args.skip_scan:
+            scan_col, speedup = f"{'-':>10}", f"{'-':>10}"
+        else:
+            scan_s, scan = timed(scan_validate)
+            ok &= sum(len(v) for v in scan.values()) == violations
+            scan_col, speedup = f"{scan_s:>10.3f}", f"{scan_s / indexed_s:>9.1f}x"
+        print(f"  {num_links:>6}{len(NODES):>9}{len(EDGES):>9}{scan_col}{indexed_s:>11.4f}"
+              f"{indexed_s / elems * 1e6:>9.2f}{speedup}")
+        ok &= violations == 0
+    DB.reset_DB()
+    print(f"\n  no violations, scan and indexed agree: {ok}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,8 @@ zip file that BloodHound Community Edition can ingest via its
 "Upload Files" button.
 
 BloodHound CE OpenGraph ingestion format (version 5):
-  - One JSON file per entity type inside a zip
+  - JSON files per entity type inside a zip, split into chunks of at most
+    chunk_size records: users_0001.json, users_0002.json, ...
   - Each file:  {"data": [...], "meta": {"type": ..., "count": ..., "version": 5}}
   - Nodes use "ObjectIdentifier" as the primary key
   - Edges are embedded as arrays inside the SOURCE node record
@@ -33,23 +34,42 @@ Edge type mapping (your relType -> BloodHound relationship):
   DOMAIN_TRUSTS   -> embedded as "Trusts" array in domain node
   ADMIN_TO        -> embedded as "LocalAdmins" in target computer
   All others      -> written as generic edges in "rels" file
+An embedded edge whose owning endpoint has no record of that type (e.g. an
+ADMIN_TO to an OU) is written to the "rels" file too.
 
 Usage:
   # After running generate_graph():
   from bloodhound_exporter import export_bloodhound
-  export_bloodhound("./generated_datasets/myrun", "myrun")
+  export_bloodhound(HYBRID_NODES, HYBRID_EDGES, "./generated_datasets/myrun", "myrun")
 
-  # Or run standalone (reads graph.jsonl produced by run.py):
+  # Legacy graphs (MainMenu.generate_data), straight from adsynth DATABASE;
+  # this is what `generate --format bloodhound` runs:
+  from bloodhound_exporter import export_legacy_bloodhound
+  export_legacy_bloodhound("./generated_datasets", "mydataset")
+
+  # Or run standalone (streams graph.jsonl produced by run.py, or a legacy
+  # dataset file with --legacy):
   python bloodhound_exporter.py --jsonl ./generated_datasets/myrun/graph.jsonl
+  python bloodhound_exporter.py --legacy ./generated_datasets/<dataset>.json
+
+The export is streamed: records are spilled to a temporary SQLite file and
+written into the zip one at a time, so memory stays flat for any graph size.
 """
 
 import json
 import os
+import sqlite3
 import sys
+import tempfile
+import time
 import zipfile
+import zlib
 import argparse
-from collections import defaultdict
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from adsynth.utils.serialization import get_serializer
 
 
 # ---------------------------------------------------------------------------
@@ -76,6 +96,7 @@ def _bh_type(label: str, plane: Optional[str] = None) -> str:
         "Server":           "computers",
         "OU":               "ous",
         "GPO":              "gpos",
+        "Container":        "containers",
         "ConditionalAccessPolicy": "azconditionalaccesses",
     }
 
@@ -226,170 +247,470 @@ def _build_bh_node(node: Dict[str, Any], bh_type: str) -> Dict[str, Any]:
 # Main export function
 # ---------------------------------------------------------------------------
 
+# Edges embedded into a node record:
+#   relType -> (BloodHound type of the record, endpoint that owns it, array field)
+# An edge whose owner has no record of that type is a generic edge instead.
+EMBEDDED_EDGES = {
+    "MEMBER_OF":       ("groups",    "end",   "Members"),
+    "CLOUD_MEMBER_OF": ("azgroups",  "end",   "Members"),
+    "DOMAIN_TRUSTS":   ("domains",   "start", "Trusts"),
+    "ADMIN_TO":        ("computers", "end",   "LocalAdmins"),
+}
+
+# Records per file inside the zip: users_0001.json, users_0002.json, ...
+DEFAULT_CHUNK_SIZE = 10000
+
+# Threads deflating zip members, and their zlib level
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_COMPRESSLEVEL = zlib.Z_DEFAULT_COMPRESSION
+
+# Rows handled per spill round trip
+_BATCH_SIZE = 10000
+
+
+def _embedded_item(field: str, ref: str) -> Dict[str, Any]:
+    """Item of an embedded array; ref is the ObjectIdentifier of the other endpoint."""
+    if field == "Trusts":
+        return {
+            "TargetDomainSid":  ref,
+            "TargetDomainName": "",
+            "IsTransitive":     True,
+            "TrustDirection":   2,   # Bidirectional
+            "TrustType":        "ParentChild",
+            "SidFilteringEnabled": False,
+        }
+    return {"ObjectIdentifier": ref, "IsInherited": False}
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Spill:
+    """
+    On-disk working set of one export (an SQLite file): the node records,
+    the internal id -> ObjectIdentifier map and the edges.  Keeping them
+    out of memory is what bounds the exporter's peak memory; endpoints are
+    resolved with joins inside SQLite instead of a dict.
+    """
+
+    def __init__(self, path: str, embedded_edges: Dict[str, tuple] = EMBEDDED_EDGES):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("PRAGMA cache_size = -32768")
+        # Unknown endpoints fall back to the upper-cased internal id, as str.upper does
+        self.db.create_function("py_upper", 1, str.upper, deterministic=True)
+        self.db.execute("CREATE TABLE node_ids (id TEXT PRIMARY KEY, objid TEXT) WITHOUT ROWID")
+        self.db.execute("CREATE TABLE records (seq INTEGER PRIMARY KEY, bh_type TEXT, objid TEXT, "
+                        "body BLOB, UNIQUE (bh_type, objid))")
+        self.db.execute("CREATE TABLE edges (start TEXT, end TEXT, rel TEXT)")
+        self.db.execute("CREATE TABLE routes (rel TEXT PRIMARY KEY, bh_type TEXT, owner TEXT, field TEXT)")
+        self.db.executemany("INSERT INTO routes VALUES (?, ?, ?, ?)",
+                            [(rel, *route) for rel, route in embedded_edges.items()])
+        # ref: ObjectIdentifier of the other endpoint, the one the item points to;
+        # edge: rowid of the edge it was made from
+        self.db.execute("CREATE TABLE embedded (bh_type TEXT, objid TEXT, field TEXT, ref TEXT, edge INTEGER)")
+
+    def add_nodes(self, id_rows, record_rows):
+        # The first record of an ObjectIdentifier wins, the last node id mapping wins
+        self.db.executemany("INSERT OR REPLACE INTO node_ids VALUES (?, ?)", id_rows)
+        self.db.executemany("INSERT OR IGNORE INTO records (bh_type, objid, body) VALUES (?, ?, ?)", record_rows)
+
+    def add_edges(self, rows):
+        self.db.executemany("INSERT INTO edges VALUES (?, ?, ?)", rows)
+
+    def finish_loading(self):
+        self.db.execute("CREATE INDEX records_by_type ON records (bh_type, seq)")
+        # Only edges whose owner has a record of the route's type are embedded
+        self.db.execute(
+            "INSERT INTO embedded "
+            "SELECT x.bh_type, x.objid, x.field, x.ref, x.edge FROM ("
+            "  SELECT r.bh_type, "
+            "         CASE r.owner WHEN 'end' THEN COALESCE(d.objid, py_upper(e.end)) "
+            "                      ELSE COALESCE(s.objid, py_upper(e.start)) END AS objid, "
+            "         r.field, "
+            "         CASE r.owner WHEN 'end' THEN COALESCE(s.objid, py_upper(e.start)) "
+            "                      ELSE COALESCE(d.objid, py_upper(e.end)) END AS ref, "
+            "         e.rowid AS edge "
+            "  FROM edges e JOIN routes r ON r.rel = e.rel "
+            "  LEFT JOIN node_ids s ON s.id = e.start LEFT JOIN node_ids d ON d.id = e.end) x "
+            "WHERE EXISTS (SELECT 1 FROM records rec WHERE rec.bh_type = x.bh_type AND rec.objid = x.objid) "
+            "ORDER BY x.edge")
+        self.db.execute("CREATE INDEX embedded_by_owner ON embedded (bh_type, objid)")
+        self.db.execute("CREATE INDEX embedded_by_edge ON embedded (edge)")
+
+    def embedded_types(self):
+        return {row[0] for row in self.db.execute("SELECT DISTINCT bh_type FROM embedded")}
+
+    def generic_edges(self):
+        """(start, end, relType) of the edges that are not embedded, in edge order."""
+        return self.db.execute(
+            "SELECT COALESCE(s.objid, py_upper(e.start)), COALESCE(d.objid, py_upper(e.end)), e.rel "
+            "FROM edges e LEFT JOIN node_ids s ON s.id = e.start LEFT JOIN node_ids d ON d.id = e.end "
+            "WHERE NOT EXISTS (SELECT 1 FROM embedded m WHERE m.edge = e.rowid) ORDER BY e.rowid")
+
+    def records(self, bh_type: str):
+        """(seq, body, field, ref) rows in record order; field and ref are None for a record without items."""
+        return self.db.execute(
+            "SELECT r.seq, r.body, e.field, e.ref FROM records r "
+            "LEFT JOIN embedded e ON e.bh_type = r.bh_type AND e.objid = r.objid "
+            "WHERE r.bh_type = ? ORDER BY r.seq, e.rowid", (bh_type,))
+
+    def close(self):
+        self.db.close()
+
+
+def _deflate(parts: List[bytes], compresslevel: int):
+    """Join and raw-deflate one zip member; zlib releases the GIL while it works."""
+    data = b"".join(parts)
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    return len(data), zlib.crc32(data), compressed
+
+
+class _ZipMemberWriter:
+    """
+    Deflates zip members in a thread pool and appends them to the archive
+    in the order they were added, so the zip does not depend on the number
+    of workers.  At most two members per worker are in flight.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile, workers: int, compresslevel: int):
+        self.zf = zf
+        self.compresslevel = compresslevel
+        self.date_time = time.localtime(time.time())[:6]
+        self.pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self.max_pending = 2 * workers
+        self.pending: Deque = deque()
+
+    def add(self, name: str, parts: List[bytes]):
+        if self.pool is None:
+            self._write(name, *_deflate(parts, self.compresslevel))
+            return
+        self.pending.append((name, self.pool.submit(_deflate, parts, self.compresslevel)))
+        while len(self.pending) >= self.max_pending:
+            self._write_next()
+
+    def _write_next(self):
+        name, future = self.pending.popleft()
+        self._write(name, *future.result())
+
+    def _write(self, name: str, file_size: int, crc: int, compressed: bytes):
+        # zipfile has no public call for an already deflated member: write
+        # the local header and data, then register the member the way
+        # ZipFile.writestr does so close() adds it to the central directory
+        zf = self.zf
+        zinfo = zipfile.ZipInfo(name, date_time=self.date_time)
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        zinfo.external_attr = 0o600 << 16
+        zinfo.file_size = file_size
+        zinfo.compress_size = len(compressed)
+        zinfo.CRC = crc
+        zip64 = file_size > zipfile.ZIP64_LIMIT or len(compressed) > zipfile.ZIP64_LIMIT
+        zinfo.header_offset = zf.fp.tell()
+        zf.fp.write(zinfo.FileHeader(zip64))
+        zf.fp.write(compressed)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[name] = zinfo
+        zf._didModify = True
+
+    def flush(self):
+        while self.pending:
+            self._write_next()
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+
+class _ChunkWriter:
+    """
+    Collects the records of one BloodHound type into <type>_0001.json,
+    <type>_0002.json, ... of at most chunk_size records, each a complete
+    {"data": [...], "meta": {...}} document, and hands every finished chunk
+    to the member writer for compression.
+    """
+
+    def __init__(self, members: _ZipMemberWriter, bh_type: str, chunk_size: int, dumps, pretty: bool):
+        self.members = members
+        self.bh_type = bh_type
+        self.chunk_size = chunk_size
+        self.dumps = dumps
+        self.separator = b",\n" if pretty else b","
+        self.files: List[str] = []
+        self.total = 0
+        self._parts: List[bytes] = []
+        self._count = 0
+
+    def add(self, record: bytes):
+        if self._count:
+            self._parts.append(self.separator)
+        else:
+            self._parts.append(b'{"data":[')
+        self._parts.append(record)
+        self._count += 1
+        self.total += 1
+        if self._count >= self.chunk_size:
+            self._close_chunk()
+
+    def _close_chunk(self):
+        name = f"{self.bh_type}_{len(self.files) + 1:04d}.json"
+        self.files.append(name)
+        meta = {"methods": 0, "type": self.bh_type, "count": self._count, "version": 5}
+        self._parts.append(b'],"meta":' + self.dumps(meta) + b"}")
+        self.members.add(name, self._parts)
+        print(f"  [BH] {name:<35} {self._count:>5} records")
+        self._parts = []
+        self._count = 0
+
+    def close(self):
+        if self._count:
+            self._close_chunk()
+
+
+def _write_zip(zip_path: str, spill: _Spill, bh_types: List[str], chunk_size: int,
+               pretty: bool, workers: int, compresslevel: int):
+    serializer = get_serializer()
+    dumps = serializer.dumps
+    dump_record = serializer.dumps_pretty if pretty else serializer.dumps
+    embedded_types = spill.embedded_types()
+
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        members = _ZipMemberWriter(zf, workers, compresslevel)
+        try:
+            for bh_type in bh_types:
+                writer = _ChunkWriter(members, bh_type, chunk_size, dumps, pretty)
+                if bh_type not in embedded_types:
+                    for _, body, _, _ in spill.records(bh_type):
+                        writer.add(body)
+                    writer.close()
+                    continue
+                # Rows of one record are adjacent; only records that carry
+                # the array receive its items, as when they were appended
+                # in memory
+                seq = body = record = None
+                for row_seq, row_body, field, ref in spill.records(bh_type):
+                    if row_seq != seq:
+                        if seq is not None:
+                            writer.add(dump_record(record) if record is not None else body)
+                        seq, body, record = row_seq, row_body, None
+                    if field is not None:
+                        if record is None:
+                            record = json.loads(body)
+                        if field in record:
+                            record[field].append(_embedded_item(field, ref))
+                if seq is not None:
+                    writer.add(dump_record(record) if record is not None else body)
+                writer.close()
+
+            # Generic relationships files (custom edges BloodHound may partially render)
+            # BloodHound CE OpenGraph supports a "rels" type for arbitrary edges
+            rels = _ChunkWriter(members, "rels", chunk_size, dumps, pretty)
+            for src_id, dst_id, rel in spill.generic_edges():
+                rels.add(dump_record({"StartNode": src_id, "EndNode": dst_id, "RelType": rel}))
+            rels.close()
+            members.flush()
+        finally:
+            members.shutdown()
+
+
 def export_bloodhound(
-    nodes: List[Dict[str, Any]],
-    edges: List[Dict[str, Any]],
+    nodes: Iterable[Dict[str, Any]],
+    edges: Iterable[Dict[str, Any]],
     output_dir: str,
     run_id: str = "export",
+    pretty: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    compresslevel: int = DEFAULT_COMPRESSLEVEL,
+    embedded_edges: Dict[str, tuple] = EMBEDDED_EDGES,
 ) -> str:
     """
     Convert HYBRID_NODES + HYBRID_EDGES into BloodHound CE zip.
 
+    The export is streamed: node records, the node id map and the edges are
+    spilled to a temporary SQLite file next to the zip, and every type is
+    written into the zip record by record, in files of at most chunk_size
+    records.  Peak memory does not grow with the graph.  Chunks are
+    deflated by a pool of worker threads and written in a fixed order, so
+    the archive content does not depend on the number of workers.
+
     Parameters
     ----------
-    nodes      : list of internal node dicts (from HYBRID_NODES)
-    edges      : list of internal edge dicts (from HYBRID_EDGES)
+    nodes      : iterable of internal node dicts (e.g. HYBRID_NODES), read once
+    edges      : iterable of internal edge dicts (e.g. HYBRID_EDGES), read once
     output_dir : directory to write the zip into
     run_id     : used as zip filename prefix
+    pretty     : indent the JSON records (default: compact, much smaller)
+    chunk_size : records per <type>_NNNN.json file inside the zip
+    workers    : threads deflating the zip members (1 = no pool)
+    compresslevel : zlib level of the zip members (0-9, -1 = zlib default)
+    embedded_edges : relType -> route of the edges embedded in node records
 
     Returns
     -------
     Full path to the written zip file.
     """
     os.makedirs(output_dir, exist_ok=True)
+    serializer = get_serializer()
+    dump_record = serializer.dumps_pretty if pretty else serializer.dumps
+    zip_path = os.path.join(output_dir, f"{run_id}_bloodhound.zip")
 
-    # ── Step 1: Build per-type node records ──────────────────────────────────
-    # bh_records[type_str] = {obj_id: record_dict}
-    bh_records: Dict[str, Dict[str, Dict]] = defaultdict(dict)
-    # internal_id -> obj_id  (needed for edge lookup)
-    id_to_objid: Dict[str, str] = {}
-
-    for node in nodes:
-        label = node["labels"][0] if node["labels"] else "base"
-        plane = node["properties"].get("plane", "")
-        bh_type = _bh_type(label, plane)
-        obj_id  = _object_id(node)
-
-        id_to_objid[node["id"]] = obj_id
-
-        if obj_id not in bh_records[bh_type]:
-            bh_records[bh_type][obj_id] = _build_bh_node(node, bh_type)
-
-    # ── Step 2: Embed edges into node records ─────────────────────────────────
-    # Edges that don't embed go into a generic relationships list
-    generic_rels: List[Dict[str, Any]] = []
-
-    for edge in edges:
-        src_id  = id_to_objid.get(edge["start"], edge["start"].upper())
-        dst_id  = id_to_objid.get(edge["end"],   edge["end"].upper())
-        rel     = edge["relType"]
-
-        member_ref = {"ObjectIdentifier": dst_id, "IsInherited": False}
-
-        if rel == "MEMBER_OF":
-            # Find the Group record and add member
-            group_rec = bh_records["groups"].get(dst_id)
-            if group_rec and "Members" in group_rec:
-                group_rec["Members"].append({"ObjectIdentifier": src_id, "IsInherited": False})
-
-        elif rel == "CLOUD_MEMBER_OF":
-            group_rec = bh_records["azgroups"].get(dst_id)
-            if group_rec and "Members" in group_rec:
-                group_rec["Members"].append({"ObjectIdentifier": src_id, "IsInherited": False})
-
-        elif rel == "DOMAIN_TRUSTS":
-            domain_rec = bh_records["domains"].get(src_id)
-            if domain_rec and "Trusts" in domain_rec:
-                domain_rec["Trusts"].append({
-                    "TargetDomainSid":  dst_id,
-                    "TargetDomainName": "",
-                    "IsTransitive":     True,
-                    "TrustDirection":   2,   # Bidirectional
-                    "TrustType":        "ParentChild",
-                    "SidFilteringEnabled": False,
-                })
-
-        elif rel == "ADMIN_TO":
-            computer_rec = bh_records["computers"].get(dst_id)
-            if computer_rec and "LocalAdmins" in computer_rec:
-                computer_rec["LocalAdmins"].append({"ObjectIdentifier": src_id, "IsInherited": False})
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=".bh-spill-") as tmp:
+        spill = _Spill(os.path.join(tmp, "spill.db"), embedded_edges)
+        try:
+            # ── Step 1: Spill per-type node records and edges ────────────────
+            bh_types: List[str] = []     # in order of first appearance
+            for batch in _batched(nodes, _BATCH_SIZE):
+                id_rows, record_rows = [], []
+                for node in batch:
+                    label = node["labels"][0] if node["labels"] else "base"
+                    plane = node["properties"].get("plane", "")
+                    bh_type = _bh_type(label, plane)
+                    obj_id  = _object_id(node)
+                    if bh_type not in bh_types:
+                        bh_types.append(bh_type)
+                    id_rows.append((node["id"], obj_id))
+                    record_rows.append((bh_type, obj_id, dump_record(_build_bh_node(node, bh_type))))
+                spill.add_nodes(id_rows, record_rows)
+            for batch in _batched(edges, _BATCH_SIZE):
+                spill.add_edges([(edge["start"], edge["end"], edge["relType"]) for edge in batch])
+
+            # ── Step 2: Resolve endpoints, gather embedded edges ─────────────
+            spill.finish_loading()
+
+            # ── Step 3: Write zip ────────────────────────────────────────────
+            _write_zip(zip_path, spill, bh_types, chunk_size, pretty, workers, compresslevel)
+        finally:
+            spill.close()
 
-        else:
-            # All other edges go to generic rels file
-            # BloodHound CE OpenGraph supports a "rels" type for arbitrary edges
-            generic_rels.append({
-                "StartNode": src_id,
-                "EndNode":   dst_id,
-                "RelType":   rel,
-            })
+    print(f"\n  BloodHound zip written: {zip_path}")
+    return zip_path
 
-    # ── Step 3: Write zip ─────────────────────────────────────────────────────
-    zip_path = os.path.join(output_dir, f"{run_id}_bloodhound.zip")
 
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+# ---------------------------------------------------------------------------
+# Legacy graphs: adsynth DATABASE (MainMenu.generate_data)
+# ---------------------------------------------------------------------------
 
-        for bh_type, records in bh_records.items():
-            if not records:
-                continue
-            data = list(records.values())
-            payload = {
-                "data": data,
-                "meta": {
-                    "methods": 0,
-                    "type":    bh_type,
-                    "count":   len(data),
-                    "version": 5,
-                },
-            }
-            filename = f"{bh_type}.json"
-            zf.writestr(filename, json.dumps(payload, indent=2))
-            print(f"  [BH] {filename:<35} {len(data):>5} records")
-
-        # Generic relationships file (custom edges BloodHound may partially render)
-        if generic_rels:
-            payload = {
-                "data": generic_rels,
-                "meta": {
-                    "methods": 0,
-                    "type":    "rels",
-                    "count":   len(generic_rels),
-                    "version": 5,
-                },
-            }
-            zf.writestr("rels.json", json.dumps(payload, indent=2))
-            print(f"  [BH] {'rels.json':<35} {len(generic_rels):>5} records")
+# Legacy node labels whose hybrid counterpart has another name
+LEGACY_LABELS = {"Domain": "ADDomain"}
 
-    print(f"\n  BloodHound zip written: {zip_path}")
-    return zip_path
+# Legacy relationship types embedded in node records, by the routes of their
+# hybrid counterparts; all others, and an AdminTo to an OU or a group, are
+# written to the rels files under their own name
+LEGACY_EMBEDDED_EDGES = {"MemberOf": EMBEDDED_EDGES["MEMBER_OF"], "AdminTo": EMBEDDED_EDGES["ADMIN_TO"]}
+
+
+def iter_legacy_nodes(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Legacy node records ({"id", "labels": ["Base", <type>, ...],
+    "properties"}) as the internal node dicts export_bloodhound reads.
+    """
+    for rec in records:
+        labels = [l for l in rec["labels"] if l != "Base"]
+        if labels:
+            labels[0] = LEGACY_LABELS.get(labels[0], labels[0])
+        yield {"id": rec["id"], "labels": labels, "properties": rec["properties"]}
+
+
+def iter_legacy_edges(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Legacy relationship records ({"start": {"id": ...}, "label": ...}) as
+    internal edge dicts.  Compact metagraph records are skipped.
+    """
+    for rec in records:
+        if rec.get("type") != "relationship":
+            continue
+        yield {
+            "start":   rec["start"]["id"],
+            "end":     rec["end"]["id"],
+            "relType": rec["label"],
+            "properties": rec.get("properties") or {},
+        }
+
+
+def export_legacy_bloodhound(output_dir: str, run_id: str = "export", **kwargs) -> str:
+    """
+    Convert the in-memory legacy graph (adsynth DATABASE: NODES / EDGES or
+    the columnar store) into a BloodHound CE zip in one streaming pass, with
+    no intermediate dataset file.  Compact hyperedges are expanded.  Takes
+    the keyword arguments of export_bloodhound.
+    """
+    from adsynth.DATABASE import iter_node_records, iter_relationship_records
+    kwargs.setdefault("embedded_edges", LEGACY_EMBEDDED_EDGES)
+    return export_bloodhound(iter_legacy_nodes(iter_node_records()),
+                             iter_legacy_edges(iter_relationship_records()),
+                             output_dir, run_id, **kwargs)
+
+
+def _iter_records(path: str, record_type: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                rec = json.loads(line)
+                if rec.get("type") == record_type:
+                    yield rec
+
+
+def export_legacy_dataset(path: str, output_dir: str, run_id: str = "export", **kwargs) -> str:
+    """Convert a legacy dataset file (generate_data JSON) into a BloodHound CE zip."""
+    kwargs.setdefault("embedded_edges", LEGACY_EMBEDDED_EDGES)
+    return export_bloodhound(iter_legacy_nodes(_iter_records(path, "node")),
+                             iter_legacy_edges(_iter_records(path, "relationship")),
+                             output_dir, run_id, **kwargs)
 
 
 # ---------------------------------------------------------------------------
 # Standalone mode: reads graph.jsonl produced by run.py
 # ---------------------------------------------------------------------------
 
+def iter_jsonl(path: str, record_type: str) -> Iterator[Dict[str, Any]]:
+    """Stream the nodes ("node") or edges ("relationship") of a graph.jsonl file."""
+    for rec in _iter_records(path, record_type):
+        if record_type == "node":
+            yield {
+                "id":         rec["id"],
+                "labels":     rec["labels"],
+                "properties": rec["properties"],
+            }
+        else:
+            yield {
+                "start":   rec["start"],
+                "end":     rec["end"],
+                "relType": rec["relType"],
+                "properties": rec.get("properties", {}),
+            }
+
+
 def load_jsonl(path: str):
     """Load HYBRID_NODES and HYBRID_EDGES from a graph.jsonl file."""
-    nodes, edges = [], []
-    with open(path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            if rec.get("type") == "node":
-                nodes.append({
-                    "id":         rec["id"],
-                    "labels":     rec["labels"],
-                    "properties": rec["properties"],
-                })
-            elif rec.get("type") == "relationship":
-                edges.append({
-                    "start":   rec["start"],
-                    "end":     rec["end"],
-                    "relType": rec["relType"],
-                    "properties": rec.get("properties", {}),
-                })
-    return nodes, edges
+    return list(iter_jsonl(path, "node")), list(iter_jsonl(path, "relationship"))
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Export graph.jsonl to BloodHound CE OpenGraph zip"
     )
-    parser.add_argument(
-        "--jsonl", required=True,
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--jsonl",
         help="Path to graph.jsonl produced by run.py"
     )
+    source.add_argument(
+        "--legacy",
+        help="Path to a dataset JSON file produced by 'generate' (generated_datasets/<name>.json)"
+    )
     parser.add_argument(
         "--output-dir", default=".",
         help="Directory to write the BloodHound zip (default: current dir)"
@@ -398,14 +719,32 @@ def main():
         "--run-id", default="export",
         help="Prefix for the output zip filename (default: export)"
     )
+    parser.add_argument(
+        "--pretty", action="store_true",
+        help="Indent the JSON files inside the zip (default: compact)"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Records per <type>_NNNN.json file in the zip (default: {DEFAULT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Threads compressing the zip members (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--compress-level", type=int, default=DEFAULT_COMPRESSLEVEL,
+        help="zlib level of the zip members, 0-9 (default: zlib's, 6)"
+    )
     args = parser.parse_args()
 
-    print(f"\nLoading {args.jsonl} ...")
-    nodes, edges = load_jsonl(args.jsonl)
-    print(f"  Loaded {len(nodes)} nodes, {len(edges)} edges")
-
-    print(f"\nConverting to BloodHound CE format ...")
-    zip_path = export_bloodhound(nodes, edges, args.output_dir, args.run_id)
+    options = dict(pretty=args.pretty, chunk_size=args.chunk_size, workers=args.workers,
+                   compresslevel=args.compress_level)
+    print(f"\nConverting {args.jsonl or args.legacy} to BloodHound CE format ...")
+    if args.legacy:
+        zip_path = export_legacy_dataset(args.legacy, args.output_dir, args.run_id, **options)
+    else:
+        zip_path = export_bloodhound(iter_jsonl(args.jsonl, "node"), iter_jsonl(args.jsonl, "relationship"),
+                                     args.output_dir, args.run_id, **options)
 
     print(f"\nDone. Upload this file to BloodHound CE:")
     print(f"  {zip_path}")
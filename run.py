@@ -11,7 +11,10 @@ Options:
   --seed-file PATH  Path to JSON file containing the full seed vector s
   --output-dir DIR  Output directory for the run bundle  (default: ./generated_datasets)
   --run-id STR      Human-readable run identifier  (default: auto-generated)
+  --workers N       Generate per-domain / per-tenant principals in N processes
+                    (default: 1; output is identical for any N)
   --validate        Run semantic invariant checks after generation  (default: True)
+  --neo4j-admin-csv Also write neo4j-admin bulk import CSV files to <run dir>/admin_csv
   --registry-info   Print the schema registry summary and exit
   --help            Show this message and exit
 
@@ -82,7 +85,7 @@ def load_seed_vector(seed_file: str) -> dict:
 
 # Week 2 generator
 
-def generate_graph(config: dict, seed: dict) -> dict:
+def generate_graph(config: dict, seed: dict, workers: int = 1) -> dict:
     """
     Week 3: topology + principal generation.
       1. Domains + trust edges
@@ -90,6 +93,9 @@ def generate_graph(config: dict, seed: dict) -> dict:
       3. Sync links + bridge components
       4. Human principals (AD users/groups, Entra users/groups, SYNCED_TO)
       5. Non-human principals (ServicePrincipal, ManagedIdentity, AutomationAccount)
+
+    With workers > 1, the per-domain / per-tenant users and groups of step 4
+    are generated in a process pool (generators/parallel.py).
     """
     from adsynth.generators.domain_generator import create_domains, create_trusts
     from adsynth.generators.tenant_generator import create_tenants
@@ -102,6 +108,9 @@ def generate_graph(config: dict, seed: dict) -> dict:
     random.seed(seed["globalSeed"])
 
     run_id = seed.get("_run_id", "run")
+    # One clock reading for the whole run (recorded in seed.json), so every
+    # shard computes the same lastlogon / pwdlastset timestamps
+    seed.setdefault("_current_time", int(time.time()))
 
     # Step 1 — topology
     domains = create_domains(config, seed, run_id)
@@ -109,15 +118,22 @@ def generate_graph(config: dict, seed: dict) -> dict:
     tenants = create_tenants(config, seed, run_id)
     links   = create_sync_links(domains, tenants, config, seed, run_id)
 
-    # Step 2 — human principals
-    humans  = create_humans(domains, tenants, links, config, seed, run_id)
+    if workers > 1:
+        # Steps 2 + 2b — sharded per domain / tenant, merged in serial order
+        from adsynth.generators.parallel import create_principals_parallel
+        humans, groups = create_principals_parallel(
+            domains, tenants, links, config, seed, run_id, workers,
+        )
+    else:
+        # Step 2 — human principals
+        humans  = create_humans(domains, tenants, links, config, seed, run_id)
 
-    # Step 2b — groups + membership edges
-    groups  = create_groups(
-        domains, tenants,
-        humans["ad_users"], humans["entra_users"],
-        config, seed, run_id,
-    )
+        # Step 2b — groups + membership edges
+        groups  = create_groups(
+            domains, tenants,
+            humans["ad_users"], humans["entra_users"],
+            config, seed, run_id,
+        )
 
     # Step 2c — non-human principals
     nhi = create_non_humans(
@@ -160,10 +176,18 @@ def build_arg_parser() -> argparse.ArgumentParser:
         "--run-id", metavar="STR",
         help="Human-readable run identifier (default: auto-generated)",
     )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="Worker processes for per-domain/tenant generation (default: 1)",
+    )
     parser.add_argument(
         "--no-validate", action="store_true",
         help="Skip semantic invariant checks",
     )
+    parser.add_argument(
+        "--neo4j-admin-csv", action="store_true",
+        help="Also write neo4j-admin bulk import CSV files to <run dir>/admin_csv",
+    )
     parser.add_argument(
         "--registry-info", action="store_true",
         help="Print schema registry summary and exit",
@@ -220,7 +244,7 @@ def main(argv=None) -> int:
     # ── Generate graph ────────────────────────────────────────────────────────
     print(f"\n[3/5] Generating graph...")
     t0 = time.time()
-    generate_graph(config, seed)
+    generate_graph(config, seed, workers=args.workers)
     elapsed = time.time() - t0
     print(f"       Nodes: {len(HYBRID_NODES)}")
     print(f"       Edges: {len(HYBRID_EDGES)}")
@@ -247,6 +271,15 @@ def main(argv=None) -> int:
     bh_zip = export_bloodhound(HYBRID_NODES, HYBRID_EDGES, run_dir, run_id)
     print(f"       Upload this to BloodHound CE: {bh_zip}")
 
+    # ── neo4j-admin CSV export ────────────────────────────────────────────────
+    if args.neo4j_admin_csv:
+        print(f"\n[+] Exporting neo4j-admin import CSV files...")
+        from adsynth.neo4j_admin_export import export_hybrid_graph
+        csv_dir = os.path.join(run_dir, "admin_csv")
+        exporter = export_hybrid_graph(csv_dir)
+        print(f"       Files: {csv_dir}")
+        print(f"       Import with (from that folder): {exporter.command()}")
+
     print(f"Done\n")
     return 0
 
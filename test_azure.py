@@ -0,0 +1,167 @@
+"""
+test_azure.py — Azure generator tests
+=====================================
+Run with:  python test_azure.py
+
+Tests:
+  1.  Azure generators: exclusion-aware choices draw what the filtered lists
+      did; Azure objects are deduplicated legacy records on both backends;
+      role assignment with Global Administrator as the only role (or none)
+"""
+
+import copy
+import json
+import os
+import random
+import sys
+from itertools import chain
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsynth.DATABASE as DB
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.skeleton_cache import GUID_PATTERN
+from adsynth.utils.sampling import ExcludingChoice
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+
+def without_guids(text):
+    # Number the GUIDs in order of appearance, so two graphs that only differ
+    # in their GUIDs compare equal
+    guids = {}
+    return GUID_PATTERN.sub(lambda m: guids.setdefault(m.group(0).lower(), f"GUID-{len(guids)}"), text)
+
+def build_azure_graph(columnar):
+    from adsynth.azure_ad_system.az_default_permissions import az_create_permissions
+    from adsynth.azure_ad_system.az_default_relationships import az_assign_roles
+    from adsynth.azure_ad_system.az_default_roles import az_create_roles
+    from adsynth.azure_ad_system.az_default_tenants import az_create_tenant
+    from adsynth.azure_ad_system.az_default_users import az_create_users
+
+    DB.use_columnar_store(columnar)
+    DB.reset_DB()
+    params = copy.deepcopy(DEFAULT_CONFIGURATIONS)
+    params["AZUser"]["nUsers"] = 200
+    params["AZMisconfig"]["reset_password"] = 50
+    random.seed(4)
+    tenant_id = az_create_tenant("CORP.ONMICROSOFT.COM")
+    roles = az_create_roles(tenant_id, params)
+    users = az_create_users("CORP.ONMICROSOFT.COM", tenant_id, roles, ["Ann", "Bob"], ["Lee", "Ng"], params)
+    az_assign_roles(users, [], [], roles, tenant_id, "SUB-1", params)
+    az_create_permissions(users, [], [], [], [], params)
+    # An edge that is already there leaves the graph as it is
+    num_edges = DB.get_num_edges()
+    DB.az_edge_operation(users[0], tenant_id, "AZContains")
+    assert DB.get_num_edges() == num_edges, \
+        f"[{('columnar' if columnar else 'dict')}] repeated Azure edge dropped"
+    return "\n".join(json.dumps(r) for r in chain(DB.iter_node_records(), DB.iter_edge_records()))
+
+def test_azure_indexes():
+    print("\n── Azure generators ─────────────────────────────────────────")
+
+    items = [f"U-{i}" for i in range(40)]
+    random.seed(2)
+    filtered = [random.choice([u for u in items if u != x]) for x in items * 5 + ["other"]]
+    random.seed(2)
+    choose = ExcludingChoice(items)
+    assert [choose(x) for x in items * 5 + ["other"]] == filtered, \
+        "ExcludingChoice draws what the filtered list did"
+    assert ExcludingChoice(["U-0"])("U-0") is None and ExcludingChoice([])() is None, "nothing left to choose"
+
+    for columnar in (False, True):
+        tag = "columnar" if columnar else "dict"
+        records = build_azure_graph(columnar)
+        objectid = {DB.get_node_endpoint(i)[0]: DB.get_node_property(i, "objectid") for i in range(DB.get_num_nodes())}
+        edges = [(objectid[e["start"]["id"]], objectid[e["end"]["id"]], e["label"], e["properties"].get("scope"))
+                 for e in DB.iter_edge_records()]
+        tenant_id, roles, users = (DB.get_node_property(DB.NODE_GROUPS[label][0], "objectid")
+                                   for label in ("AZTenant", "AZRole", "AZUser"))
+        has_role = [e for e in edges if e[2] == "AZHasRole"]
+        assert all(r["labels"][-1].startswith("AZ") and "objectid" in r["properties"] for r in DB.iter_node_records()), \
+            f"[{tag}] Azure objects are legacy node records"
+        assert (users, roles, "AZHasRole", tenant_id) in has_role, \
+            f"[{tag}] Global Admin user holds Global Administrator"
+        overprivileged = [e for e in has_role if e[1] == roles and e[0] != users]
+        assert len(overprivileged) == 20 and all(e[3] == tenant_id for e in overprivileged), \
+            f"[{tag}] overprivileged users get Global Administrator at tenant scope: got {len(overprivileged)}"
+        assert all(e[1] != roles for e in has_role if e[3] == "SUB-1"), \
+            f"[{tag}] regular role assignments exclude Global Administrator"
+        resets = [e for e in edges if e[2] == "AZResetPassword"]
+        assert len(resets) == 101 and all(e[0] != e[1] for e in resets), \
+            f"[{tag}] AZResetPassword never targets its source: got {len(resets)}"
+        assert len(set(e[:3] for e in edges)) == len(edges) == len(DB.dict_edges), \
+            f"[{tag}] one record per (source, type, target)"
+        if columnar:
+            assert without_guids(records) == without_guids(dict_records), \
+                "Azure records identical to dict backend"
+        dict_records = records
+
+    # Global Administrator as the only role, then no roles at all
+    from adsynth.azure_ad_system.az_default_relationships import az_assign_roles
+    from adsynth.azure_ad_system.az_default_roles import az_create_roles
+    from adsynth.azure_ad_system.az_default_service_principals import az_create_service_principals
+    from adsynth.azure_ad_system.az_default_tenants import az_create_tenant
+    from adsynth.azure_ad_system.az_default_users import az_create_users
+    DB.use_columnar_store(False)
+    for num_roles in (1, 0):
+        # nRoles 0 falls back to the default, the empty list is passed as is
+        DB.reset_DB()
+        params = copy.deepcopy(DEFAULT_CONFIGURATIONS)
+        params["AZUser"]["nUsers"] = 50
+        params["AZRole"]["nRoles"] = 1
+        params["AZRole"]["assignChanceUsers"] = 100
+        params["AZRole"]["assignChanceGroups"] = 100
+        params["AZRole"]["assignChanceServicePrincipals"] = 100
+        random.seed(5)
+        tenant_id = az_create_tenant("CORP.ONMICROSOFT.COM")
+        roles = az_create_roles(tenant_id, params)[:num_roles]
+        users = az_create_users("CORP.ONMICROSOFT.COM", tenant_id, roles, ["Ann"], ["Lee"], params)
+        sps = az_create_service_principals(tenant_id, params)
+        try:
+            az_assign_roles(users, users[:5], sps, roles, tenant_id, "SUB-1", params)
+            failure = None
+        except (KeyError, IndexError) as e:
+            failure = repr(e)
+        assert failure is None, \
+            f"[{num_roles} role(s)] role assignment skips a draw with nothing left: {failure}"
+        has_role = [e for e in DB.iter_edge_records() if e["label"] == "AZHasRole"] if failure is None else []
+        subscription_scoped = [e for e in has_role if e["properties"].get("scope") == "SUB-1"]
+        assert failure is None and not subscription_scoped, \
+            f"[{num_roles} role(s)] no user or service principal gets a subscription role: got {len(subscription_scoped)}"
+        if num_roles:
+            assert failure is None and sum(e["properties"].get("scope") == tenant_id for e in has_role) >= 5, \
+                "[1 role(s)] overprivileged users still get Global Administrator"
+    DB.reset_DB()
+
+TESTS = (
+    test_azure_indexes,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Azure Generators Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+test_corpus.py — packed name corpus tests
+=========================================
+Run with:  python test_corpus.py
+
+Tests:
+  1.  Name corpora: packed, mapped pools read and draw like the pickled
+      lists; converted once, rebuilt when the pickle changes
+"""
+
+import os
+import pickle
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsynth.utils.corpus as corpus_module
+from adsynth.generators.common import get_first_names
+from adsynth.utils.corpus import NameCorpus, load_corpus, write_corpus
+from adsynth.utils.data import get_names_pool
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+def raises(exception, function, *args):
+    # True if function(*args) raises exception
+    try:
+        function(*args)
+    except exception:
+        return True
+    return False
+
+def test_name_corpus():
+    print("\n── Name corpora ─────────────────────────────────────────────")
+    names = ["Ann", "", "Zoë", "O'Brien", "Ødegård", "Lee"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "names.names")
+        write_corpus(names, path)
+        corpus = NameCorpus.open(path)
+        assert list(corpus) == names and len(corpus) == 6 and corpus.tolist() == names, \
+            "corpus reads back the names"
+        assert corpus[-1] == "Lee" and corpus[1:5] == names[1:5] and corpus[::2] == names[::2], \
+            "negative indices and slices"
+        assert raises(IndexError, lambda: corpus[6]), "out of range index raises IndexError"
+        assert pickle.loads(pickle.dumps(corpus)).tolist() == names, "a pickled corpus maps the same file"
+
+        random.seed(3)
+        expected = [random.choice(names) for _ in range(50)]
+        random.seed(3)
+        drawn = [random.choice(corpus) for _ in range(50)]
+        random.seed(3)
+        taken = corpus.take(corpus.sample_indices(50))
+        assert drawn == expected and taken == expected, \
+            "random.choice and sample_indices draw what the list did"
+
+        pkl = os.path.join(tmp, "first.pkl")
+        with open(pkl, "wb") as f:
+            pickle.dump(names, f)
+        loaded = load_corpus(pkl)
+        assert loaded.tolist() == names and os.path.exists(os.path.join(tmp, "first.names")) and load_corpus(pkl) is loaded, \
+            "a pool is converted once and shared"
+        with open(pkl, "wb") as f:
+            pickle.dump(names + ["New"], f)
+        stamp = os.path.getmtime(os.path.join(tmp, "first.names"))
+        os.utime(pkl, (stamp + 10, stamp + 10))
+        del corpus_module._CORPORA[pkl]
+        assert load_corpus(pkl).tolist() == names + ["New"], "a newer pickle is converted again"
+        del corpus_module._CORPORA[pkl]
+
+    with open(os.path.join("data", "first.pkl"), "rb") as f:
+        first = pickle.load(f)
+    pool = get_names_pool()
+    assert isinstance(pool, NameCorpus) and pool.tolist() == first, \
+        "data pools are name corpora with the pickled names"
+    assert get_first_names() is pool, "generators share the pool's mapping"
+
+TESTS = (
+    test_name_corpus,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Name Corpus Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+test_exporters.py — dataset import / export path tests
+=======================================================
+Run with:  python test_exporters.py
+
+Tests:
+  1.  Batched Neo4j loader: id constraint first, nodes batched per label
+      set before relationships batched per type, import label removed
+  2.  Batched Neo4j loader: a failed import resumes from its checkpoint
+      without sending any committed batch twice
+  3.  neo4j-admin CSV export: one header + data file per label set and
+      relationship type, typed and array columns, import command
+  4.  neo4j-admin CSV export of the in-memory store, hyperedges expanded
+  5.  Streaming BloodHound CE export: chunked type files, embedded Members /
+      LocalAdmins / Trusts, generic rels, spill file removed
+  6.  BloodHound zip members deflated in a thread pool: valid archive, same
+      members in the same order for any worker count
+  7.  BloodHound CE export of the legacy graph store: "Base" dropped,
+      MemberOf / AdminTo embedded, other legacy edges (AdminTo to an OU
+      included) written as rels
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsynth.DATABASE as DB
+from bloodhound_exporter import export_bloodhound, export_legacy_bloodhound
+from adsynth.neo4j_admin_export import export_dataset, export_graph_store
+from adsynth.neo4j_loader import BulkNeo4jLoader, iter_import_batches
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+_results = []
+
+def check(name, cond, detail=""):
+    status = PASS_S if cond else FAIL_S
+    msg = f"  [{status}] {name}"
+    if not cond and detail:
+        msg += f"\n         → {detail}"
+    print(msg)
+    _results.append((name, cond))
+    return cond
+
+def write_jsonl(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+def sample_records():
+    records = []
+    for i in range(5):
+        records.append({"type": "node", "id": str(i), "labels": ["Base", "User"],
+                        "properties": {"name": f"U{i}@CORP.LOCAL", "enabled": True}})
+    records.append({"type": "node", "id": "5", "labels": ["Base", "Group"],
+                    "properties": {"name": "ADMINS@CORP.LOCAL"}})
+    records.append({"type": "node", "id": "6", "labels": ["Domain"], "properties": {"name": "CORP.LOCAL"}})
+    for i in range(5):
+        records.append({"type": "relationship", "id": f"r_{i}", "label": "MemberOf", "properties": {},
+                        "start": {"id": str(i), "labels": ["Base", "User"]},
+                        "end": {"id": "5", "labels": ["Base", "Group"]}})
+    records.append({"type": "relationship", "id": "r_5", "label": "GenericAll", "properties": {"isacl": True},
+                    "start": {"id": "5", "labels": ["Base", "Group"]}, "end": {"id": "6", "labels": ["Domain"]}})
+    # Hybrid graph.jsonl layout and a compact metagraph record
+    records.append({"type": "relationship", "start": "6", "end": "5", "relType": "Contains", "properties": {}})
+    records.append({"type": "memberset", "id": "m_0", "members": ["0", "1"]})
+    return records
+
+
+class StubResult:
+
+    def __init__(self, total=0):
+        self.total = total
+
+    def consume(self):
+        return None
+
+    def single(self):
+        return {"total": self.total}
+
+
+class StubSession:
+    """Records queries; execute_write fails on the fail_on-th write when set."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def run(self, query, **params):
+        self.driver.queries.append(query)
+        if "REMOVE" in query:
+            total, self.driver.labelled = self.driver.labelled, 0
+            return StubResult(total)
+        return StubResult()
+
+    def execute_write(self, fn, query, rows):
+        with self.driver.lock:
+            self.driver.writes += 1
+            if self.driver.writes == self.driver.fail_on:
+                raise RuntimeError("connection lost")
+        fn(self, query, rows)
+        with self.driver.lock:
+            self.driver.batches.append((query, [dict(r) for r in rows]))
+            if "CREATE (n" in query:
+                self.driver.labelled += len(rows)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StubDriver:
+
+    def __init__(self, fail_on=None):
+        self.queries = []
+        self.batches = []
+        self.writes = 0
+        self.labelled = 0
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+
+    def session(self, **kwargs):
+        return StubSession(self)
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+def test_neo4j_loader():
+    print("\n── Batched Neo4j loader ─────────────────────────────────────")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.json")
+        write_jsonl(path, sample_records())
+        driver = StubDriver()
+        loader = BulkNeo4jLoader(driver, batch_size=2, sessions=2, progress=None)
+        counts = loader.load(path)
+
+        check("id constraint created first", "CONSTRAINT" in driver.queries[0], f"got {driver.queries[0]}")
+        check("node and relationship counts", counts == {"node": 7, "relationship": 7}, f"got {counts}")
+        sizes = [len(rows) for _, rows in driver.batches]
+        check("batches hold at most batch_size rows", max(sizes) == 2, f"got {sizes}")
+        kinds = ["node" if "CREATE (n" in q else "rel" for q, _ in driver.batches]
+        check("every node batch precedes the relationship batches",
+              kinds == sorted(kinds, key=lambda k: k != "node"), f"got {kinds}")
+        check("one label set per node batch",
+              all(":`Base`:`User`)" in q for q, rows in driver.batches if rows[0].get("id") in ("0", "1", "2", "3", "4")))
+        rels = sorted((r["start"], q.split("[r:")[1].split("]")[0], r["end"]) for q, rows in driver.batches
+                      if "MATCH" in q for r in rows)
+        check("both relationship layouts loaded",
+              ("6", "`Contains`", "5") in rels and ("0", "`MemberOf`", "5") in rels and len(rels) == 7, f"got {rels}")
+        check("endpoints matched through the indexed import label",
+              all("MATCH (s:`ADSynthImport` {id: row.start})" in q for q, _ in driver.batches if "MATCH" in q))
+        check("import label removed afterwards", any("REMOVE n:`ADSynthImport`" in q for q in driver.queries))
+        check("checkpoint removed after success", not os.path.exists(os.path.join(tmp, "graph.import.json")))
+
+def test_loader_resume():
+    print("\n── Loader resume ────────────────────────────────────────────")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.json")
+        write_jsonl(path, sample_records())
+        expected = [rows for _, _, rows in iter_import_batches(path, 2)]
+
+        failing = StubDriver(fail_on=4)
+        try:
+            BulkNeo4jLoader(failing, batch_size=2, sessions=1, progress=None).load(path)
+            check("failed import raises", False)
+        except RuntimeError:
+            check("failed import raises", True)
+        checkpoint = os.path.join(tmp, "graph.import.json")
+        check("checkpoint kept after failure", os.path.exists(checkpoint))
+
+        driver = StubDriver()
+        loader = BulkNeo4jLoader(driver, batch_size=2, sessions=1, progress=None)
+        loader.load(path, resume=True)
+        sent = [rows for _, rows in failing.batches] + [rows for _, rows in driver.batches]
+        check("resumed run skips committed batches", loader.skipped_batches == len(failing.batches),
+              f"got {loader.skipped_batches}")
+        check("every batch sent exactly once across both runs",
+              sorted(map(json.dumps, sent)) == sorted(map(json.dumps, expected)))
+        check("checkpoint removed after the resumed run", not os.path.exists(checkpoint))
+
+        with open(checkpoint, "w") as f:
+            json.dump({"identity": {"dataset": "other"}, "done": [0]}, f)
+        try:
+            BulkNeo4jLoader(StubDriver(), batch_size=2, progress=None).load(path, resume=True)
+            check("checkpoint of another dataset is refused", False)
+        except ValueError:
+            check("checkpoint of another dataset is refused", True)
+
+def test_neo4j_admin_csv():
+    print("\n── neo4j-admin CSV export ───────────────────────────────────")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.json")
+        records = sample_records()
+        records[0]["properties"].update({"spns": ["HTTP/a", "CIFS/b"], "score": 1, "note": "a,\"b\"\nc"})
+        records[1]["properties"].update({"spns": [], "score": 2.5})
+        records[2]["properties"]["spns"] = "LDAP/c"
+        write_jsonl(path, records)
+        exporter = export_dataset(path)
+        out = os.path.join(tmp, "graph_admin_csv")
+
+        check("counts exclude non-graph records",
+              exporter.counts() == {"node": 7, "relationship": 7} and exporter.skipped == 1,
+              f"got {exporter.counts()}, skipped {exporter.skipped}")
+        users = exporter.groups[("node", ("Base", "User"))]
+        header = read_csv(os.path.join(out, users.header_file))[0]
+        check("typed node header", header[:4] == ["id:ID", "name:string", "enabled:boolean", "spns:string[]"]
+              and "score:double" in header, f"got {header}")
+        rows = read_csv(os.path.join(out, users.data_file))
+        spns = header.index("spns:string[]")
+        check("one data row per node of the label set", len(rows) == 5, f"got {len(rows)}")
+        check("array values joined with the array delimiter",
+              [r[spns] for r in rows[:3]] == ["HTTP/a;CIFS/b", "", "LDAP/c"], f"got {[r[spns] for r in rows[:3]]}")
+        check("quotes, commas and newlines survive CSV quoting",
+              rows[0][header.index("note:string")] == "a,\"b\"\nc")
+        member_of = exporter.groups[("relationship", "MemberOf")]
+        check("relationship header and rows",
+              read_csv(os.path.join(out, member_of.header_file)) == [[":START_ID", ":END_ID"]]
+              and read_csv(os.path.join(out, member_of.data_file))[0] == ["0", "5"])
+        check("hybrid relationship layout exported",
+              read_csv(os.path.join(out, exporter.groups[("relationship", "Contains")].data_file)) == [["6", "5"]])
+        command = exporter.command()
+        check("import command lists every file set",
+              command.startswith("neo4j-admin database import full ")
+              and f"--nodes=Base:User={users.header_file},{users.data_file}" in command
+              and f"--relationships=MemberOf={member_of.header_file},{member_of.data_file}" in command
+              and "--multiline-fields=true" in command, f"got {command}")
+        check("import.sh written", os.path.exists(os.path.join(out, "import.sh")))
+
+        records[3]["properties"]["spns"] = ["a;b"]
+        write_jsonl(path, records)
+        try:
+            export_dataset(path)
+            check("array element containing the delimiter is refused", False)
+        except ValueError:
+            check("array element containing the delimiter is refused", True)
+
+def test_admin_csv_graph_store():
+    print("\n── neo4j-admin CSV export of the graph store ────────────────")
+    DB.reset_DB()
+    DB.use_hyperedges(DB.HYPEREDGE_COMPACT)
+    group = DB.node_operation("Group", ["name", "objectid", "labels"], ["ADMINS@CORP.LOCAL", "G-1", "Group"], "G-1")
+    users = [DB.node_operation("User", ["name", "objectid", "labels"], [f"U{i}@CORP.LOCAL", f"U-{i}", "User"], f"U-{i}")
+             for i in range(3)]
+    DB.edge_operation(users[0], group, "MemberOf")
+    DB.hyperedge_operation(group, users, "GenericAll", ["isacl"], [True])
+    with tempfile.TemporaryDirectory() as tmp:
+        exporter = export_graph_store(tmp)
+        generic_all = exporter.groups[("relationship", "GenericAll")]
+        rows = read_csv(os.path.join(tmp, generic_all.data_file))
+        check("store nodes exported", exporter.counts()["node"] == 4, f"got {exporter.counts()}")
+        check("compact hyperedge expanded to one row per member",
+              sorted(rows) == sorted([["0", str(u), "true"] for u in users]), f"got {rows}")
+    DB.use_hyperedges(DB.HYPEREDGE_EAGER)
+    DB.reset_DB()
+
+def test_bloodhound_streaming():
+    print("\n── Streaming BloodHound CE export ───────────────────────────")
+    nodes = [{"id": "d", "labels": ["ADDomain"], "properties": {"name": "corp.local", "sid": "S-1-5-21-9"}},
+             {"id": "d2", "labels": ["ADDomain"], "properties": {"name": "child.corp.local", "sid": "S-1-5-21-8"}},
+             {"id": "g", "labels": ["Group"], "properties": {"name": "admins", "objectid": "g-1"}},
+             {"id": "c", "labels": ["Computer"], "properties": {"name": "ws01"}}]
+    nodes += [{"id": f"u{i}", "labels": ["User"], "properties": {"name": f"user{i}@corp.local", "plane": "AD"}}
+              for i in range(5)]
+    # A second node with an ObjectIdentifier already seen keeps the first record
+    nodes.append({"id": "u-dup", "labels": ["User"], "properties": {"name": "dup", "objectid": "U0"}})
+    edges = [{"start": f"u{i}", "end": "g", "relType": "MEMBER_OF", "properties": {}} for i in range(5)]
+    edges += [{"start": "g", "end": "c", "relType": "ADMIN_TO", "properties": {}},
+              {"start": "d", "end": "d2", "relType": "DOMAIN_TRUSTS", "properties": {}},
+              {"start": "u0", "end": "c", "relType": "HAS_SESSION", "properties": {}},
+              {"start": "u1", "end": "missing", "relType": "HAS_SESSION", "properties": {}}]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = export_bloodhound(iter(nodes), iter(edges), tmp, "t", chunk_size=2)
+        data = {}
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+            for name in names:
+                payload = json.loads(zf.read(name))
+                data.setdefault(payload["meta"]["type"], []).append(payload)
+
+        check("types split into numbered chunk files",
+              [n for n in names if n.startswith("users_")] == ["users_0001.json", "users_0002.json", "users_0003.json"],
+              f"got {names}")
+        check("chunk meta counts match their data",
+              all(p["meta"]["count"] == len(p["data"]) <= 2 for chunks in data.values() for p in chunks))
+        users = [r for p in data["users"] for r in p["data"]]
+        check("one record per ObjectIdentifier, first node wins",
+              len(users) == 5 and users[0]["Properties"]["name"] == "USER0@CORP.LOCAL", f"got {len(users)} users")
+        group = data["groups"][0]["data"][0]
+        check("members embedded in the group record",
+              [m["ObjectIdentifier"] for m in group["Members"]] == [f"U{i}" for i in range(5)])
+        check("local admins embedded in the computer record",
+              data["computers"][0]["data"][0]["LocalAdmins"] == [{"ObjectIdentifier": "G-1", "IsInherited": False}])
+        domains = [r for p in data["domains"] for r in p["data"]]
+        check("trusts embedded in the source domain only",
+              [t["TargetDomainSid"] for t in domains[0]["Trusts"]] == ["S-1-5-21-8"] and domains[1]["Trusts"] == [])
+        rels = [r for p in data["rels"] for r in p["data"]]
+        check("other edges written as generic rels, unknown ids upper-cased",
+              rels == [{"StartNode": "U0", "EndNode": "C", "RelType": "HAS_SESSION"},
+                       {"StartNode": "U1", "EndNode": "MISSING", "RelType": "HAS_SESSION"}], f"got {rels}")
+        check("spill directory removed", os.listdir(tmp) == ["t_bloodhound.zip"], f"got {os.listdir(tmp)}")
+
+def test_bloodhound_parallel_zip():
+    print("\n── Parallel BloodHound zip compression ──────────────────────")
+    nodes = [{"id": f"n{i}", "labels": ["User" if i % 3 else "Group"],
+              "properties": {"name": f"obj{i}", "plane": "AD"}} for i in range(60)]
+    edges = [{"start": f"n{i}", "end": f"n{(i * 7) % 60}", "relType": ("MEMBER_OF", "HAS_SESSION")[i % 2],
+              "properties": {}} for i in range(120)]
+    members = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers, level in ((1, 6), (3, 6), (3, 1)):
+            path = export_bloodhound(iter(nodes), iter(edges), os.path.join(tmp, str(workers)), "t",
+                                     chunk_size=7, workers=workers, compresslevel=level)
+            with zipfile.ZipFile(path) as zf:
+                check(f"archive valid (workers={workers}, level={level})", zf.testzip() is None)
+                members.append([(info.filename, zf.read(info)) for info in zf.infolist()])
+    check("same members in the same order for any worker count", members[0] == members[1],
+          f"got {[n for n, _ in members[1]]}")
+    check("compression level does not change the content", members[1] == members[2])
+
+def test_bloodhound_legacy_store():
+    print("\n── BloodHound CE export of the legacy graph store ───────────")
+    DB.reset_DB()
+    domain = DB.node_operation("Domain", ["name", "objectid", "labels"], ["CORP.LOCAL", "S-1-5-21-9", "Domain"], "S-1-5-21-9")
+    group = DB.node_operation("Group", ["name", "objectid", "labels"], ["ADMINS@CORP.LOCAL", "G-1", "Group"], "G-1")
+    computer = DB.node_operation("Computer", ["name", "objectid", "labels"], ["WS01.CORP.LOCAL", "C-1", "Computer"], "C-1")
+    ou = DB.node_operation("OU", ["name", "objectid", "labels"], ["SERVERS@CORP.LOCAL", "OU-1", "OU"], "OU-1")
+    users = [DB.node_operation("User", ["name", "objectid", "labels"],
+                                [f"U{i}@CORP.LOCAL", f"U-{i}", "User"], f"U-{i}")
+             for i in range(2)]
+    for user in users:
+        DB.edge_operation(user, group, "MemberOf")
+    DB.edge_operation(group, computer, "AdminTo")
+    DB.edge_operation(group, ou, "AdminTo")
+    DB.edge_operation(group, users[0], "GenericAll", ["isacl"], [True])
+    DB.edge_operation(domain, computer, "Contains")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = export_legacy_bloodhound(tmp, "legacy")
+        data = {}
+        with zipfile.ZipFile(path) as zf:
+            for name in zf.namelist():
+                payload = json.loads(zf.read(name))
+                data.setdefault(payload["meta"]["type"], []).extend(payload["data"])
+    DB.reset_DB()
+
+    check("one file per legacy object type",
+          sorted(data) == ["computers", "domains", "groups", "ous", "rels", "users"], f"got {sorted(data)}")
+    check("Domain nodes written as domains", data["domains"][0]["ObjectIdentifier"] == "S-1-5-21-9")
+    check("MemberOf embedded as group members",
+          [m["ObjectIdentifier"] for m in data["groups"][0]["Members"]] == ["U-0", "U-1"])
+    check("AdminTo embedded as local admins",
+          data["computers"][0]["LocalAdmins"] == [{"ObjectIdentifier": "G-1", "IsInherited": False}])
+    check("AdminTo to an OU and other legacy edges kept under their own names",
+          data["rels"] == [{"StartNode": "G-1", "EndNode": "OU-1", "RelType": "AdminTo"},
+                           {"StartNode": "G-1", "EndNode": "U-0", "RelType": "GenericAll"},
+                           {"StartNode": "S-1-5-21-9", "EndNode": "C-1", "RelType": "Contains"}],
+          f"got {data['rels']}")
+
+# ---------------------------------------------------------------------------
+
+def main():
+    print("\n" + "="*60)
+    print("  Exporter Test Suite")
+    print("="*60)
+
+    test_neo4j_loader()
+    test_loader_resume()
+    test_neo4j_admin_csv()
+    test_admin_csv_graph_store()
+    test_bloodhound_streaming()
+    test_bloodhound_parallel_zip()
+    test_bloodhound_legacy_store()
+
+    passed = sum(1 for _, ok in _results if ok)
+    total  = len(_results)
+    failed = total - passed
+    print(f"\n{'='*60}")
+    print(f"  Results: {passed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,530 @@
+"""
+test_graph_store.py — legacy DATABASE storage backend tests
+===========================================================
+Run with:  python test_graph_store.py
+
+Tests:
+  1.  Columnar store: node_operation returns dense indices, dedups by lookup key
+  2.  Columnar store: labels are interned, appended once, kept in order
+  3.  Columnar store: edge_operation dedups and keeps properties sparse
+  4.  Columnar store: materialised records match the dict backend exactly
+  5.  Edge dedup key: packed keys round-trip and do not collide
+  6.  Streaming export: spilled edges + late property updates match the
+      in-memory dump byte for byte
+  7.  Bulk insert: bulk_node_operation matches per-node node_operation in
+      both backends (records, indices, DATABASE_ID, NODE_GROUPS)
+  8.  Lazy hyperedges: export-time expansion gives the eager edge set and
+      properties (overlapping hyperedges, member edges written later
+      included); compact mode keeps one record per hyperedge / member set
+  9.  OU registry: tiered OU names resolve to their live member lists
+ 10.  Graph builders: interleaved, nested and threaded builders (active at
+      the same time) each build the graph of a run on its own; synthesizer
+      entry points build into the builder passed as graph=; reset_DB
+      forgets every structure
+ 11.  Backends across generators: a hybrid run after a columnar run picks
+      its own backend and writes the dict backend's dataset; Azure role
+      scopes are plain ids
+"""
+
+import copy
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsynth.DATABASE as DB
+import adsynth.hybrid_system.export_writer as export_writer
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.graph_builder import GraphBuilder
+from adsynth.graph_state import current_graph
+from adsynth.helpers.getters import get_ou_elements
+from adsynth.helpers.metagraph_extractor import extract_hyperedges
+from adsynth.helpers.ou_registry import get_ou_entry, register_tiered_ous
+from adsynth.hybrid_system.schema_registry import NodeLabel
+from adsynth.skeleton_cache import GUID_PATTERN
+from adsynth.streaming_writer import StreamingGraphWriter
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+def raises(exception, function, *args):
+    # True if function(*args) raises exception
+    try:
+        function(*args)
+    except exception:
+        return True
+    return False
+
+def build_small_graph(columnar, stream=None):
+    DB.use_columnar_store(columnar)
+    DB.use_edge_stream(stream)
+    DB.reset_DB()
+    domain = DB.node_operation("Domain", ["name", "objectid", "labels"],
+                               ["CORP.LOCAL", "S-1-5-21-1", "Domain"], "S-1-5-21-1")
+    ou = DB.node_operation("OU", ["name", "objectid", "description", "labels"],
+                           ["ADMIN@CORP.LOCAL", "OU-1", None, "OU"], "OU-1")
+    gpo = DB.node_operation("GPO", ["name", "objectid", "labels"],
+                            ["POLICY@CORP.LOCAL", "GPO-1", "GPO"], "GPO-1")
+    user = DB.node_operation("User", ["name", "objectid", "labels", "enabled"],
+                             ["ALICE@CORP.LOCAL", "U-1", "User", True], "U-1")
+    # Second call on an existing node updates it in place
+    DB.node_operation("User", ["labels", "admincount"], ["User", True], "U-1")
+    DB.edge_operation(domain, ou, "Contains")
+    DB.edge_operation(gpo, ou, "GpLink", ["enforced"], [False])
+    DB.edge_operation(user, ou, "GenericAll", ["isacl"], [True])
+    DB.edge_operation(user, ou, "GenericAll", ["isacl"], [True])
+    DB.edge_operation(gpo, user, "Owns", ["meta"], [{"k": [1, 2]}])
+    # Late update of an existing edge, and a label added after edges exist
+    DB.edge_operation(user, ou, "GenericAll", ["isInherited"], [False])
+    DB.node_operation("User", ["labels"], ["Kerberoastable"], "U-1")
+    DB.node_operation("User", ["labels"], ["Kerberoastable"], "U-1")
+    DB.use_edge_stream(None)
+    if stream is not None:
+        return None, None, None, list(DB.GPLINK_OUS)
+    nodes = [dict(r) for r in DB.iter_node_records()]
+    edges = [dict(r) for r in DB.iter_edge_records()]
+    gplinks = list(DB.GPLINK_OUS)
+    return (domain, ou, gpo, user), nodes, edges, gplinks
+
+def test_columnar_store():
+    print("\n── Columnar graph store ─────────────────────────────────────")
+    idx, nodes, edges, gplinks = build_small_graph(columnar=True)
+    store = current_graph().GRAPH_STORE
+
+    assert list(idx) == [0, 1, 2, 3], f"node indices are dense: got {idx}"
+    assert store.num_nodes() == 4, f"repeated lookup key does not add a node: got {store.num_nodes()}"
+    assert DB.get_node_index("U-1", "objectid") == 3, "get_node_index resolves objectid"
+    assert DB.get_node_index("ALICE@CORP.LOCAL_User", "name") == 3, "get_node_index resolves name_label"
+
+    assert store.node_labels(3) == ["Base", "User", "Kerberoastable"], \
+        f"labels kept in order without duplicates: got {store.node_labels(3)}"
+    assert len(store.label_names) == len(set(store.label_names)), "label strings interned once"
+    assert DB.has_node_property(1, "description") and DB.get_node_property(1, "description") is None, \
+        "None is stored as a real property value"
+
+    assert store.num_edges() == 4, f"duplicate edge is dropped: got {store.num_edges()}"
+    assert 0 not in store.edge_props, "edges without properties stay out of the property map"
+    assert gplinks == [1], f"GPO→OU edge recorded in GPLINK_OUS: got {gplinks}"
+
+    _, ref_nodes, ref_edges, ref_gplinks = build_small_graph(columnar=False)
+    assert nodes == ref_nodes, "node records identical to dict backend"
+    assert [list(n["properties"]) for n in nodes] == [list(n["properties"]) for n in ref_nodes], \
+        "node property key order identical to dict backend"
+    assert edges == ref_edges, "edge records identical to dict backend"
+    assert gplinks == ref_gplinks, "GPLINK_OUS identical to dict backend"
+
+    DB.reset_DB()
+
+def test_edge_key():
+    print("\n── Edge dedup key ───────────────────────────────────────────")
+    DB.reset_DB()
+    # "1" + "X" + "12" and "11" + "X" + "2" style triples must stay distinct
+    triples = [(1, 12, "MemberOf"), (11, 2, "MemberOf"), (12, 1, "MemberOf"),
+               (1, 12, "AdminTo"), (0, 0, "MemberOf"), (2**40, 2**32 - 1, "AdminTo")]
+    keys = [DB.pack_edge_key(s, e, t) for s, e, t in triples]
+    assert all(isinstance(k, int) for k in keys), "packed keys are ints"
+    assert len(set(keys)) == len(triples), "no two triples share a key"
+    assert [DB.unpack_edge_key(k) for k in keys] == triples, \
+        f"keys round-trip: got {[DB.unpack_edge_key(k) for k in keys]}"
+    assert raises(ValueError, DB.pack_edge_key, 0, 2**32, "MemberOf"), "end index above 32 bits is rejected"
+    DB.reset_DB()
+
+def test_streaming_export():
+    print("\n── Streaming export ─────────────────────────────────────────")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.json")
+        stream = StreamingGraphWriter(path, batch_size=2)
+        _, _, _, gplinks = build_small_graph(columnar=True, stream=stream)
+        assert current_graph().GRAPH_STORE.num_edges() == 0, "edges are not kept in memory"
+        assert stream.num_edges == 4, f"stream counts deduplicated edges: got {stream.num_edges}"
+        stream.finish(DB.iter_node_records(), DB.get_node_endpoint)
+        assert not os.path.exists(stream.spill_path), "spill file removed"
+        with open(path) as f:
+            streamed = f.read()
+
+        _, nodes, edges, ref_gplinks = build_small_graph(columnar=False)
+        expected = "".join(json.dumps(dict(n, type="node"), separators=(',', ':')) + '\n'
+                           for n in nodes)
+        expected += "".join(json.dumps(e, separators=(',', ':')) + '\n' for e in edges)
+        assert streamed == expected, "output identical to the in-memory dump"
+        assert gplinks == ref_gplinks, "GPLINK_OUS identical"
+
+        path = os.path.join(tmp, "azure.json")
+        stream = StreamingGraphWriter(path)
+        records = [{"source": "a", "target": "b", "type": "AZMemberOf"}]
+        stream.drain_records(records)
+        assert records == [], "drained records list is emptied"
+        stream.finish([{"id": "a", "name": "A"}])
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert (lines == ['{"id":"a","name":"A","type":"node"}',
+                          '{"source":"a","target":"b","type":"AZMemberOf"}']), \
+            f"complete records copied verbatim after nodes: got {lines}"
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+
+def build_bulk_graph(columnar, bulk):
+    DB.use_columnar_store(columnar)
+    DB.use_edge_stream(None)
+    DB.reset_DB()
+    group = DB.node_operation("Group", ["name", "objectid", "labels"],
+                              ["DOMAIN USERS@CORP.LOCAL", "G-513", "Group"], "G-513")
+    keys = ["name", "objectid", "enabled", "description"]
+    rows = [[f"U{i}@CORP.LOCAL", f"U-{i}", i % 2 == 0, None] for i in range(5)]
+    if bulk:
+        indices = list(DB.bulk_node_operation("User", keys, [list(c) for c in zip(*rows)]))
+        DB.bulk_edge_operation(indices, group, "MemberOf")
+    else:
+        indices = [DB.node_operation("User", keys + ["labels"], row + ["User"], row[1]) for row in rows]
+        for index in indices:
+            DB.edge_operation(index, group, "MemberOf")
+    # Later updates must still work on bulk-inserted nodes
+    DB.node_operation("User", ["labels", "admincount"], ["Kerberoastable", True], "U-3")
+    return (indices, [dict(r) for r in DB.iter_node_records()], [dict(r) for r in DB.iter_edge_records()],
+            dict(DB.DATABASE_ID["objectid"]), dict(DB.DATABASE_ID["name"]), list(DB.NODE_GROUPS["User"]),
+            current_graph().neo4j_id)
+
+def test_bulk_insert():
+    print("\n── Bulk insert ──────────────────────────────────────────────")
+    ref = build_bulk_graph(columnar=False, bulk=False)
+    for columnar in (False, True):
+        backend = "columnar" if columnar else "dict"
+        got = build_bulk_graph(columnar=columnar, bulk=True)
+        assert got[0] == [1, 2, 3, 4, 5], f"{backend}: dense indices after existing nodes: got {got[0]}"
+        assert got[1] == ref[1], f"{backend}: node records identical to node_operation"
+        assert [list(n["properties"]) for n in got[1]] == [list(n["properties"]) for n in ref[1]], \
+            f"{backend}: property key order identical"
+        assert got[2] == ref[2], f"{backend}: edge records identical"
+        assert got[3:] == ref[3:], f"{backend}: DATABASE_ID / NODE_GROUPS / neo4j_id identical"
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+
+def build_hyperedge_graph(columnar, mode):
+    DB.use_columnar_store(columnar)
+    DB.use_hyperedges(mode)
+    DB.reset_DB()
+    DB.node_operation("Group", ["name", "objectid", "labels"],
+                      ["ADMINS@CORP.LOCAL", "G-1", "Group"], "G-1")
+    users = [DB.node_operation("User", ["name", "objectid", "labels"],
+                               [f"U{i}@CORP.LOCAL", f"U-{i}", "User"], f"U-{i}") for i in range(4)]
+    # Already materialised member edge: the hyperedge only updates its properties
+    DB.edge_operation(0, users[0], "GenericAll", ["isacl"], [False])
+    members = [f"U{i}@CORP.LOCAL" for i in range(3)]
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", members, "User", "GenericAll",
+                       ["isacl", "isInherited"], [True, False])
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", members, "User", "Owns", ["isacl"], [True])
+    # Overlapping member set and a repeated hyperedge with a late property
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", users[1:], "User", "GenericAll", ["isacl"], [True])
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", members, "User", "Owns", ["fromgpo"], [False])
+    edges = sorted((e["start"]["id"], e["label"], e["end"]["id"], json.dumps(e["properties"]))
+                   for e in DB.iter_edge_records())
+    return edges
+
+def build_overlapping_hyperedges(columnar, mode):
+    # Member edges written by edge_operation / bulk_edge_operation after a
+    # hyperedge covers them, and overlapping hyperedges with conflicting values
+    DB.use_columnar_store(columnar)
+    DB.use_hyperedges(mode)
+    DB.reset_DB()
+    DB.node_operation("Group", ["name", "objectid", "labels"], ["ADMINS@CORP.LOCAL", "G-1", "Group"], "G-1")
+    users = [DB.node_operation("User", ["name", "objectid", "labels"],
+                               [f"U{i}@CORP.LOCAL", f"U-{i}", "User"], f"U-{i}") for i in range(3)]
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", ["U0@CORP.LOCAL", "U1@CORP.LOCAL"], "User", "GenericAll",
+                       ["isacl", "isInherited"], [True, False])
+    DB.edge_operation(0, users[0], "GenericAll", ["extra"], [1])
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", ["U1@CORP.LOCAL", "U2@CORP.LOCAL"], "User", "GenericAll",
+                       ["isInherited"], [True])
+    extract_hyperedges("ADMINS@CORP.LOCAL", "Group", ["U0@CORP.LOCAL", "U1@CORP.LOCAL"], "User", "GenericAll",
+                       ["isInherited"], [False])
+    DB.bulk_edge_operation([0], users[2], "GenericAll", ["extra"], [2])
+    return sorted((e["start"]["id"], e["label"], e["end"]["id"], json.dumps(e["properties"], sort_keys=True))
+                  for e in DB.iter_relationship_records())
+
+def test_lazy_hyperedges():
+    print("\n── Lazy hyperedges ──────────────────────────────────────────")
+    ref = build_hyperedge_graph(columnar=False, mode=DB.HYPEREDGE_EAGER)
+    for columnar in (False, True):
+        backend = "columnar" if columnar else "dict"
+        edges = build_hyperedge_graph(columnar=columnar, mode=DB.HYPEREDGE_LAZY)
+        assert DB.get_num_edges() == 1, \
+            f"{backend}: only the pre-existing edge is materialised: got {DB.get_num_edges()}"
+        assert DB.get_num_hyperedges() == 3, \
+            f"{backend}: repeated hyperedge is recorded once: got {DB.get_num_hyperedges()}"
+        assert len(DB.MEMBER_SETS) == 2, \
+            f"{backend}: identical member sets are interned: got {len(DB.MEMBER_SETS)}"
+        assert edges == ref, f"{backend}: expanded edges and properties identical to eager: got {edges}"
+        ids = [e["id"] for e in DB.iter_edge_records()]
+        assert ids == [f"r_{i}" for i in range(len(ref))], \
+            f"{backend}: expanded edges continue the edge ids: got {ids}"
+        assert DB.get_num_expanded_hyperedges() == len(ref) - 1, \
+            f"{backend}: expanded member edges counted without expanding them: got {DB.get_num_expanded_hyperedges()}"
+
+    ref = build_overlapping_hyperedges(columnar=False, mode=DB.HYPEREDGE_EAGER)
+    for columnar in (False, True):
+        backend = "columnar" if columnar else "dict"
+        for mode, name in ((DB.HYPEREDGE_LAZY, "lazy"), (DB.HYPEREDGE_COMPACT, "compact")):
+            edges = build_overlapping_hyperedges(columnar=columnar, mode=mode)
+            assert edges == ref, \
+                f"{backend}: {name} expansion of overlapping and later-written member edges is eager's: got {edges}, expected {ref}"
+            assert len(DB.dict_edges) + DB.get_num_expanded_hyperedges() == len(ref), \
+                f"{backend}: {name} count of overlapping member edges"
+
+    build_hyperedge_graph(columnar=True, mode=DB.HYPEREDGE_COMPACT)
+    records = list(DB.iter_metagraph_records())
+    assert len(list(DB.iter_edge_records())) == 1, "compact: member edges are never expanded"
+    assert [r["type"] for r in records] == ["memberset"] * 2 + ["hyperedge"] * 3, \
+        "compact: member sets then hyperedges"
+    assert records[0]["members"] == ["1", "2", "3"], \
+        f"compact: member sets list node ids: got {records[0]['members']}"
+    assert ((records[3]["label"], records[3]["members"], records[3]["properties"])
+            == ("Owns", "m_0", {"isacl": True, "fromgpo": False})), \
+        f"compact: hyperedge references its member set: got {records[3]}"
+    DB.use_hyperedges(DB.HYPEREDGE_EAGER)
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+
+def test_ou_registry():
+    print("\n── OU registry ──────────────────────────────────────────────")
+    DB.reset_DB()
+    n_tiers = 3
+    for tracked in (DB.ENABLED_USERS, DB.DISABLED_USERS):
+        tracked.extend([[] for _ in range(n_tiers)])
+    for tracked in (DB.WS_TIERS_LOCATIONS, DB.S_TIERS_LOCATIONS, DB.FOLDERS, DB.DISTRIBUTION_GROUPS):
+        tracked.extend([dict() for _ in range(n_tiers)])
+    for i in range(n_tiers):
+        DB.WS_TIERS_LOCATIONS[i]["NY"] = []
+        DB.S_TIERS_LOCATIONS[i]["NY"] = []
+    register_tiered_ous(range(2, n_tiers), ["NY"], ["IT", "R&D"])
+
+    assert len(DB.OU_REGISTRY) == 8, f"one entry per tiered OU: got {len(DB.OU_REGISTRY)}"
+    entry = get_ou_entry("T2 Servers NY")
+    assert (entry.tier, entry.kind, entry.subdivision, entry.member_type) == (2, "Servers", "NY", "Computer"), \
+        f"entry records tier, kind and location: got {entry}"
+
+    # Members placed (or re-bound) after registration are still found
+    DB.WS_TIERS_LOCATIONS[2]["NY"].append("WS-00001@CORP.LOCAL")
+    DB.ENABLED_USERS[2].append("ALICE@CORP.LOCAL")
+    DB.FOLDERS[2]["R&D"] = ["T2_R&D_FOLDER0_READ@CORP.LOCAL"]
+    DB.DISTRIBUTION_GROUPS[2]["IT"] = ["T2 DISTRIBUTION IT_NY@CORP.LOCAL"]
+    got = [get_ou_elements(name) for name in
+           ["T2 Workstations NY", "T2 Enabled User Accounts", "T2 Disabled User Accounts",
+            "T2 Security R&D", "T2 Distribution IT", "T1 Workstations NY", "T2 Groups"]]
+    assert (got == [
+        (["WS-00001@CORP.LOCAL"], "Computer"), (["ALICE@CORP.LOCAL"], "User"), ([], "User"),
+        (["T2_R&D_FOLDER0_READ@CORP.LOCAL"], "Group"), (["T2 DISTRIBUTION IT_NY@CORP.LOCAL"], "Group"),
+        ([], ""), ([], "")]), f"live members and node type per OU: got {got}"
+
+    for tracked in (DB.ENABLED_USERS, DB.DISABLED_USERS, DB.WS_TIERS_LOCATIONS, DB.S_TIERS_LOCATIONS,
+                    DB.FOLDERS, DB.DISTRIBUTION_GROUPS):
+        tracked.clear()
+    DB.reset_DB()
+    assert DB.OU_REGISTRY == {}, "reset_DB clears the registry"
+
+def grow_graph(step):
+    # One "phase": a group of users with random property values
+    group = DB.node_operation("Group", ["name", "objectid", "labels"],
+                              [f"G{step}@CORP.LOCAL", f"G-{step}", "Group"], f"G-{step}")
+    for i in range(3):
+        user = DB.node_operation("User", ["name", "objectid", "labels", "pwdlastset"],
+                                 [f"U{step}-{i}@CORP.LOCAL", f"U-{step}-{i}", "User", random.randint(0, 10**9)],
+                                 f"U-{step}-{i}")
+        DB.edge_operation(user, group, "MemberOf", ["weight"], [random.random()])
+        DB.ENABLED_USERS.append(user)
+
+def grow_steps(steps):
+    for step in steps:
+        random.seed(step)
+        grow_graph(step)
+
+def graph_state():
+    return json.dumps([list(DB.iter_node_records()), list(DB.iter_edge_records()), dict(DB.DATABASE_ID),
+                       dict(DB.NODE_GROUPS), list(DB.ENABLED_USERS), current_graph().neo4j_id, list(export_writer.HYBRID_NODES)])
+
+def graph_shape():
+    # graph_state without the random property values
+    return json.dumps([[(r["id"], r["labels"], r["properties"]["name"]) for r in DB.iter_node_records()],
+                       [(r["start"]["id"], r["end"]["id"], r["label"]) for r in DB.iter_edge_records()],
+                       dict(DB.DATABASE_ID), dict(DB.NODE_GROUPS), list(DB.ENABLED_USERS), current_graph().neo4j_id,
+                       list(export_writer.HYBRID_NODES)])
+
+def test_graph_builder():
+    print("\n── Graph builders ───────────────────────────────────────────")
+    DB.reset_DB()
+    export_writer.reset_graph()
+    for tracked in (DB.FOLDERS, DB.DISTRIBUTION_GROUPS, DB.S_TIERS_LOCATIONS, DB.WS_TIERS_LOCATIONS,
+                    DB.LOCAL_ADMINS, DB.SEC_DIST_GROUPS):
+        tracked.append({})
+    grow_steps([7])
+    DB.reset_DB()
+    assert (not any((DB.FOLDERS, DB.DISTRIBUTION_GROUPS, DB.S_TIERS_LOCATIONS, DB.WS_TIERS_LOCATIONS,
+                     DB.LOCAL_ADMINS, DB.SEC_DIST_GROUPS))), \
+        "reset_DB forgets the tier locations, folders, groups and local admins"
+    assert current_graph().neo4j_id == 0, "reset_DB starts node ids at 0 again"
+
+    grow_steps([7])
+    default = graph_state()
+    steps = {"a": [0, 1, 2], "b": [10, 11]}
+    expected = {}
+    for name, builder_steps in steps.items():
+        builder = GraphBuilder()
+        with builder.active():
+            assert DB.get_num_nodes() == 0 and current_graph().neo4j_id == 0, f"builder {name} starts empty"
+            grow_steps(builder_steps)
+            export_writer.add_node(NodeLabel.User, name, {}, validate=False)
+            expected[name] = graph_state()
+            expected[name + " shape"] = graph_shape()
+    assert graph_state() == default, "default graph back after a builder"
+
+    a, b = GraphBuilder(), GraphBuilder()
+    for name, step in (("a", 0), ("b", 10), ("a", 1), ("b", 11), ("a", 2)):
+        with (a if name == "a" else b).active():
+            grow_steps([step])
+    with a.active():
+        export_writer.add_node(NodeLabel.User, "a", {}, validate=False)
+        with b.active():
+            export_writer.add_node(NodeLabel.User, "b", {}, validate=False)
+            assert graph_state() == expected["b"], "nested builder's graph is active"
+            with a.active():
+                assert graph_state() == expected["a"], "builder activated again below another"
+            assert graph_state() == expected["b"], "nested builder's graph back"
+        with a.active():
+            assert graph_state() == expected["a"], "interleaved builders build the sequential graphs"
+    assert graph_state() == default, "default graph untouched by interleaved builders"
+
+    columnar = GraphBuilder(columnar=True)
+    with columnar.active():
+        grow_steps(steps["a"])
+        export_writer.add_node(NodeLabel.User, "a", {}, validate=False)
+        assert graph_state() == expected["a"], "columnar builder builds the dict builder's records"
+    assert current_graph().GRAPH_STORE is None, "columnar store only while its builder is active"
+    columnar.reset()
+    with columnar.active():
+        assert DB.get_num_nodes() == 0 and not export_writer.HYBRID_NODES, "reset empties the builder's graph"
+
+    # Synthesizer entry points build into the graph they are passed
+    from adsynth.default_ad_system.domains import create_domain
+    passed, activated = GraphBuilder(), GraphBuilder()
+    random.seed(4)
+    create_domain("CORP.LOCAL", "S-1-5-21-4", "DC=CORP,DC=LOCAL", {}, graph=passed)
+    random.seed(4)
+    with activated.active():
+        create_domain("CORP.LOCAL", "S-1-5-21-4", "DC=CORP,DC=LOCAL", {})
+        expected["domain"] = graph_state()
+    assert graph_state() == default, "default graph untouched by an entry point given a builder"
+    with passed.active():
+        assert DB.NODE_GROUPS["Domain"] == [0] and graph_state() == expected["domain"], \
+            "entry point builds into the builder it is passed"
+
+    # Every thread waits inside its active builder until all of them are in
+    # theirs, so the builders must be active at the same time.  The threads
+    # share the random stream: compare the graphs without the drawn values.
+    results = {}
+    started = threading.Barrier(6)
+    def run(index):
+        builder = GraphBuilder()
+        builder_steps = steps["a"] if index % 2 else steps["b"]
+        with builder.active():
+            grow_steps(builder_steps[:1])
+            try:
+                started.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                return
+            grow_steps(builder_steps[1:])
+            export_writer.add_node(NodeLabel.User, "a" if index % 2 else "b", {}, validate=False)
+            results[index] = graph_shape()
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6, f"builders are active in several threads at once: {len(results)} of 6 finished"
+    assert all(results.get(i) == expected[("a" if i % 2 else "b") + " shape"] for i in range(6)), \
+        "threaded builders build the sequential graphs"
+    assert graph_state() == default, "default graph untouched by threaded builders"
+    DB.reset_DB()
+
+def without_guids(text):
+    # Number the GUIDs in order of appearance, so two graphs that only differ
+    # in their GUIDs compare equal
+    guids = {}
+    return GUID_PATTERN.sub(lambda m: guids.setdefault(m.group(0).lower(), f"GUID-{len(guids)}"), text)
+
+def run_generator(menu, generate, parameters, output_dir, name):
+    random.seed(parameters["seed"])
+    menu.parameters = parameters
+    menu.dataset_name = os.path.relpath(os.path.join(output_dir, name), "generated_datasets")
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        generate()
+    with open(os.path.join(output_dir, name + ".json")) as f:
+        return without_guids(f.read())
+
+def test_generator_backends():
+    print("\n── Backends across generators ───────────────────────────────")
+    from adsynth.ADSynth import MainMenu
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        menu = MainMenu()
+    menu.current_time = 1700000000
+    parameters = copy.deepcopy(DEFAULT_CONFIGURATIONS)
+    parameters["seed"] = 5
+    parameters["User"]["nUsers"] = 30
+    columnar = dict(copy.deepcopy(parameters), columnar_store=1)
+    with tempfile.TemporaryDirectory(dir="generated_datasets") as tmp:
+        expected = run_generator(menu, menu.generate_data_hybrid, parameters, tmp, "dict")
+        run_generator(menu, lambda: menu.do_generate(""), columnar, tmp, "legacy")
+        after_columnar = run_generator(menu, menu.generate_data_hybrid, parameters, tmp, "after_columnar")
+        assert after_columnar == expected, "hybrid run after a columnar run uses the dict backend"
+        on_columnar = run_generator(menu, menu.generate_data_hybrid, columnar, tmp, "columnar")
+        assert on_columnar == expected, "columnar hybrid run writes the dict backend's dataset"
+        for name, generate in (("generate", lambda: menu.do_generate("")), ("generate_azure", menu.generate_data_azure)):
+            DB.use_columnar_store(True)
+            run_generator(menu, generate, parameters, tmp, name)
+            assert current_graph().GRAPH_STORE is None, f"{name} without columnar_store uses the dict backend"
+        subscription_id, tenant_id = (DB.get_node_property(DB.NODE_GROUPS[label][0], "objectid")
+                                      for label in ("AZSubscription", "AZTenant"))
+        scopes = {e["properties"]["scope"] for e in DB.iter_edge_records() if e["label"] == "AZHasRole"}
+        assert scopes == {subscription_id, tenant_id}, \
+            f"generate_azure role scopes are the plain subscription and tenant ids: got {scopes}"
+    DB.reset_DB()
+
+TESTS = (
+    test_columnar_store,
+    test_edge_key,
+    test_streaming_export,
+    test_bulk_insert,
+    test_lazy_hyperedges,
+    test_ou_registry,
+    test_graph_builder,
+    test_generator_backends,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Graph Store Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
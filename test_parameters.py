@@ -0,0 +1,100 @@
+"""
+test_parameters.py — compiled parameter tests
+=============================================
+Run with:  python test_parameters.py
+
+Tests:
+  1.  Compiled parameters: read-only snapshot (nested objects, lists and
+      cached answers included), getters give the raw-dict answers from a
+      cache, config problems reported up front
+"""
+
+import copy
+import json
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adsynth.helpers.getters import get_department_names, get_list_perc_param_value, get_locations, get_threshold_values
+from adsynth.utils.parameters import compile_parameters, get_perc_param_value
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+def raises(exception, function, *args):
+    # True if function(*args) raises exception
+    try:
+        function(*args)
+    except exception:
+        return True
+    return False
+
+def test_compiled_parameters():
+    print("\n── Compiled parameters ──────────────────────────────────────")
+    raw = {"User": {"enabled": 150, "nUsers": "many", "typo": 1, "sessionsPercentages": [10, 150, -5]},
+           "Group": {"nGroupsPerUsers": [2, 5]}, "nLocations": 2}
+    config = compile_parameters(raw)
+    lookups = [lambda p: get_perc_param_value("User", "enabled", p),
+               lambda p: get_threshold_values("Group", "nGroupsPerUsers", p),
+               lambda p: get_threshold_values("Group", "nResourcesThresholds", p),
+               get_locations, get_department_names]
+    assert [f(config) for f in lookups] == [f(raw) for f in lookups], "getters give the raw-dict answers"
+    assert get_locations(config) is get_locations(config), "answers come from the cache"
+    assert config.problems == ["User.nUsers: expected int, the default is used", "User.typo: unknown parameter"], \
+        f"problems reported up front: got {config.problems}"
+
+    raw["nLocations"] = 5
+    assert len(get_locations(config)) == 2, "snapshot does not follow the source dict"
+    assert raises(TypeError, config.__setitem__, "nLocations", 5), "compiled parameters are read-only"
+    assert compile_parameters(config) is config, "compiling twice returns the same object"
+
+    def refused(change):
+        return raises(TypeError, change)
+    assert (refused(lambda: config["User"].update(enabled=5)) and refused(lambda: config["Group"]["nGroupsPerUsers"].append(9))
+            and refused(lambda: config["Group"]["nGroupsPerUsers"].__setitem__(0, 9))), \
+        "nested objects and lists are read-only"
+    sessions = get_list_perc_param_value("User", "sessionsPercentages", config)
+    assert (sessions == [10, 100, 100] == get_list_perc_param_value("User", "sessionsPercentages", raw)
+            and raw["User"]["sessionsPercentages"] == [10, 150, -5] and config["User"]["sessionsPercentages"] == [10, 150, -5]), \
+        "out-of-range percentages clamped without touching the parameters"
+    assert refused(lambda: sessions.__setitem__(0, 1)) and sessions == [10, 100, 100], \
+        "cached answers are read-only"
+    copied = copy.deepcopy(config["Group"])
+    copied["nGroupsPerUsers"].append(9)
+    assert type(copied) is dict and copied["nGroupsPerUsers"] == [2, 5, 9] and config["Group"]["nGroupsPerUsers"] == [2, 5], \
+        "copies of a compiled object are plain and editable"
+    assert json.loads(json.dumps(config)) == raw | {"nLocations": 2} and pickle.loads(pickle.dumps(config)) == config, \
+        "compiled parameters serialise as the source dict"
+
+TESTS = (
+    test_compiled_parameters,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Parameters Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+test_phases.py — generate_data phase pipeline tests
+===================================================
+Run with:  python test_phases.py
+
+Tests:
+  1.  Phase profiler: per-phase nodes/edges added and traced memory, JSON
+      report, and a cProfile dump of the slowest phase (without memory
+      tracing) next to the dataset
+  2.  Phase checkpoints: a run resumed after a lost phase writes the
+      dataset of an uninterrupted one byte for byte, GUIDs included (also
+      for generate --resume); phases saved together; other runs'
+      checkpoints are refused
+  3.  Skeleton cache: a cached scaffolding equals a freshly built one, GUIDs
+      included, keeps the random stream and follows the run's node ids; a
+      generate that hits the cache writes the dataset of one that misses it
+"""
+
+import copy
+import filecmp
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from itertools import chain
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsynth.DATABASE as DB
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.graph_state import current_graph
+from adsynth.phase_checkpoint import PhaseCheckpoint
+from adsynth.phase_profiler import PhaseProfiler
+from adsynth.skeleton_cache import GUID_PATTERN, SkeletonCache, skeleton_key
+from adsynth.streaming_writer import StreamingGraphWriter
+from adsynth.utils.sampling import random_guid
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+def raises(exception, function, *args):
+    # True if function(*args) raises exception
+    try:
+        function(*args)
+    except exception:
+        return True
+    return False
+
+def test_phase_profiler():
+    print("\n── Phase profiler ───────────────────────────────────────────")
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+    profiler = PhaseProfiler(profile=True)
+    profiler.start_phase("nodes")
+    a = DB.node_operation("User", ["name", "objectid", "labels"], ["A@CORP.LOCAL", "U-A", "User"], "U-A")
+    b = DB.node_operation("Group", ["name", "objectid", "labels"], ["G@CORP.LOCAL", "G-1", "Group"], "G-1")
+    profiler.start_phase("edges")
+    DB.edge_operation(a, b, "MemberOf")
+    DB.edge_operation(a, b, "MemberOf")
+    sum(i * i for i in range(200000))
+    profiler.finish()
+
+    phases = {p["phase"]: p for p in profiler.phases}
+    assert list(phases) == ["nodes", "edges"], f"phases recorded in order: got {list(phases)}"
+    assert ((phases["nodes"]["nodes_added"], phases["nodes"]["edges_added"],
+             phases["edges"]["nodes_added"], phases["edges"]["edges_added"]) == (2, 0, 0, 1)), \
+        "nodes / edges added per phase"
+    assert not profiler.memory_traced and "peak_tracemalloc_bytes" not in phases["edges"], \
+        "profiled run does not trace memory"
+    assert profiler.slowest_phase() == "edges", "slowest phase by wall time"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = profiler.write(os.path.join(tmp, "run.json"))
+        with open(report_path) as f:
+            report = json.load(f)
+        assert report_path == os.path.join(tmp, "run.phases.json"), "report written next to the dataset"
+        assert (report["nodes"], report["edges"]) == (2, 1), "report totals match the graph"
+        assert (report["cprofile_stats"] == "run.edges.prof"
+                and os.path.exists(os.path.join(tmp, "run.edges.prof"))), \
+            "cProfile stats dumped for the slowest phase"
+        assert report["memory_traced"] is False, "profiled report says memory was not traced"
+
+    untraced = PhaseProfiler()
+    untraced.finish()
+    assert not untraced.memory_traced and not tracemalloc.is_tracing(), "memory is only traced on request"
+
+    plain = PhaseProfiler(trace_memory=True)
+    plain.start_phase("small")
+    small = [0] * 1000
+    plain.start_phase("large")
+    large = [0] * 1000000
+    del large
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(plain.write(os.path.join(tmp, "run.json"))) as f:
+            report = json.load(f)
+        assert "cprofile_stats" not in report and os.listdir(tmp) == ["run.phases.json"], \
+            "unprofiled run dumps no cProfile stats"
+    phases = {p["phase"]: p for p in report["phases"]}
+    assert (report["memory_traced"] and phases["large"]["peak_tracemalloc_bytes"] >= 8000000
+            > phases["small"]["peak_tracemalloc_bytes"]), "traced report has per-phase peak traced memory"
+    assert phases["large"]["net_tracemalloc_bytes"] < 1000000 and phases["small"]["net_tracemalloc_bytes"] >= 8000, \
+        "net traced memory of a phase excludes what it freed"
+    assert not tracemalloc.is_tracing(), "tracemalloc stopped with the run"
+    DB.reset_DB()
+
+def grow_graph(step):
+    # One "phase": a group of users with random property values
+    group = DB.node_operation("Group", ["name", "objectid", "labels"],
+                              [f"G{step}@CORP.LOCAL", f"G-{step}", "Group"], f"G-{step}")
+    for i in range(3):
+        user = DB.node_operation("User", ["name", "objectid", "labels", "pwdlastset"],
+                                 [f"U{step}-{i}@CORP.LOCAL", f"U-{step}-{i}", "User", random.randint(0, 10**9)],
+                                 f"U-{step}-{i}")
+        DB.edge_operation(user, group, "MemberOf", ["weight"], [random.random()])
+        DB.ENABLED_USERS.append(user)
+
+def grow_guid_phase(step):
+    # A phase that also draws a GUID, as most generate_data phases do
+    grow_graph(step)
+    guid = random_guid().upper()
+    DB.node_operation("Computer", ["name", "objectid", "labels"], [f"PC{step}.CORP.LOCAL", guid, "Computer"], guid)
+
+def test_phase_checkpoint():
+    print("\n── Phase checkpoints ────────────────────────────────────────")
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_path = os.path.join(tmp, "run.checkpoint")
+        datasets = []
+        for interrupted in (False, True):
+            path = os.path.join(tmp, f"graph{int(interrupted)}.json")
+            DB.use_columnar_store(True)
+            DB.reset_DB()
+            random.seed(3)
+            stream = StreamingGraphWriter(path, batch_size=2)
+            DB.use_edge_stream(stream)
+            checkpoint = PhaseCheckpoint(checkpoint_path, {"seed": 3}, ("stream",))
+            grow_guid_phase(0)
+            checkpoint.save(("first", "cached"), locals())
+
+            if interrupted:
+                # A phase that dies half-way, then a fresh process
+                grow_graph(99)
+                stream._spill.close()
+                DB.use_edge_stream(None)
+                DB.use_columnar_store(False)
+                DB.reset_DB()
+                random.seed(0)
+                checkpoint = PhaseCheckpoint(checkpoint_path, {"seed": 3}, ("stream",))
+                assert checkpoint.load(), "checkpoint loaded"
+                assert checkpoint.phases == ["first", "cached"], "phases saved together all completed"
+                assert not checkpoint.pending("first") and checkpoint.pending("second"), \
+                    "completed phase skipped"
+                assert len(DB.ENABLED_USERS) == 3, f"tracking structures restored: got {DB.ENABLED_USERS}"
+                stream, = checkpoint.restored_values()
+                DB.use_edge_stream(stream)
+
+            grow_guid_phase(1)
+            DB.use_edge_stream(None)
+            stream.finish(DB.iter_node_records(), DB.get_node_endpoint)
+            with open(path) as f:
+                datasets.append(f.read())
+        assert datasets[0] == datasets[1], "resumed run writes the same dataset, GUIDs included"
+
+        assert raises(ValueError, PhaseCheckpoint(checkpoint_path, {"seed": 4}, ()).load), \
+            "checkpoint of another run refused"
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+
+def test_resumed_generate():
+    print("\n── Resumed generate ─────────────────────────────────────────")
+    import adsynth.ADSynth as ADSynth
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        menu = ADSynth.MainMenu()
+    menu.current_time = 1700000000
+    menu.parameters = copy.deepcopy(DEFAULT_CONFIGURATIONS)
+    menu.parameters["seed"] = 7
+    menu.parameters["User"]["nUsers"] = 30
+    checkpoint_path, create_kerberoastable_users = ADSynth.CHECKPOINT_PATH, ADSynth.create_kerberoastable_users
+
+    def interrupt(*args):
+        raise RuntimeError("interrupted")
+
+    with tempfile.TemporaryDirectory(dir="generated_datasets") as tmp:
+        ADSynth.CHECKPOINT_PATH = os.path.join(tmp, "generate.checkpoint")
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                menu.dataset_name = os.path.relpath(os.path.join(tmp, "uninterrupted"), "generated_datasets")
+                menu.do_generate("")
+                menu.dataset_name = os.path.relpath(os.path.join(tmp, "resumed"), "generated_datasets")
+                ADSynth.create_kerberoastable_users = interrupt
+                assert raises(RuntimeError, menu.do_generate, "--checkpoint --trace-memory"), \
+                    "run stopped in the kerberoastables phase"
+                assert not tracemalloc.is_tracing(), "failed run stopped tracing memory"
+                ADSynth.create_kerberoastable_users = create_kerberoastable_users
+                random.seed(0)
+                menu.do_generate("--resume")
+        finally:
+            ADSynth.CHECKPOINT_PATH, ADSynth.create_kerberoastable_users = checkpoint_path, create_kerberoastable_users
+        assert filecmp.cmp(os.path.join(tmp, "uninterrupted.json"), os.path.join(tmp, "resumed.json"), shallow=False), \
+            "resumed generate writes the uninterrupted dataset byte for byte"
+        assert not os.path.exists(os.path.join(tmp, "generate.checkpoint")), \
+            "checkpoint removed with the completed run"
+    DB.reset_DB()
+
+def build_scaffolding(first_id, columnar, cache=None):
+    # The scaffolding phases of generate_data, from an empty graph
+    from adsynth.default_ad_system.default_acls import create_domain_admins_acls, create_enterprise_admins_acls
+    from adsynth.default_ad_system.default_gpos import apply_default_gpos, create_default_gpos
+    from adsynth.default_ad_system.default_groups import create_default_groups
+    from adsynth.default_ad_system.default_ous import create_domain_controllers_ou
+    from adsynth.default_ad_system.domains import create_domain
+    from adsynth.entities.acls import cs
+    from adsynth.synthesizer.objects import create_admin_groups
+    from adsynth.synthesizer.ou_structure import create_ad_skeleton
+    from adsynth.synthesizer.security_policies import create_gpos_container
+
+    domain, sid, dn, n_tiers = "CORP.LOCAL", "S-1-5-21-100-200-300", "DC=CORP,DC=LOCAL", 3
+    DB.use_columnar_store(columnar)
+    DB.reset_DB()
+    current_graph().neo4j_id = first_id
+    DB.ridcount.extend([1000])
+    random.seed(5)
+    skeleton = SkeletonCache(cache or "", skeleton_key(domain, sid, None, n_tiers, {}), enabled=cache is not None)
+    values = skeleton.load({})
+    if values is None:
+        functional_level = create_domain(domain, sid, dn, {})
+        create_ad_skeleton(domain, sid, {}, n_tiers)
+        create_default_groups(domain, sid, None)
+        create_admin_groups(domain, sid, n_tiers)
+        ddp, ddcp, dcou, gpos_container = (cs(random_guid(), sid).upper() for _ in range(4))
+        create_gpos_container(domain, dn, gpos_container)
+        create_default_gpos(domain, dn, ddp, ddcp)
+        create_domain_controllers_ou(domain, dn, dcou)
+        apply_default_gpos(domain, ddp, ddcp, dcou)
+        create_enterprise_admins_acls(domain)
+        create_domain_admins_acls(domain)
+        skeleton.save(ddp, ddcp, dcou, gpos_container)
+        values = (functional_level, ddp, ddcp, dcou, gpos_container)
+    records = "\n".join(json.dumps(r) for r in chain(DB.iter_node_records(), DB.iter_edge_records()))
+    return records, values, random.random()
+
+def without_guids(text):
+    # Number the GUIDs in order of appearance, so two graphs that only differ
+    # in their GUIDs compare equal
+    guids = {}
+    return GUID_PATTERN.sub(lambda m: guids.setdefault(m.group(0).lower(), f"GUID-{len(guids)}"), text)
+
+def test_skeleton_cache():
+    print("\n── Skeleton cache ───────────────────────────────────────────")
+    with tempfile.TemporaryDirectory() as tmp:
+        for columnar in (False, True):
+            tag = "columnar" if columnar else "dict"
+            cache = os.path.join(tmp, tag)
+            built, built_values, built_draw = build_scaffolding(0, columnar, cache)
+            assert len(os.listdir(cache)) == 1, f"[{tag}] scaffolding cached: got {os.listdir(cache)}"
+
+            # A later run in the same process: node ids continue from neo4j_id
+            fresh, _, fresh_draw = build_scaffolding(40, columnar)
+            loaded, values, loaded_draw = build_scaffolding(40, columnar, cache)
+            assert loaded == fresh and len(set(GUID_PATTERN.findall(loaded))) > 10, \
+                f"[{tag}] cached scaffolding equals a fresh one, GUIDs included"
+            assert loaded_draw == fresh_draw == built_draw, f"[{tag}] random stream unchanged"
+            dcou = values[3]
+            assert (DB.get_node_index(dcou, "objectid") >= 0
+                and DB.get_node_property(DB.get_node_index(dcou, "objectid"), "objectid") == dcou), \
+                f"[{tag}] regenerated ids resolve"
+            assert build_scaffolding(40, columnar, cache)[0] == loaded, \
+                f"[{tag}] seeded GUIDs are reproducible"
+    DB.use_columnar_store(False)
+    DB.reset_DB()
+
+    # generate with the cache cold, then warm
+    import adsynth.ADSynth as ADSynth
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        menu = ADSynth.MainMenu()
+    menu.current_time = 1700000000
+    menu.parameters = copy.deepcopy(DEFAULT_CONFIGURATIONS)
+    menu.parameters["seed"] = 11
+    menu.parameters["User"]["nUsers"] = 30
+    menu.parameters["skeleton_cache"] = 1
+    cache_dir = ADSynth.SKELETON_CACHE_DIR
+    with tempfile.TemporaryDirectory(dir="generated_datasets") as tmp:
+        ADSynth.SKELETON_CACHE_DIR = os.path.join(tmp, "cache")
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                for name in ("cold", "warm"):
+                    # generate sets old_domain, which is part of the cache key
+                    menu.old_domain = None
+                    menu.dataset_name = os.path.relpath(os.path.join(tmp, name), "generated_datasets")
+                    menu.do_generate("")
+        finally:
+            ADSynth.SKELETON_CACHE_DIR = cache_dir
+        assert len(os.listdir(os.path.join(tmp, "cache"))) == 1, \
+            f"generate caches the scaffolding: got {os.listdir(os.path.join(tmp, 'cache'))}"
+        assert filecmp.cmp(os.path.join(tmp, "cold.json"), os.path.join(tmp, "warm.json"), shallow=False), \
+            "a cache hit writes the dataset of a cache miss byte for byte"
+    DB.reset_DB()
+
+TESTS = (
+    test_phase_profiler,
+    test_phase_checkpoint,
+    test_resumed_generate,
+    test_skeleton_cache,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Phase Pipeline Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
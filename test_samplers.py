@@ -0,0 +1,136 @@
+"""
+test_samplers.py — seeded sampler tests
+=======================================
+Run with:  python test_samplers.py
+
+Tests:
+  1.  Samplers: seeded streams of Bernoulli, AliasSampler and ColumnSampler;
+      alias tables give the weights (zero weights never drawn); Bernoulli
+      at p=0 / p=100; ColumnSampler answers the same without NumPy
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsynth.utils.sampling as sampling_module
+from adsynth.utils.sampling import AliasSampler, Bernoulli, ColumnSampler
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+def raises(exception, function, *args):
+    # True if function(*args) raises exception
+    try:
+        function(*args)
+    except exception:
+        return True
+    return False
+
+class FixedRandom:
+    """An rng whose random() always returns value."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+def alias_probabilities(sampler):
+    # Exact probability of every item under the alias table
+    probabilities = dict.fromkeys(sampler.items, 0.0)
+    for i, item in enumerate(sampler.items):
+        probabilities[item] += sampler.prob[i] / sampler.n
+        probabilities[sampler.items[sampler.alias[i]]] += (1 - sampler.prob[i]) / sampler.n
+    return probabilities
+
+def column_answers(sampler):
+    return (sampler.bools(0, 100, 50), sampler.bools(100, 0, 50), sampler.integers(4, 4, 20),
+            sampler.choices(["only"], 20), sampler.weighted(["PAW"] * 15, 20),
+            sorted(set(sampler.integers(1, 3, 500))), sorted(set(sampler.weighted(["a"] * 3 + ["c"], 500))))
+
+def test_samplers():
+    print("\n── Samplers ─────────────────────────────────────────────────")
+    random.seed(6)
+    expected = [random.random() < 0.3 for _ in range(200)]
+    random.seed(6)
+    coin = Bernoulli(30, 70)
+    assert [coin() for _ in range(200)] == expected, "Bernoulli draws random() < p_true / 100"
+    assert not Bernoulli(0, 100)(FixedRandom(0.0)), "Bernoulli at p=0 is never true"
+    assert Bernoulli(100, 0)(FixedRandom(1 - 2 ** -53)), "Bernoulli at p=100 is always true"
+    assert Bernoulli(30, 30).threshold == 0.5, "Bernoulli of a broken pair is a fair coin"
+
+    weights = {"PAW": 15, "Server": 20, "Workstation": 65, "Unused": 0, "Rare": 1}
+    sampler = AliasSampler(weights, weights.values())
+    probabilities = alias_probabilities(sampler)
+    assert all(abs(probabilities[item] - w / 101) < 1e-12 for item, w in weights.items()), \
+        f"alias table gives the weights: got {probabilities}"
+    assert probabilities["Unused"] == 0.0, "zero weight has probability zero"
+    random.seed(8)
+    draws = [sampler() for _ in range(5000)]
+    state = random.getstate()
+    random.seed(8)
+    for _ in range(5000):
+        random.random()
+    assert state == random.getstate(), "alias draw consumes one random()"
+    random.seed(8)
+    assert [sampler() for _ in range(5000)] == draws, "alias stream reproducible for a seed"
+    assert "Unused" not in draws and set(draws) == set(weights) - {"Unused"}, "zero weight never drawn"
+    assert alias_probabilities(AliasSampler.from_list(["a"] * 3 + ["b"])) == alias_probabilities(AliasSampler(["a", "b"], [3, 1])), \
+        "from_list counts the weighted list"
+    assert raises(ValueError, AliasSampler, ["a", "b"], [0, 0]), "all-zero weights refused"
+
+    streams = {}
+    for backend in ("numpy", "random") if sampling_module.numpy is not None else ("random",):
+        random.seed(9)
+        first = ColumnSampler(backend=backend)
+        random.seed(9)
+        second = ColumnSampler(backend=backend)
+        assert (first.integers(0, 10 ** 6, 100) == second.integers(0, 10 ** 6, 100)
+                and first.weighted(["a", "b", "b"], 100) == second.weighted(["a", "b", "b"], 100)), \
+            f"[{backend}] ColumnSampler seeded from the random module"
+        streams[backend] = column_answers(ColumnSampler(seed=4, backend=backend))
+    if "numpy" in streams:
+        assert streams["numpy"] == streams["random"], \
+            f"ColumnSampler gives the same answers with and without NumPy: got {streams}"
+    numpy_module = sampling_module.numpy
+    sampling_module.numpy = None
+    try:
+        fallback = ColumnSampler(seed=4)
+        assert fallback.backend == "random" and column_answers(fallback) == streams["random"], \
+            "without NumPy ColumnSampler falls back to random"
+    finally:
+        sampling_module.numpy = numpy_module
+
+TESTS = (
+    test_samplers,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Sampler Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+test_sweep.py — parameter sweep tests
+=====================================
+Run with:  python test_sweep.py
+
+Tests:
+  1.  Parameter sweeps: grids expand to override points; a pool of workers
+      writes the datasets of in-process runs, later runs of a worker
+      included, and a manifest; a failed point stops memory tracing
+"""
+
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adsynth.adsynth_templates.default_config import DEFAULT_CONFIGURATIONS
+from adsynth.skeleton_cache import GUID_PATTERN
+import adsynth.sweep as sweep
+from adsynth.sweep import expand_grid, plan_points, run_point, run_sweep
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+PASS_S = "\033[32mPASS\033[0m"
+FAIL_S = "\033[31mFAIL\033[0m"
+
+def raises(exception, function, *args):
+    # True if function(*args) raises exception
+    try:
+        function(*args)
+    except exception:
+        return True
+    return False
+
+def without_guids(text):
+    # Number the GUIDs in order of appearance, so two graphs that only differ
+    # in their GUIDs compare equal
+    guids = {}
+    return GUID_PATTERN.sub(lambda m: guids.setdefault(m.group(0).lower(), f"GUID-{len(guids)}"), text)
+
+def test_sweep():
+    print("\n── Parameter sweeps ─────────────────────────────────────────")
+    assert (expand_grid({"User.nUsers": [10, 20], "nTiers": [2, 3]})
+            == [{"User.nUsers": 10, "nTiers": 2}, {"User.nUsers": 10, "nTiers": 3},
+                {"User.nUsers": 20, "nTiers": 2}, {"User.nUsers": 20, "nTiers": 3}]), \
+        "grid object expands to its product"
+    points = plan_points(DEFAULT_CONFIGURATIONS, [{"User.nUsers": 20, "perc_misconfig_sessions.Customized": 30}],
+                         ["legacy", "azure"], [4, 5])
+    assert [(p["name"], p["seed"]) for p in points] == [("0000_legacy", 4), ("0001_legacy", 5), ("0002_azure", 4), ("0003_azure", 5)], \
+        "one point per overrides, generator and seed"
+    assert (points[0]["parameters"]["User"]["nUsers"] == 20 and points[0]["parameters"]["perc_misconfig_sessions"]["Customized"] == 30
+            and DEFAULT_CONFIGURATIONS["User"]["nUsers"] == 200 and points[0]["parameters"]["skeleton_cache"] == 1), \
+        "overrides reach nested parameters, the base is untouched"
+    assert raises(ValueError, plan_points, DEFAULT_CONFIGURATIONS, [{"nTiers.count": 2}], ["legacy"], None), \
+        "overrides below a plain value are refused"
+
+    # The same point three times: every later run of a worker repeats the first
+    points = plan_points(DEFAULT_CONFIGURATIONS, [{"User.nUsers": 20, "nTiers": 2}] * 3 + [{"User.nUsers": 40, "nTiers": 2}],
+                         ["legacy"], None, skeleton_cache=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        datasets = {}
+        for workers in (1, 2):
+            out = os.path.join(tmp, f"workers{workers}")
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                manifest = run_sweep(points, out, workers=workers, current_time=1700000000)
+            entries = manifest["points"]
+            assert [e["status"] for e in entries] == ["ok"] * 4 and len(set(e["nodes"] for e in entries)) == 2, \
+                f"[{workers} workers] every point generated: got {[(e['status'], e.get('error')) for e in entries]}"
+            with open(os.path.join(out, "manifest.json")) as f:
+                assert json.load(f)["points"] == entries, f"[{workers} workers] manifest written"
+            datasets[workers] = []
+            for entry in entries:
+                with open(os.path.join(out, entry["dataset"])) as f:
+                    datasets[workers].append(without_guids(f.read()))
+            assert all(e["bytes"] == os.path.getsize(os.path.join(out, e["dataset"])) for e in entries), \
+                f"[{workers} workers] dataset sizes recorded"
+        assert len(set(datasets[1][:3])) == 1, "later runs in a process build the first run's graph"
+        assert datasets[1] == datasets[2], "workers write the datasets of a single process"
+
+        # A point that fails while memory is traced
+        failing = dict(points[0], name="failing", parameters=None)
+        tracemalloc.start()
+        entry = run_point(failing, tmp, 1700000000, trace_memory=True)
+        assert entry["status"] == "failed" and not tracemalloc.is_tracing(), \
+            f"failed point recorded, tracing stopped for the worker's later points: got {entry}"
+
+        # The manifest describes what the generator wrote, whatever its format
+        sweep._MENU.output_format = "bloodhound"
+        try:
+            entry = run_point(dict(points[0], name="zipped"), tmp, 1700000000)
+        finally:
+            sweep._MENU.output_format = "json"
+        assert (entry["status"] == "ok" and entry["dataset"] == "zipped_bloodhound.zip"
+                and entry["bytes"] == os.path.getsize(os.path.join(tmp, "zipped_bloodhound.zip"))), \
+            f"a BloodHound point records its zip: got {entry}"
+        hybrid = plan_points(DEFAULT_CONFIGURATIONS, [{"User.nUsers": 20}], ["hybrid"], None, skeleton_cache=False)[0]
+        entry = run_point(hybrid, tmp, 1700000000)
+        with open(os.path.join(tmp, entry["dataset"])) as f:
+            types = [json.loads(line)["type"] for line in f]
+        assert (entry["status"] == "ok" and entry["nodes"] == types.count("node")
+                and entry["edges"] == len(types) - types.count("node")), \
+            f"a hybrid point records the graph it wrote: got {entry}"
+
+TESTS = (
+    test_sweep,
+)
+
+def main():
+    print("\n" + "="*60)
+    print("  Parameter Sweep Test Suite")
+    print("="*60)
+
+    failed = 0
+    for test in TESTS:
+        try:
+            test()
+            print(f"  [{PASS_S}] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  [{FAIL_S}] {test.__name__}\n         → {e}")
+
+    total = len(TESTS)
+    print(f"\n{'='*60}")
+    print(f"  Results: {total - failed}/{total} tests passed", end="")
+    print(f"  ({failed} FAILED)" if failed else "  ✓ ALL PASS")
+    print(f"{'='*60}\n")
+    return 0 if failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
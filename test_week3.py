@@ -30,6 +30,7 @@ Tests:
   25. Endpoint constraints: all edges pass schema validation
   26. Determinism: same seed → identical graph
   27. CLI end-to-end: graph contains all expected node types
+  28. Parallel generation: --workers N output identical to the serial run
 """
 
 import copy
@@ -360,6 +361,24 @@ def test_determinism():
     check("Same seed → same node ids",   ids1 == ids2)
 
 
+def test_parallel():
+    print("\n── Parallel Generation ──────────────────────────────────────")
+    import run
+    cfg = copy.deepcopy(DEFAULT_HYBRID_CONFIG)
+    cfg["Domain"]["nDomains"] = 3
+    cfg["Tenant"]["nTenantsPerDomain"] = 2
+    s = dict(BASE_SEED, _run_id="par-run", _current_time=1700000000)
+
+    run.generate_graph(cfg, dict(s))
+    serial = (copy.deepcopy(HYBRID_NODES), copy.deepcopy(HYBRID_EDGES))
+    run.generate_graph(cfg, dict(s), workers=2)
+
+    check("workers=2 → identical node records", HYBRID_NODES == serial[0])
+    check("workers=2 → identical edge records", HYBRID_EDGES == serial[1])
+    check("workers=2 → identical node order",
+          [n["id"] for n in HYBRID_NODES] == [n["id"] for n in serial[0]])
+
+
 def test_cli():
     print("\n── CLI End-to-End ───────────────────────────────────────────")
     script = os.path.join(os.path.dirname(__file__), "run.py")
@@ -409,6 +428,7 @@ def main():
     test_nhi_generation()
     test_endpoint_constraints()
     test_determinism()
+    test_parallel()
     test_cli()
 
     passed = sum(1 for _, ok in _results if ok)